@@ -24,9 +24,15 @@ from restalchemy.storage.sql import engines
 
 from exordos_core.common import config
 from exordos_core.common import log as infra_log
+from exordos_core.compute.agents.universal.drivers import workers as pool_workers
+from exordos_core.compute.scheduler import pipeline as n_pipeline
+from exordos_core.compute.scheduler import prewarm as n_prewarm
+from exordos_core.gservice import metrics as gs_metrics
 from exordos_core.gservice.service import GeneralService
+from exordos_core.network import ipam as net_ipam
 
 DOMAIN = "gservice"
+DOMAIN_SCHEDULER = "scheduler"
 
 cli_opts = [
     cfg.StrOpt(
@@ -34,6 +40,137 @@ cli_opts = [
         default="https://repository.genesis-core.tech/genesis_lbaas/latest/genesis-lbaas.raw.gz",
         help="URL to get image for LB dataplane VM",
     ),
+    cfg.IntOpt(
+        "workers",
+        default=0,
+        min=0,
+        help="Number of threads to run nested services in parallel. "
+        "Zero means all services run serially in a single thread. "
+        "Every worker holds its own DB connection so the DB connection "
+        "pool size should be adjusted accordingly.",
+    ),
+    cfg.FloatOpt(
+        "service-deadline",
+        default=None,
+        min=0,
+        help="Maximum duration (seconds) of a nested service iteration in "
+        "the parallel mode. The general loop doesn't wait for a service "
+        "which exceeds the deadline and skips it until it finishes.",
+    ),
+    cfg.StrOpt(
+        "metrics-file",
+        default=None,
+        help="Path to the file to export per-service iteration metrics "
+        "(durations, lags, overruns, SQL statements) in the Prometheus "
+        "text format. The metrics aren't exported if it isn't set.",
+    ),
+    cfg.BoolOpt(
+        "notify-wakeups",
+        default=False,
+        help="Wake up the nested services on table changes via "
+        "PostgreSQL LISTEN/NOTIFY. Periodic polling is kept as a fallback. "
+        "Requires a direct (session) connection to the database.",
+    ),
+    cfg.BoolOpt(
+        "leases",
+        default=False,
+        help="Distribute the nested services among several gservice "
+        "instances using PostgreSQL advisory locks as leases. The host "
+        "bound agents run on every instance. Requires a direct (session) "
+        "connection to the database.",
+    ),
+    cfg.IntOpt(
+        "shards",
+        default=1,
+        min=1,
+        help="Number of shards the heavy builders are split into by "
+        "instance UUID if leases are enabled. Every shard has its own lease.",
+    ),
+    cfg.IntOpt(
+        "pool-agent-workers",
+        default=0,
+        min=0,
+        help="Number of parallel data plane operations (volumes and "
+        "machines) per pool in the pool agent. Zero means all operations "
+        "run serially in the agent thread.",
+    ),
+    cfg.FloatOpt(
+        "pool-agent-operation-timeout",
+        default=pool_workers.DEF_OPERATION_TIMEOUT,
+        min=0,
+        help="Duration (seconds) after which a parallel operation of the "
+        "pool agent is reported as overdue. The operation isn't interrupted, "
+        "it's picked up on one of the next agent iterations.",
+    ),
+    cfg.StrOpt(
+        "ipam-backend",
+        default=net_ipam.DEF_IPAM_BACKEND,
+        choices=tuple(net_ipam.IPAM_BACKENDS),
+        help="IPAM implementation of the network service. 'ranges' is the "
+        "list of free ranges scanned linearly, 'bitmap' allocates and "
+        "releases IPs in logarithmic time.",
+    ),
+    cfg.BoolOpt(
+        "network-batch-allocation",
+        default=False,
+        help="Allocate the ports of all new nodes of an iteration at once "
+        "and insert them in bulk. Ports are allocated one by one "
+        "otherwise.",
+    ),
+]
+
+scheduler_opts = [
+    cfg.ListOpt(
+        "pool-filters",
+        default=list(n_pipeline.DEFAULT_POOL_FILTERS),
+        help="Ordered names of the machine pool filters from the "
+        "gcn_scheduler_pool_filter entry point group.",
+    ),
+    cfg.ListOpt(
+        "pool-weighters",
+        default=list(n_pipeline.DEFAULT_POOL_WEIGHTERS),
+        help="Names of the machine pool weighters from the "
+        "gcn_scheduler_pool_weighter entry point group.",
+    ),
+    cfg.ListOpt(
+        "machine-filters",
+        default=list(n_pipeline.DEFAULT_MACHINE_FILTERS),
+        help="Ordered names of the idle machine filters from the "
+        "gcn_scheduler_machine_filter entry point group.",
+    ),
+    cfg.ListOpt(
+        "machine-weighters",
+        default=list(n_pipeline.DEFAULT_MACHINE_WEIGHTERS),
+        help="Names of the idle machine weighters from the "
+        "gcn_scheduler_machine_weighter entry point group.",
+    ),
+    cfg.DictOpt(
+        "weighter-multipliers",
+        default={},
+        help="Multipliers of the weighters by name, for instance "
+        "RelativeCoreRamWeighter:2.0. The default multiplier is 1.0, zero "
+        "disables the weighter and a negative value inverts it.",
+    ),
+    cfg.BoolOpt(
+        "batch-placement",
+        default=False,
+        help="Place all unscheduled nodes of an iteration into pools using "
+        "an in-memory capacity index and write the placements in bulk.",
+    ),
+    cfg.ListOpt(
+        "prewarm-volumes",
+        default=[],
+        help="Free volumes kept ready in every pool as "
+        "<size>:<count>:<image> entries, for instance "
+        "10:3:http://repo/ubuntu.raw.gz. A volume serves node volumes of "
+        "the image of its size or bigger.",
+    ),
+    cfg.IntOpt(
+        "prewarm-per-iteration",
+        default=n_prewarm.PREWARM_PER_PASS,
+        min=1,
+        help="Maximum number of pre-warmed volumes created per scheduler iteration.",
+    ),
 ]
 
 
@@ -42,6 +179,7 @@ ra_config_opts.register_posgresql_db_opts(CONF)
 sdk_opts.register_event_opts(CONF)
 
 CONF.register_cli_opts(cli_opts, DOMAIN)
+CONF.register_cli_opts(scheduler_opts, DOMAIN_SCHEDULER)
 
 
 def main():
@@ -53,8 +191,40 @@ def main():
     log = logging.getLogger(__name__)
 
     engines.engine_factory.configure_postgresql_factory(CONF)
-
-    service = GeneralService()
+    if CONF[DOMAIN].metrics_file:
+        gs_metrics.install_sql_counter(engines.engine_factory.get_engine())
+
+    scheduler = CONF[DOMAIN_SCHEDULER]
+    scheduler_pipeline = n_pipeline.SchedulerPipeline.load(
+        pool_filters=scheduler.pool_filters,
+        pool_weighters=scheduler.pool_weighters,
+        machine_filters=scheduler.machine_filters,
+        machine_weighters=scheduler.machine_weighters,
+        multipliers={k: float(v) for k, v in scheduler.weighter_multipliers.items()},
+    )
+
+    volume_prewarmer = None
+    if scheduler.prewarm_volumes:
+        volume_prewarmer = n_prewarm.VolumePrewarmer(
+            specs=[n_prewarm.PrewarmSpec.parse(v) for v in scheduler.prewarm_volumes],
+            per_pass=scheduler.prewarm_per_iteration,
+        )
+
+    service = GeneralService(
+        workers=CONF[DOMAIN].workers,
+        service_deadline=CONF[DOMAIN].service_deadline,
+        metrics_file=CONF[DOMAIN].metrics_file,
+        listen_url=CONF.db.connection_url if CONF[DOMAIN].notify_wakeups else None,
+        lease_url=CONF.db.connection_url if CONF[DOMAIN].leases else None,
+        shards=CONF[DOMAIN].shards,
+        scheduler_pipeline=scheduler_pipeline,
+        batch_placement=scheduler.batch_placement,
+        volume_prewarmer=volume_prewarmer,
+        pool_agent_workers=CONF[DOMAIN].pool_agent_workers,
+        pool_agent_operation_timeout=CONF[DOMAIN].pool_agent_operation_timeout,
+        ipam_backend=CONF[DOMAIN].ipam_backend,
+        network_batch_allocation=CONF[DOMAIN].network_batch_allocation,
+    )
 
     service.start()
 
@@ -0,0 +1,163 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import typing as tp
+import uuid as sys_uuid
+
+from gcl_sdk.common import constants as sdk_c
+from restalchemy.dm import filters as dm_filters
+from restalchemy.storage.sql import engines
+
+# Only the last 32 bits of UUID are hashed, so the shard of an instance
+# can be computed by the database as well
+SHARD_KEY_MASK = 0xFFFFFFFF
+
+
+def shard_key_sql(column: str) -> str:
+    """SQL expression of the shard key of the UUID column."""
+    return f"('x' || right({column}::text, 8))::bit(32)::bigint"
+
+
+# The mixin overrides the methods of the builder it's mixed into
+if tp.TYPE_CHECKING:
+    from gcl_sdk.agents.universal.services.builder import (
+        UniversalBuilderService as _BuilderBase,
+    )
+else:
+    _BuilderBase = object
+
+
+class ShardedServiceMixin:
+    """Service that processes only a part (shards) of the instances.
+
+    An instance belongs to the shard `(uuid.int & SHARD_KEY_MASK) %
+    shard_count`. The shards
+    are assigned by the general service according to the owned leases.
+    By default the service owns the only shard, i.e. all instances.
+    """
+
+    def __init__(self, *args: tp.Any, **kwargs: tp.Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._shards: tp.FrozenSet[int] = frozenset((0,))
+        self._shard_count = 1
+
+    def set_shards(self, shards: tp.Collection[int], shard_count: int) -> None:
+        self._shards = frozenset(shards)
+        self._shard_count = shard_count
+
+    @property
+    def is_primary_shard(self) -> bool:
+        """The primary shard owner performs the non-sharded work."""
+        return 0 in self._shards
+
+    def in_shard(self, uuid: sys_uuid.UUID) -> bool:
+        return (uuid.int & SHARD_KEY_MASK) % self._shard_count in self._shards
+
+
+class ShardedBuilderMixin(ShardedServiceMixin, _BuilderBase):
+    """Shard the new and updated instances of a universal builder.
+
+    The new and updated instances are the bulk of the builder work, they
+    are split by instance UUID. The rest of the work (deleted and
+    outdated instances) is done by the primary shard owner only.
+
+    The shards are selected by the database, so the page of instances
+    fetched by every shard consists of its own instances only. The
+    instance models with filter clauses aren't sharded in the database,
+    the page of such builders is filtered after the fetch.
+    """
+
+    def _is_sharded_in_db(self) -> bool:
+        return self._shard_count > 1 and not self._instance_model.get_filter_clause(
+            **self._iteration_context.get("clause_filters", {})
+        )
+
+    def _get_shard_instances(self, expression: str) -> tp.List[tp.Any]:
+        model = self._instance_model
+        table = model.__tablename__
+        shard_key = shard_key_sql(f"{table}.uuid")
+        engine = engines.engine_factory.get_engine()
+        with engine.session_manager() as session:
+            rows = session.execute(
+                expression.format(table=table, shard_key=shard_key),
+                (
+                    model.get_resource_kind(),
+                    self._shard_count,
+                    list(self._shards),
+                    sdk_c.DEF_SQL_LIMIT,
+                ),
+            ).fetchall()
+
+        if not rows:
+            return []
+
+        return model.objects.get_all(
+            filters={"uuid": dm_filters.In(str(r["uuid"]) for r in rows)},
+        )
+
+    def _get_new_instances(self) -> tp.Collection[tp.Any]:
+        if not self._is_sharded_in_db():
+            return [i for i in super()._get_new_instances() if self.in_shard(i.uuid)]
+
+        return self._get_shard_instances(
+            """
+            SELECT {table}.uuid AS uuid
+            FROM {table} LEFT JOIN ua_target_resources
+                ON ua_target_resources.uuid = {table}.uuid
+                AND ua_target_resources.kind = %s
+            WHERE ua_target_resources.uuid IS NULL
+                AND {shard_key} %% %s = ANY(%s)
+            LIMIT %s;
+            """
+        )
+
+    def _get_updated_instances(self) -> tp.Collection[tp.Any]:
+        if not self._is_sharded_in_db():
+            return [
+                i for i in super()._get_updated_instances() if self.in_shard(i.uuid)
+            ]
+
+        return self._get_shard_instances(
+            """
+            SELECT {table}.uuid AS uuid
+            FROM {table} INNER JOIN ua_target_resources
+                ON ua_target_resources.uuid = {table}.uuid
+            WHERE {table}.updated_at != ua_target_resources.tracked_at
+                AND ua_target_resources.kind = %s
+                AND {shard_key} %% %s = ANY(%s)
+            LIMIT %s;
+            """
+        )
+
+    def _actualize_deleted_instances(self) -> None:
+        if self.is_primary_shard:
+            super()._actualize_deleted_instances()
+
+    def _actualize_outdated_instances(self) -> None:
+        if self.is_primary_shard:
+            super()._actualize_outdated_instances()
+
+    def _actualize_outdated_master_hash_instances(self) -> None:
+        if self.is_primary_shard:
+            super()._actualize_outdated_master_hash_instances()
+
+    def _actualize_outdated_master_full_hash_instances(self) -> None:
+        if self.is_primary_shard:
+            super()._actualize_outdated_master_full_hash_instances()
+
+    def _actualize_instances_with_outdated_tracked(self) -> None:
+        if self.is_primary_shard:
+            super()._actualize_instances_with_outdated_tracked()
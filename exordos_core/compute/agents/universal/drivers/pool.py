@@ -14,10 +14,13 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import functools
 import logging
+import threading
 import typing as tp
 import uuid as sys_uuid
 
+from gcl_sdk.agents.universal.dm import models as ua_models
 from gcl_sdk.agents.universal.drivers import exceptions as ua_driver_exc
 from gcl_sdk.agents.universal.drivers import meta
 import netaddr
@@ -27,6 +30,7 @@ from restalchemy.dm import types_dynamic
 
 from exordos_core.common import utils
 from exordos_core.compute import constants as nc
+from exordos_core.compute.agents.universal.drivers import workers as pool_workers
 from exordos_core.compute.dm import models
 from exordos_core.compute.pool.drivers import base as driver_base
 from exordos_core.compute.pool.drivers import exceptions as driver_exc
@@ -42,7 +46,11 @@ class RootVolumeNotFound(ua_driver_exc.AgentDriverException):
 class MetaPool(meta.MetaCoordinatorDataPlaneModel):
     """Machine pool meta model."""
 
-    __driver_map__ = {}
+    __driver_map__: tp.Dict[str, driver_base.AbstractPoolDriver] = {}
+    # Guards the driver map. Every driver is loaded under its own lock, so
+    # a slow connection doesn't block loading drivers of other pools.
+    __driver_lock__ = threading.Lock()
+    __driver_locks__: tp.Dict[str, threading.Lock] = {}
 
     driver_spec = properties.property(types.Dict(), required=True)
     machine_type = properties.property(
@@ -74,6 +82,9 @@ class MetaPool(meta.MetaCoordinatorDataPlaneModel):
         self.dp_port_map = {}
         self.dp_volume_map = {}
         self.dp_storage_pool_map = {}
+        # Guards the capacity accounting if the operations of the pool
+        # run concurrently
+        self.lock = threading.RLock()
 
     def load_driver(self) -> driver_base.AbstractPoolDriver:
         """
@@ -83,16 +94,48 @@ class MetaPool(meta.MetaCoordinatorDataPlaneModel):
         """
         driver_key = str(self.driver_spec)
 
-        if driver_key in self.__driver_map__:
-            return self.__driver_map__[driver_key]
+        driver = self.__driver_map__.get(driver_key)
+        if driver is not None:
+            return driver
 
-        # TODO(akremenetsky): Use dynamic typing for this field
-        driver_kind = self.driver_spec["driver"]
+        with self.__driver_lock__:
+            lock = self.__driver_locks__.setdefault(driver_key, threading.Lock())
 
-        class_ = utils.load_from_entry_point(nc.EP_MACHINE_POOL_DRIVERS, driver_kind)
-        driver = class_(self)
-        self.__driver_map__[driver_key] = driver
-        return driver
+        with lock:
+            # Loaded by another thread in the meantime
+            driver = self.__driver_map__.get(driver_key)
+            if driver is not None:
+                return driver
+
+            # TODO(akremenetsky): Use dynamic typing for this field
+            driver_kind = self.driver_spec["driver"]
+
+            class_ = utils.load_from_entry_point(
+                nc.EP_MACHINE_POOL_DRIVERS, driver_kind
+            )
+            driver = class_(self)
+            with self.__driver_lock__:
+                self.__driver_map__[driver_key] = driver
+            return driver
+
+    @classmethod
+    def evict_drivers(cls, pools: tp.Iterable["MetaPool"]) -> None:
+        """Close and forget the drivers of pools that are gone."""
+        alive = {str(p.driver_spec) for p in pools}
+        with cls.__driver_lock__:
+            gone = {
+                k: cls.__driver_map__.pop(k)
+                for k in tuple(cls.__driver_map__.keys())
+                if k not in alive
+            }
+            for driver_key in gone:
+                cls.__driver_locks__.pop(driver_key, None)
+
+        for driver_key, driver in gone.items():
+            try:
+                driver.close()
+            except Exception:
+                LOG.exception("Unable to close the driver %s", driver_key)
 
     def get_meta_model_fields(self) -> tp.Optional[tp.Set[str]]:
         """Return a list of meta fields or None.
@@ -296,6 +339,19 @@ class MetaVolume(meta.MetaCoordinatorDataPlaneModel):
         storage_pool = pool.storage_pools[0]
         storage_pool.allocate_capacity(size)
 
+    def _reserve_capacity(self, pool: MetaPool, size: tp.Optional[int] = None) -> bool:
+        """Check and allocate the capacity at once."""
+        with pool.lock:
+            if not self._has_storage_capacity(pool, size):
+                return False
+            self._allocate_capacity(pool, size)
+            return True
+
+    def _release_capacity(self, pool: MetaPool, size: tp.Optional[int] = None) -> None:
+        size = size if size is not None else self.size
+        with pool.lock:
+            pool.storage_pools[0].free_capacity(size)
+
     def get_meta_model_fields(self) -> tp.Optional[tp.Set[str]]:
         """Return a list of meta fields or None.
 
@@ -325,7 +381,7 @@ class MetaVolume(meta.MetaCoordinatorDataPlaneModel):
             dp_volume = pool.dp_volume_map[self.uuid]
         else:
             # Check the storage pool has enough capacity
-            if not self._has_storage_capacity(pool):
+            if not self._reserve_capacity(pool):
                 self.status = nc.VolumeStatus.ERROR.value
                 return
 
@@ -342,8 +398,11 @@ class MetaVolume(meta.MetaCoordinatorDataPlaneModel):
                 machine=self.machine,
                 project_id=self.project_id,
             )
-            self._create_volume(pool, driver, dp_volume)
-            self._allocate_capacity(pool)
+            try:
+                self._create_volume(pool, driver, dp_volume)
+            except Exception:
+                self._release_capacity(pool)
+                raise
 
         self._from_dp_volume(dp_volume)
 
@@ -405,14 +464,18 @@ class MetaVolume(meta.MetaCoordinatorDataPlaneModel):
         # Resize the volume
         if self.size != dp_volume.size:
             # Check the storage pool has enough capacity
-            if not self._has_storage_capacity(pool, self.size - dp_volume.size):
+            need_size = self.size - dp_volume.size
+            if not self._reserve_capacity(pool, need_size):
                 self.status = nc.VolumeStatus.ERROR.value
                 return
 
             unknown_action = False
             dp_volume.size = self.size
-            driver.resize_volume(dp_volume)
-            self._allocate_capacity(pool, self.size - dp_volume.size)
+            try:
+                driver.resize_volume(dp_volume)
+            except Exception:
+                self._release_capacity(pool, need_size)
+                raise
             LOG.info("The volume %s resized.", self.uuid)
 
         # Attachments
@@ -551,6 +614,32 @@ class MetaMachine(meta.MetaCoordinatorDataPlaneModel):
         if ram is not None:
             pool.avail_ram -= ram
 
+    def _reserve_resources(
+        self,
+        pool: MetaPool,
+        cores: tp.Optional[int] = None,
+        ram: tp.Optional[int] = None,
+    ) -> bool:
+        """Check and allocate the resources at once."""
+        with pool.lock:
+            if not self._has_enough_resources(pool, cores, ram):
+                return False
+            self._allocate_resources(pool, cores, ram)
+            return True
+
+    def _release_resources(
+        self,
+        pool: MetaPool,
+        cores: tp.Optional[int] = None,
+        ram: tp.Optional[int] = None,
+    ) -> None:
+        with pool.lock:
+            self._allocate_resources(
+                pool,
+                -cores if cores is not None else None,
+                -ram if ram is not None else None,
+            )
+
     def get_meta_model_fields(self) -> tp.Optional[tp.Set[str]]:
         """Return a list of meta fields or None.
 
@@ -606,10 +695,21 @@ class MetaMachine(meta.MetaCoordinatorDataPlaneModel):
         # Check the pool has enough resources.
         # If the pool doesn't have enough resources, mark the machine
         # as `NEED_RESCHEDULE` and return.
-        if not self._has_enough_resources(pool, self.cores, self.ram):
+        if not self._reserve_resources(pool, self.cores, self.ram):
             self.status = nc.MachineStatus.NEED_RESCHEDULE.value
             return
 
+        try:
+            self._create_machine_with_deps(driver, volumes)
+        except Exception:
+            self._release_resources(pool, self.cores, self.ram)
+            raise
+
+    def _create_machine_with_deps(
+        self,
+        driver: driver_base.AbstractPoolDriver,
+        volumes: tp.Collection[MetaVolume],
+    ) -> None:
         dp_machine = models.Machine(
             uuid=self.uuid,
             name=self.name,
@@ -630,7 +730,6 @@ class MetaMachine(meta.MetaCoordinatorDataPlaneModel):
         ports = (self._port(),)
 
         self._create_machine(driver, dp_machine, pool_volumes, ports)
-        self._allocate_resources(pool, self.cores, self.ram)
 
     def restore_from_dp(
         self, pool: tp.Optional[MetaPool], volumes: tp.Collection[MetaVolume]
@@ -683,7 +782,7 @@ class MetaMachine(meta.MetaCoordinatorDataPlaneModel):
             # possible in this case as we need to migrate the machine.
             # Such functionality is not implemented yet.
             need_cores = self.cores - dp_machine.cores
-            if not self._has_enough_resources(pool, cores=need_cores):
+            if not self._reserve_resources(pool, cores=need_cores):
                 self.status = nc.MachineStatus.ERROR.value
                 LOG.error("Not enough Cores to update the machine %s", self.uuid)
                 return
@@ -701,8 +800,11 @@ class MetaMachine(meta.MetaCoordinatorDataPlaneModel):
                     self.image,
                 )
 
-            driver.set_machine_cores(dp_machine, self.cores)
-            self._allocate_resources(pool, cores=need_cores)
+            try:
+                driver.set_machine_cores(dp_machine, self.cores)
+            except Exception:
+                self._release_resources(pool, cores=need_cores)
+                raise
             LOG.info("The machine %s cores updated.", self.uuid)
 
         # Ram
@@ -715,13 +817,16 @@ class MetaMachine(meta.MetaCoordinatorDataPlaneModel):
             # possible in this case as we need to migrate the machine.
             # Such functionality is not implemented yet.
             need_ram = self.ram - dp_machine.ram
-            if not self._has_enough_resources(pool, ram=need_ram):
+            if not self._reserve_resources(pool, ram=need_ram):
                 self.status = nc.MachineStatus.ERROR.value
                 LOG.error("Not enough RAM to update the machine %s", self.uuid)
                 return
 
-            driver.set_machine_ram(dp_machine, self.ram)
-            self._allocate_resources(pool, ram=need_ram)
+            try:
+                driver.set_machine_ram(dp_machine, self.ram)
+            except Exception:
+                self._release_resources(pool, ram=need_ram)
+                raise
             LOG.info("The machine %s ram updated.", self.uuid)
 
         # TODO(akremenetsky): Actually update image logic is more suitable for
@@ -761,7 +866,7 @@ class MetaMachine(meta.MetaCoordinatorDataPlaneModel):
 
 class PoolAgentDriver(meta.MetaCoordinatorAgentDriver):
     # Order matters
-    __model_map__ = {
+    __model_map__: tp.Dict[str, tp.Type[meta.MetaCoordinatorDataPlaneModel]] = {
         "pool": MetaPool,
         "pool_volume": MetaVolume,
         "pool_machine": MetaMachine,
@@ -786,3 +891,186 @@ class PoolAgentDriver(meta.MetaCoordinatorAgentDriver):
             },
         },
     }
+
+    # Kinds which data plane operations may run in parallel across pools
+    __parallel_kinds__ = ("pool_volume", "pool_machine")
+
+    def __init__(
+        self,
+        *args: tp.Any,
+        meta_file: str,
+        workers: int = 0,
+        operation_timeout: float = pool_workers.DEF_OPERATION_TIMEOUT,
+        **kwargs: tp.Any,
+    ) -> None:
+        super().__init__(*args, meta_file=meta_file, **kwargs)
+
+        # Zero workers means all operations run serially in the agent thread
+        self._workers: tp.Optional[pool_workers.PoolWorkers] = None
+        if workers > 0:
+            self._workers = pool_workers.PoolWorkers(workers, operation_timeout)
+
+    def _parallel_workers(
+        self, resource: ua_models.Resource
+    ) -> tp.Optional[pool_workers.PoolWorkers]:
+        """The workers if the resource operations run in parallel."""
+        if resource.kind not in self.__parallel_kinds__:
+            return None
+        return self._workers
+
+    def _in_progress(self, resource: ua_models.Resource) -> ua_models.Resource:
+        """The resource with an operation in flight."""
+        meta_obj = self.__model_map__[resource.kind].from_ua_resource(resource)
+        if resource.kind == "pool_volume":
+            meta_obj.status = nc.VolumeStatus.IN_PROGRESS.value
+        else:
+            meta_obj.status = nc.MachineStatus.IN_PROGRESS.value
+        return meta_obj.to_ua_resource(resource.kind)
+
+    def _not_ready(
+        self, workers: pool_workers.PoolWorkers, resource: ua_models.Resource
+    ) -> bool:
+        """Check an operation on the resource or its volumes is in flight."""
+        if resource.uuid in workers:
+            return True
+
+        if workers.blocked(resource.uuid):
+            LOG.debug("Volumes of %s are in progress, skip it", resource.uuid)
+            return True
+
+        return False
+
+    def _prepare(
+        self, resource: ua_models.Resource
+    ) -> tp.Tuple[meta.MetaCoordinatorDataPlaneModel, tp.Dict[str, tp.Any]]:
+        meta_obj = self.__model_map__[resource.kind].from_ua_resource(resource)
+        requirements = self.__coordinator_map__.get(resource.kind)
+        deps = self._get_dependencies(resource.kind, requirements, meta_obj)
+        return meta_obj, deps
+
+    def _dependents(
+        self, meta_obj: meta.MetaCoordinatorDataPlaneModel
+    ) -> tp.Tuple[sys_uuid.UUID, ...]:
+        """Resources not ready until the operation on `meta_obj` is done."""
+        if isinstance(meta_obj, MetaVolume) and meta_obj.machine is not None:
+            return (meta_obj.machine,)
+        return ()
+
+    def create(self, resource: ua_models.Resource) -> ua_models.Resource:
+        """Create the resource, in the pool workers if they're enabled.
+
+        The resource is reported as in progress until the operation is
+        finished, its actual state is reported on the next iteration.
+        """
+        workers = self._parallel_workers(resource)
+        if workers is None:
+            return super().create(resource)
+
+        if self._not_ready(workers, resource):
+            return self._in_progress(resource)
+
+        try:
+            self.get(resource)
+        except ua_driver_exc.ResourceNotFound:
+            pass
+        else:
+            raise ua_driver_exc.ResourceAlreadyExists(resource=resource)
+
+        meta_obj, deps = self._prepare(resource)
+        if deps["pool"] is None:
+            return super().create(resource)
+
+        def complete() -> None:
+            self._add_to_meta(resource.kind, meta_obj)
+            self._coordinator_storage[resource.kind][meta_obj.uuid] = meta_obj
+            LOG.debug("Created resource: %s", meta_obj.uuid)
+
+        workers.submit(
+            deps["pool"].uuid,
+            resource.kind,
+            resource.uuid,
+            functools.partial(meta_obj.dump_to_dp, **deps),
+            complete,
+            dependents=self._dependents(meta_obj),
+        )
+        return self._in_progress(resource)
+
+    def update(self, resource: ua_models.Resource) -> ua_models.Resource:
+        """Update the resource, in the pool workers if they're enabled."""
+        workers = self._parallel_workers(resource)
+        if workers is None:
+            return super().update(resource)
+
+        if self._not_ready(workers, resource):
+            return self._in_progress(resource)
+
+        for meta_obj in self._load_from_meta(resource.kind):
+            if meta_obj.uuid == resource.uuid:
+                break
+        else:
+            raise ua_driver_exc.ResourceNotFound(resource=resource)
+
+        meta_obj, deps = self._prepare(resource)
+        if deps["pool"] is None:
+            return super().update(resource)
+
+        def complete() -> None:
+            self._delete_from_meta(resource.kind, resource.uuid)
+            self._add_to_meta(resource.kind, meta_obj)
+            self._coordinator_storage[resource.kind][meta_obj.uuid] = meta_obj
+            LOG.debug("Updated resource: %s", meta_obj.uuid)
+
+        workers.submit(
+            deps["pool"].uuid,
+            resource.kind,
+            resource.uuid,
+            functools.partial(meta_obj.update_on_dp, **deps),
+            complete,
+            dependents=self._dependents(meta_obj),
+        )
+        return self._in_progress(resource)
+
+    def delete(self, resource: ua_models.Resource) -> None:
+        """Delete the resource, in the pool workers if they're enabled."""
+        workers = self._parallel_workers(resource)
+        if workers is None:
+            return super().delete(resource)
+
+        if resource.uuid in workers:
+            return
+
+        meta_obj, deps = self._prepare(resource)
+        if deps["pool"] is None:
+            return super().delete(resource)
+
+        def complete() -> None:
+            self._delete_from_meta(resource.kind, resource.uuid)
+            self._coordinator_storage[resource.kind].pop(meta_obj.uuid, None)
+            LOG.debug("Deleted resource: %s(%s)", resource.uuid, resource.kind)
+
+        workers.submit(
+            deps["pool"].uuid,
+            resource.kind,
+            resource.uuid,
+            functools.partial(meta_obj.delete_from_dp, **deps),
+            complete,
+        )
+
+    def finalize_capability(self, capability: str) -> None:
+        # Don't wait for the operations, machines with volumes in flight
+        # are skipped until the volumes are done.
+        if self._workers is not None:
+            self._workers.collect(capability, wait=False)
+        super().finalize_capability(capability)
+
+    def finalize(self) -> None:
+        pools = self._coordinator_storage.get("pool", {})
+        if self._workers is not None:
+            # Pick up the operations finished in the meantime
+            self._workers.collect(wait=False)
+            self._workers.evict(pools.keys())
+
+        # Running operations may use drivers of the deleted pools
+        if self._workers is None or len(self._workers) == 0:
+            MetaPool.evict_drivers(pools.values())
+        super().finalize()
@@ -0,0 +1,161 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from concurrent import futures
+import logging
+import time
+import typing as tp
+import uuid as sys_uuid
+
+LOG = logging.getLogger(__name__)
+
+# Duration (seconds) after which a pool operation is reported as overdue
+DEF_OPERATION_TIMEOUT = 600.0
+
+
+class Operation(tp.NamedTuple):
+    pool: sys_uuid.UUID
+    kind: str
+    uuid: sys_uuid.UUID
+    future: futures.Future
+    complete: tp.Callable[[], None]
+    submitted_at: float
+    # Resources which aren't ready until the operation is finished
+    dependents: tp.FrozenSet[sys_uuid.UUID]
+
+
+class PoolWorkers:
+    """Run data plane operations of pools in parallel.
+
+    Every pool has its own bounded thread pool so a slow pool doesn't
+    block operations on other pools and a pool isn't overloaded with
+    concurrent operations. The `complete` callback of a succeeded
+    operation is called in the collecting thread, so the driver state
+    (meta file, coordinator storage) is updated by a single thread only.
+    An operation that exceeds the timeout is reported and left running in
+    background, it's collected on one of the next calls.
+    """
+
+    def __init__(self, workers: int, timeout: float = DEF_OPERATION_TIMEOUT) -> None:
+        if workers < 1:
+            raise ValueError("`workers` must be greater than 0")
+
+        self._workers = workers
+        self._timeout = timeout
+        self._executors: tp.Dict[sys_uuid.UUID, futures.ThreadPoolExecutor] = {}
+        self._operations: tp.Dict[sys_uuid.UUID, Operation] = {}
+        # Operations already reported as overdue
+        self._overdue: tp.Set[sys_uuid.UUID] = set()
+
+    def __len__(self) -> int:
+        """Number of operations in flight."""
+        return len(self._operations)
+
+    def __contains__(self, uuid: sys_uuid.UUID) -> bool:
+        """Check an operation on the resource is in flight."""
+        return uuid in self._operations
+
+    def blocked(self, uuid: sys_uuid.UUID) -> bool:
+        """Check an operation the resource depends on is in flight."""
+        return any(uuid in o.dependents for o in self._operations.values())
+
+    def _executor(self, pool: sys_uuid.UUID) -> futures.ThreadPoolExecutor:
+        if pool not in self._executors:
+            self._executors[pool] = futures.ThreadPoolExecutor(
+                max_workers=self._workers,
+                thread_name_prefix=f"pool-{str(pool)[:8]}",
+            )
+        return self._executors[pool]
+
+    def submit(
+        self,
+        pool: sys_uuid.UUID,
+        kind: str,
+        uuid: sys_uuid.UUID,
+        func: tp.Callable[[], None],
+        complete: tp.Callable[[], None],
+        dependents: tp.Iterable[sys_uuid.UUID] = (),
+    ) -> None:
+        """Run `func` on the pool workers, `complete` is called on success."""
+        if uuid in self._operations:
+            raise ValueError(f"Operation on {uuid} is already in flight")
+
+        future = self._executor(pool).submit(func)
+        self._operations[uuid] = Operation(
+            pool=pool,
+            kind=kind,
+            uuid=uuid,
+            future=future,
+            complete=complete,
+            submitted_at=time.monotonic(),
+            dependents=frozenset(dependents),
+        )
+
+    def _finish(self, operation: Operation) -> None:
+        del self._operations[operation.uuid]
+        self._overdue.discard(operation.uuid)
+        try:
+            operation.future.result()
+        except Exception:
+            LOG.exception(
+                "Error during the operation on %s(%s)",
+                operation.uuid,
+                operation.kind,
+            )
+            return
+
+        operation.complete()
+
+    def collect(self, kind: tp.Optional[str] = None, wait: bool = True) -> None:
+        """Finish the done operations, optionally only of the given kind.
+
+        If `wait` is set, every operation is waited for until its timeout
+        expires.
+        """
+        for operation in tuple(self._operations.values()):
+            if kind is not None and operation.kind != kind:
+                continue
+
+            if wait and not operation.future.done():
+                timeout = operation.submitted_at + self._timeout - time.monotonic()
+                futures.wait((operation.future,), timeout=max(timeout, 0))
+
+            if operation.future.done():
+                self._finish(operation)
+            elif operation.uuid not in self._overdue and (
+                time.monotonic() - operation.submitted_at >= self._timeout
+            ):
+                self._overdue.add(operation.uuid)
+                LOG.warning(
+                    "The operation on %s(%s) exceeds the timeout, "
+                    "it's left running in background",
+                    operation.uuid,
+                    operation.kind,
+                )
+
+    def evict(self, pools: tp.Collection[sys_uuid.UUID]) -> None:
+        """Shut down workers of the pools which aren't in `pools` anymore."""
+        busy = {o.pool for o in self._operations.values()}
+        for pool in tuple(self._executors.keys()):
+            if pool in pools or pool in busy:
+                continue
+            self._executors.pop(pool).shutdown(wait=False)
+
+    def shutdown(self) -> None:
+        """Shut down workers of all pools."""
+        for executor in self._executors.values():
+            executor.shutdown(wait=False)
+        self._executors.clear()
@@ -21,6 +21,7 @@ from gcl_sdk.agents.universal.dm import models as ua_models
 from gcl_sdk.agents.universal.services import builder as sdk_builder
 from restalchemy.dm import filters as dm_filters
 
+from exordos_core.common import sharding
 from exordos_core.compute import constants as nc
 from exordos_core.compute.dm import models
 
@@ -58,7 +59,9 @@ class Node(
         return (ua_models.RI("machine", self.uuid),)
 
 
-class NodeBuilderService(sdk_builder.UniversalBuilderService):
+class NodeBuilderService(
+    sharding.ShardedBuilderMixin, sdk_builder.UniversalBuilderService
+):
     def __init__(
         self,
         iter_min_period: int = 1,
@@ -28,6 +28,8 @@ from restalchemy.dm import filters as dm_filters
 from exordos_core.compute import constants as nc
 from exordos_core.compute.dm import models
 from exordos_core.compute.pool.dm import models as pool_models
+from exordos_core.compute.scheduler import reservations
+from exordos_core.compute.scheduler import storage
 
 LOG = logging.getLogger(__name__)
 
@@ -65,11 +67,15 @@ class PoolBuilderService(sdk_builder.CollectionUniversalBuilderService):
     # Internal methods
 
     def _agent_by_pool(self, pool_uuid: sys_uuid.UUID) -> sys_uuid.UUID:
-        for pool in self._iteration_context["clause_filters"]["pools"]:
-            if pool.uuid == pool_uuid:
-                return pool.agent
-
-        raise ValueError(f"Pool {pool_uuid} not found")
+        try:
+            return self._iteration_context["pool_agents"][pool_uuid]
+        except KeyError:
+            raise ValueError(f"Pool {pool_uuid} not found")
+
+    def _reservations(self) -> reservations.ReservationLedger:
+        return self._iteration_context.get(
+            "reservations", reservations.ReservationLedger()
+        )
 
     # Machine
 
@@ -107,11 +113,47 @@ class PoolBuilderService(sdk_builder.CollectionUniversalBuilderService):
         volume = self._iteration_context[machine.uuid]["root_volume"]
         return port, volume
 
+    def _prefetch_machine_deps(
+        self,
+        machines: tp.Collection[pool_models.Machine],
+    ) -> None:
+        """Fetch the dependencies of all machines of the batch at once."""
+        if not machines:
+            return
+
+        nodes = {m.node.uuid for m in machines if m.node is not None}
+        ports = models.Port.objects.get_all(filters={"node": dm_filters.In(nodes)})
+        volumes = models.MachineVolume.objects.get_all(
+            filters={"machine": dm_filters.In([m.uuid for m in machines])}
+        )
+
+        node_ports: tp.Dict[tp.Optional[sys_uuid.UUID], tp.List[models.Port]] = {}
+        for port in ports:
+            node_ports.setdefault(port.node, []).append(port)
+        machine_volumes: tp.Dict[
+            sys_uuid.UUID, tp.List[models.MachineVolume]
+        ] = {}
+        for volume in volumes:
+            machine_volumes.setdefault(volume.machine, []).append(volume)
+
+        deps = self._iteration_context.setdefault("machine_deps", {})
+        for machine in machines:
+            node_uuid = machine.node.uuid if machine.node is not None else None
+            deps[machine.uuid] = (
+                node_ports.get(node_uuid, []),
+                sorted(machine_volumes.get(machine.uuid, []), key=lambda v: v.index),
+            )
+
     def _fetch_machine_deps(
         self,
         machine: pool_models.Machine,
     ) -> tp.Tuple[tp.Collection[models.Port], tp.Collection[models.MachineVolume]]:
         """Fetch the machine dependencies."""
+        # The dependencies of the batch are usually prefetched
+        deps = self._iteration_context.get("machine_deps", {})
+        if machine.uuid in deps:
+            return deps[machine.uuid]
+
         ports = models.Port.objects.get_all(
             filters={"node": dm_filters.EQ(machine.node.uuid)}
         )
@@ -156,9 +198,13 @@ class PoolBuilderService(sdk_builder.CollectionUniversalBuilderService):
         cores = target_machine.cores - cores
         ram = target_machine.ram - ram
 
-        # TODO(akremenetsky): Actually we need to actualize the pool
-        # avail cores and ram after allocating the machine.
-        return pool.avail_cores >= cores and pool.avail_ram >= ram
+        # The reported capacity doesn't account other machines scheduled
+        # to the pool but not created on the data plane yet.
+        reserved = self._reservations().reserved(pool.uuid, exclude=target_machine.uuid)
+        return (
+            pool.avail_cores - reserved.cores >= cores
+            and pool.avail_ram - reserved.ram >= ram
+        )
 
     def _can_create_machine(
         self,
@@ -368,6 +414,11 @@ class PoolBuilderService(sdk_builder.CollectionUniversalBuilderService):
     ) -> None:
         """Actualize the machine status."""
 
+        # The machine exists on the data plane, so the pool capacity
+        # reported by the agent accounts it already.
+        if pool_machine is not None:
+            self._reservations().release(machine.uuid)
+
         if pool_machine is None or guest_machine is None:
             return
 
@@ -428,11 +479,7 @@ class PoolBuilderService(sdk_builder.CollectionUniversalBuilderService):
         size = actual_volume.size if actual_volume is not None else 0
         size = target_volume.size - size
 
-        if not pool.storage_pools:
-            return False
-
-        storage_pool: models.AbstractStoragePool = pool.storage_pools[0]
-        return storage_pool.has_capacity(size)
+        return storage.select_storage_pool(pool.storage_pools, size) is not None
 
     def _reschedule_volume(
         self,
@@ -462,11 +509,14 @@ class PoolBuilderService(sdk_builder.CollectionUniversalBuilderService):
             self._reschedule_volume(volume)
             return False
 
-        storage_pool: models.AbstractStoragePool = volume.pool.storage_pools[0]
+        storage_pool = storage.select_storage_pool(
+            volume.pool.storage_pools, volume.size
+        )
 
         # FIXME(akremenetsky): Does it work correctly?
         # Will every volume refer to own pool object?
-        storage_pool.allocate_capacity(volume.size)
+        if storage_pool is not None:
+            storage_pool.allocate_capacity(volume.size)
 
         return True
 
@@ -493,11 +543,13 @@ class PoolBuilderService(sdk_builder.CollectionUniversalBuilderService):
             volume.node_volume.save()
             return False
 
-        storage_pool: models.AbstractStoragePool = volume.pool.storage_pools[0]
+        size = target_volume.size - actual_volume.size
+        storage_pool = storage.select_storage_pool(volume.pool.storage_pools, size)
 
         # FIXME(akremenetsky): Does it work correctly?
         # Will every volume refer to own pool object?
-        storage_pool.allocate_capacity(target_volume.size - actual_volume.size)
+        if storage_pool is not None:
+            storage_pool.allocate_capacity(size)
 
         return True
 
@@ -518,9 +570,25 @@ class PoolBuilderService(sdk_builder.CollectionUniversalBuilderService):
             "clause_filters": {
                 "builder": self.ua_service_spec.uuid,
                 "pools": pools,
-            }
+            },
+            "pool_agents": {p.uuid: p.agent for p in pools},
+            "reservations": reservations.ReservationLedger.load(
+                [p.uuid for p in pools]
+            ),
         }
 
+    def _get_new_instances(self) -> tp.Collection[ua_models.InstanceMixin]:
+        instances = super()._get_new_instances()
+        if self._instance_model is pool_models.Machine:
+            self._prefetch_machine_deps(instances)
+        return instances
+
+    def _get_updated_instances(self) -> tp.Collection[ua_models.InstanceMixin]:
+        instances = super()._get_updated_instances()
+        if self._instance_model is pool_models.Machine:
+            self._prefetch_machine_deps(instances)
+        return instances
+
     @functools.singledispatchmethod
     def can_create_instance_resource(
         self,
@@ -22,6 +22,7 @@ from gcl_sdk.agents.universal.services import builder as sdk_builder
 from restalchemy.dm import filters as dm_filters
 from restalchemy.dm import relationships
 
+from exordos_core.common import sharding
 from exordos_core.compute import constants as nc
 from exordos_core.compute.dm import models
 
@@ -61,7 +62,9 @@ class Volume(
         return (ua_models.RI("pool_volume", self.uuid),)
 
 
-class VolumeBuilderService(sdk_builder.UniversalBuilderService):
+class VolumeBuilderService(
+    sharding.ShardedBuilderMixin, sdk_builder.UniversalBuilderService
+):
     def __init__(
         self,
         iter_min_period: int = 1,
@@ -21,6 +21,10 @@ import uuid as sys_uuid
 DEF_SQL_LIMIT = 300
 EP_MACHINE_POOL_DRIVERS = "gcn_machine_pool_driver"
 EP_NETWORK_DRIVERS = "gcn_network_driver"
+EP_SCHEDULER_POOL_FILTERS = "gcn_scheduler_pool_filter"
+EP_SCHEDULER_POOL_WEIGHTERS = "gcn_scheduler_pool_weighter"
+EP_SCHEDULER_MACHINE_FILTERS = "gcn_scheduler_machine_filter"
+EP_SCHEDULER_MACHINE_WEIGHTERS = "gcn_scheduler_machine_weighter"
 DEF_ROOT_DISK_SIZE = 10
 POLICY_SERVICE_NAME = "compute"
 
@@ -125,3 +129,6 @@ class PortStatus(str, enum.Enum):
 
 class PlacementPolicyKind(str, enum.Enum):
     SOFT_ANTI_AFFINITY = "soft-anti-affinity"
+    HARD_ANTI_AFFINITY = "hard-anti-affinity"
+    AFFINITY = "affinity"
+    ZONE_SPREAD = "zone-spread"
@@ -150,6 +150,7 @@ class MachinePool(
     driver_spec = properties.property(types.Dict(), default=dict)
     agent = properties.property(types.AllowNone(types.UUID()), default=None)
     builder = properties.property(types.AllowNone(types.UUID()), default=None)
+    zone = properties.property(types.AllowNone(types.UUID()), default=None)
     machine_type = properties.property(
         types.Enum([t.value for t in nc.NodeType]),
         default=nc.NodeType.VM.value,
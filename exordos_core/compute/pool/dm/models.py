@@ -55,9 +55,9 @@ class SchedulableToAgentFromPoolMixin(ua_models.SchedulableToAgentMixin):
                 instance_pool = instance_pool.uuid
 
             # TODO(akremenetsky): Interface for `_iteration_context`
-            for pool in builder._iteration_context["clause_filters"]["pools"]:
-                if pool.uuid == instance_pool:
-                    return pool.agent
+            pool_agents = builder._iteration_context["pool_agents"]
+            if instance_pool in pool_agents:
+                return pool_agents[instance_pool]
 
         raise ValueError(f"Pool {self.pool} not found")
 
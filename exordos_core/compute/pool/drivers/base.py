@@ -22,6 +22,9 @@ from exordos_core.compute.dm import models
 
 
 class AbstractPoolDriver(abc.ABC):
+    def close(self) -> None:
+        """Release resources of the driver, it isn't used anymore."""
+
     @abc.abstractmethod
     def get_pool_info(self) -> models.MachinePool:
         """Get pool info."""
@@ -0,0 +1,183 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Shared libvirt connections.
+
+Drivers of all pools with the same connection URI share a bounded pool
+of connections. Threads are bound to the connections of the pool
+round-robin, so concurrent operations run over several connections
+while the number of connections stays bounded. Keepalive lets libvirt
+notice a dead peer, so the cheap `isAlive()` check before a connection
+is handed out is enough to reopen broken connections.
+"""
+
+import itertools
+import logging
+import threading
+import typing as tp
+
+import libvirt
+
+from exordos_core.compute.pool.drivers import inventory
+
+LOG = logging.getLogger(__name__)
+
+# Maximum number of connections per URI
+POOL_SIZE = 4
+# Keepalive messages are sent every `KEEPALIVE_INTERVAL` seconds, the
+# connection is closed after `KEEPALIVE_COUNT` unanswered messages.
+KEEPALIVE_INTERVAL = 5
+KEEPALIVE_COUNT = 3
+
+_registry_lock = threading.Lock()
+_registry: tp.Dict[str, "ConnectionPool"] = {}
+
+
+class ConnectionPool:
+    """Bounded pool of libvirt connections to the same URI."""
+
+    def __init__(
+        self,
+        uri: str,
+        size: int = POOL_SIZE,
+        keepalive_interval: int = KEEPALIVE_INTERVAL,
+        keepalive_count: int = KEEPALIVE_COUNT,
+    ) -> None:
+        if size < 1:
+            raise ValueError("`size` must be greater than 0")
+
+        self._uri = uri
+        self._keepalive_interval = keepalive_interval
+        self._keepalive_count = keepalive_count
+        self._lock = threading.Lock()
+        self._connections: tp.List[tp.Optional[libvirt.virConnect]] = [None] * size
+        self._slots = itertools.count()
+        self._local = threading.local()
+        # Number of drivers using the pool
+        self.users = 0
+
+    @property
+    def uri(self) -> str:
+        return self._uri
+
+    def _open(self) -> libvirt.virConnect:
+        # The events are delivered only to connections opened after
+        # the event loop has been registered
+        inventory.ensure_event_loop()
+        conn = libvirt.open(self._uri)
+        if not conn:
+            raise ConnectionError(f"Failed to open libvirt connection: {self._uri}")
+
+        if self._keepalive_interval > 0:
+            try:
+                conn.setKeepAlive(self._keepalive_interval, self._keepalive_count)
+            except libvirt.libvirtError:
+                # Local drivers don't support keepalive
+                LOG.debug("Keepalive isn't supported by %s", self._uri)
+
+        return conn
+
+    @staticmethod
+    def _close(conn: libvirt.virConnect) -> None:
+        try:
+            conn.close()
+        except libvirt.libvirtError:
+            LOG.debug("Unable to close the libvirt connection", exc_info=True)
+
+    @staticmethod
+    def _is_alive(conn: libvirt.virConnect) -> bool:
+        try:
+            return conn.isAlive() == 1
+        except libvirt.libvirtError:
+            return False
+
+    def _slot(self) -> int:
+        slot = getattr(self._local, "slot", None)
+        if slot is None:
+            slot = self._local.slot = next(self._slots) % len(self._connections)
+        return slot
+
+    def get(self, slot: tp.Optional[int] = None) -> libvirt.virConnect:
+        """Healthy connection of the current thread or of the slot.
+
+        The connection is opened outside of the lock, so a slow or
+        unreachable host doesn't block the threads of other slots.
+        """
+        slot = self._slot() if slot is None else slot
+        with self._lock:
+            conn = self._connections[slot]
+            # isAlive() doesn't actually ping the host, but it returns 0
+            # once the keepalive or any call detected a broken connection
+            if conn is not None and self._is_alive(conn):
+                return conn
+            self._connections[slot] = None
+
+        if conn is not None:
+            LOG.warning("The libvirt connection to %s is broken", self._uri)
+            self._close(conn)
+
+        conn = self._open()
+        with self._lock:
+            installed = self._connections[slot]
+            # Another thread of the slot has opened a connection meanwhile
+            if installed is not None and self._is_alive(installed):
+                conn, installed = installed, conn
+            else:
+                self._connections[slot] = conn
+
+        if installed is not None:
+            self._close(installed)
+        return conn
+
+    def primary(self) -> libvirt.virConnect:
+        """The connection for long living bindings like event callbacks."""
+        return self.get(0)
+
+    def close(self) -> None:
+        with self._lock:
+            for i, conn in enumerate(self._connections):
+                if conn is not None:
+                    self._close(conn)
+                self._connections[i] = None
+
+
+def acquire(
+    uri: str,
+    size: int = POOL_SIZE,
+    keepalive_interval: int = KEEPALIVE_INTERVAL,
+    keepalive_count: int = KEEPALIVE_COUNT,
+) -> ConnectionPool:
+    """Shared connection pool of the URI, created on first use."""
+    with _registry_lock:
+        pool = _registry.get(uri)
+        if pool is None:
+            pool = _registry[uri] = ConnectionPool(
+                uri, size, keepalive_interval, keepalive_count
+            )
+        pool.users += 1
+        return pool
+
+
+def release(pool: ConnectionPool) -> None:
+    """Close the connections once the last user releases the pool."""
+    with _registry_lock:
+        pool.users -= 1
+        if pool.users > 0:
+            return
+        if _registry.get(pool.uri) is pool:
+            del _registry[pool.uri]
+
+    pool.close()
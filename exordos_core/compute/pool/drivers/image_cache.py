@@ -0,0 +1,159 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Base image cache of the storage pools.
+
+Every image is downloaded and decompressed once per storage pool into
+a base volume, volumes of the image are created as copy-on-write clones
+of the base volume. Base volumes unused by any clone are evicted in the
+least recently used order once the free space of the storage pool drops
+below the reserve.
+"""
+
+import hashlib
+import shutil
+import struct
+import threading
+import typing as tp
+from urllib import request
+import zlib
+
+BASE_VOLUME_PREFIX = "base-"
+DOWNLOAD_CHUNK = 1 << 20
+DOWNLOAD_TIMEOUT = 60
+QCOW2_MAGIC = b"QFI\xfb"
+# The virtual size is a big-endian 64-bit integer in the qcow2 header
+QCOW2_SIZE = struct.Struct(">Q")
+QCOW2_SIZE_OFFSET = 24
+
+
+class CachedImage(tp.NamedTuple):
+    name: str
+    # Allocated size in bytes
+    size: int
+    last_used: float
+    # The base volume is a backing file of some volume
+    in_use: bool
+
+
+def base_volume_name(image: str) -> str:
+    digest = hashlib.sha256(image.encode("utf-8")).hexdigest()
+    return f"{BASE_VOLUME_PREFIX}{digest[:32]}"
+
+
+def is_base_volume(name: str) -> bool:
+    return name.startswith(BASE_VOLUME_PREFIX)
+
+
+def image_format(image: str) -> str:
+    """Format of the image once it's decompressed."""
+    path = image.split("?", 1)[0].removesuffix(".gz")
+    return "qcow2" if path.endswith(".qcow2") else "raw"
+
+
+def virtual_size(fileobj: tp.BinaryIO, size: int, image_format: str) -> int:
+    """Size of the disk in the decompressed image of `size` bytes.
+
+    It's the size of the data for raw images and the size from the
+    header for qcow2 ones.
+    """
+    if image_format != "qcow2":
+        return size
+
+    fileobj.seek(0)
+    header = fileobj.read(QCOW2_SIZE_OFFSET + QCOW2_SIZE.size)
+    if len(header) < QCOW2_SIZE_OFFSET + QCOW2_SIZE.size or not header.startswith(
+        QCOW2_MAGIC
+    ):
+        raise ValueError("The image isn't in the qcow2 format")
+    return QCOW2_SIZE.unpack_from(header, QCOW2_SIZE_OFFSET)[0]
+
+
+def download_image(image: str, fileobj: tp.BinaryIO) -> int:
+    """Download the image into the file, gzip is decompressed on the fly.
+
+    Returns the size of the written data.
+    """
+    decompressor = None
+    if image.split("?", 1)[0].endswith(".gz"):
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    size = 0
+    with request.urlopen(image, timeout=DOWNLOAD_TIMEOUT) as response:
+        if decompressor is None:
+            shutil.copyfileobj(response, fileobj, DOWNLOAD_CHUNK)
+            return fileobj.tell()
+
+        while chunk := response.read(DOWNLOAD_CHUNK):
+            data = decompressor.decompress(chunk)
+            fileobj.write(data)
+            size += len(data)
+
+        data = decompressor.flush()
+        fileobj.write(data)
+        size += len(data)
+
+    return size
+
+
+def lru_evictions(
+    images: tp.Iterable[CachedImage],
+    available: int,
+    need: int,
+    reserve: int,
+) -> tp.Optional[tp.List[str]]:
+    """Least recently used images to evict to fit `need` bytes.
+
+    The `reserve` bytes are kept free in the storage pool. Images used by
+    volumes are never evicted. Returns None if the space can't be freed.
+    """
+    evictions = []
+    candidates = sorted((i for i in images if not i.in_use), key=lambda i: i.last_used)
+    for image in candidates:
+        if available - need >= reserve:
+            break
+        evictions.append(image.name)
+        available += image.size
+
+    if available - need < reserve:
+        return None
+    return evictions
+
+
+class ImageUsage:
+    """Last use of the base images and locks to cache them once."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._last_used: tp.Dict[str, float] = {}
+        self._image_locks: tp.Dict[str, threading.Lock] = {}
+
+    def lock(self, name: str) -> threading.Lock:
+        with self._lock:
+            return self._image_locks.setdefault(name, threading.Lock())
+
+    def touch(self, name: str, now: float) -> None:
+        with self._lock:
+            self._last_used[name] = now
+
+    def last_used(self, name: str) -> float:
+        # Images cached before the start are the first to evict
+        with self._lock:
+            return self._last_used.get(name, 0.0)
+
+    def forget(self, name: str) -> None:
+        with self._lock:
+            self._last_used.pop(name, None)
@@ -0,0 +1,328 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Inventory cache of a libvirt hypervisor.
+
+Listing all domains with their XML and all volumes with their info on
+every agent iteration is expensive on hypervisors with many domains.
+The inventory keeps parsed domains and volume info between iterations.
+It is kept actual by libvirt lifecycle events and by explicit
+invalidation from the driver operations, so only changed domains are
+re-parsed. A periodic full resync is a safety net for missed events and
+for changes that don't emit events, for instance volumes created by
+somebody else.
+"""
+
+import logging
+import threading
+import time
+import typing as tp
+from xml.etree import ElementTree as ET
+
+import libvirt
+
+LOG = logging.getLogger(__name__)
+
+# Full resync period in seconds, non-positive disables the cache
+RESYNC_PERIOD = 300.0
+
+_event_loop_lock = threading.Lock()
+_event_loop_thread: tp.Optional[threading.Thread] = None
+
+
+def _run_event_loop() -> None:
+    while True:
+        try:
+            libvirt.virEventRunDefaultImpl()
+        except Exception:
+            LOG.exception("Error in the libvirt event loop")
+            time.sleep(1)
+
+
+def ensure_event_loop() -> None:
+    """Start the libvirt event loop once per process.
+
+    The loop implementation must be registered before connections are
+    opened, otherwise the connections don't deliver events.
+    """
+    global _event_loop_thread
+
+    with _event_loop_lock:
+        if _event_loop_thread is not None:
+            return
+
+        libvirt.virEventRegisterDefaultImpl()
+        _event_loop_thread = threading.Thread(
+            target=_run_event_loop, name="libvirt-events", daemon=True
+        )
+        _event_loop_thread.start()
+
+
+class VolumeRecord(tp.NamedTuple):
+    volume: libvirt.virStorageVol
+    path: str
+    info: tp.List[int]
+
+
+class LibvirtInventory:
+    """Domains and volumes of a storage pool of a libvirt connection."""
+
+    def __init__(
+        self,
+        storage_pool: str,
+        resync_period: float = RESYNC_PERIOD,
+    ) -> None:
+        self._storage_pool_name = storage_pool
+        self._resync_period = resync_period
+
+        # Serializes refreshes
+        self._lock = threading.Lock()
+        # Guards the state changed by the event callbacks, it's never
+        # held during libvirt calls
+        self._events_lock = threading.Lock()
+
+        self._conn: tp.Optional[libvirt.virConnect] = None
+        self._domain_callbacks: tp.List[int] = []
+        self._pool_callbacks: tp.List[int] = []
+        self._events = False
+        self._last_resync: tp.Optional[float] = None
+
+        self._domains: tp.Dict[str, tp.Tuple[libvirt.virDomain, ET.Element]] = {}
+        self._dirty_domains: tp.Set[str] = set()
+
+        self._storage_pool: tp.Optional[libvirt.virStoragePool] = None
+        self._storage_pool_element: tp.Optional[ET.Element] = None
+        self._volumes: tp.Dict[str, VolumeRecord] = {}
+        self._volumes_dirty = True
+        self._stale_volumes: tp.Set[str] = set()
+
+        # Number of parsed domain XMLs, useful to check the cache works
+        self.parsed_domains = 0
+
+    # Event callbacks, called from the event loop thread
+
+    def _on_domain_event(
+        self, conn: libvirt.virConnect, domain: libvirt.virDomain, *args: tp.Any
+    ) -> None:
+        with self._events_lock:
+            self._dirty_domains.add(domain.UUIDString())
+
+    def _on_storage_pool_event(
+        self, conn: libvirt.virConnect, pool: libvirt.virStoragePool, *args: tp.Any
+    ) -> None:
+        if pool.name() != self._storage_pool_name:
+            return
+
+        with self._events_lock:
+            self._volumes_dirty = True
+
+    # Binding to a connection
+
+    def _register(self, conn: libvirt.virConnect) -> None:
+        for event_id in (
+            libvirt.VIR_DOMAIN_EVENT_ID_LIFECYCLE,
+            libvirt.VIR_DOMAIN_EVENT_ID_DEVICE_ADDED,
+            libvirt.VIR_DOMAIN_EVENT_ID_DEVICE_REMOVED,
+        ):
+            self._domain_callbacks.append(
+                conn.domainEventRegisterAny(None, event_id, self._on_domain_event, None)
+            )
+
+        for event_id in (
+            libvirt.VIR_STORAGE_POOL_EVENT_ID_LIFECYCLE,
+            libvirt.VIR_STORAGE_POOL_EVENT_ID_REFRESH,
+        ):
+            self._pool_callbacks.append(
+                conn.storagePoolEventRegisterAny(
+                    None, event_id, self._on_storage_pool_event, None
+                )
+            )
+
+    def _unregister(self) -> None:
+        conn = self._conn
+        if conn is None:
+            return
+
+        for callback in self._domain_callbacks:
+            try:
+                conn.domainEventDeregisterAny(callback)
+            except libvirt.libvirtError:
+                LOG.debug("Unable to deregister domain callback %s", callback)
+        for callback in self._pool_callbacks:
+            try:
+                conn.storagePoolEventDeregisterAny(callback)
+            except libvirt.libvirtError:
+                LOG.debug("Unable to deregister pool callback %s", callback)
+
+        self._domain_callbacks.clear()
+        self._pool_callbacks.clear()
+        self._events = False
+
+    def _bind(self, conn: libvirt.virConnect) -> None:
+        if self._conn is not None:
+            self._unregister()
+
+        self._conn = conn
+        self._last_resync = None
+        self._storage_pool = None
+        if self._resync_period <= 0:
+            return
+
+        try:
+            self._register(conn)
+            self._events = True
+        except libvirt.libvirtError:
+            LOG.warning(
+                "Events aren't supported by %s, the inventory isn't cached",
+                conn.getURI(),
+            )
+            self._unregister()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._unregister()
+            self._conn = None
+
+    # Invalidation by the driver operations
+
+    def invalidate_domain(self, uuid: str) -> None:
+        with self._events_lock:
+            self._dirty_domains.add(uuid)
+
+    def invalidate_volumes(self, name: tp.Optional[str] = None) -> None:
+        """Reload the volume list and the info of the volume if passed."""
+        with self._events_lock:
+            self._volumes_dirty = True
+            if name is not None:
+                self._stale_volumes.add(name)
+
+    # Refresh
+
+    def _parse_domain(
+        self, domain: libvirt.virDomain
+    ) -> tp.Tuple[libvirt.virDomain, ET.Element]:
+        self.parsed_domains += 1
+        return domain, ET.fromstring(domain.XMLDesc())
+
+    def _reload_domain(self, conn: libvirt.virConnect, uuid: str) -> None:
+        try:
+            domain = conn.lookupByUUIDString(uuid)
+            self._domains[uuid] = self._parse_domain(domain)
+        except libvirt.libvirtError as e:
+            if e.get_error_code() != libvirt.VIR_ERR_NO_DOMAIN:
+                raise
+            self._domains.pop(uuid, None)
+
+    def _reload_volumes(
+        self, storage_pool: libvirt.virStoragePool, stale: tp.Collection[str]
+    ) -> None:
+        volumes = {}
+        for volume in storage_pool.listAllVolumes():
+            name = volume.name()
+            record = self._volumes.get(name)
+            if record is None or name in stale:
+                try:
+                    record = VolumeRecord(volume, volume.path(), volume.info())
+                except libvirt.libvirtError:
+                    # The volume has been deleted in the meantime
+                    LOG.debug("Unable to get info of volume %s", name)
+                    continue
+            volumes[name] = record
+
+        self._volumes = volumes
+
+    def refresh(self, conn: libvirt.virConnect) -> None:
+        """Bring the inventory up to date with the connection."""
+        with self._lock:
+            if conn is not self._conn:
+                self._bind(conn)
+
+            now = time.monotonic()
+            resync = (
+                not self._events
+                or self._last_resync is None
+                or now - self._last_resync >= self._resync_period
+            )
+
+            # Take the accumulated changes, events received after that
+            # are handled on the next refresh.
+            with self._events_lock:
+                dirty_domains, self._dirty_domains = self._dirty_domains, set()
+                volumes_dirty, self._volumes_dirty = self._volumes_dirty, False
+                stale_volumes, self._stale_volumes = self._stale_volumes, set()
+
+            try:
+                if resync:
+                    self._domains = {
+                        d.UUIDString(): self._parse_domain(d)
+                        for d in conn.listAllDomains()
+                    }
+                else:
+                    for uuid in dirty_domains:
+                        self._reload_domain(conn, uuid)
+
+                storage_pool = self._storage_pool
+                if storage_pool is None:
+                    storage_pool = conn.storagePoolLookupByName(
+                        self._storage_pool_name
+                    )
+                    self._storage_pool = storage_pool
+                    self._storage_pool_element = ET.fromstring(
+                        storage_pool.XMLDesc()
+                    )
+                    self._volumes.clear()
+                    volumes_dirty = True
+
+                if resync:
+                    self._volumes.clear()
+                    self._reload_volumes(storage_pool, ())
+                elif volumes_dirty:
+                    self._reload_volumes(storage_pool, stale_volumes)
+            except Exception:
+                # Don't lose the changes, resync everything next time
+                self._last_resync = None
+                self._storage_pool = None
+                raise
+
+            if resync:
+                self._last_resync = now
+
+    # Access to the inventory
+
+    def domains(self) -> tp.Tuple[tp.Tuple[libvirt.virDomain, ET.Element], ...]:
+        return tuple(self._domains.values())
+
+    def volumes(self) -> tp.Tuple[libvirt.virStorageVol, ...]:
+        return tuple(r.volume for r in self._volumes.values())
+
+    def volume_path(self, volume: libvirt.virStorageVol) -> str:
+        record = self._volumes.get(volume.name())
+        return record.path if record is not None else volume.path()
+
+    def volume_info(self, volume: libvirt.virStorageVol) -> tp.List[int]:
+        record = self._volumes.get(volume.name())
+        return record.info if record is not None else volume.info()
+
+    @property
+    def storage_pool(self) -> libvirt.virStoragePool:
+        return self._storage_pool
+
+    @property
+    def storage_pool_type(self) -> tp.Optional[str]:
+        if self._storage_pool_element is None:
+            return None
+        return self._storage_pool_element.get("type")
@@ -17,6 +17,7 @@
 import enum
 import logging
 import operator
+import tempfile
 import time
 import typing as tp
 import uuid as sys_uuid
@@ -31,7 +32,11 @@ from exordos_core.common import constants as c
 from exordos_core.compute import constants as nc
 from exordos_core.compute.dm import models
 from exordos_core.compute.pool.drivers import base
+from exordos_core.compute.pool.drivers import connections
+from exordos_core.compute.pool.drivers import domain_xml
 from exordos_core.compute.pool.drivers import exceptions as pool_exc
+from exordos_core.compute.pool.drivers import image_cache
+from exordos_core.compute.pool.drivers import inventory
 
 ImageFormatType = tp.Literal["raw", "qcow2"]
 NetworkType = tp.Literal["bridge", "network"]
@@ -75,12 +80,6 @@ class StoragePoolType(enum.Enum):
         raise ValueError(f"Unknown storage pool type: {self}")
 
 
-META_TAG = "genesis:genesis"
-META_CPU_TAG = "genesis:vcpu"
-META_MEM_TAG = "genesis:mem"
-META_IMG_TAG = "genesis:image"
-GENESIS_NS = "https://github.com/infraguys"
-
 LOG = logging.getLogger(__name__)
 
 
@@ -105,65 +104,19 @@ volume_template_with_format = """
 """
 
 
-domain_template = """
-<domain type="kvm">
-  <metadata>
-    <genesis:genesis xmlns:genesis="https://github.com/infraguys">
-    </genesis:genesis>
-  </metadata>
-  <os>
-    <type arch="x86_64" machine="q35">hvm</type>
-  </os>
-  <features>
-    <acpi/>
-    <apic/>
-    <vmport state="off"/>
-  </features>
-  <cpu mode="host-passthrough"/>
-  <clock offset="utc">
-    <timer name="rtc" tickpolicy="catchup"/>
-    <timer name="pit" tickpolicy="delay"/>
-    <timer name="hpet" present="no"/>
-  </clock>
-  <pm>
-    <suspend-to-mem enabled="no"/>
-    <suspend-to-disk enabled="no"/>
-  </pm>
-  <devices>
-    <emulator>/usr/bin/qemu-system-x86_64</emulator>
-    <controller type="usb" model="qemu-xhci" ports="5"/>
-    <controller type="pci" model="pcie-root"/>
-    <!-- For hotplug devices -->
-    <controller type="pci" model="pcie-root-port"/>
-    <controller type="pci" model="pcie-root-port"/>
-    <controller type="pci" model="pcie-root-port"/>
-    <controller type="pci" model="pcie-root-port"/>
-    <controller type="pci" model="pcie-root-port"/>
-    <controller type="pci" model="pcie-root-port"/>
-    <controller type="pci" model="pcie-root-port"/>
-    <controller type="pci" model="pcie-root-port"/>
-    <console type="pty"/>
-    <channel type="unix">
-      <source mode="bind"/>
-      <target type="virtio" name="org.qemu.guest_agent.0"/>
-    </channel>
-    <channel type="spicevmc">
-      <target type="virtio" name="com.redhat.spice.0"/>
-    </channel>
-    <input type="tablet" bus="usb"/>
-    <graphics type="spice" port="-1" tlsPort="-1" autoport="yes">
-      <image compression="off"/>
-    </graphics>
-    <video>
-      <model type="qxl"/>
-    </video>
-    <redirdev bus="usb" type="spicevmc"/>
-    <memballoon model="virtio"/>
-    <rng model="virtio">
-      <backend model="random">/dev/urandom</backend>
-    </rng>
-  </devices>
-</domain>
+volume_template_with_backing = """
+<volume>
+  <name>{name}</name>
+  <capacity>{size}</capacity>
+  <allocation>0</allocation>
+  <target>
+    <format type="qcow2"/>
+  </target>
+  <backingStore>
+    <path>{backing_path}</path>
+    <format type="{backing_format}"/>
+  </backingStore>
+</volume>
 """
 
 
@@ -206,7 +159,7 @@ class XMLLibvirtMixin:
 
         # Also we need to remove the old value from the meta
         if meta_tag is not None:
-            meta_node = docement.getElementsByTagName(META_TAG)[0]
+            meta_node = docement.getElementsByTagName(domain_xml.META_TAG)[0]
             for node in docement.getElementsByTagName(meta_tag):
                 meta_node.removeChild(node)
 
@@ -225,7 +178,7 @@ class XMLLibvirtMixin:
         **kwargs,
     ) -> None:
         # Remove the old value from the meta
-        meta_node = docement.getElementsByTagName(META_TAG)[0]
+        meta_node = docement.getElementsByTagName(domain_xml.META_TAG)[0]
         for node in docement.getElementsByTagName(tag):
             meta_node.removeChild(node)
 
@@ -283,7 +236,7 @@ class XMLLibvirtInstance(XMLLibvirtMixin):
             domain,
             "vcpu",
             text=str(cores),
-            meta_tag=META_CPU_TAG,
+            meta_tag=domain_xml.META_CPU_TAG,
             placement="static",
         )
 
@@ -293,7 +246,7 @@ class XMLLibvirtInstance(XMLLibvirtMixin):
             domain,
             "memory",
             text=str(memory),
-            meta_tag=META_MEM_TAG,
+            meta_tag=domain_xml.META_MEM_TAG,
             unit="MiB",
         )
         cls.document_set_tag(
@@ -307,7 +260,7 @@ class XMLLibvirtInstance(XMLLibvirtMixin):
     def domain_set_image(cls, domain: minidom.Document, image: str) -> None:
         cls.document_meta_set_tag(
             domain,
-            META_IMG_TAG,
+            domain_xml.META_IMG_TAG,
             uri=image,
         )
 
@@ -471,31 +424,57 @@ class LibvirtPoolDriverSpec(tp.NamedTuple):
     network_type: NetworkType = "network"
     iface_rom_file: tp.Optional[str] = None
     iface_mtu: int = 1450
+    inventory_resync_period: float = inventory.RESYNC_PERIOD
+    # Create volumes of images as clones of cached base images
+    image_cache: bool = False
+    # Free space (GB) kept in the storage pool by the image cache
+    image_cache_reserve: int = 50
+    keepalive_interval: int = connections.KEEPALIVE_INTERVAL
+    keepalive_count: int = connections.KEEPALIVE_COUNT
+    # Maximum number of connections shared by pools with the same URI.
+    # It shadows the module in the class body, so it goes last.
+    connections: int = connections.POOL_SIZE
 
 
 class LibvirtPoolDriver(base.AbstractPoolDriver):
     def __init__(self, pool: models.MachinePool):
         self._spec = LibvirtPoolDriverSpec(**pool.driver_spec)
         self._pool = pool
+        self._inventory = inventory.LibvirtInventory(
+            self._spec.storage_pool, self._spec.inventory_resync_period
+        )
+        self._image_usage = image_cache.ImageUsage()
+        self._connections = connections.acquire(
+            self._spec.connection_uri,
+            size=self._spec.connections,
+            keepalive_interval=self._spec.keepalive_interval,
+            keepalive_count=self._spec.keepalive_count,
+        )
         # Check if connection string is valid and we can connect
-        _ = self._client
+        try:
+            _ = self._client
+        except Exception:
+            connections.release(self._connections)
+            raise
 
     @property
-    def _client(self):
-        instance = getattr(self, "_client_instance", None)
-        # isAlive() doesn't actually ping host (so it's cheap),
-        #  but it will return 0 if there were any errors before
-        if not instance or not instance.isAlive():
-            instance = libvirt.open(self._spec.connection_uri)
-            if not instance:
-                raise ConnectionError(
-                    f"Failed to open libvirt connection: {self._spec.connection_uri}"
-                )
-            self._client_instance = instance
-        return instance
+    def _client(self) -> libvirt.virConnect:
+        return self._connections.get()
+
+    @property
+    def _inventory_client(self) -> libvirt.virConnect:
+        # The inventory subscribes to events of the connection, so it
+        # always uses the same one.
+        return self._connections.primary()
+
+    def close(self) -> None:
+        """Release the connections of the driver."""
+        self._inventory.close()
+        connections.release(self._connections)
 
     def _create_domain(self, domain_xml: str) -> libvirt.virDomain:
         virt_domain = self._client.defineXML(domain_xml)
+        self._inventory.invalidate_domain(virt_domain.UUIDString())
         virt_domain.create()
 
         # Set the autostart flag to run the domain
@@ -519,11 +498,11 @@ class LibvirtPoolDriver(base.AbstractPoolDriver):
     ) -> tp.Tuple[models.Machine, tp.Tuple[models.Port, ...]]:
         element = element or ET.fromstring(domain.XMLDesc())
 
-        cores_xml = element.find(f".//{{{GENESIS_NS}}}vcpu")
+        cores_xml = element.find(f".//{{{domain_xml.GENESIS_NS}}}vcpu")
         cores = int(cores_xml.text)
-        ram_xml = element.find(f".//{{{GENESIS_NS}}}mem")
+        ram_xml = element.find(f".//{{{domain_xml.GENESIS_NS}}}mem")
         ram = int(ram_xml.text)
-        image_el = element.find(f".//{{{GENESIS_NS}}}image")
+        image_el = element.find(f".//{{{domain_xml.GENESIS_NS}}}image")
         image = image_el.get("uri") if image_el is not None else None
 
         # Determine the boot device. For the backward compatibility
@@ -600,7 +579,7 @@ class LibvirtPoolDriver(base.AbstractPoolDriver):
 
         volume_name = self._volume_name(volume)
         volume_uuid = sys_uuid.UUID(volume_name)
-        info = volume.info()
+        info = self._inventory.volume_info(volume)
 
         return models.MachineVolume(
             uuid=volume_uuid,
@@ -647,7 +626,7 @@ class LibvirtPoolDriver(base.AbstractPoolDriver):
         volumes: tp.Collection[libvirt.virStorageVol],
     ) -> tp.Dict[libvirt.virStorageVol, tp.Optional[tp.Tuple[libvirt.virDomain, int]]]:
         result = {v: None for v in volumes}
-        path_map = {v.path(): v for v in volumes}
+        path_map = {self._inventory.volume_path(v): v for v in volumes}
 
         for domain, root in domains:
             idx = 0
@@ -684,6 +663,10 @@ class LibvirtPoolDriver(base.AbstractPoolDriver):
         result = []
 
         for volume, attach_info in attachments.items():
+            # Base images of the image cache aren't machine volumes
+            if image_cache.is_base_volume(volume.name()):
+                continue
+
             domain, idx = attach_info if attach_info else (None, None)
             machine_uuid = (
                 None if domain is None else sys_uuid.UUID(domain.UUIDString())
@@ -801,24 +784,20 @@ class LibvirtPoolDriver(base.AbstractPoolDriver):
         tp.Collection[models.MachineVolume],
     ]:
         pool = self.get_pool_info()
-        vir_storage_pool = self._client.storagePoolLookupByName(self._spec.storage_pool)
-        volumes = vir_storage_pool.listAllVolumes()
-        domains = tuple(
-            (d, ET.fromstring(d.XMLDesc())) for d in self._client.listAllDomains()
-        )
+        self._inventory.refresh(self._inventory_client)
+        domains = self._inventory.domains()
 
-        volumes = self._list_volumes(domains, volumes)
+        volumes = self._list_volumes(domains, self._inventory.volumes())
         machines = self._list_machines(domains)
 
-        storage_pool_element = ET.fromstring(vir_storage_pool.XMLDesc())
-        pool_type = storage_pool_element.get("type")
-
+        vir_storage_pool = self._inventory.storage_pool
+        storage_pool_info = vir_storage_pool.info()
         storage_pool = models.ThinStoragePool(
             uuid=sys_uuid.UUID(vir_storage_pool.UUIDString()),
             name=vir_storage_pool.name(),
-            capacity_usable=vir_storage_pool.info()[1] >> 30,  # GB
-            available_actual=vir_storage_pool.info()[3] >> 30,  # GB
-            pool_type=pool_type,
+            capacity_usable=storage_pool_info[1] >> 30,  # GB
+            available_actual=storage_pool_info[3] >> 30,  # GB
+            pool_type=self._inventory.storage_pool_type,
         )
 
         self._fill_thin_storage_pool(storage_pool, volumes)
@@ -828,14 +807,11 @@ class LibvirtPoolDriver(base.AbstractPoolDriver):
     def list_volumes(
         self, machine: tp.Optional[models.Machine] = None
     ) -> tp.Iterable[models.MachineVolume]:
-        storage_pool = self._client.storagePoolLookupByName(self._spec.storage_pool)
-        volumes = storage_pool.listAllVolumes()
-        domains = tuple(
-            (d, ET.fromstring(d.XMLDesc())) for d in self._client.listAllDomains()
+        self._inventory.refresh(self._inventory_client)
+        volumes = self._list_volumes(
+            self._inventory.domains(), self._inventory.volumes()
         )
 
-        volumes = self._list_volumes(domains, volumes)
-
         if machine is None:
             return volumes
 
@@ -868,21 +844,162 @@ class LibvirtPoolDriver(base.AbstractPoolDriver):
 
         raise pool_exc.VolumeNotFoundError(volume=volume)
 
+    def _evict_images(self, storage_pool: libvirt.virStoragePool, need: int) -> bool:
+        """Free space for `need` bytes evicting unused base images."""
+        available = storage_pool.info()[3]
+        reserve = self._spec.image_cache_reserve << 30
+        if available - need >= reserve:
+            return True
+
+        bases = []
+        backing_paths = set()
+        for vir_volume in storage_pool.listAllVolumes():
+            if image_cache.is_base_volume(vir_volume.name()):
+                bases.append(vir_volume)
+                continue
+
+            element = ET.fromstring(vir_volume.XMLDesc())
+            backing_path = element.findtext("backingStore/path")
+            if backing_path:
+                backing_paths.add(backing_path)
+
+        images = [
+            image_cache.CachedImage(
+                name=v.name(),
+                size=v.info()[2],
+                last_used=self._image_usage.last_used(v.name()),
+                in_use=v.path() in backing_paths,
+            )
+            for v in bases
+        ]
+        evictions = image_cache.lru_evictions(images, available, need, reserve)
+        if evictions is None:
+            return False
+
+        for name in evictions:
+            lock = self._image_usage.lock(name)
+            # The image is being cloned right now
+            if not lock.acquire(blocking=False):
+                return False
+            try:
+                storage_pool.storageVolLookupByName(name).delete()
+                self._image_usage.forget(name)
+            finally:
+                lock.release()
+                self._inventory.invalidate_volumes(name)
+            LOG.info("The base image %s has been evicted", name)
+
+        return True
+
+    def _cache_image(
+        self, storage_pool: libvirt.virStoragePool, name: str, image: str
+    ) -> tp.Optional[tp.Tuple[libvirt.virStorageVol, int]]:
+        """Download the image into a new base volume.
+
+        Returns the base volume and the virtual size of the image.
+        """
+        image_format = image_cache.image_format(image)
+        with tempfile.TemporaryFile() as image_file:
+            size = image_cache.download_image(image, image_file)
+            disk_size = image_cache.virtual_size(image_file, size, image_format)
+            if not self._evict_images(storage_pool, size):
+                LOG.warning("Not enough space to cache the image %s", image)
+                return None
+
+            base = storage_pool.createXML(
+                volume_template_with_format.format(
+                    name=name, size=size, format=image_format
+                )
+            )
+            self._inventory.invalidate_volumes()
+
+            image_file.seek(0)
+            stream = self._client.newStream()
+            try:
+                base.upload(stream, 0, size)
+                stream.sendAll(lambda _stream, nbytes, f: f.read(nbytes), image_file)
+                stream.finish()
+            except Exception:
+                stream.abort()
+                base.delete()
+                raise
+
+        LOG.info("The image %s has been cached as %s", image, name)
+        return base, disk_size
+
+    def _create_clone(
+        self, storage_pool: libvirt.virStoragePool, volume: models.MachineVolume
+    ) -> bool:
+        """Create the volume as a clone of the cached image.
+
+        Returns False if the volume can't be cloned, it has to be created
+        as usual then.
+        """
+        if not self._spec.image_cache or not volume.image:
+            return False
+
+        pool_type = StoragePoolType(ET.fromstring(storage_pool.XMLDesc()).get("type"))
+        # Only qcow2 volumes may have backing files
+        if pool_type != StoragePoolType.DIR:
+            return False
+
+        name = image_cache.base_volume_name(volume.image)
+        size = volume.size << 30
+        with self._image_usage.lock(name):
+            try:
+                base = storage_pool.storageVolLookupByName(name)
+                # The capacity of a base volume is read by libvirt from the
+                # image header, it's the virtual size of the image
+                disk_size = base.info()[1]
+            except libvirt.libvirtError as e:
+                if e.get_error_code() != libvirt.VIR_ERR_NO_STORAGE_VOL:
+                    raise
+                try:
+                    cached = self._cache_image(storage_pool, name, volume.image)
+                except Exception:
+                    LOG.exception("Unable to cache the image %s", volume.image)
+                    return False
+
+                if cached is None:
+                    return False
+                base, disk_size = cached
+
+            if disk_size > size:
+                LOG.warning(
+                    "The image %s doesn't fit the volume %s", volume.image, volume.uuid
+                )
+                return False
+
+            self._image_usage.touch(name, time.monotonic())
+            storage_pool.createXML(
+                volume_template_with_backing.format(
+                    name=pool_type.volume_name(volume.name),
+                    size=size,
+                    backing_path=base.path(),
+                    backing_format=image_cache.image_format(volume.image),
+                )
+            )
+
+        LOG.debug("The volume %s is cloned from %s", volume.uuid, name)
+        return True
+
     def create_volume(self, volume: models.MachineVolume) -> models.MachineVolume:
         storage_pool = self._client.storagePoolLookupByName(self._spec.storage_pool)
 
-        # TODO(akremenetsky): Rework `xml_from_base_template` to use
-        # the correct name format
-        volume_xml = XMLLibvirtVolume.xml_from_base_template(
-            storage_pool, volume.name, volume.size << 30
-        )
-
         try:
-            storage_pool.createXML(volume_xml)
+            if not self._create_clone(storage_pool, volume):
+                # TODO(akremenetsky): Rework `xml_from_base_template` to use
+                # the correct name format
+                volume_xml = XMLLibvirtVolume.xml_from_base_template(
+                    storage_pool, volume.name, volume.size << 30
+                )
+                storage_pool.createXML(volume_xml)
         except libvirt.libvirtError as e:
             if e.get_error_code() == libvirt.VIR_ERR_STORAGE_VOL_EXIST:
                 raise pool_exc.VolumeAlreadyExistsError(volume=volume.uuid)
             raise
+        finally:
+            self._inventory.invalidate_volumes()
 
         # If no error the volume is ready
         volume.status = nc.VolumeStatus.ACTIVE.value
@@ -916,6 +1033,7 @@ class LibvirtPoolDriver(base.AbstractPoolDriver):
             # Some backends don't need wiping, for ex. ZFS
             if e.get_error_code() != 3:  # VIR_ERR_NO_SUPPORT
                 raise
+        self._inventory.invalidate_volumes(v.name())
         max_iters = 20
         for i in range(max_iters + 1):
             try:
@@ -979,6 +1097,7 @@ class LibvirtPoolDriver(base.AbstractPoolDriver):
 
         # Attach the device both to live domain and persistent config
         flags = libvirt.VIR_DOMAIN_AFFECT_LIVE | libvirt.VIR_DOMAIN_AFFECT_CONFIG
+        self._inventory.invalidate_domain(domain.UUIDString())
         try:
             domain.attachDeviceFlags(disk_xml, flags)
         except libvirt.libvirtError as e:
@@ -1016,6 +1135,7 @@ class LibvirtPoolDriver(base.AbstractPoolDriver):
 
         # Detach the device both from live domain and persistent config
         flags = libvirt.VIR_DOMAIN_AFFECT_LIVE | libvirt.VIR_DOMAIN_AFFECT_CONFIG
+        self._inventory.invalidate_domain(domain.UUIDString())
 
         try:
             domain.detachDeviceFlags(ET.tostring(disk, "unicode"), flags)
@@ -1043,6 +1163,7 @@ class LibvirtPoolDriver(base.AbstractPoolDriver):
 
         # libvirt expects size in bytes, our size is in GiB
         new_size_bytes = volume.size << 30
+        self._inventory.invalidate_volumes(vir_volume.name())
 
         # For safety, do not allow shrinking volumes for now
         info = vir_volume.info()
@@ -1096,6 +1217,7 @@ class LibvirtPoolDriver(base.AbstractPoolDriver):
 
         # Attach the interface both to live domain and persistent config
         flags = libvirt.VIR_DOMAIN_AFFECT_LIVE | libvirt.VIR_DOMAIN_AFFECT_CONFIG
+        self._inventory.invalidate_domain(domain.UUIDString())
         try:
             domain.attachDeviceFlags(interface_xml, flags)
         except libvirt.libvirtError as e:
@@ -1138,6 +1260,7 @@ class LibvirtPoolDriver(base.AbstractPoolDriver):
 
         # Detach the interface both from live domain and persistent config
         flags = libvirt.VIR_DOMAIN_AFFECT_LIVE | libvirt.VIR_DOMAIN_AFFECT_CONFIG
+        self._inventory.invalidate_domain(domain.UUIDString())
 
         try:
             domain.detachDeviceFlags(ET.tostring(target_interface, "unicode"), flags)
@@ -1153,8 +1276,8 @@ class LibvirtPoolDriver(base.AbstractPoolDriver):
         self,
     ) -> tp.List[tp.Tuple[models.Machine, tp.Tuple[models.Port, ...]]]:
         """Return machine list from data plane."""
-        domains = self._client.listAllDomains()
-        return self._list_machines(tuple((d, None) for d in domains))
+        self._inventory.refresh(self._inventory_client)
+        return self._list_machines(self._inventory.domains())
 
     def create_machine(
         self,
@@ -1164,26 +1287,7 @@ class LibvirtPoolDriver(base.AbstractPoolDriver):
         legacy_machine: bool = False,
     ) -> tp.Tuple[models.Machine, tp.Tuple[models.Port, ...]]:
         """Create a new LibVirt domain."""
-        domain = XMLLibvirtInstance(domain_template)
-
-        # Set base characteristics for the domain
-        domain.set_uuid(machine.uuid)
-        domain.set_name(self._machine2domain_name(machine))
-        domain.set_vcpu(machine.cores)
-        domain.set_memory(machine.ram)
-        domain.set_image(machine.image)
-        domain.set_boot(nc.BootAlternative[machine.boot].boot_type)
-
-        for port in ports:
-            domain.add_interface(
-                mac=port.mac,
-                rom=self._spec.iface_rom_file,
-                mtu=self._spec.iface_mtu,
-                # TODO(akremenetsky): This parameter should be taken from
-                # the network
-                iface_type=self._spec.network_type,
-                source=port.source,
-            )
+        ports = tuple(ports)
 
         # Prepare volume paths
         storage_pool = self._client.storagePoolLookupByName(self._spec.storage_pool)
@@ -1192,27 +1296,40 @@ class LibvirtPoolDriver(base.AbstractPoolDriver):
         pool_type = StoragePoolType(storage_pool_xml.get("type"))
         pool_path = storage_pool_xml.find("target").find("path").text
 
-        # Add the volumes to the domain
-        for i, volume in enumerate(volumes):
+        disks = []
+        for volume in volumes:
             if not legacy_machine:
-                domain.add_disk(
-                    image_path=f"{pool_path}/{pool_type.volume_name(volume.name)}",
-                    device="vd" + chr(ord("a") + i),
-                    bus="virtio",
-                )
+                disks.append(f"{pool_path}/{pool_type.volume_name(volume.name)}")
             else:
                 # TODO(akremenetsky): Remove this snippet one day
                 legacy_volume_name = pool_type.legacy_volume_name(
                     volume.name, machine.uuid
                 )
-                domain.add_disk(
-                    image_path=f"{pool_path}/{legacy_volume_name}",
-                    device="vd" + chr(ord("a") + i),
-                    bus="virtio",
-                )
+                disks.append(f"{pool_path}/{legacy_volume_name}")
+
+        layout = domain_xml.DomainLayout(
+            boot=nc.BootAlternative[machine.boot].boot_type,
+            disks=tuple(domain_xml.disk_type(path) for path in disks),
+            interfaces=len(ports),
+            # TODO(akremenetsky): This parameter should be taken from
+            # the network
+            network_type=self._spec.network_type,
+            iface_mtu=self._spec.iface_mtu,
+            iface_rom_file=self._spec.iface_rom_file,
+            with_image=machine.image is not None,
+        )
 
         # Create the domain from the XML specification
-        domain_spec = domain.xml
+        domain_spec = domain_xml.render_domain(
+            layout,
+            uuid=machine.uuid,
+            name=self._machine2domain_name(machine),
+            cores=machine.cores,
+            ram=machine.ram,
+            disks=disks,
+            interfaces=[(p.mac or models.Port.generate_mac(), p.source) for p in ports],
+            image=machine.image,
+        )
         self._create_domain(domain_spec)
 
         LOG.debug(
@@ -1220,7 +1337,7 @@ class LibvirtPoolDriver(base.AbstractPoolDriver):
             machine.uuid,
             domain_spec,
         )
-        return machine, tuple(ports)
+        return machine, ports
 
     def delete_machine(
         self, machine: models.Machine, delete_volumes: bool = True
@@ -1240,6 +1357,7 @@ class LibvirtPoolDriver(base.AbstractPoolDriver):
         # FIXME(akremenetsky): Actully we should undefine the
         # domain before volume deletion
         domain.undefine()
+        self._inventory.invalidate_domain(domain.UUIDString())
 
         if delete_volumes:
             for volume in self.list_volumes(machine):
@@ -1254,48 +1372,41 @@ class LibvirtPoolDriver(base.AbstractPoolDriver):
         domain = self._client.lookupByUUIDString(str(machine))
         return self._domain2machine(domain)
 
-    def set_machine_cores(self, machine: models.Machine, cores: int) -> None:
-        """Set machine cores."""
-        ports = self._list_interfaces(machine)
-        volumes = self.list_volumes(machine)
+    def _redefine_machine(
+        self,
+        machine: models.Machine,
+        edit: tp.Callable[[domain_xml.DomainElement], None],
+    ) -> None:
+        """Apply the edit to the domain XML and redefine the domain.
 
-        # TODO(akremenetsky): It's only for backward compatibility
-        # This part has to be removed once all machines are migrated.
-        # Or this part can be reworked to convert legacy to new format.
+        The persistent domain XML is edited in place so the devices
+        are kept as they are and don't have to be collected again.
+        """
         domain = self._client.lookupByUUIDString(str(machine.uuid))
-        legacy_domain = self._is_legacy_domain(ET.fromstring(domain.XMLDesc()))
+        element = domain_xml.DomainElement(
+            domain.XMLDesc(libvirt.VIR_DOMAIN_XML_INACTIVE)
+        )
+        edit(element)
 
-        self.delete_machine(machine, delete_volumes=False)
+        try:
+            domain.destroy()
+        except libvirt.libvirtError:
+            LOG.debug("The domain is not in the running state")
+        domain.undefine()
+        self._inventory.invalidate_domain(domain.UUIDString())
+
+        self._create_domain(element.xml)
 
+    def set_machine_cores(self, machine: models.Machine, cores: int) -> None:
+        """Set machine cores."""
+        self._redefine_machine(machine, lambda d: d.set_vcpu(cores))
         machine.cores = cores
-        self.create_machine(
-            machine,
-            volumes=volumes,
-            ports=ports,
-            legacy_machine=legacy_domain,
-        )
         LOG.debug("The domain %s was updated with cores %s", machine.uuid, cores)
 
     def set_machine_ram(self, machine: models.Machine, ram: int) -> None:
         """Set machine ram."""
-        ports = self._list_interfaces(machine)
-        volumes = self.list_volumes(machine)
-
-        # TODO(akremenetsky): It's only for backward compatibility
-        # This part has to be removed once all machines are migrated.
-        # Or this part can be reworked to convert legacy to new format.
-        domain = self._client.lookupByUUIDString(str(machine.uuid))
-        legacy_domain = self._is_legacy_domain(ET.fromstring(domain.XMLDesc()))
-
-        self.delete_machine(machine, delete_volumes=False)
-
+        self._redefine_machine(machine, lambda d: d.set_memory(ram))
         machine.ram = ram
-        self.create_machine(
-            machine,
-            volumes=volumes,
-            ports=ports,
-            legacy_machine=legacy_domain,
-        )
         LOG.debug("The domain %s was updated with ram %s", machine.uuid, ram)
 
     def reset_machine(self, machine: models.Machine) -> None:
@@ -1329,23 +1440,9 @@ class LibvirtPoolDriver(base.AbstractPoolDriver):
         """Rename the machine."""
         origin_name = machine.name
         try:
-            ports = self._list_interfaces(machine)
-            volumes = self.list_volumes(machine)
-
-            # TODO(akremenetsky): It's only for backward compatibility
-            # This part has to be removed once all machines are migrated.
-            # Or this part can be reworked to convert legacy to new format.
-            domain = self._client.lookupByUUIDString(str(machine.uuid))
-            legacy_domain = self._is_legacy_domain(ET.fromstring(domain.XMLDesc()))
-
-            self.delete_machine(machine, delete_volumes=False)
             machine.name = name
-            self.create_machine(
-                machine,
-                volumes=volumes,
-                ports=ports,
-                legacy_machine=legacy_domain,
-            )
+            domain_name = self._machine2domain_name(machine)
+            self._redefine_machine(machine, lambda d: d.set_name(domain_name))
         except:
             machine.name = origin_name
             raise
@@ -0,0 +1,166 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Load aware assignment of machine pools to builders and agents."""
+
+import datetime
+import time
+import typing as tp
+import uuid as sys_uuid
+
+from gcl_sdk.agents.universal import constants as ua_c
+from gcl_sdk.agents.universal.dm import models as ua_models
+
+# Builders and agents which haven't updated their records for this time
+# (seconds) are considered dead, see `exordos_core.gservice.heartbeat`.
+AGENT_STALE_TIMEOUT = 300
+# Dead builders and agents get pools again only after they are seen
+# alive for this time (seconds), so flapping ones don't make pools bounce
+AGENT_REVIVE_DELAY = 120
+# A pool costs as much as this number of machines
+POOL_LOAD = 1
+
+
+def pool_load(machines: int) -> int:
+    return machines + POOL_LOAD
+
+
+def is_alive(
+    agent: ua_models.UniversalAgent,
+    stale_timeout: tp.Optional[float] = AGENT_STALE_TIMEOUT,
+) -> bool:
+    """The agent is active and its record was updated recently."""
+    if agent.status != ua_c.AgentStatus.ACTIVE.value:
+        return False
+
+    if stale_timeout is None:
+        return True
+
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return agent.updated_at >= now - datetime.timedelta(seconds=stale_timeout)
+
+
+class Liveness:
+    """Liveness of builders or agents with hysteresis.
+
+    An owner dies when its record gets stale and revives only after it
+    has been seen alive for `revive_delay` in a row.
+    """
+
+    def __init__(
+        self,
+        stale_timeout: tp.Optional[float] = AGENT_STALE_TIMEOUT,
+        revive_delay: float = AGENT_REVIVE_DELAY,
+    ) -> None:
+        self._stale_timeout = stale_timeout
+        self._revive_delay = revive_delay
+        # Dead owners and the time they are seen alive since
+        self._dead: tp.Dict[sys_uuid.UUID, tp.Optional[float]] = {}
+
+    def alive(
+        self, agents: tp.Iterable[ua_models.UniversalAgent]
+    ) -> tp.List[ua_models.UniversalAgent]:
+        """Filter out dead and reviving owners."""
+        now = time.monotonic()
+        dead: tp.Dict[sys_uuid.UUID, tp.Optional[float]] = {}
+        alive = []
+
+        for agent in agents:
+            if not is_alive(agent, self._stale_timeout):
+                dead[agent.uuid] = None
+                continue
+
+            if agent.uuid in self._dead:
+                since = self._dead[agent.uuid]
+                since = now if since is None else since
+                if now - since < self._revive_delay:
+                    dead[agent.uuid] = since
+                    continue
+
+            alive.append(agent)
+
+        # Forget the owners that are gone
+        self._dead = dead
+        return alive
+
+
+class LoadBalancer:
+    """Spread pools among owners (builders or agents) by their load.
+
+    The load of an owner is the sum of the loads of its pools. New pools
+    go to the least loaded owner. `moves` evens out the loads moving a
+    limited number of pools from the most loaded owners.
+    """
+
+    def __init__(self, owners: tp.Iterable[sys_uuid.UUID]) -> None:
+        self._pools: tp.Dict[sys_uuid.UUID, tp.Dict[sys_uuid.UUID, int]] = {
+            o: {} for o in owners
+        }
+        self._loads = {o: 0 for o in self._pools}
+
+    def __contains__(self, owner: tp.Optional[sys_uuid.UUID]) -> bool:
+        return owner in self._pools
+
+    def load(self, owner: sys_uuid.UUID) -> int:
+        return self._loads[owner]
+
+    def add(self, owner: sys_uuid.UUID, pool: sys_uuid.UUID, load: int) -> None:
+        self._pools[owner][pool] = load
+        self._loads[owner] += load
+
+    def _remove(self, owner: sys_uuid.UUID, pool: sys_uuid.UUID) -> int:
+        load = self._pools[owner].pop(pool)
+        self._loads[owner] -= load
+        return load
+
+    def _least_loaded(self) -> sys_uuid.UUID:
+        return min(self._loads, key=lambda o: (self._loads[o], o))
+
+    def assign(self, pool: sys_uuid.UUID, load: int) -> sys_uuid.UUID:
+        """Assign the pool to the least loaded owner."""
+        owner = self._least_loaded()
+        self.add(owner, pool, load)
+        return owner
+
+    def moves(
+        self, limit: int
+    ) -> tp.List[tp.Tuple[sys_uuid.UUID, sys_uuid.UUID, sys_uuid.UUID]]:
+        """Move at most `limit` pools to even out the loads.
+
+        A pool is moved only if it lowers the load of the most loaded
+        owner, so the balanced state is stable. Returns the list of
+        (pool, source owner, destination owner).
+        """
+        moves: tp.List[tp.Tuple[sys_uuid.UUID, sys_uuid.UUID, sys_uuid.UUID]] = []
+        while len(moves) < limit and len(self._loads) > 1:
+            src = max(self._loads, key=lambda o: (self._loads[o], o))
+            dst = self._least_loaded()
+            gap = self._loads[src] - self._loads[dst]
+
+            # The best pool makes the loads of both owners closest
+            candidates = [
+                (abs(gap - 2 * load), pool)
+                for pool, load in self._pools[src].items()
+                if 0 < load < gap
+            ]
+            if not candidates:
+                break
+
+            _, pool = min(candidates)
+            self.add(dst, pool, self._remove(src, pool))
+            moves.append((pool, src, dst))
+
+        return moves
@@ -18,6 +18,7 @@ import abc
 import typing as tp
 
 from exordos_core.compute.dm import models
+from exordos_core.compute.scheduler.driver import occupancy as occ
 
 
 class NodeBundle(tp.NamedTuple):
@@ -35,21 +36,72 @@ class MachinePoolBundle(tp.NamedTuple):
     volumes: tp.Collection[models.MachineVolume]
 
 
-class MachinePoolAbstractFilter(abc.ABC):
+class SchedulingPass:
+    """Data of a scheduling pass shared by the pool filters and weighters.
+
+    The data is loaded on the first access, so it's loaded once per pass
+    no matter how many stages use it and isn't loaded at all if no stage
+    needs it. The placements made within the pass are accounted in the
+    loaded data, so the nodes of the same pass see each other.
+    """
+
+    def __init__(
+        self,
+        nodes: tp.Collection[NodeBundle],
+        pools: tp.Collection[MachinePoolBundle],
+    ) -> None:
+        self.nodes = nodes
+        self.pools = pools
+        self._occupancy: tp.Optional[occ.PolicyOccupancy] = None
+
+    @property
+    def occupancy(self) -> occ.PolicyOccupancy:
+        """Occupancy of the placement policies of the pass nodes."""
+        if self._occupancy is None:
+            self._occupancy = occ.PolicyOccupancy.load(
+                [n.node.uuid for n in self.nodes], [p.pool for p in self.pools]
+            )
+        return self._occupancy
+
+    def placed(self, node: NodeBundle, pool: MachinePoolBundle) -> None:
+        """Account the node placed into the pool within the pass."""
+        if self._occupancy is not None:
+            self._occupancy.add(node.node.uuid, pool.pool.uuid)
+
+
+class AbstractPassHook(abc.ABC):
+    """Hooks of the pool filters and weighters into a scheduling pass."""
+
+    def prefetch(self, scheduling_pass: SchedulingPass) -> None:
+        """Load data for the whole scheduling pass in advance.
+
+        It's called once per pass before the nodes are filtered. Stages
+        that need data from the database should take it from the pass
+        or load it here in bulk instead of querying it for every node.
+        """
+
+    def placed(self, node: NodeBundle, pool: MachinePoolBundle) -> None:
+        """Account the node placed into the pool within the pass.
+
+        The data of the pass is already updated when it's called.
+        """
+
+
+class MachinePoolAbstractFilter(AbstractPassHook):
     @abc.abstractmethod
     def filter(
         self,
         node: NodeBundle,
-        pools: tp.List[MachinePoolBundle],
+        pools: tp.Sequence[MachinePoolBundle],
     ) -> tp.Iterable[MachinePoolBundle]:
         """Filter out pools that are not suitable for the node."""
 
 
-class MachinePoolAbstractWeighter(abc.ABC):
+class MachinePoolAbstractWeighter(AbstractPassHook):
     @abc.abstractmethod
     def weight(
         self,
-        pools: tp.List[MachinePoolBundle],
+        pools: tp.Sequence[MachinePoolBundle],
     ) -> tp.Iterable[float]:
         """Assign weights to machine pools.
 
@@ -58,13 +110,24 @@ class MachinePoolAbstractWeighter(abc.ABC):
         0 means the pool is the worst for the node.
         """
 
+    def weight_for(
+        self,
+        node: NodeBundle,
+        pools: tp.Sequence[MachinePoolBundle],
+    ) -> tp.Iterable[float]:
+        """Assign weights to machine pools for the particular node.
+
+        Weighters which depend on the node override this method.
+        """
+        return self.weight(pools)
+
 
 class MachineAbstractFilter(abc.ABC):
     @abc.abstractmethod
     def filter(
         self,
         node: NodeBundle,
-        machines: tp.List[MachineBundle],
+        machines: tp.Sequence[MachineBundle],
     ) -> tp.Iterable[MachineBundle]:
         """Filter out machines that are not suitable for the node."""
 
@@ -73,7 +136,7 @@ class MachineAbstractWeighter(abc.ABC):
     @abc.abstractmethod
     def weight(
         self,
-        machines: tp.List[MachineBundle],
+        machines: tp.Sequence[MachineBundle],
     ) -> tp.Iterable[float]:
         """Assign weights to machines.
 
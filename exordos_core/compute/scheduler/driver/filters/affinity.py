@@ -15,51 +15,49 @@
 #    under the License.
 import typing as tp
 
-from restalchemy.dm import filters as dm_filters
-
-from exordos_core.compute.dm import models
+from exordos_core.compute import constants as nc
 from exordos_core.compute.scheduler.driver import base
+from exordos_core.compute.scheduler.driver import occupancy as occ
+
+
+class AbstractPolicyFilter(base.MachinePoolAbstractFilter):
+    """Base filter for placement policies backed by the policy occupancy.
+
+    The occupancy is shared by all stages of the scheduling pass, so it
+    is loaded once per pass instead of once per filter or node.
+    """
+
+    def __init__(self) -> None:
+        self._pass: tp.Optional[base.SchedulingPass] = None
 
+    def prefetch(self, scheduling_pass: base.SchedulingPass) -> None:
+        """Bind the filter to the pass and make sure the occupancy is loaded."""
+        self._pass = scheduling_pass
+        scheduling_pass.occupancy
 
-class DummySoftAntiAffinityFilter(base.MachinePoolAbstractFilter):
+    def _get_occupancy(self) -> occ.PolicyOccupancy:
+        if self._pass is None:
+            raise ValueError(f"{type(self).__name__} is used out of a scheduling pass")
+        return self._pass.occupancy
+
+
+class DummySoftAntiAffinityFilter(AbstractPolicyFilter):
     def filter(
         self,
         node: base.NodeBundle,
-        pools: tp.List[base.MachinePoolBundle],
+        pools: tp.Sequence[base.MachinePoolBundle],
     ) -> tp.Iterable[base.MachinePoolBundle]:
         """Filter out pools that are not suitable for the node."""
-        # Get all policies for the node
-        allocations = models.PlacementPolicyAllocation.objects.get_all(
-            filters={
-                "node": dm_filters.EQ(node.node.uuid),
-            }
+        occupancy = self._get_occupancy()
+        occupied = occupancy.occupied(
+            node.node.uuid, (nc.PlacementPolicyKind.SOFT_ANTI_AFFINITY.value,)
         )
 
         # If no policies, we don't have any constraints
-        if not allocations:
+        if not occupied:
             return pools
 
-        nodes_in_allocations = models.PlacementPolicyAllocation.objects.get_all(
-            filters={
-                "policy": dm_filters.In(a.policy for a in allocations),
-            }
-        )
-
-        # TODO(akremenetsky): So far all policies are soft anti affinity
-        # Other policies are not supported.
-        machines_in_policy = models.Machine.objects.get_all(
-            filters={
-                "node": dm_filters.In(
-                    a.node.uuid
-                    for a in nodes_in_allocations
-                    if a.node.uuid != node.node.uuid
-                ),
-            }
-        )
-
-        avail_pools = {p.pool.uuid for p in pools} - {
-            m.pool for m in machines_in_policy
-        }
+        avail_pools = {p.pool.uuid for p in pools} - occupied
 
         # For soft anti affinity we allow to schedule machine to any pool
         # if there are no free pools
@@ -67,3 +65,72 @@ class DummySoftAntiAffinityFilter(base.MachinePoolAbstractFilter):
             return pools
 
         return tuple(p for p in pools if p.pool.uuid in avail_pools)
+
+
+class HardAntiAffinityFilter(AbstractPolicyFilter):
+    def filter(
+        self,
+        node: base.NodeBundle,
+        pools: tp.Sequence[base.MachinePoolBundle],
+    ) -> tp.Iterable[base.MachinePoolBundle]:
+        """Filter out pools with other members of the node policies."""
+        occupancy = self._get_occupancy()
+        occupied = occupancy.occupied(
+            node.node.uuid, (nc.PlacementPolicyKind.HARD_ANTI_AFFINITY.value,)
+        )
+
+        if not occupied:
+            return pools
+
+        return tuple(p for p in pools if p.pool.uuid not in occupied)
+
+
+class AffinityFilter(AbstractPolicyFilter):
+    def filter(
+        self,
+        node: base.NodeBundle,
+        pools: tp.Sequence[base.MachinePoolBundle],
+    ) -> tp.Iterable[base.MachinePoolBundle]:
+        """Keep only pools with other members of the node policies.
+
+        The first member of a policy may be placed into any pool.
+        """
+        occupancy = self._get_occupancy()
+        policies = occupancy.policies(
+            node.node.uuid, (nc.PlacementPolicyKind.AFFINITY.value,)
+        )
+
+        result: tp.Sequence[base.MachinePoolBundle] = pools
+        for policy in policies:
+            occupied = occupancy.pools(policy)
+            if occupied:
+                result = tuple(p for p in result if p.pool.uuid in occupied)
+
+        return result
+
+
+class PlacementScopeFilter(AbstractPolicyFilter):
+    def filter(
+        self,
+        node: base.NodeBundle,
+        pools: tp.Sequence[base.MachinePoolBundle],
+    ) -> tp.Iterable[base.MachinePoolBundle]:
+        """Keep only pools in the zone or domain of the node policies."""
+        occupancy = self._get_occupancy()
+
+        result: tp.Sequence[base.MachinePoolBundle] = pools
+        for policy_uuid in occupancy.policies(node.node.uuid):
+            policy = occupancy.policy(policy_uuid)
+            if policy.zone is not None:
+                result = tuple(
+                    p for p in result if occupancy.zone(p.pool.uuid) == policy.zone
+                )
+            elif policy.domain is not None:
+                result = tuple(
+                    p
+                    for p in result
+                    if occupancy.zone_domain(occupancy.zone(p.pool.uuid))
+                    == policy.domain
+                )
+
+        return result
@@ -0,0 +1,168 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+import collections
+import typing as tp
+import uuid as sys_uuid
+
+from restalchemy.dm import filters as dm_filters
+
+from exordos_core.compute import constants as nc
+from exordos_core.compute.dm import models
+
+
+class PolicySpec(tp.NamedTuple):
+    kind: str
+    zone: tp.Optional[sys_uuid.UUID] = None
+    domain: tp.Optional[sys_uuid.UUID] = None
+
+
+DEFAULT_POLICY = PolicySpec(kind=nc.PlacementPolicyKind.SOFT_ANTI_AFFINITY.value)
+
+
+class PolicyOccupancy:
+    """Pools and zones occupied by placement policies.
+
+    The occupancy is loaded for a batch of nodes with a fixed number of
+    queries and then updated in memory as the nodes are placed, so the
+    nodes of the same batch see each other. Pools without a zone are
+    considered as zones of their own.
+    """
+
+    def __init__(self) -> None:
+        self._node_policies: tp.Dict[sys_uuid.UUID, tp.Set[sys_uuid.UUID]] = {}
+        self._policies: tp.Dict[sys_uuid.UUID, PolicySpec] = {}
+        self._policy_pools: tp.Dict[sys_uuid.UUID, tp.Counter[sys_uuid.UUID]] = {}
+        self._policy_zones: tp.Dict[sys_uuid.UUID, tp.Counter[sys_uuid.UUID]] = {}
+        self._pool_zones: tp.Dict[sys_uuid.UUID, tp.Optional[sys_uuid.UUID]] = {}
+        self._zone_domains: tp.Dict[sys_uuid.UUID, sys_uuid.UUID] = {}
+
+    @classmethod
+    def load(
+        cls,
+        nodes: tp.Collection[sys_uuid.UUID],
+        pools: tp.Collection[models.MachinePool] = (),
+    ) -> "PolicyOccupancy":
+        occupancy = cls()
+        occupancy._pool_zones = {p.uuid: p.zone for p in pools}
+        if not nodes:
+            return occupancy
+
+        allocations = models.FlatPlacementPolicyAllocation.objects.get_all(
+            filters={"node": dm_filters.In(nodes)},
+        )
+        for allocation in allocations:
+            occupancy._node_policies.setdefault(allocation.node, set()).add(
+                allocation.policy
+            )
+
+        policies = {a.policy for a in allocations}
+        if not policies:
+            return occupancy
+
+        for policy in models.PlacementPolicy.objects.get_all(
+            filters={"uuid": dm_filters.In(policies)},
+        ):
+            occupancy._policies[policy.uuid] = PolicySpec(
+                kind=policy.kind,
+                zone=policy.zone.uuid if policy.zone else None,
+                domain=policy.domain.uuid if policy.domain else None,
+            )
+
+        if any(p.domain for p in occupancy._policies.values()):
+            for zone in models.PlacementZone.objects.get_all():
+                occupancy._zone_domains[zone.uuid] = zone.domain.uuid
+
+        # All nodes in the policies and pools of their machines
+        allocations = models.FlatPlacementPolicyAllocation.objects.get_all(
+            filters={"policy": dm_filters.In(policies)},
+        )
+        machines = models.Machine.objects.get_all(
+            filters={"node": dm_filters.In({a.node for a in allocations})},
+        )
+        node_pools = {m.node: m.pool for m in machines if m.pool is not None}
+
+        # Zones of pools which aren't among the pools for scheduling
+        unknown = set(node_pools.values()) - occupancy._pool_zones.keys()
+        if unknown:
+            for pool in models.MachinePool.objects.get_all(
+                filters={"uuid": dm_filters.In(unknown)},
+            ):
+                occupancy._pool_zones[pool.uuid] = pool.zone
+
+        for allocation in allocations:
+            pool = node_pools.get(allocation.node)
+            if pool is not None:
+                occupancy._occupy(allocation.policy, pool)
+
+        return occupancy
+
+    def _occupy(self, policy: sys_uuid.UUID, pool: sys_uuid.UUID) -> None:
+        self._policy_pools.setdefault(policy, collections.Counter())[pool] += 1
+        self._policy_zones.setdefault(policy, collections.Counter())[
+            self.zone_key(pool)
+        ] += 1
+
+    def zone_key(self, pool: sys_uuid.UUID) -> sys_uuid.UUID:
+        """Zone of the pool or the pool itself if it has no zone."""
+        return self._pool_zones.get(pool) or pool
+
+    def zone(self, pool: sys_uuid.UUID) -> tp.Optional[sys_uuid.UUID]:
+        return self._pool_zones.get(pool)
+
+    def zone_domain(
+        self, zone: tp.Optional[sys_uuid.UUID]
+    ) -> tp.Optional[sys_uuid.UUID]:
+        if zone is None:
+            return None
+        return self._zone_domains.get(zone)
+
+    def policy(self, policy: sys_uuid.UUID) -> PolicySpec:
+        return self._policies.get(policy, DEFAULT_POLICY)
+
+    def policies(
+        self,
+        node: sys_uuid.UUID,
+        kinds: tp.Optional[tp.Collection[str]] = None,
+    ) -> tp.Set[sys_uuid.UUID]:
+        """Policies of the node, optionally only of the given kinds."""
+        policies = self._node_policies.get(node, set())
+        if kinds is None:
+            return policies
+        return {p for p in policies if self.policy(p).kind in kinds}
+
+    def pools(self, policy: sys_uuid.UUID) -> tp.Counter[sys_uuid.UUID]:
+        """Number of policy members in every occupied pool."""
+        return self._policy_pools.get(policy, collections.Counter())
+
+    def zones(self, policy: sys_uuid.UUID) -> tp.Counter[sys_uuid.UUID]:
+        """Number of policy members in every occupied zone."""
+        return self._policy_zones.get(policy, collections.Counter())
+
+    def occupied(
+        self,
+        node: sys_uuid.UUID,
+        kinds: tp.Optional[tp.Collection[str]] = None,
+    ) -> tp.Set[sys_uuid.UUID]:
+        """Pools occupied by the placement policies of the node."""
+        occupied: tp.Set[sys_uuid.UUID] = set()
+        for policy in self.policies(node, kinds):
+            occupied |= self.pools(policy).keys()
+        return occupied
+
+    def add(self, node: sys_uuid.UUID, pool: sys_uuid.UUID) -> None:
+        """Account the node placed into the pool."""
+        for policy in self.policies(node):
+            self._occupy(policy, pool)
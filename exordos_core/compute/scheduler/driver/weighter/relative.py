@@ -47,7 +47,7 @@ class RelativeCoreRamWeighter(base.MachinePoolAbstractWeighter):
 
     def weight(
         self,
-        pools: tp.List[base.MachinePoolBundle],
+        pools: tp.Sequence[base.MachinePoolBundle],
     ) -> tp.Iterable[float]:
         """Assign weights to machine pools.
 
@@ -58,12 +58,33 @@ class RelativeCoreRamWeighter(base.MachinePoolAbstractWeighter):
 
         # Maximum weight gets a pool with relative maximal cores and ram
         usages = tuple(self._usage_ratio(p.pool) for p in pools)
+        total = sum(usages)
 
         # The system is empty, all pools have equal weight
-        if sum(usages) == 0:
+        if total == 0:
             return (1 / len(pools) for _ in pools)
 
-        return (1.0 - u / sum(usages) for u in usages)
+        return (1.0 - u / total for u in usages)
+
+
+class StackingWeighter(RelativeCoreRamWeighter):
+    """Prefer the most used pools to pack nodes densely.
+
+    The opposite of `RelativeCoreRamWeighter`, it leaves empty pools
+    untouched so their hosts may be powered off.
+    """
+
+    def weight(
+        self,
+        pools: tp.Sequence[base.MachinePoolBundle],
+    ) -> tp.Iterable[float]:
+        """Assign weights to machine pools.
+
+        Every machine pool gets a weight from range [0, 1] equal to its
+        usage ratio. The pools without room for the node are filtered out
+        before weighting.
+        """
+        return tuple(self._usage_ratio(p.pool) for p in pools)
 
 
 class SimpleMachineWeighter(base.MachineAbstractWeighter):
@@ -74,7 +95,7 @@ class SimpleMachineWeighter(base.MachineAbstractWeighter):
 
     def weight(
         self,
-        machines: tp.List[base.MachineBundle],
+        machines: tp.Sequence[base.MachineBundle],
     ) -> tp.Iterable[float]:
         """Assign weights to machines.
 
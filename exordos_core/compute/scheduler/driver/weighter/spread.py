@@ -0,0 +1,65 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+import typing as tp
+
+from exordos_core.compute import constants as nc
+from exordos_core.compute.scheduler.driver import base
+
+
+class ZoneSpreadWeighter(base.MachinePoolAbstractWeighter):
+    """Prefer zones with fewer members of the node spread policies.
+
+    Pools without a zone are considered as zones of their own, so
+    without zones the nodes are spread among pools.
+    """
+
+    def __init__(self) -> None:
+        self._pass: tp.Optional[base.SchedulingPass] = None
+
+    def prefetch(self, scheduling_pass: base.SchedulingPass) -> None:
+        self._pass = scheduling_pass
+        scheduling_pass.occupancy
+
+    def weight(
+        self,
+        pools: tp.Sequence[base.MachinePoolBundle],
+    ) -> tp.Iterable[float]:
+        """All pools are equal without the node."""
+        return (1.0 for _ in pools)
+
+    def weight_for(
+        self,
+        node: base.NodeBundle,
+        pools: tp.Sequence[base.MachinePoolBundle],
+    ) -> tp.Iterable[float]:
+        if self._pass is None:
+            raise ValueError(f"{type(self).__name__} is used out of a scheduling pass")
+        occupancy = self._pass.occupancy
+
+        policies = occupancy.policies(
+            node.node.uuid, (nc.PlacementPolicyKind.ZONE_SPREAD.value,)
+        )
+        if not policies:
+            return self.weight(pools)
+
+        members = [0] * len(pools)
+        for policy in policies:
+            zones = occupancy.zones(policy)
+            for i, pool in enumerate(pools):
+                members[i] += zones[occupancy.zone_key(pool.pool.uuid)]
+
+        most = max(members)
+        return (1.0 - m / (most + 1) for m in members)
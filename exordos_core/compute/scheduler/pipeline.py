@@ -0,0 +1,213 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Filter and weighter pipeline of the node scheduler.
+
+Filters and weighters are registered in the entry point groups and
+picked by name from the configuration. Every stage of the pipeline is
+timed so the slowest filter or weighter is visible in the metrics.
+"""
+
+import threading
+import time
+import typing as tp
+
+from exordos_core.common import utils
+from exordos_core.compute import constants as nc
+from exordos_core.compute.scheduler.driver import base
+
+DEFAULT_POOL_FILTERS = (
+    "CoresRamAvailableFilter",
+    "PlacementScopeFilter",
+    "HardAntiAffinityFilter",
+    "AffinityFilter",
+    "DummySoftAntiAffinityFilter",
+)
+DEFAULT_POOL_WEIGHTERS = ("RelativeCoreRamWeighter", "ZoneSpreadWeighter")
+DEFAULT_MACHINE_FILTERS = ("HWCoresRamAvailableFilter",)
+DEFAULT_MACHINE_WEIGHTERS = ("SimpleMachineWeighter",)
+
+
+class StageStats(tp.NamedTuple):
+    calls: int = 0
+    seconds: float = 0.0
+
+
+_Driver = tp.Union[
+    base.MachinePoolAbstractFilter,
+    base.MachinePoolAbstractWeighter,
+    base.MachineAbstractFilter,
+    base.MachineAbstractWeighter,
+]
+
+
+class _Stage(base.AbstractPassHook):
+    """Timed wrapper of a filter or a weighter."""
+
+    driver: _Driver
+
+    def __init__(self, name: str, driver: _Driver) -> None:
+        self.name = name
+        self.driver = driver
+        self.stats = StageStats()
+        self._lock = threading.Lock()
+
+    def _timed(self, func: tp.Callable[..., tp.Any], *args: tp.Any) -> tp.Any:
+        started_at = time.monotonic()
+        try:
+            return func(*args)
+        finally:
+            duration = time.monotonic() - started_at
+            with self._lock:
+                self.stats = StageStats(
+                    self.stats.calls + 1, self.stats.seconds + duration
+                )
+
+    def prefetch(self, scheduling_pass: base.SchedulingPass) -> None:
+        # Only the pool stages take part in the pass over pools
+        if isinstance(self.driver, base.AbstractPassHook):
+            self._timed(self.driver.prefetch, scheduling_pass)
+
+    def placed(self, node: base.NodeBundle, pool: base.MachinePoolBundle) -> None:
+        if isinstance(self.driver, base.AbstractPassHook):
+            self._timed(self.driver.placed, node, pool)
+
+
+class FilterStage(_Stage):
+    driver: tp.Union[base.MachinePoolAbstractFilter, base.MachineAbstractFilter]
+
+    def _filter(self, node: tp.Any, items: tp.Any) -> tp.Tuple[tp.Any, ...]:
+        # Lazy results are consumed here to account their cost to the stage
+        return tuple(self.driver.filter(node, items))
+
+    def filter(self, node: tp.Any, items: tp.Any) -> tp.Tuple[tp.Any, ...]:
+        return self._timed(self._filter, node, items)
+
+
+class WeighterStage(_Stage):
+    """Weighter with a multiplier of its weights.
+
+    The multiplier sets the importance of the weighter relative to the
+    others, zero disables it and a negative one inverts it.
+    """
+
+    driver: tp.Union[base.MachinePoolAbstractWeighter, base.MachineAbstractWeighter]
+
+    def __init__(
+        self,
+        name: str,
+        driver: tp.Union[
+            base.MachinePoolAbstractWeighter, base.MachineAbstractWeighter
+        ],
+        multiplier: float = 1.0,
+    ) -> None:
+        super().__init__(name, driver)
+        self.multiplier = multiplier
+
+    def _weight(
+        self, func: tp.Callable[..., tp.Iterable[float]], *args: tp.Any
+    ) -> tp.List[float]:
+        return [w * self.multiplier for w in func(*args)]
+
+    def weight(self, items: tp.Any) -> tp.List[float]:
+        return self._timed(self._weight, self.driver.weight, items)
+
+    def weight_for(self, node: tp.Any, items: tp.Any) -> tp.List[float]:
+        if not isinstance(self.driver, base.MachinePoolAbstractWeighter):
+            return self.weight(items)
+        return self._timed(self._weight, self.driver.weight_for, node, items)
+
+
+def load_filters(group: str, names: tp.Iterable[str]) -> tp.List[FilterStage]:
+    """Instantiate filters registered in the entry point group."""
+    return [
+        FilterStage(name, utils.load_from_entry_point(group, name)()) for name in names
+    ]
+
+
+def load_weighters(
+    group: str,
+    names: tp.Iterable[str],
+    multipliers: tp.Optional[tp.Dict[str, float]] = None,
+) -> tp.List[WeighterStage]:
+    """Instantiate weighters registered in the entry point group."""
+    multipliers = multipliers or {}
+    return [
+        WeighterStage(
+            name,
+            utils.load_from_entry_point(group, name)(),
+            float(multipliers.get(name, 1.0)),
+        )
+        for name in names
+    ]
+
+
+class SchedulerPipeline:
+    """Filters and weighters of pools and machines."""
+
+    def __init__(
+        self,
+        pool_filters: tp.List[FilterStage],
+        pool_weighters: tp.List[WeighterStage],
+        machine_filters: tp.List[FilterStage],
+        machine_weighters: tp.List[WeighterStage],
+    ) -> None:
+        self.pool_filters = pool_filters
+        self.pool_weighters = pool_weighters
+        self.machine_filters = machine_filters
+        self.machine_weighters = machine_weighters
+
+    @classmethod
+    def load(
+        cls,
+        pool_filters: tp.Iterable[str] = DEFAULT_POOL_FILTERS,
+        pool_weighters: tp.Iterable[str] = DEFAULT_POOL_WEIGHTERS,
+        machine_filters: tp.Iterable[str] = DEFAULT_MACHINE_FILTERS,
+        machine_weighters: tp.Iterable[str] = DEFAULT_MACHINE_WEIGHTERS,
+        multipliers: tp.Optional[tp.Dict[str, float]] = None,
+    ) -> "SchedulerPipeline":
+        """Load the pipeline from the entry points.
+
+        The stages follow the order of the names. The multipliers are
+        applied to the pool and machine weighters with the same name.
+        """
+        return cls(
+            pool_filters=load_filters(nc.EP_SCHEDULER_POOL_FILTERS, pool_filters),
+            pool_weighters=load_weighters(
+                nc.EP_SCHEDULER_POOL_WEIGHTERS, pool_weighters, multipliers
+            ),
+            machine_filters=load_filters(
+                nc.EP_SCHEDULER_MACHINE_FILTERS, machine_filters
+            ),
+            machine_weighters=load_weighters(
+                nc.EP_SCHEDULER_MACHINE_WEIGHTERS, machine_weighters, multipliers
+            ),
+        )
+
+    def stages(self) -> tp.Iterator[tp.Tuple[str, _Stage]]:
+        """All stages with their kinds."""
+        for kind, stages in (
+            ("pool_filter", self.pool_filters),
+            ("pool_weighter", self.pool_weighters),
+            ("machine_filter", self.machine_filters),
+            ("machine_weighter", self.machine_weighters),
+        ):
+            for stage in stages:
+                yield kind, stage
+
+    def stats(self) -> tp.Dict[tp.Tuple[str, str], StageStats]:
+        """Cumulative calls and duration of every stage."""
+        return {(kind, stage.name): stage.stats for kind, stage in self.stages()}
@@ -0,0 +1,307 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import bisect
+import datetime
+import typing as tp
+import uuid as sys_uuid
+
+from restalchemy.dm import filters as dm_filters
+from restalchemy.storage.sql import engines
+from restalchemy.storage.sql import utils as sql_utils
+
+from exordos_core.compute import constants as nc
+from exordos_core.compute.dm import models
+from exordos_core.compute.scheduler import reservations
+from exordos_core.compute.scheduler.driver import base
+
+# Idle machines are fetched by pages of this size from every bucket
+IDLE_MACHINES_PAGE = 100
+# The same ratio as in the simple machine weighter, 1 cpu == 8192 Mb ram
+RAM_PER_CORE = 8192
+
+
+def accumulate_weights(
+    weighters: tp.Iterable[tp.Any],
+    items: tp.Sequence[tp.Any],
+    node: tp.Optional[base.NodeBundle] = None,
+) -> tp.List[float]:
+    """Sum weights of all weighters for every item in one pass per weighter.
+
+    If the node is passed the weighters weight the items for the node.
+    """
+    accumulated = [0.0] * len(items)
+    for weighter in weighters:
+        if node is None:
+            weights = weighter.weight(items)
+        else:
+            weights = weighter.weight_for(node, items)
+        for i, weight in enumerate(weights):
+            accumulated[i] += weight
+    return accumulated
+
+
+def best_index(weights: tp.Sequence[float]) -> int:
+    """Index of the highest weight, the first one wins on ties."""
+    return max(range(len(weights)), key=weights.__getitem__)
+
+
+class PoolCapacityIndex:
+    """In-memory capacity index of pools for a scheduling batch.
+
+    The pools are kept sorted by available cores and RAM so the pools
+    that fit a node are found by bisection instead of a full scan. The
+    placements made earlier in the same batch are accounted, so the batch
+    may be written to the database at once. Placement policies are
+    handled by the pool filters, see `SchedulingPass`.
+    """
+
+    def __init__(self, pools: tp.Iterable[base.MachinePoolBundle]) -> None:
+        self._pools = {p.pool.uuid: p for p in pools}
+        self._order = sorted(self._key(p) for p in self._pools.values())
+
+    @staticmethod
+    def _key(
+        pool: base.MachinePoolBundle,
+    ) -> tp.Tuple[int, int, sys_uuid.UUID]:
+        return (pool.pool.avail_cores, pool.pool.avail_ram, pool.pool.uuid)
+
+    def candidates(self, node: models.Node) -> tp.List[base.MachinePoolBundle]:
+        """Pools with enough capacity for the node."""
+        start = bisect.bisect_left(self._order, (node.cores,))
+        return [
+            self._pools[uuid]
+            for _, avail_ram, uuid in self._order[start:]
+            if avail_ram >= node.ram
+        ]
+
+    def consume(self, node: models.Node, pool: base.MachinePoolBundle) -> None:
+        """Account the node placed into the pool."""
+        del self._order[bisect.bisect_left(self._order, self._key(pool))]
+        pool.pool.avail_cores -= node.cores
+        pool.pool.avail_ram -= node.ram
+        bisect.insort(self._order, self._key(pool))
+
+
+def batch_update(
+    session: tp.Any,
+    objects: tp.Sequence[tp.Any],
+    fields: tp.Sequence[str],
+) -> None:
+    """Update `fields` of the objects with a single batched statement.
+
+    The ORM has a bulk insert only, updates are written object by object.
+    The helper does the same as `update()` of the models: validates the
+    objects, touches `updated_at` and writes the storable snapshot, but
+    only the passed fields are written and the objects are matched by
+    UUID. Objects must be already saved.
+    """
+    if not objects:
+        return
+
+    model = type(objects[0])
+    if "updated_at" in model.properties.properties:
+        fields = tuple(fields) + ("updated_at",)
+        now = datetime.datetime.now(datetime.timezone.utc)
+        for obj in objects:
+            obj.properties["updated_at"].set_value_force(now)
+
+    values = []
+    for obj in objects:
+        obj.validate()
+        data = obj.get_storable_snapshot()
+        values.append(tuple(data[f] for f in fields) + (data["uuid"],))
+
+    statement = 'UPDATE "%s" SET %s WHERE "uuid" = %%s' % (
+        model.__tablename__,
+        ", ".join(f"{session.engine.escape(f)} = %s" for f in fields),
+    )
+    session.execute_many(statement, values)
+
+
+class PlacementWriter:
+    """Collect placement results and write them in bulk.
+
+    Machines, their pool reservations and new machine volumes are
+    inserted, reused machine volumes are updated. A node is placed by its
+    machine, the node itself isn't changed. Every kind of rows
+    is written with a single batched statement within a savepoint of the
+    current session transaction, so a failed batch doesn't abort the rest
+    of the scheduler pass. The inserted objects aren't marked as saved,
+    they are dropped after the pass and reloaded from the database.
+    """
+
+    def __init__(self) -> None:
+        self._machines: tp.List[models.Machine] = []
+        self._reservations: tp.List[models.MachinePoolReservations] = []
+        self._new_volumes: tp.List[models.MachineVolume] = []
+        self._reused_volumes: tp.List[models.MachineVolume] = []
+
+    def __len__(self) -> int:
+        return len(self._machines)
+
+    def add(
+        self,
+        machine: models.Machine,
+        volumes: tp.Iterable[models.MachineVolume],
+    ) -> None:
+        self._machines.append(machine)
+        self._reservations.append(reservations.reservation_for(machine))
+        for volume in volumes:
+            if volume._saved:
+                self._reused_volumes.append(volume)
+            else:
+                self._new_volumes.append(volume)
+
+    def flush(self) -> None:
+        """Write all collected rows in the current transaction."""
+        try:
+            with sql_utils.savepoint("placement") as session:
+                session.batch_insert(self._machines)
+                session.batch_insert(self._reservations)
+                session.batch_insert(self._new_volumes)
+                batch_update(
+                    session,
+                    self._reused_volumes,
+                    ("pool", "machine", "node_volume", "project_id"),
+                )
+        finally:
+            self._machines.clear()
+            self._reservations.clear()
+            self._new_volumes.clear()
+            self._reused_volumes.clear()
+
+
+class _MachineBucket:
+    """Idle machines with the same cores and RAM."""
+
+    def __init__(self, cores: int, ram: int, count: int) -> None:
+        self.cores = cores
+        self.ram = ram
+        self.count = count
+        self.machines: tp.List[base.MachineBundle] = []
+        self.cursor: tp.Optional[sys_uuid.UUID] = None
+        self.exhausted = False
+
+    @property
+    def size(self) -> int:
+        return self.cores * RAM_PER_CORE + self.ram
+
+    def fits(self, node: models.Node) -> bool:
+        return self.count > 0 and self.cores >= node.cores and self.ram >= node.ram
+
+
+class IdleMachineIndex:
+    """Best-fit index of idle machines for a scheduling pass.
+
+    Idle machines are grouped into capacity buckets by (cores, ram) with
+    a single aggregate query. Machines of a bucket are fetched lazily
+    page by page with keyset pagination only when a node fits the bucket,
+    so the number of idle machines isn't limited and they aren't loaded
+    all at once. The buckets are checked from the smallest to the biggest
+    one, so a node gets the smallest suitable machine.
+    """
+
+    def __init__(
+        self,
+        machine_type: str = nc.NodeType.HW.value,
+        page_size: int = IDLE_MACHINES_PAGE,
+    ) -> None:
+        self._machine_type = machine_type
+        self._page_size = page_size
+        self._buckets: tp.List[_MachineBucket] = []
+
+    def _base_filters(self) -> tp.Dict[str, dm_filters.AbstractClause]:
+        return {
+            "node": dm_filters.Is(None),
+            "status": dm_filters.EQ(nc.MachineStatus.IDLE.value),
+            "machine_type": dm_filters.EQ(self._machine_type),
+        }
+
+    def load(self) -> None:
+        """Load the capacity buckets."""
+        engine = engines.engine_factory.get_engine()
+        with engine.session_manager() as session:
+            rows = session.execute(
+                f"""
+                SELECT cores, ram, count(*) AS count
+                FROM {models.Machine.__tablename__}
+                WHERE node IS NULL AND status = %s AND machine_type = %s
+                GROUP BY cores, ram;
+                """,
+                (nc.MachineStatus.IDLE.value, self._machine_type),
+            ).fetchall()
+
+        self._buckets = sorted(
+            (_MachineBucket(r["cores"], r["ram"], r["count"]) for r in rows),
+            key=lambda b: (b.size, b.cores),
+        )
+
+    def _fetch_page(self, bucket: _MachineBucket) -> tp.List[base.MachineBundle]:
+        filters = self._base_filters()
+        filters["cores"] = dm_filters.EQ(bucket.cores)
+        filters["ram"] = dm_filters.EQ(bucket.ram)
+        if bucket.cursor is not None:
+            filters["uuid"] = dm_filters.GT(bucket.cursor)
+
+        machines = models.Machine.objects.get_all(
+            filters=filters,
+            order_by={"uuid": "asc"},
+            limit=self._page_size,
+        )
+        if len(machines) < self._page_size:
+            bucket.exhausted = True
+        if not machines:
+            return []
+        bucket.cursor = machines[-1].uuid
+
+        volumes = models.MachineVolume.objects.get_all(
+            filters={"machine": dm_filters.In([m.uuid for m in machines])},
+        )
+        volume_map: tp.Dict[sys_uuid.UUID, tp.List[models.MachineVolume]] = {}
+        for v in volumes:
+            volume_map.setdefault(v.machine, []).append(v)
+
+        page = [
+            base.MachineBundle(machine=m, volumes=volume_map.get(m.uuid, []))
+            for m in machines
+        ]
+        bucket.machines.extend(page)
+        return page
+
+    def candidates(
+        self, node: models.Node
+    ) -> tp.Iterator[tp.Tuple[base.MachineBundle, ...]]:
+        """Yield groups of suitable machines starting from the best fit."""
+        for bucket in self._buckets:
+            if not bucket.fits(node):
+                continue
+
+            if bucket.machines:
+                yield tuple(bucket.machines)
+
+            while not bucket.exhausted:
+                page = self._fetch_page(bucket)
+                if page:
+                    yield tuple(page)
+
+    def take(self, machine: base.MachineBundle) -> None:
+        """Remove the machine from the index once it's scheduled."""
+        for bucket in self._buckets:
+            if machine in bucket.machines:
+                bucket.machines.remove(machine)
+                bucket.count -= 1
+                return
@@ -0,0 +1,174 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Pre-warmed machine volumes.
+
+The prewarmer keeps a number of free machine volumes of popular images
+in every pool. The scheduler takes such volumes for node volumes of the
+same image instead of creating new ones. A pre-warmed volume of a size
+class serves node volumes of that size or bigger, the volume is resized
+on placement.
+"""
+
+import threading
+import typing as tp
+import uuid as sys_uuid
+
+from exordos_core.common import constants as c
+from exordos_core.compute import constants as nc
+from exordos_core.compute.dm import models
+from exordos_core.compute.scheduler import storage
+from exordos_core.compute.scheduler.driver import base
+
+# Maximum number of volumes created per scheduler iteration
+PREWARM_PER_PASS = 10
+
+
+class PrewarmSpec(tp.NamedTuple):
+    image: str
+    size: int
+    volumes: int
+
+    @classmethod
+    def parse(cls, value: str) -> "PrewarmSpec":
+        """Parse the `<size>:<count>:<image>` format.
+
+        The image goes last since image URLs contain colons.
+        """
+        size, volumes, image = value.split(":", 2)
+        return cls(image=image, size=int(size), volumes=int(volumes))
+
+
+class PrewarmStats:
+    """Hits and misses of reusable volumes by image."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.hits: tp.Dict[str, int] = {}
+        self.misses: tp.Dict[str, int] = {}
+        self.created = 0
+
+    def observe(self, image: str, hit: bool) -> None:
+        counters = self.hits if hit else self.misses
+        with self._lock:
+            counters[image] = counters.get(image, 0) + 1
+
+    def hit_ratio(self, image: str) -> float:
+        hits = self.hits.get(image, 0)
+        total = hits + self.misses.get(image, 0)
+        return hits / total if total else 0.0
+
+    def render(self, prefix: str) -> tp.List[str]:
+        """Render the stats in the Prometheus text format."""
+        with self._lock:
+            images = sorted(self.hits.keys() | self.misses.keys())
+            lines = [f"# TYPE {prefix}_prewarm_created_total counter"]
+            lines.append(f"{prefix}_prewarm_created_total {self.created}")
+            for name, kind, value in (
+                ("prewarm_hits_total", "counter", lambda i: self.hits.get(i, 0)),
+                ("prewarm_misses_total", "counter", lambda i: self.misses.get(i, 0)),
+                ("prewarm_hit_ratio", "gauge", self.hit_ratio),
+            ):
+                lines.append(f"# TYPE {prefix}_{name} {kind}")
+                for image in images:
+                    lines.append(f'{prefix}_{name}{{image="{image}"}} {value(image)}')
+        return lines
+
+
+class VolumePrewarmer:
+    """Keep free volumes of the configured images in every pool.
+
+    The volumes are created as regular free machine volumes, the pool
+    builder and the pool agent provision them on the data plane. The
+    refill is spread over the scheduler iterations by a limit of volumes
+    per iteration.
+    """
+
+    def __init__(
+        self,
+        specs: tp.Iterable[PrewarmSpec],
+        per_pass: int = PREWARM_PER_PASS,
+    ) -> None:
+        self._specs = tuple(specs)
+        self._images = frozenset(s.image for s in self._specs)
+        self._per_pass = per_pass
+        self._offset = 0
+        self.stats = PrewarmStats()
+
+    def observe(self, image: str, hit: bool) -> None:
+        """Account a lookup of a reusable volume of the image.
+
+        Only the pre-warmed images are accounted, the others aren't
+        expected to have free volumes.
+        """
+        if image in self._images:
+            self.stats.observe(image, hit)
+
+    def _build_volume(
+        self, pool: base.MachinePoolBundle, spec: PrewarmSpec
+    ) -> tp.Optional[models.MachineVolume]:
+        storage_pool = storage.select_storage_pool(pool.pool.storage_pools, spec.size)
+        if storage_pool is None:
+            return None
+
+        storage_pool.allocate_capacity(spec.size)
+        volume_uuid = sys_uuid.uuid4()
+        return models.MachineVolume(
+            uuid=volume_uuid,
+            name=str(volume_uuid),
+            pool=pool.pool.uuid,
+            index=0,
+            size=spec.size,
+            image=spec.image,
+            boot=True,
+            project_id=c.SERVICE_PROJECT_ID,
+            status=nc.VolumeStatus.NEW.value,
+        )
+
+    def refill(
+        self,
+        pools: tp.Sequence[base.MachinePoolBundle],
+        indexes: tp.Callable[[base.MachinePoolBundle], storage.ReusableVolumeIndex],
+    ) -> tp.List[models.MachineVolume]:
+        """Create the missing free volumes and return them."""
+        if not self._specs or not pools:
+            return []
+
+        created: tp.List[models.MachineVolume] = []
+
+        # Start from another pool every time to refill all pools evenly
+        self._offset %= len(pools)
+        ordered = list(pools[self._offset :]) + list(pools[: self._offset])
+        self._offset += 1
+
+        for pool in ordered:
+            index = indexes(pool)
+            for spec in self._specs:
+                missing = spec.volumes - index.count(spec.image, spec.size)
+                for _ in range(missing):
+                    if len(created) >= self._per_pass:
+                        return created
+
+                    volume = self._build_volume(pool, spec)
+                    if volume is None:
+                        break
+
+                    volume.save()
+                    index.add(volume)
+                    created.append(volume)
+                    self.stats.created += 1
+
+        return created
@@ -0,0 +1,164 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Capacity reservations of machines placed into pools.
+
+The pool capacity is reported by the pool agent and it accounts only
+machines that already exist on the data plane. A reservation is written
+by the scheduler in the same transaction as the machine placement and it
+is released by the pool builder as soon as the agent reports the machine.
+The cascade drops the reservation if the machine is deleted, for instance
+rescheduled. So the available capacity of a pool is the reported one
+minus the sum of its reservations.
+"""
+
+import typing as tp
+import uuid as sys_uuid
+
+from restalchemy.dm import filters as dm_filters
+from restalchemy.storage.sql import engines
+
+from exordos_core.compute.dm import models
+
+
+class Reserved(tp.NamedTuple):
+    cores: int = 0
+    ram: int = 0
+
+
+NOTHING_RESERVED = Reserved()
+
+
+def reservation_for(machine: models.Machine) -> models.MachinePoolReservations:
+    """Reservation of the machine placed into a pool.
+
+    The reservation has the same UUID as the machine so the machine
+    cannot be reserved twice.
+    """
+    return models.MachinePoolReservations(
+        uuid=machine.uuid,
+        pool=machine.pool,
+        machine=machine.uuid,
+        cores=machine.cores,
+        ram=machine.ram,
+    )
+
+
+def load_reserved(
+    pools: tp.Iterable[sys_uuid.UUID],
+) -> tp.Dict[sys_uuid.UUID, Reserved]:
+    """Sum of reservations of every pool with a single aggregate query."""
+    pools = list(pools)
+    if not pools:
+        return {}
+
+    engine = engines.engine_factory.get_engine()
+    with engine.session_manager() as session:
+        rows = session.execute(
+            f"""
+            SELECT pool, sum(cores) AS cores, sum(ram) AS ram
+            FROM {models.MachinePoolReservations.__tablename__}
+            WHERE pool = ANY(%s)
+            GROUP BY pool;
+            """,
+            (pools,),
+        ).fetchall()
+
+    return {r["pool"]: Reserved(int(r["cores"]), int(r["ram"])) for r in rows}
+
+
+def delete_reservations(machines: tp.Iterable[sys_uuid.UUID]) -> None:
+    """Release reservations of the machines."""
+    engine = engines.engine_factory.get_engine()
+    with engine.session_manager() as session:
+        session.execute(
+            f"""
+            DELETE FROM {models.MachinePoolReservations.__tablename__}
+            WHERE machine = ANY(%s);
+            """,
+            (list(machines),),
+        )
+
+
+def apply_reserved(
+    pools: tp.Iterable[models.MachinePool],
+    reserved: tp.Mapping[sys_uuid.UUID, Reserved],
+) -> None:
+    """Subtract the reservations from the reported pool capacity."""
+    for pool in pools:
+        cores, ram = reserved.get(pool.uuid, NOTHING_RESERVED)
+        pool.avail_cores -= cores
+        pool.avail_ram -= ram
+
+
+class ReservationLedger:
+    """Reservations of the pools served by a pool builder.
+
+    The ledger is loaded once per builder iteration. Only machines that
+    aren't created on the data plane yet have reservations, so the
+    number of rows is bounded by the machines in flight.
+    """
+
+    def __init__(
+        self, reservations: tp.Iterable[models.MachinePoolReservations] = ()
+    ) -> None:
+        self._pools: tp.Dict[sys_uuid.UUID, tp.Dict[sys_uuid.UUID, Reserved]] = {}
+        self._machines: tp.Dict[sys_uuid.UUID, sys_uuid.UUID] = {}
+        for reservation in reservations:
+            self._pools.setdefault(reservation.pool, {})[reservation.machine] = (
+                Reserved(reservation.cores, reservation.ram)
+            )
+            self._machines[reservation.machine] = reservation.pool
+
+    @classmethod
+    def load(cls, pools: tp.Collection[sys_uuid.UUID]) -> "ReservationLedger":
+        if not pools:
+            return cls()
+
+        return cls(
+            models.MachinePoolReservations.objects.get_all(
+                filters={
+                    "pool": dm_filters.In(pools),
+                    "machine": dm_filters.IsNot(None),
+                },
+            )
+        )
+
+    def __contains__(self, machine: sys_uuid.UUID) -> bool:
+        return machine in self._machines
+
+    def reserved(
+        self,
+        pool: sys_uuid.UUID,
+        exclude: tp.Optional[sys_uuid.UUID] = None,
+    ) -> Reserved:
+        """Resources reserved in the pool by machines except `exclude`."""
+        cores = ram = 0
+        for machine, reserved in self._pools.get(pool, {}).items():
+            if machine != exclude:
+                cores += reserved.cores
+                ram += reserved.ram
+        return Reserved(cores, ram)
+
+    def release(self, machine: sys_uuid.UUID) -> bool:
+        """Drop the reservation of the machine created on the data plane."""
+        pool = self._machines.pop(machine, None)
+        if pool is None:
+            return False
+
+        del self._pools[pool][machine]
+        delete_reservations((machine,))
+        return True
@@ -15,7 +15,6 @@
 #    under the License.
 
 import logging
-import random
 import typing as tp
 import uuid as sys_uuid
 
@@ -23,9 +22,16 @@ from gcl_looper.services import basic
 from gcl_sdk.agents.universal.dm import models as ua_models
 from restalchemy.common import contexts
 from restalchemy.dm import filters as dm_filters
+from restalchemy.storage.sql import engines
+from restalchemy.storage.sql import utils as sql_utils
 
 from exordos_core.compute import constants as nc
 from exordos_core.compute.dm import models
+from exordos_core.compute.scheduler import balance
+from exordos_core.compute.scheduler import placement
+from exordos_core.compute.scheduler import prewarm
+from exordos_core.compute.scheduler import reservations
+from exordos_core.compute.scheduler import storage
 from exordos_core.compute.scheduler.driver import base
 
 LOG = logging.getLogger(__name__)
@@ -42,12 +48,27 @@ class SchedulerService(basic.BasicService):
         machine_weighters: tp.List[base.MachineAbstractWeighter],
         iter_min_period: int = 1,
         iter_pause: float = 0.1,
+        batch_placement: bool = False,
+        prewarmer: tp.Optional[prewarm.VolumePrewarmer] = None,
+        agent_stale_timeout: tp.Optional[float] = balance.AGENT_STALE_TIMEOUT,
     ):
         super().__init__(iter_min_period, iter_pause)
         self._pool_filters = pool_filters
         self._pool_weighters = pool_weighters
         self._machine_filters = machine_filters
         self._machine_weighters = machine_weighters
+        self._batch_placement = batch_placement
+        self._prewarmer = prewarmer
+        self._builder_liveness = balance.Liveness(agent_stale_timeout)
+        self._agent_liveness = balance.Liveness(agent_stale_timeout)
+        # Alive builders and agents and their loads after the last rebalance
+        self._pool_owners: tp.Tuple[
+            tp.FrozenSet[sys_uuid.UUID], tp.FrozenSet[sys_uuid.UUID]
+        ] = (frozenset(), frozenset())
+        self._pool_balancers: tp.Optional[
+            tp.Tuple[balance.LoadBalancer, balance.LoadBalancer]
+        ] = None
+        self._reusable_volumes: tp.Dict[sys_uuid.UUID, storage.ReusableVolumeIndex] = {}
 
     def _get_pool_builders(
         self, limit: int = nc.DEF_SQL_LIMIT
@@ -114,12 +135,15 @@ class SchedulerService(basic.BasicService):
         return models.UnscheduledVolume.objects.get_all(limit=limit)
 
     def _get_idle_machines(
-        self, limit: int = nc.DEF_SQL_LIMIT
+        self,
+        machine_type: str = nc.NodeType.VM.value,
+        limit: int = nc.DEF_SQL_LIMIT,
     ) -> tp.Tuple[base.MachineBundle, ...]:
         idle = models.Machine.objects.get_all(
             filters={
                 "node": dm_filters.Is(None),
                 "status": dm_filters.EQ(nc.MachineStatus.IDLE.value),
+                "machine_type": dm_filters.EQ(machine_type),
             },
             limit=limit,
         )
@@ -152,7 +176,7 @@ class SchedulerService(basic.BasicService):
 
     def _get_pools(
         self, limit: int = nc.DEF_SQL_LIMIT
-    ) -> tp.List[base.MachinePoolBundle]:
+    ) -> tp.Tuple[base.MachinePoolBundle, ...]:
         """Fetch pools and available volumes in the pools."""
         pools = models.MachinePool.objects.get_all(
             filters={
@@ -174,20 +198,48 @@ class SchedulerService(basic.BasicService):
         for v in volumes:
             volume_map.setdefault(v.pool, []).append(v)
 
+        # The reported capacity doesn't account machines that aren't
+        # created on the data plane yet, take their reservations into account.
+        reservations.apply_reserved(
+            pools, reservations.load_reserved(p.uuid for p in pools)
+        )
+
+        # The free volumes are looked up in the indexes during the pass
+        self._reusable_volumes = {
+            p.uuid: storage.ReusableVolumeIndex(volume_map.get(p.uuid, ()))
+            for p in pools
+        }
+
         return tuple(
             base.MachinePoolBundle(pool=p, volumes=volume_map.get(p.uuid, []))
             for p in pools
         )
 
+    def _get_reusable_volumes(
+        self, pool: base.MachinePoolBundle
+    ) -> storage.ReusableVolumeIndex:
+        index = self._reusable_volumes.get(pool.pool.uuid)
+        if index is None:
+            index = storage.ReusableVolumeIndex(pool.volumes)
+            self._reusable_volumes[pool.pool.uuid] = index
+        return index
+
+    @staticmethod
+    def _select_storage_pool(
+        pool: base.MachinePoolBundle, size: int
+    ) -> models.AbstractStoragePool:
+        storage_pool = storage.select_storage_pool(pool.pool.storage_pools, size)
+
+        # The pool is out of space. Charge the first storage pool anyway,
+        # the pool builder reschedules the volume if it doesn't fit.
+        if storage_pool is None:
+            storage_pool = pool.pool.storage_pools[0]
+        return storage_pool
+
     def _build_machine_volume(
         self, pool: base.MachinePoolBundle, volume: models.Volume
     ) -> models.MachineVolume:
-        # TODO(akremenetsky): Rework this simple implementation.
-        # At the moment we just take the first storage pool
-        # and allocate additional space for the volume.
-        # But we need to figure out which storage pool is
-        # the owner of the volume.
-        storage_pool = pool.pool.storage_pools[0]
+        storage_pool = self._select_storage_pool(pool, volume.size)
         storage_pool.allocate_capacity(volume.size)
 
         pool_volume = models.MachineVolume(
@@ -220,39 +272,33 @@ class SchedulerService(basic.BasicService):
         if volume.image is None:
             return self._build_machine_volume(pool, volume)
 
-        volumes = []
-        for pool_volume in pool.volumes:
-            # We can take less than required size and resize it later
-            # NOTE(akremenetsky): Need to think about target fileds for
-            # volumes. Is the size is a target or actual field?
-            if pool_volume.image == volume.image and pool_volume.size <= volume.size:
-                volumes.append(pool_volume)
+        # We can take less than required size and resize it later
+        # NOTE(akremenetsky): Need to think about target fileds for
+        # volumes. Is the size is a target or actual field?
+        reusable = self._get_reusable_volumes(pool)
+        pool_volume = reusable.find(volume.image, volume.size)
+        if self._prewarmer is not None:
+            self._prewarmer.observe(volume.image, pool_volume is not None)
 
         # No volumes found, just create a new volume later
-        if not volumes:
+        if pool_volume is None:
             return self._build_machine_volume(pool, volume)
 
-        # Figure out the best volume
-        volumes.sort(key=lambda v: volume.size - v.size)
-        pool_volume = volumes[0]
         need_size = volume.size - pool_volume.size
+        if need_size:
+            storage_pool = storage.select_storage_pool(
+                pool.pool.storage_pools, need_size
+            )
 
-        # TODO(akremenetsky): Rework this simple implementation.
-        # At the moment we just take the first storage pool
-        # and allocate additional space for the volume.
-        # But we need to figure out which storage pool is
-        # the owner of the volume.
-        storage_pool = pool.pool.storage_pools[0]
+            # Check if the storage pool has enough space
+            if storage_pool is None:
+                return self._build_machine_volume(pool, volume)
 
-        # Check if the storage pool has enough space
-        if need_size and storage_pool.available < need_size:
-            return self._build_machine_volume(pool, volume)
-
-        # Allocate additional space for the volume
-        storage_pool.allocate_capacity(need_size)
+            # Allocate additional space for the volume
+            storage_pool.allocate_capacity(need_size)
 
         # Remove the volume from the pool
-        pool.volumes.remove(pool_volume)
+        reusable.remove(pool_volume)
         LOG.debug(
             "Found machine volume %s for node volume %s",
             pool_volume,
@@ -260,16 +306,16 @@ class SchedulerService(basic.BasicService):
         )
 
         pool_volume.node_volume = volume.uuid
+        pool_volume.project_id = volume.project_id
         return pool_volume
 
-    def _place_node_into_pool(
+    def _build_node_placement(
         self, node: base.NodeBundle, pool: base.MachinePoolBundle
-    ) -> None:
-        """Place a node into a pool.
+    ) -> tp.Tuple[models.Machine, tp.List[models.MachineVolume]]:
+        """Prepare the machine and volumes of the node placed into the pool.
 
-        The scheduling operation has been completed. A particular pool
-        has been selected for the node. Now we need to place the node
-        into the pool.
+        Nothing is saved, the caller is responsible for saving the node,
+        the machine and the volumes.
         """
         # Prepare the machine
         machine_uuid = node.node.uuid
@@ -293,12 +339,30 @@ class SchedulerService(basic.BasicService):
         # Set pool to machine, node and volumes
         machine.pool = pool.pool.uuid
         node.node.pool = pool.pool.uuid
-        node.node.save()
-        machine.save()
         for volume in volume_allocations:
             volume.pool = pool.pool.uuid
             volume.machine = machine_uuid
-            volume.save()
+
+        return machine, volume_allocations
+
+    def _place_node_into_pool(
+        self, node: base.NodeBundle, pool: base.MachinePoolBundle
+    ) -> None:
+        """Place a node into a pool.
+
+        The scheduling operation has been completed. A particular pool
+        has been selected for the node. Now we need to place the node
+        into the pool.
+        """
+        machine, volume_allocations = self._build_node_placement(node, pool)
+
+        # A failed placement must not abort the transaction of the pass
+        with sql_utils.savepoint("place_node"):
+            node.node.save()
+            machine.save()
+            reservations.reservation_for(machine).save()
+            for volume in volume_allocations:
+                volume.save()
 
         LOG.info(
             "The machine %s scheduled to %s pool",
@@ -312,40 +376,69 @@ class SchedulerService(basic.BasicService):
         pool.pool.avail_cores -= machine.cores
         pool.pool.avail_ram -= machine.ram
 
+    def _select_machine(
+        self,
+        node: base.NodeBundle,
+        machines: tp.Sequence[base.MachineBundle],
+    ) -> tp.Optional[base.MachineBundle]:
+        """Choose the best machine for the node or None."""
+        # Filtering. We filter out unsuitable machines. For instance,
+        # machines that doesn't have enough cores or ram or some
+        # placement constraints.
+        for filter in self._machine_filters:
+            machines = tuple(filter.filter(node, machines))
+
+        if not machines:
+            return None
+
+        # Weighting. We weight machines and choose the best one.
+        # Accumulate weights from all weighters.
+        # So that the best pool has the highest weight
+        accumulated_weights = placement.accumulate_weights(
+            self._machine_weighters, machines
+        )
+
+        # Choose the best machine, it means the one with the highest weight
+        return machines[placement.best_index(accumulated_weights)]
+
+    def _select_hw_machine(
+        self,
+        node: base.NodeBundle,
+        index: placement.IdleMachineIndex,
+    ) -> tp.Optional[base.MachineBundle]:
+        """Choose the best idle HW machine from the best-fit index."""
+        for machines in index.candidates(node.node):
+            machine = self._select_machine(node, machines)
+            if machine is not None:
+                return machine
+        return None
+
     def _schedule_on_existing_machines(self) -> tp.Tuple[base.MachineBundle, ...]:
         unscheduled = self._get_unscheduled_nodes()
 
-        # TODO(akremenetsky): Idle machines are limited by some number
-        # in SQL query and it's maybe a problem if we have a lot of
-        # idle machines. The fetched machines may be not suitable for
-        # unscheduled nodes and we will create another machines.
-        idle_machines = self._get_idle_machines()
-
-        idle_hws = [
-            m for m in idle_machines if m.machine.machine_type == nc.NodeType.HW.value
-        ]
-        idle_vms = [
-            m for m in idle_machines if m.machine.machine_type == nc.NodeType.VM.value
-        ]
+        # VM nodes without idle machines get new machines in pools so
+        # a limited number of idle VMs is enough. HW machines are looked
+        # up in the index without limits, it's loaded on demand.
+        idle_vms = list(self._get_idle_machines(nc.NodeType.VM.value))
+        hw_index = placement.IdleMachineIndex(nc.NodeType.HW.value)
+        hw_loaded = False
         vms = []
 
         for unscheduled_node in unscheduled:
             node: models.Node = unscheduled_node.node
+
             if node.node_type == nc.NodeType.HW:
-                idle_machines = idle_hws
+                if not hw_loaded:
+                    hw_index.load()
+                    hw_loaded = True
+                machine_bundle = self._select_hw_machine(unscheduled_node, hw_index)
             else:
-                idle_machines = idle_vms
-
-            # Filtering. We filter out unsuitable machines. For instance,
-            # machines that doesn't have enough cores or ram or some
-            # placement constraints.
-            for filter in self._machine_filters:
-                idle_machines = filter.filter(unscheduled_node, idle_machines)
+                machine_bundle = self._select_machine(unscheduled_node, idle_vms)
 
             # There are no available HW machines for this node
             # This means we unable to proceed scheduling process
             # for this node.
-            if not idle_machines and node.node_type == nc.NodeType.HW:
+            if machine_bundle is None and node.node_type == nc.NodeType.HW:
                 LOG.warning(
                     "No HW machines found to schedule node %s",
                     node.uuid,
@@ -359,7 +452,7 @@ class SchedulerService(basic.BasicService):
             # There are no available VM machines for this node
             # but it's not a problem. A virtual machine will be
             # created later.
-            if not idle_machines and node.node_type == nc.NodeType.VM:
+            if machine_bundle is None:
                 LOG.debug(
                     "No idle VM machines found to schedule node %s",
                     node.uuid,
@@ -367,20 +460,6 @@ class SchedulerService(basic.BasicService):
                 vms.append(unscheduled_node)
                 continue
 
-            # Weighting. We weight machines and choose the best one.
-            # Accumulate weights from all weighters.
-            # So that the best pool has the highest weight
-            accumulated_weights = [0.0] * len(idle_machines)
-            for weighter in self._machine_weighters:
-                weights = weighter.weight(idle_machines)
-                accumulated_weights = [
-                    w0 + w1 for w0, w1 in zip(accumulated_weights, weights)
-                ]
-
-            # Choose the best machine, it means the one with the highest weight
-            index = accumulated_weights.index(max(accumulated_weights))
-            machine_bundle = idle_machines[index]
-
             # TODO(akremenetsky): Map volumes to machine volumes
             machine_bundle.machine.node = node.uuid
             machine_bundle.machine.status = nc.MachineStatus.SCHEDULED.value
@@ -398,16 +477,40 @@ class SchedulerService(basic.BasicService):
 
             # Actualize idle machines
             if node.node_type == nc.NodeType.HW.value:
-                idle_hws.remove(machine_bundle)
+                hw_index.take(machine_bundle)
             else:
                 idle_vms.remove(machine_bundle)
 
         return vms
 
-    def _schedule_on_pools(
+    def _pass_hooks(self) -> tp.List[base.AbstractPassHook]:
+        return [*self._pool_filters, *self._pool_weighters]
+
+    def _begin_pass(
         self,
         nodes: tp.Collection[base.NodeBundle],
         pools: tp.Collection[base.MachinePoolBundle],
+    ) -> base.SchedulingPass:
+        """Start the pass, its data is shared by all pool stages."""
+        scheduling_pass = base.SchedulingPass(nodes, pools)
+        for hook in self._pass_hooks():
+            hook.prefetch(scheduling_pass)
+        return scheduling_pass
+
+    def _placed(
+        self,
+        scheduling_pass: base.SchedulingPass,
+        node: base.NodeBundle,
+        pool: base.MachinePoolBundle,
+    ) -> None:
+        scheduling_pass.placed(node, pool)
+        for hook in self._pass_hooks():
+            hook.placed(node, pool)
+
+    def _schedule_on_pools(
+        self,
+        nodes: tp.Collection[base.NodeBundle],
+        pools: tp.Sequence[base.MachinePoolBundle],
     ) -> None:
         if not nodes:
             LOG.debug("Nothing to schedule, no unscheduled nodes")
@@ -421,6 +524,8 @@ class SchedulerService(basic.BasicService):
         # Save origin pools to filter them out for each machine
         origin_pools = pools
 
+        scheduling_pass = self._begin_pass(nodes, pools)
+
         for node in nodes:
             pools = origin_pools
 
@@ -428,7 +533,7 @@ class SchedulerService(basic.BasicService):
             # that doesn't have enough cores or ram or some placement
             # constraints.
             for filter in self._pool_filters:
-                pools = filter.filter(node, pools)
+                pools = tuple(filter.filter(node, pools))
 
             if not pools:
                 LOG.warning("No pools found to schedule node %s", node.node.uuid)
@@ -439,16 +544,12 @@ class SchedulerService(basic.BasicService):
 
             # Accumulate weights from all weighters
             # So that the best pool has the highest weight
-            accumulated_weights = [0.0] * len(pools)
-            for weighter in self._pool_weighters:
-                weights = weighter.weight(pools)
-                accumulated_weights = [
-                    w0 + w1 for w0, w1 in zip(accumulated_weights, weights)
-                ]
+            accumulated_weights = placement.accumulate_weights(
+                self._pool_weighters, pools, node
+            )
 
             # Choose the best pool, it means the one with the highest weight
-            index = accumulated_weights.index(max(accumulated_weights))
-            pool = pools[index]
+            pool = pools[placement.best_index(accumulated_weights)]
             if not pool:
                 LOG.warning("No pools found to schedule node %s", node.node.uuid)
                 continue
@@ -462,44 +563,197 @@ class SchedulerService(basic.BasicService):
                     node.node.uuid,
                     pool.pool.uuid,
                 )
+                continue
 
-    def _schedule_pools(self, pool_builders: tp.List[ua_models.UniversalAgent]) -> None:
-        unsheduled = self._get_unscheduled_pools()
-        if not unsheduled:
-            LOG.debug("Nothing to schedule, no unscheduled pools")
+            self._placed(scheduling_pass, node, pool)
+
+    def _schedule_on_pools_batch(
+        self,
+        nodes: tp.Collection[base.NodeBundle],
+        pools: tp.Collection[base.MachinePoolBundle],
+    ) -> None:
+        """Schedule the whole batch of nodes and save it at once.
+
+        Pools are looked up in the capacity index that accounts the
+        placements made earlier in the batch. The configured filters
+        are applied to the candidates from the index, the data of the pass
+        they share is updated on every placement.
+        """
+        if not nodes:
+            LOG.debug("Nothing to schedule, no unscheduled nodes")
             return
 
-        # The simplest implementation is to schedule to a random machine agent
-        if not pool_builders:
-            pools = [pool.uuid for pool in unsheduled]
-            LOG.warning("No pool builders found to schedule pools %s", pools)
+        if not pools:
+            _nodes = tuple(m.node.uuid for m in nodes)
+            LOG.warning("No pools found to schedule nodes %s", _nodes)
             return
 
-        machine_agents = ua_models.UniversalAgent.have_capabilities((MACHINE_POOL_CAP,))
+        index = placement.PoolCapacityIndex(pools)
+        scheduling_pass = self._begin_pass(nodes, pools)
+        writer = placement.PlacementWriter()
 
-        # TODO(akremenetsky): We need to rebalance pools among agents
-        # and builders. Also we need to track died agents and builders.
-        if not machine_agents:
-            pools = [pool.uuid for pool in unsheduled]
-            LOG.warning("No machine agents found to schedule pools %s", pools)
-            return
+        for node in nodes:
+            candidates = index.candidates(node.node)
+            for filter in self._pool_filters:
+                if not candidates:
+                    break
+                candidates = list(filter.filter(node, candidates))
 
-        for pool in unsheduled:
-            builder = random.choice(pool_builders)
-            agent = random.choice(machine_agents[MACHINE_POOL_CAP])
+            if not candidates:
+                LOG.warning("No pools found to schedule node %s", node.node.uuid)
+                continue
+
+            weights = placement.accumulate_weights(
+                self._pool_weighters, candidates, node
+            )
+            pool = candidates[placement.best_index(weights)]
 
             try:
-                pool.builder = builder.uuid
-                pool.agent = agent.uuid
-                pool.update()
-                LOG.info(
-                    "The pool %s scheduled to builder %s and agent %s",
-                    pool.uuid,
-                    builder.uuid,
-                    agent.uuid,
+                machine, volumes = self._build_node_placement(node, pool)
+            except Exception:
+                LOG.exception(
+                    "Error placing node %s into pool %s",
+                    node.node.uuid,
+                    pool.pool.uuid,
                 )
+                continue
+
+            writer.add(machine, volumes)
+            index.consume(node.node, pool)
+            self._placed(scheduling_pass, node, pool)
+            LOG.info(
+                "The machine %s scheduled to %s pool", machine.uuid, pool.pool.uuid
+            )
+
+        writer.flush()
+
+    def _get_pool_loads(self) -> tp.Dict[sys_uuid.UUID, int]:
+        """Load of every pool, it depends on the number of its machines."""
+        engine = engines.engine_factory.get_engine()
+        with engine.session_manager() as session:
+            rows = session.execute(
+                f"""
+                SELECT pool, count(*) AS count
+                FROM {models.Machine.__tablename__}
+                WHERE pool IS NOT NULL
+                GROUP BY pool;
+                """,
+            ).fetchall()
+
+        return {r["pool"]: r["count"] for r in rows}
+
+    def _get_unassigned_pools(self) -> tp.List[models.MachinePool]:
+        """Pools without a builder or an agent."""
+        return models.MachinePool.objects.get_all(
+            filters=dm_filters.OR(
+                {"builder": dm_filters.Is(None)},
+                {"agent": dm_filters.Is(None)},
+            ),
+        )
+
+    def _assign_pool(
+        self,
+        pool: models.MachinePool,
+        load: int,
+        builders: balance.LoadBalancer,
+        agents: balance.LoadBalancer,
+    ) -> None:
+        origin = (pool.builder, pool.agent)
+        try:
+            if pool.builder not in builders:
+                pool.builder = builders.assign(pool.uuid, load)
+            if pool.agent not in agents:
+                pool.agent = agents.assign(pool.uuid, load)
+            pool.update()
+            LOG.info(
+                "The pool %s scheduled to builder %s and agent %s, was %s",
+                pool.uuid,
+                pool.builder,
+                pool.agent,
+                origin,
+            )
+        except Exception:
+            LOG.exception("Error scheduling pool %s", pool.uuid)
+
+    def _rebalance_pools(
+        self,
+        pool_builders: tp.Collection[sys_uuid.UUID],
+        machine_agents: tp.Collection[sys_uuid.UUID],
+    ) -> tp.Tuple[balance.LoadBalancer, balance.LoadBalancer]:
+        """Reassign pools of dead owners and even out the loads.
+
+        It needs the loads of all pools, so it's done only when the alive
+        builders or agents change.
+        """
+        pools = {p.uuid: p for p in models.MachinePool.objects.get_all()}
+        machines = self._get_pool_loads()
+        builders = balance.LoadBalancer(pool_builders)
+        agents = balance.LoadBalancer(machine_agents)
+
+        pending = []
+        for pool in pools.values():
+            load = balance.pool_load(machines.get(pool.uuid, 0))
+            if pool.builder in builders and pool.agent in agents:
+                builders.add(pool.builder, pool.uuid, load)
+                agents.add(pool.agent, pool.uuid, load)
+                continue
+
+            if pool.builder in builders:
+                builders.add(pool.builder, pool.uuid, load)
+            elif pool.agent in agents:
+                agents.add(pool.agent, pool.uuid, load)
+            pending.append((load, pool))
+
+        # The biggest pools first for even distribution
+        pending.sort(key=lambda p: (p[0], p[1].uuid), reverse=True)
+        for load, pool in pending:
+            self._assign_pool(pool, load, builders, agents)
+
+        for pool_uuid, src, dst in builders.moves(BUILDER_REBALANCE_RATE):
+            pool = pools[pool_uuid]
+            try:
+                pool.builder = dst
+                pool.update()
+                LOG.info("The pool %s moved from builder %s to %s", pool.uuid, src, dst)
             except Exception:
-                LOG.exception("Error scheduling pool %s", pool.uuid)
+                LOG.exception("Error moving pool %s", pool.uuid)
+
+        return builders, agents
+
+    def _schedule_pools(self, pool_builders: tp.List[ua_models.UniversalAgent]) -> None:
+        """Assign pools to builders and agents by their load.
+
+        When the alive builders or agents change, pools of dead ones are
+        reassigned and a limited number of pools is moved between
+        builders to even out their loads. Otherwise only new pools are
+        assigned to the least loaded builders and agents.
+        """
+        builders = [b.uuid for b in self._builder_liveness.alive(pool_builders)]
+        if not builders:
+            LOG.warning("No alive pool builders found to schedule pools")
+            return
+
+        machine_agents = ua_models.UniversalAgent.have_capabilities((MACHINE_POOL_CAP,))
+        agents = [
+            a.uuid
+            for a in self._agent_liveness.alive(
+                machine_agents.get(MACHINE_POOL_CAP, ())
+            )
+        ]
+        if not agents:
+            LOG.warning("No alive machine agents found to schedule pools")
+            return
+
+        owners = (frozenset(builders), frozenset(agents))
+        if self._pool_balancers is None or owners != self._pool_owners:
+            self._pool_balancers = self._rebalance_pools(builders, agents)
+            self._pool_owners = owners
+            return
+
+        # New pools don't have machines yet
+        load = balance.pool_load(0)
+        for pool in self._get_unassigned_pools():
+            self._assign_pool(pool, load, *self._pool_balancers)
 
     def _schedule_volume_on_pools(self, pools: tp.List[base.MachinePoolBundle]) -> None:
         """Schedule volumes on pools."""
@@ -567,6 +821,21 @@ class SchedulerService(basic.BasicService):
                 )
                 continue
 
+    def _refill_prewarmed(self, pools: tp.Sequence[base.MachinePoolBundle]) -> None:
+        """Refill pre-warmed volumes consumed in the iteration.
+
+        It's done in a separate transaction after the placements are
+        committed, so the refill doesn't delay or roll back them.
+        """
+        if self._prewarmer is None or not pools:
+            return
+
+        try:
+            with contexts.Context().session_manager():
+                self._prewarmer.refill(pools, self._get_reusable_volumes)
+        except Exception:
+            LOG.exception("Error refilling pre-warmed volumes:")
+
     def _iteration(self):
         with contexts.Context().session_manager():
             pool_builders = self._get_pool_builders()
@@ -594,7 +863,10 @@ class SchedulerService(basic.BasicService):
 
             # The second step is to schedule unscheduled nodes to pools.
             try:
-                self._schedule_on_pools(unscheduled_nodes, pools)
+                if self._batch_placement:
+                    self._schedule_on_pools_batch(unscheduled_nodes, pools)
+                else:
+                    self._schedule_on_pools(unscheduled_nodes, pools)
             except Exception:
                 LOG.exception("Error scheduling nodes:")
 
@@ -603,3 +875,5 @@ class SchedulerService(basic.BasicService):
                 self._schedule_volume_on_pools(pools)
             except Exception:
                 LOG.exception("Error scheduling volumes:")
+
+        self._refill_prewarmed(pools)
@@ -0,0 +1,107 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Storage aware placement of machine volumes."""
+
+import bisect
+import typing as tp
+
+from exordos_core.compute.dm import models
+
+
+def _storage_pool_key(
+    storage_pool: models.AbstractStoragePool,
+) -> tp.Tuple[float, float, int]:
+    capacity = storage_pool.capacity
+    free_ratio = storage_pool.available / capacity if capacity else 0.0
+    oversubscription = getattr(storage_pool, "oversubscription_ratio", 1.0)
+    return (free_ratio, -oversubscription, storage_pool.available)
+
+
+def select_storage_pool(
+    storage_pools: tp.Sequence[models.AbstractStoragePool],
+    size: int,
+) -> tp.Optional[models.AbstractStoragePool]:
+    """Choose the storage pool for a volume of the given size.
+
+    The storage pool with the biggest free share of its capacity wins,
+    the less oversubscribed one wins on ties. None is returned if no
+    storage pool has enough space.
+    """
+    suitable = [p for p in storage_pools if p.has_capacity(size)]
+    if not suitable:
+        return None
+    return max(suitable, key=_storage_pool_key)
+
+
+class ReusableVolumeIndex:
+    """Index of free pre-provisioned machine volumes of a pool.
+
+    The volumes are grouped by (image, size) and the sizes of every
+    image are kept sorted, so the best volume for a node volume is found
+    by bisection instead of scanning and sorting all volumes of the pool.
+    """
+
+    def __init__(self, volumes: tp.Iterable[models.MachineVolume] = ()) -> None:
+        self._volumes: tp.Dict[tp.Tuple[str, int], tp.List[models.MachineVolume]] = {}
+        self._sizes: tp.Dict[str, tp.List[int]] = {}
+        for volume in volumes:
+            self.add(volume)
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self._volumes.values())
+
+    def add(self, volume: models.MachineVolume) -> None:
+        if volume.image is None:
+            return
+
+        key = (volume.image, volume.size)
+        if key not in self._volumes:
+            self._volumes[key] = []
+            bisect.insort(self._sizes.setdefault(volume.image, []), volume.size)
+        self._volumes[key].append(volume)
+
+    def count(self, image: str, size: int) -> int:
+        """Number of free volumes of the image and the size."""
+        return len(self._volumes.get((image, size), ()))
+
+    def find(self, image: str, size: int) -> tp.Optional[models.MachineVolume]:
+        """The biggest volume of the image not bigger than the size.
+
+        A smaller volume may be taken and resized later, so the biggest
+        one needs the least additional space.
+        """
+        sizes = self._sizes.get(image)
+        if not sizes:
+            return None
+
+        i = bisect.bisect_right(sizes, size)
+        if i == 0:
+            return None
+        return self._volumes[(image, sizes[i - 1])][-1]
+
+    def remove(self, volume: models.MachineVolume) -> None:
+        key = (volume.image, volume.size)
+        volumes = self._volumes[key]
+        # The found volumes are the last ones
+        if volumes[-1] is volume:
+            volumes.pop()
+        else:
+            volumes.remove(volume)
+        if not volumes:
+            del self._volumes[key]
+            sizes = self._sizes[volume.image]
+            del sizes[bisect.bisect_left(sizes, volume.size)]
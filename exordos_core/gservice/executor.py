@@ -0,0 +1,198 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import abc
+from concurrent import futures
+import contextlib
+import logging
+import time
+import typing as tp
+
+from gcl_looper.services import basic
+
+from exordos_core.gservice import listener as gs_listener
+from exordos_core.gservice import metrics as gs_metrics
+
+LOG = logging.getLogger(__name__)
+
+
+class AbstractServiceExecutor(abc.ABC):
+    """Runs iterations of the nested services of the general service."""
+
+    def __init__(
+        self,
+        metrics: tp.Optional[gs_metrics.ServiceMetrics] = None,
+        origins: tp.Optional[gs_listener.OriginTracker] = None,
+    ) -> None:
+        self._metrics = metrics
+        self._origins = origins
+
+    def _run_service(self, service: basic.BasicService) -> None:
+        with contextlib.ExitStack() as stack:
+            if self._origins is not None:
+                stack.enter_context(self._origins.track(service))
+            if self._metrics is not None:
+                stack.enter_context(self._metrics.measure(service))
+            service._loop_iteration()
+
+    @abc.abstractmethod
+    def run(self, services: tp.Sequence[basic.BasicService]) -> None:
+        """Run one iteration of every service from `services`."""
+
+    def in_flight(self) -> tp.Set[int]:
+        """IDs of services still running in background."""
+        return set()
+
+    def shutdown(self) -> None:
+        """Release resources of the executor."""
+
+
+class SerialServiceExecutor(AbstractServiceExecutor):
+    """Run services one after another in the caller thread."""
+
+    def run(self, services: tp.Sequence[basic.BasicService]) -> None:
+        for service in services:
+            self._run_service(service)
+
+
+class ParallelServiceExecutor(AbstractServiceExecutor):
+    """Run independent services on a bounded thread pool.
+
+    Every service runs in a worker thread so it gets its own DB session
+    from the thread-local session storage. A service is started only
+    after all services it depends on (see `dependencies`) have finished
+    in the same pass. A service that exceeds its deadline is left running
+    in background, the pass stops waiting for it and it isn't started
+    again until the current iteration is over.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        deadline: tp.Optional[float] = None,
+        dependencies: tp.Optional[
+            tp.Dict[int, tp.Collection[basic.BasicService]]
+        ] = None,
+        deadlines: tp.Optional[tp.Dict[int, float]] = None,
+        metrics: tp.Optional[gs_metrics.ServiceMetrics] = None,
+        origins: tp.Optional[gs_listener.OriginTracker] = None,
+    ) -> None:
+        super().__init__(metrics, origins)
+        if workers < 1:
+            raise ValueError("`workers` must be greater than 0")
+
+        self._pool = futures.ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="gservice"
+        )
+        self._deadline = deadline
+        self._deadlines = deadlines or {}
+        self._dependencies = dependencies or {}
+
+        # Futures of services which overran their deadline in one of
+        # the previous passes and are still running.
+        self._in_flight: tp.Dict[int, futures.Future] = {}
+
+    def _service_deadline(self, service: basic.BasicService) -> tp.Optional[float]:
+        return self._deadlines.get(id(service), self._deadline)
+
+    def _is_ready(
+        self,
+        service: basic.BasicService,
+        in_pass: tp.Set[int],
+        done: tp.Set[int],
+    ) -> bool:
+        """Check all dependencies of the service are done in this pass."""
+        for dependency in self._dependencies.get(id(service), ()):
+            dep_id = id(dependency)
+            if dep_id in in_pass and dep_id not in done:
+                return False
+        return True
+
+    def _collect_in_flight(self) -> None:
+        for svc_id, future in tuple(self._in_flight.items()):
+            if future.done():
+                del self._in_flight[svc_id]
+
+    def in_flight(self) -> tp.Set[int]:
+        self._collect_in_flight()
+        return set(self._in_flight)
+
+    def run(self, services: tp.Sequence[basic.BasicService]) -> None:
+        self._collect_in_flight()
+
+        pending = []
+        for service in services:
+            if id(service) in self._in_flight:
+                LOG.warning(
+                    "Service %s is still running after its deadline, skipping",
+                    service.__class__.__name__,
+                )
+                continue
+            pending.append(service)
+
+        in_pass = {id(s) for s in pending}
+        done: tp.Set[int] = set()
+        running: tp.Dict[futures.Future, tp.Tuple[basic.BasicService, float]] = {}
+
+        while pending or running:
+            # Submit every service whose dependencies are satisfied
+            for service in tuple(pending):
+                if not self._is_ready(service, in_pass, done):
+                    continue
+                pending.remove(service)
+                future = self._pool.submit(self._run_service, service)
+                running[future] = (service, time.monotonic())
+
+            if not running:
+                # Dependencies can't be satisfied, it's a misconfiguration
+                # of the dependencies. Just run the rest in the next pass.
+                names = [s.__class__.__name__ for s in pending]
+                LOG.error("Unable to resolve dependencies for services %s", names)
+                return
+
+            timeout = None
+            now = time.monotonic()
+            for service, started_at in running.values():
+                deadline = self._service_deadline(service)
+                if deadline is None:
+                    continue
+                left = max(started_at + deadline - now, 0)
+                timeout = left if timeout is None else min(timeout, left)
+
+            finished, _ = futures.wait(
+                running, timeout=timeout, return_when=futures.FIRST_COMPLETED
+            )
+            for future in finished:
+                service, _ = running.pop(future)
+                done.add(id(service))
+
+            # Release the services which have exceeded their deadline
+            now = time.monotonic()
+            for future, (service, started_at) in tuple(running.items()):
+                deadline = self._service_deadline(service)
+                if deadline is None or now - started_at < deadline:
+                    continue
+                LOG.warning(
+                    "Service %s exceeded its deadline %ss",
+                    service.__class__.__name__,
+                    deadline,
+                )
+                del running[future]
+                done.add(id(service))
+                self._in_flight[id(service)] = future
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,88 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Heartbeats of the builders and agents.
+
+The records of the universal agents are updated only on registration,
+so the general service touches the records of its host bound builders
+and agents periodically, and the orch API touches the records of the
+agents polling their payloads. The scheduler considers builders and
+agents with old records dead and moves their pools away.
+"""
+
+import datetime
+import logging
+import time
+import typing as tp
+import uuid as sys_uuid
+
+from gcl_sdk.agents.universal.dm import models as ua_models
+from restalchemy.common import contexts
+
+LOG = logging.getLogger(__name__)
+# Must be well below `balance.AGENT_STALE_TIMEOUT`
+HEARTBEAT_PERIOD = 30.0
+
+
+def touch(
+    session: tp.Any,
+    agents: tp.Iterable[sys_uuid.UUID],
+    period: float = HEARTBEAT_PERIOD,
+) -> None:
+    """Touch the agent records not touched for the period.
+
+    Agents poll frequently, the period keeps the writes rare.
+    """
+    session.execute(
+        f"""
+        UPDATE {ua_models.UniversalAgent.__tablename__}
+        SET updated_at = now()
+        WHERE uuid = ANY(%s)
+            AND updated_at < now() - make_interval(secs => %s);
+        """,
+        ([str(a) for a in agents], period),
+    )
+
+
+def is_due(agent: ua_models.UniversalAgent, period: float = HEARTBEAT_PERIOD) -> bool:
+    """Whether the agent record hasn't been touched for the period."""
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return agent.updated_at < now - datetime.timedelta(seconds=period)
+
+
+class Heartbeat:
+    def __init__(
+        self,
+        agents: tp.Iterable[sys_uuid.UUID],
+        period: float = HEARTBEAT_PERIOD,
+    ) -> None:
+        self._agents = tuple(agents)
+        self._period = period
+        self._last_beat: tp.Optional[float] = None
+
+    def beat(self) -> None:
+        """Touch the agent records if the period has passed."""
+        now = time.monotonic()
+        if self._last_beat is not None and now - self._last_beat < self._period:
+            return
+
+        try:
+            with contexts.Context().session_manager() as session:
+                # The records were touched a period ago, leave room for jitter
+                touch(session, self._agents, self._period / 2)
+            self._last_beat = now
+        except Exception:
+            LOG.exception("Unable to update heartbeats of agents %s", self._agents)
@@ -0,0 +1,171 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import logging
+import math
+import time
+import typing as tp
+import zlib
+
+import psycopg
+
+LOG = logging.getLogger(__name__)
+
+# Namespaces (the first key) of the two-key advisory locks
+MEMBER_NAMESPACE = 0x4D454D  # "MEM"
+LEASE_NAMESPACE = 0x4C5345  # "LSE"
+MAX_MEMBERS = 128
+LEASE_REFRESH_PERIOD = 5.0
+
+
+def _lock_key(key: str) -> int:
+    """Stable signed 32-bit key of the lease."""
+    value = zlib.crc32(key.encode())
+    return value - (1 << 32) if value >= (1 << 31) else value
+
+
+class LeaseManager:
+    """Distribute leases among gservice instances via advisory locks.
+
+    Every instance holds a dedicated connection with session-level
+    advisory locks: a member lock to announce itself and a lock per
+    owned lease. The instance takes its fair share of the leases
+    (ceil(leases / members)) and releases the surplus when new members
+    appear. If an instance dies, PostgreSQL drops its locks together
+    with the connection and the remaining members pick up the leases on
+    the next refresh.
+    """
+
+    def __init__(
+        self,
+        connection_url: str,
+        refresh_period: float = LEASE_REFRESH_PERIOD,
+    ) -> None:
+        self._connection_url = connection_url
+        self._refresh_period = refresh_period
+        self._conn: tp.Optional[psycopg.Connection[tp.Any]] = None
+        self._member: tp.Optional[int] = None
+        self._owned: tp.Set[str] = set()
+        self._next_refresh = 0.0
+
+    @property
+    def owned(self) -> tp.FrozenSet[str]:
+        return frozenset(self._owned)
+
+    @property
+    def _connection(self) -> "psycopg.Connection[tp.Any]":
+        if self._conn is None:
+            raise ConnectionError("The lease connection isn't established")
+        return self._conn
+
+    def _try_lock(self, namespace: int, key: int) -> bool:
+        cursor = self._connection.execute(
+            "SELECT pg_try_advisory_lock(%s, %s) AS locked", (namespace, key)
+        )
+        row = cursor.fetchone()
+        return bool(row and row[0])
+
+    def _unlock(self, namespace: int, key: int) -> None:
+        self._connection.execute("SELECT pg_advisory_unlock(%s, %s)", (namespace, key))
+
+    def _connect(self) -> None:
+        self._conn = psycopg.connect(self._connection_url, autocommit=True)
+        for slot in range(MAX_MEMBERS):
+            if self._try_lock(MEMBER_NAMESPACE, slot):
+                self._member = slot
+                LOG.info("Joined the gservice cluster as member %s", slot)
+                return
+
+        raise RuntimeError("No free member slots in the gservice cluster")
+
+    def _disconnect(self) -> None:
+        self._owned.clear()
+        self._member = None
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                LOG.exception("Error closing the lease connection")
+        self._conn = None
+
+    def _members(self) -> int:
+        cursor = self._connection.execute(
+            "SELECT count(*) FROM pg_locks "
+            "WHERE locktype = 'advisory' AND classid = %s "
+            "AND objsubid = 2 AND granted AND database = ("
+            "  SELECT oid FROM pg_database WHERE datname = current_database()"
+            ")",
+            (MEMBER_NAMESPACE,),
+        )
+        row = cursor.fetchone()
+        return max(row[0] if row else 0, 1)
+
+    def _rebalance(self, keys: tp.Sequence[str], keep: tp.Collection[str]) -> None:
+        # Leases which aren't known anymore
+        for key in self._owned - set(keys):
+            self._unlock(LEASE_NAMESPACE, _lock_key(key))
+            self._owned.discard(key)
+
+        share = math.ceil(len(keys) / self._members())
+
+        # Give the surplus away so new members may pick it up
+        for key in sorted(self._owned - set(keep), reverse=True):
+            if len(self._owned) <= share:
+                break
+            self._unlock(LEASE_NAMESPACE, _lock_key(key))
+            self._owned.discard(key)
+            LOG.info("Lease %s released for rebalancing", key)
+
+        # Members start from different offsets to reduce contention
+        offset = (self._member or 0) * share % len(keys) if keys else 0
+        for key in tuple(keys[offset:]) + tuple(keys[:offset]):
+            if len(self._owned) >= share:
+                break
+            if key in self._owned:
+                continue
+            if self._try_lock(LEASE_NAMESPACE, _lock_key(key)):
+                self._owned.add(key)
+                LOG.info("Lease %s acquired", key)
+
+    def refresh(
+        self,
+        keys: tp.Sequence[str],
+        keep: tp.Collection[str] = (),
+    ) -> tp.FrozenSet[str]:
+        """Refresh the leases and return the owned ones.
+
+        `keep` are the leases which must not be released for rebalancing,
+        for instance, leases of services which are still running.
+        """
+        now = time.monotonic()
+        if self._conn is not None and now < self._next_refresh:
+            return self.owned
+
+        self._next_refresh = now + self._refresh_period
+        try:
+            if self._conn is None or self._conn.closed:
+                self._disconnect()
+                self._connect()
+            self._rebalance(keys, keep)
+        except Exception:
+            # The locks are released by PostgreSQL with the connection
+            LOG.exception("Unable to refresh leases, all leases are dropped")
+            self._disconnect()
+
+        return self.owned
+
+    def close(self) -> None:
+        self._disconnect()
@@ -0,0 +1,125 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import contextlib
+import logging
+import threading
+import typing as tp
+
+import psycopg
+
+from exordos_core.gservice import sessions as gs_sessions
+
+LOG = logging.getLogger(__name__)
+
+# The channel is populated by the `exordos_notify_change` triggers
+CHANGES_CHANNEL = "exordos_changes"
+NOTIFIES_TIMEOUT = 1.0
+RECONNECT_PAUSE = 5.0
+
+
+class OriginTracker:
+    """Remember which nested service uses which DB backend.
+
+    A notification carries the PID of the backend that has sent it. The
+    tracker maps backends to the service that opened the last session on
+    them so a service isn't woken up by its own changes. A pooled
+    connection may be taken by another service before the notification
+    is delivered, such a change is still picked up by periodic polling.
+    """
+
+    def __init__(self) -> None:
+        self._owners: tp.Dict[int, int] = {}
+        self._local = threading.local()
+
+    @contextlib.contextmanager
+    def track(self, service: tp.Any) -> tp.Iterator[None]:
+        """Attribute sessions opened in the current thread to `service`."""
+        self._local.service_id = id(service)
+        try:
+            yield
+        finally:
+            self._local.service_id = None
+
+    def _on_session_opened(self, session: gs_sessions.HookedPgSQLSession) -> None:
+        service_id = getattr(self._local, "service_id", None)
+        if service_id is not None:
+            self._owners[session.backend_pid] = service_id
+
+    def install(self, engine: tp.Any) -> None:
+        """Track backends of all sessions created by the engine."""
+        gs_sessions.install(engine).on_opened(self._on_session_opened)
+
+    def owner(self, pid: int) -> tp.Optional[int]:
+        """ID of the service that used the backend last."""
+        return self._owners.get(pid)
+
+
+class ChangeListener:
+    """Listen for table change notifications from PostgreSQL.
+
+    The listener runs in a daemon thread with a dedicated connection
+    since a pooled connection can't be held by LISTEN forever. The
+    `callback` is called with the changed table name from the listener
+    thread together with the PID of the notifying backend. The connection
+    is reestablished on errors, the services keep polling the tables in
+    the meantime.
+    """
+
+    def __init__(
+        self,
+        connection_url: str,
+        callback: tp.Callable[[str, int], None],
+        channel: str = CHANGES_CHANNEL,
+    ) -> None:
+        self._connection_url = connection_url
+        self._callback = callback
+        self._channel = channel
+        self._stop_event = threading.Event()
+        self._thread: tp.Optional[threading.Thread] = None
+
+    def _listen(self) -> None:
+        with psycopg.connect(self._connection_url, autocommit=True) as conn:
+            conn.execute(f"LISTEN {self._channel}")
+            LOG.info("Listening for changes on channel %s", self._channel)
+
+            while not self._stop_event.is_set():
+                for notify in conn.notifies(timeout=NOTIFIES_TIMEOUT):
+                    try:
+                        self._callback(notify.payload, notify.pid)
+                    except Exception:
+                        LOG.exception(
+                            "Error handling change notification %s", notify.payload
+                        )
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self._listen()
+            except Exception:
+                LOG.exception("Change listener failed, reconnecting")
+                self._stop_event.wait(RECONNECT_PAUSE)
+
+    def start(self) -> None:
+        self._stop_event.clear()
+        thread = threading.Thread(
+            target=self._run, name="gservice-listener", daemon=True
+        )
+        thread.start()
+        self._thread = thread
+
+    def stop(self) -> None:
+        self._stop_event.set()
@@ -0,0 +1,253 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import bisect
+import contextlib
+import logging
+import os
+import threading
+import time
+import typing as tp
+
+from gcl_looper.services import basic
+
+from exordos_core.gservice import sessions as gs_sessions
+
+LOG = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the iteration duration histogram buckets
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+METRIC_PREFIX = "exordos_gservice"
+
+_local = threading.local()
+
+
+def _sql_statements() -> int:
+    return getattr(_local, "sql_statements", 0)
+
+
+def _count_sql_statement() -> None:
+    _local.sql_statements = _sql_statements() + 1
+
+
+def install_sql_counter(engine: tp.Any) -> None:
+    """Count SQL statements of all sessions created by the engine."""
+    gs_sessions.install(engine).on_executed(_count_sql_statement)
+
+
+class _IterationFailureFilter(logging.Filter):
+    """Mark the current iteration failed on errors of the service loop.
+
+    `BasicService._loop_iteration` swallows all exceptions and only logs
+    them, so the log record is the only trace of a failed iteration.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.ERROR:
+            _local.failed = True
+        return True
+
+
+_FAILURE_FILTER = _IterationFailureFilter()
+
+
+class ServiceStats:
+    def __init__(self, name: str, buckets: tp.Sequence[float]) -> None:
+        self.name = name
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.duration_sum = 0.0
+        self.iterations = 0
+        self.failures = 0
+        self.overruns = 0
+        self.sql_statements = 0
+        self.last_duration = 0.0
+        self.last_lag = 0.0
+        self.last_sql_statements = 0
+        self.last_success: tp.Optional[float] = None
+
+    def observe(
+        self,
+        duration: float,
+        sql_statements: int,
+        overrun: bool,
+        failed: bool,
+    ) -> None:
+        self.bucket_counts[bisect.bisect_left(self.buckets, duration)] += 1
+        self.duration_sum += duration
+        self.iterations += 1
+        self.last_duration = duration
+        self.sql_statements += sql_statements
+        self.last_sql_statements = sql_statements
+        if overrun:
+            self.overruns += 1
+        if failed:
+            self.failures += 1
+        else:
+            self.last_success = time.time()
+
+
+class ServiceMetrics:
+    """Timing and lag instrumentation of the nested services.
+
+    The metrics are exported in the Prometheus text format to a file
+    that can be picked up by the node exporter textfile collector or
+    just read by an operator.
+    """
+
+    def __init__(
+        self,
+        path: tp.Optional[str] = None,
+        buckets: tp.Sequence[float] = DURATION_BUCKETS,
+    ) -> None:
+        self._path = path
+        self._buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._stats: tp.Dict[int, ServiceStats] = {}
+        self._stages: tp.Dict[str, tp.Callable[[], tp.Dict[tp.Any, tp.Any]]] = {}
+        self._collectors: tp.List[tp.Callable[[str], tp.List[str]]] = []
+        logging.getLogger(basic.__name__).addFilter(_FAILURE_FILTER)
+
+    def register(self, service: basic.BasicService, name: str) -> None:
+        self._stats[id(service)] = ServiceStats(name, self._buckets)
+
+    def register_stages(
+        self,
+        name: str,
+        stats: tp.Callable[[], tp.Dict[tp.Tuple[str, str], tp.Any]],
+    ) -> None:
+        """Export cumulative timings of the service pipeline stages.
+
+        `stats` returns `calls` and `seconds` of every stage keyed by
+        the stage kind and name.
+        """
+        self._stages[name] = stats
+
+    def register_collector(self, render: tp.Callable[[str], tp.List[str]]) -> None:
+        """Export extra metrics rendered by `render` with the metric prefix."""
+        self._collectors.append(render)
+
+    def stats(self, service: basic.BasicService) -> ServiceStats:
+        return self._stats[id(service)]
+
+    def observe_lag(self, service: basic.BasicService, lag: float) -> None:
+        """Save how far behind the schedule the service started."""
+        self._stats[id(service)].last_lag = max(lag, 0.0)
+
+    @contextlib.contextmanager
+    def measure(self, service: basic.BasicService) -> tp.Iterator[None]:
+        """Measure one iteration of the service."""
+        stats = self._stats.get(id(service))
+        if stats is None:
+            yield
+            return
+
+        _local.failed = False
+        sql_before = _sql_statements()
+        started_at = time.monotonic()
+        try:
+            yield
+        finally:
+            duration = time.monotonic() - started_at
+            with self._lock:
+                stats.observe(
+                    duration=duration,
+                    sql_statements=_sql_statements() - sql_before,
+                    overrun=duration > service._iter_min_period,
+                    failed=_local.failed,
+                )
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text format."""
+        p = METRIC_PREFIX
+        lines = [
+            f"# HELP {p}_iteration_duration_seconds Service iteration duration.",
+            f"# TYPE {p}_iteration_duration_seconds histogram",
+        ]
+        with self._lock:
+            stats = sorted(self._stats.values(), key=lambda s: s.name)
+            for s in stats:
+                cumulative = 0
+                for bound, count in zip(
+                    self._buckets + (float("inf"),), s.bucket_counts
+                ):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(
+                        f'{p}_iteration_duration_seconds_bucket{{service="{s.name}",'
+                        f'le="{le}"}} {cumulative}'
+                    )
+                lines.append(
+                    f'{p}_iteration_duration_seconds_sum{{service="{s.name}"}} '
+                    f"{s.duration_sum}"
+                )
+                lines.append(
+                    f'{p}_iteration_duration_seconds_count{{service="{s.name}"}} '
+                    f"{s.iterations}"
+                )
+
+            gauges = (
+                ("iteration_overruns_total", "counter", "overruns"),
+                ("iteration_failures_total", "counter", "failures"),
+                ("sql_statements_total", "counter", "sql_statements"),
+                ("last_iteration_sql_statements", "gauge", "last_sql_statements"),
+                ("last_iteration_duration_seconds", "gauge", "last_duration"),
+                ("last_iteration_lag_seconds", "gauge", "last_lag"),
+                ("last_success_timestamp_seconds", "gauge", "last_success"),
+            )
+            for name, kind, attr in gauges:
+                lines.append(f"# TYPE {p}_{name} {kind}")
+                for s in stats:
+                    value = getattr(s, attr)
+                    if value is None:
+                        continue
+                    lines.append(f'{p}_{name}{{service="{s.name}"}} {value}')
+
+            stages = [
+                (service, kind, stage, value)
+                for service, stats in sorted(self._stages.items())
+                for (kind, stage), value in stats().items()
+            ]
+            for name, attr in (
+                ("stage_calls_total", "calls"),
+                ("stage_duration_seconds_total", "seconds"),
+            ):
+                if not stages:
+                    break
+                lines.append(f"# TYPE {p}_{name} counter")
+                for service, kind, stage, value in stages:
+                    lines.append(
+                        f'{p}_{name}{{service="{service}",kind="{kind}",'
+                        f'stage="{stage}"}} {getattr(value, attr)}'
+                    )
+
+            for render in self._collectors:
+                lines.extend(render(p))
+
+        return "\n".join(lines) + "\n"
+
+    def export(self) -> None:
+        """Atomically write the metrics to the file if it's configured."""
+        if not self._path:
+            return
+
+        tmp_path = f"{self._path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                f.write(self.render())
+            os.replace(tmp_path, self._path)
+        except OSError:
+            LOG.exception("Unable to export gservice metrics to %s", self._path)
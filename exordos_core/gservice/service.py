@@ -16,6 +16,7 @@
 
 import logging
 import time
+import typing as tp
 import uuid as sys_uuid
 
 from gcl_looper.services import basic
@@ -27,24 +28,31 @@ from gcl_sdk.agents.universal.services import agent as ua_agent_service
 from gcl_sdk.agents.universal.services import scheduler as ua_scheduler_service
 from gcl_sdk.events.services import senders
 from restalchemy.dm import filters as dm_filters
+from restalchemy.storage.sql import engines
 
+from exordos_core.common import sharding
 from exordos_core.compute import constants as nc
 from exordos_core.compute.agents.universal.drivers import pool as ua_pool_drivers
+from exordos_core.compute.agents.universal.drivers import workers as pool_workers
 from exordos_core.compute.builders import node as node_builder_svc
 from exordos_core.compute.builders import node_set as set_builder_svc
 from exordos_core.compute.builders import pool as pool_builder_svc
 from exordos_core.compute.builders import volume as volume_builder_svc
 from exordos_core.compute.dm import models as compute_models
 from exordos_core.compute.node_set.dm import models as node_set_models
+from exordos_core.compute.scheduler import pipeline as n_pipeline
 from exordos_core.compute.scheduler import service as n_scheduler_service
-from exordos_core.compute.scheduler.driver.filters import affinity
-from exordos_core.compute.scheduler.driver.filters import available
-from exordos_core.compute.scheduler.driver.weighter import relative
 from exordos_core.config import service as config_service
 from exordos_core.dns_sync import service as dns_sync_service
 from exordos_core.elements.builders import service as service_builder_svc
 from exordos_core.elements.services import builders as em_builders
+from exordos_core.gservice import executor as gs_executor
+from exordos_core.gservice import heartbeat as gs_heartbeat
+from exordos_core.gservice import leases as gs_leases
+from exordos_core.gservice import listener as gs_listener
+from exordos_core.gservice import metrics as gs_metrics
 from exordos_core.janitor import service as janitor_service
+from exordos_core.network import ipam as net_ipam
 from exordos_core.network import service as n_network_service
 from exordos_core.network.lb.builders import iaas as net_lb_iaas
 from exordos_core.network.lb.builders import paas as net_lb_paas
@@ -54,6 +62,8 @@ from exordos_core.telemetry import service as telemetry_service
 from exordos_core.vs.builders import service as vs_builder_svc
 
 LOG = logging.getLogger(__name__)
+# The general loop period if the services are woken up by DB notifications
+NOTIFY_TICK = 0.2
 NODE_SET_TF_STORAGE = "/var/lib/exordos/exordos_core/node_set/target_fields.json"
 NODE_SET_TARGET_TF_STORAGE = (
     "/var/lib/exordos/exordos_core/target_node_set/target_fields.json"
@@ -61,35 +71,52 @@ NODE_SET_TARGET_TF_STORAGE = (
 
 
 class GeneralService(basic.BasicService):
-    def __init__(self, iter_min_period=3, iter_pause=0.1):
-        super().__init__(iter_min_period=iter_min_period, iter_pause=iter_pause)
-
-        # TODO(akremenetsky): Form a pipliene from the configuration
-        # and entry points
-        pool_filters = [
-            available.CoresRamAvailableFilter(),
-            affinity.DummySoftAntiAffinityFilter(),
-        ]
-        pool_weighters = [
-            relative.RelativeCoreRamWeighter(),
-        ]
-        machine_filters = [
-            available.HWCoresRamAvailableFilter(),
-        ]
-        machine_weighters = [
-            relative.SimpleMachineWeighter(),
-        ]
+    def __init__(
+        self,
+        iter_min_period=3,
+        iter_pause=0.1,
+        workers=0,
+        service_deadline=None,
+        metrics_file=None,
+        listen_url=None,
+        lease_url=None,
+        shards=1,
+        scheduler_pipeline=None,
+        batch_placement=False,
+        volume_prewarmer=None,
+        pool_agent_workers=0,
+        pool_agent_operation_timeout=pool_workers.DEF_OPERATION_TIMEOUT,
+        ipam_backend=net_ipam.DEF_IPAM_BACKEND,
+        network_batch_allocation=False,
+    ):
+        # The nested services keep their own periods, the general loop
+        # ticks faster to pick up the services woken up by notifications.
+        super().__init__(
+            iter_min_period=min(iter_min_period, NOTIFY_TICK)
+            if listen_url
+            else iter_min_period,
+            iter_pause=iter_pause,
+        )
+
+        if scheduler_pipeline is None:
+            scheduler_pipeline = n_pipeline.SchedulerPipeline.load()
 
         # The simplest way to enable the nested services
         # It will be reworked in the future
         n_scheduler = n_scheduler_service.SchedulerService(
-            pool_filters=pool_filters,
-            pool_weighters=pool_weighters,
-            machine_filters=machine_filters,
-            machine_weighters=machine_weighters,
+            pool_filters=scheduler_pipeline.pool_filters,
+            pool_weighters=scheduler_pipeline.pool_weighters,
+            machine_filters=scheduler_pipeline.machine_filters,
+            machine_weighters=scheduler_pipeline.machine_weighters,
+            iter_min_period=iter_min_period,
+            batch_placement=batch_placement,
+            prewarmer=volume_prewarmer,
+        )
+        n_network = n_network_service.NetworkService(
             iter_min_period=iter_min_period,
+            ipam_class=net_ipam.IPAM_BACKENDS[ipam_backend],
+            batch_allocation=network_batch_allocation,
         )
-        n_network = n_network_service.NetworkService(iter_min_period=iter_min_period)
         node_builder = node_builder_svc.NodeBuilderService(
             iter_min_period=iter_min_period
         )
@@ -97,11 +124,13 @@ class GeneralService(basic.BasicService):
             iter_min_period=iter_min_period
         )
         pool_driver = ua_pool_drivers.PoolAgentDriver(
-            meta_file="/var/lib/exordos/exordos_core/pool_agent_meta.json"
+            meta_file="/var/lib/exordos/exordos_core/pool_agent_meta.json",
+            workers=pool_agent_workers,
+            operation_timeout=pool_agent_operation_timeout,
         )
-        agent_uuid = sys_uuid.uuid5(ua_utils.system_uuid(), "machine_pool_agent")
+        pool_agent_uuid = sys_uuid.uuid5(ua_utils.system_uuid(), "machine_pool_agent")
         machine_pool_agent = ua_agent_service.UniversalAgentService(
-            agent_uuid=agent_uuid,
+            agent_uuid=pool_agent_uuid,
             orch_client=orch_db.DatabaseOrchClient(),
             caps_drivers=[pool_driver],
             facts_drivers=[],
@@ -166,8 +195,9 @@ class GeneralService(basic.BasicService):
             payload_path=None,
         )
 
+        pool_builder_uuid = sys_uuid.uuid5(ua_utils.system_uuid(), "pool_builder")
         pool_builder_service = pool_builder_svc.PoolBuilderService(
-            uuid=sys_uuid.uuid5(ua_utils.system_uuid(), "pool_builder"),
+            uuid=pool_builder_uuid,
             orch_client=orch_db.DatabaseOrchClient(),
             iter_min_period=iter_min_period,
         )
@@ -199,40 +229,195 @@ class GeneralService(basic.BasicService):
             iter_min_period=iter_min_period * 2,
         )
 
-        self._services = [
-            vs_builder_service,
-            set_builder,
-            infra_scheduler,
-            infra_agent,
-            n_scheduler,
-            n_network,
-            pool_builder_service,
-            node_builder,
-            volume_builder,
-            machine_pool_agent,
-            cfg_service,
-            service_builder,
-            net_lb_iaas_builder,
-            net_lb_paas_builder,
-            secret_svc,
-            event_sender,
-            em_builder,
-            dns_sync,
+        # Services are identified by their names in the metrics
+        services = {
+            "vs_builder": vs_builder_service,
+            "node_set_builder": set_builder,
+            "infra_scheduler": infra_scheduler,
+            "infra_agent": infra_agent,
+            "scheduler": n_scheduler,
+            "network": n_network,
+            "pool_builder": pool_builder_service,
+            "node_builder": node_builder,
+            "volume_builder": volume_builder,
+            "machine_pool_agent": machine_pool_agent,
+            "config_builder": cfg_service,
+            "service_builder": service_builder,
+            "lb_iaas_builder": net_lb_iaas_builder,
+            "lb_paas_builder": net_lb_paas_builder,
+            "secret_builder": secret_svc,
+            "event_sender": event_sender,
+            "em_builder": em_builder,
+            "dns_sync": dns_sync,
             # non-essential services should be last
-            janitor,
-            telemetry,
-        ]
+            "janitor": janitor,
+            "telemetry": telemetry,
+        }
+        self._services = list(services.values())
         self._next_run_times = {id(s): 0 for s in self._services}
 
+        # Several general services may run on different hosts. The agents
+        # and the pool builder are bound to the host by their UUIDs so
+        # they run everywhere, the rest are distributed by leases. The
+        # heavy builders are split into shards with a lease per shard.
+        local_services = (infra_agent, machine_pool_agent, pool_builder_service)
+        sharded_services = (node_builder, volume_builder)
+        self._leases = None
+        self._lease_keys = {}
+        if lease_url:
+            self._leases = gs_leases.LeaseManager(lease_url)
+            for name, service in services.items():
+                if service in local_services:
+                    continue
+                if service in sharded_services:
+                    keys = tuple(f"{name}:{i}" for i in range(shards))
+                else:
+                    keys = (name,)
+                self._lease_keys[id(service)] = keys
+
+        # Ordering dependencies between the nested services. They matter
+        # only for the parallel mode, the serial mode follows the order
+        # of the list above. A service runs after its dependencies have
+        # finished in the same pass.
+        self._dependencies = {
+            id(infra_agent): (infra_scheduler,),
+            id(pool_builder_service): (n_scheduler,),
+            id(volume_builder): (n_scheduler,),
+            id(machine_pool_agent): (pool_builder_service,),
+        }
+
+        # Changes in these tables wake up the interested services
+        # immediately. Periodic polling is kept as a fallback.
+        self._subscriptions = {
+            "nodes": (n_scheduler, n_network, node_builder),
+            "compute_ports": (n_network,),
+            "machines": (n_scheduler, pool_builder_service, node_builder),
+            "config_configs": (cfg_service,),
+            "em_resources": (em_builder,),
+            "ua_target_resources": (machine_pool_agent, infra_agent),
+        }
+        self._listener = None
+        self._origins = None
+        if listen_url:
+            self._listener = gs_listener.ChangeListener(
+                listen_url, self._on_table_changed
+            )
+            self._origins = gs_listener.OriginTracker()
+            self._origins.install(engines.engine_factory.get_engine())
+
+        # The scheduler moves pools away from the builders and agents
+        # which don't update their records
+        self._heartbeat = gs_heartbeat.Heartbeat(
+            (pool_builder_uuid, pool_agent_uuid, agent_uuid)
+        )
+
+        # The heartbeats and leases are maintained at the pace of the
+        # nested services, not at the faster pace of the notifications
+        self._maintenance_period = iter_min_period
+        self._next_maintenance = 0.0
+        self._candidates = self._services
+
+        self._metrics = gs_metrics.ServiceMetrics(path=metrics_file)
+        for name, service in services.items():
+            self._metrics.register(service, name)
+        self._metrics.register_stages("scheduler", scheduler_pipeline.stats)
+        if volume_prewarmer is not None:
+            self._metrics.register_collector(volume_prewarmer.stats.render)
+
+        # `workers == 0` keeps the classic serial loop
+        if workers > 0:
+            self._executor = gs_executor.ParallelServiceExecutor(
+                workers=workers,
+                deadline=service_deadline,
+                dependencies=self._dependencies,
+                metrics=self._metrics,
+                origins=self._origins,
+            )
+        else:
+            self._executor = gs_executor.SerialServiceExecutor(
+                self._metrics, self._origins
+            )
+
     def _setup(self):
         LOG.info("Setup all services")
         for service in self._services:
             service._setup()
 
-    def _iteration(self):
+        if self._listener is not None:
+            self._listener.start()
+
+    def _on_table_changed(self, table: str, pid: int) -> None:
+        # Called from the listener thread. A service isn't woken up by
+        # its own changes, it has just seen them.
+        origin = self._origins.owner(pid) if self._origins is not None else None
         now = time.monotonic()
+        for service in self._subscriptions.get(table, ()):
+            if id(service) != origin:
+                self._next_run_times[id(service)] = now
+
+    def _leased_services(
+        self, leases: gs_leases.LeaseManager
+    ) -> tp.List[basic.BasicService]:
+        keys = [k for keys in self._lease_keys.values() for k in keys]
+        # Don't give away leases of services still running in background
+        keep = [
+            k
+            for svc_id in self._executor.in_flight()
+            for k in self._lease_keys.get(svc_id, ())
+        ]
+        owned = leases.refresh(keys, keep)
+
+        services = []
         for service in self._services:
+            keys = self._lease_keys.get(id(service))
+            if keys is None:
+                services.append(service)
+                continue
+
+            shards = [i for i, key in enumerate(keys) if key in owned]
+            if not shards:
+                continue
+            if isinstance(service, sharding.ShardedServiceMixin):
+                service.set_shards(shards, len(keys))
+            services.append(service)
+
+        return services
+
+    def _maintain(self) -> None:
+        now = time.monotonic()
+        if now < self._next_maintenance:
+            return
+        self._next_maintenance = now + self._maintenance_period
+
+        self._heartbeat.beat()
+        if self._leases is not None:
+            self._candidates = self._leased_services(self._leases)
+
+    def _iteration(self):
+        self._maintain()
+
+        now = time.monotonic()
+        services = []
+        for service in self._candidates:
             svc_id = id(service)
-            if now >= self._next_run_times[svc_id]:
+            next_run_time = self._next_run_times[svc_id]
+            if now >= next_run_time:
+                # The first run isn't scheduled so there is no lag
+                if next_run_time:
+                    self._metrics.observe_lag(service, now - next_run_time)
                 self._next_run_times[svc_id] = now + service._iter_min_period
-                service._loop_iteration()
+                services.append(service)
+
+        if not services:
+            return
+
+        self._executor.run(services)
+        self._metrics.export()
+
+    def stop(self) -> None:
+        super().stop()
+        if self._listener is not None:
+            self._listener.stop()
+        self._executor.shutdown()
+        if self._leases is not None:
+            self._leases.close()
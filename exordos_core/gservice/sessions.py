@@ -0,0 +1,94 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import functools
+import threading
+import typing as tp
+import weakref
+
+from restalchemy.storage.sql import sessions as ra_sessions
+
+
+class SessionHooks:
+    """Callbacks called by the sessions of an engine.
+
+    `opened` callbacks get every new session, `executed` callbacks are
+    called before every statement. A callback is registered once even
+    if it's added several times.
+    """
+
+    def __init__(self) -> None:
+        self._opened: tp.List[tp.Callable[["HookedPgSQLSession"], None]] = []
+        self._executed: tp.List[tp.Callable[[], None]] = []
+
+    def on_opened(self, callback: tp.Callable[["HookedPgSQLSession"], None]) -> None:
+        if callback not in self._opened:
+            self._opened.append(callback)
+
+    def on_executed(self, callback: tp.Callable[[], None]) -> None:
+        if callback not in self._executed:
+            self._executed.append(callback)
+
+    def opened(self, session: "HookedPgSQLSession") -> None:
+        for callback in self._opened:
+            callback(session)
+
+    def executed(self) -> None:
+        for callback in self._executed:
+            callback()
+
+
+class HookedPgSQLSession(ra_sessions.PgSQLSession):
+    """PostgreSQL session calling the hooks of its engine."""
+
+    def __init__(self, engine: tp.Any, hooks: SessionHooks) -> None:
+        super().__init__(engine)
+        self._hooks = hooks
+        hooks.opened(self)
+
+    @property
+    def backend_pid(self) -> int:
+        """PID of the DB backend serving the session."""
+        return self._conn.info.backend_pid
+
+    def execute(self, statement: str, values: tp.Any = None) -> tp.Any:
+        self._hooks.executed()
+        return super().execute(statement, values)
+
+    def execute_many(self, statement: str, values: tp.Any) -> tp.Any:
+        self._hooks.executed()
+        return super().execute_many(statement, values)
+
+
+_hooks: "weakref.WeakKeyDictionary[tp.Any, SessionHooks]" = (
+    weakref.WeakKeyDictionary()
+)
+_hooks_lock = threading.Lock()
+
+
+def install(engine: tp.Any) -> SessionHooks:
+    """Make the engine create hooked sessions.
+
+    The engine is switched to the hooked sessions only once, all features
+    share the returned hooks of the engine.
+    """
+    with _hooks_lock:
+        hooks = _hooks.get(engine)
+        if hooks is None:
+            hooks = SessionHooks()
+            engine.get_session = functools.partial(HookedPgSQLSession, engine, hooks)
+            _hooks[engine] = hooks
+        return hooks
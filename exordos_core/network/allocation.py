@@ -0,0 +1,138 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Atomic allocation of port IPs in the database.
+
+IPs are picked from the IPAM of the network state, but an IP is claimed
+only by inserting its port. A unique index on (subnet, ipv4) guarantees
+that concurrent workers never assign the same IP twice: the whole batch
+of ports is inserted with a single statement that skips rows conflicting
+on the index, other conflicts fail the statement. Ports that lost the
+race get the next free IPs and are inserted again, the lost IPs stay
+occupied in the local IPAM since they are taken by somebody else.
+"""
+
+import logging
+import typing as tp
+import uuid as sys_uuid
+
+from restalchemy.storage.sql import engines
+
+from exordos_core.network import ipam as net_ipam
+from exordos_core.network import state as net_state
+from exordos_core.network.dm import models as net_models
+
+LOG = logging.getLogger(__name__)
+
+# Number of attempts to insert a port that lost the race for its IP
+ALLOCATION_ATTEMPTS = 3
+# Ports per statement, keeps the statement within the parameters limit
+INSERT_CHUNK = 1000
+
+
+class PortAllocator:
+    def __init__(
+        self,
+        state: net_state.NetworkState,
+        attempts: int = ALLOCATION_ATTEMPTS,
+    ) -> None:
+        self._state = state
+        self._attempts = attempts
+
+    @staticmethod
+    def _insert(ports: tp.Sequence[net_models.Port]) -> tp.Set[sys_uuid.UUID]:
+        """Insert the ports skipping conflicts, return the inserted ones."""
+        engine = engines.engine_factory.get_engine()
+        inserted: tp.Set[sys_uuid.UUID] = set()
+        with engine.session_manager() as session:
+            table = net_models.Port.get_table()
+            columns = table.get_column_names(session)
+            row = "(%s)" % ", ".join(["%s"] * len(columns))
+
+            for i in range(0, len(ports), INSERT_CHUNK):
+                chunk = ports[i : i + INSERT_CHUNK]
+                statement = (
+                    'INSERT INTO "%s" (%s) VALUES %s '
+                    "ON CONFLICT (subnet, ipv4) WHERE ipv4 IS NOT NULL "
+                    "DO NOTHING RETURNING uuid"
+                    % (
+                        table.name,
+                        ", ".join(table.get_escaped_column_names(session)),
+                        ", ".join([row] * len(chunk)),
+                    )
+                )
+                values: tp.List[tp.Any] = []
+                for port in chunk:
+                    data = port._get_prepared_data()
+                    values.extend(data[c] for c in columns)
+
+                rows = session.execute(statement, values).fetchall()
+                inserted.update(sys_uuid.UUID(str(r["uuid"])) for r in rows)
+
+        return inserted
+
+    def _assign(self, ports: tp.Iterable[net_models.Port]) -> tp.List[net_models.Port]:
+        assigned = []
+        for port in ports:
+            try:
+                port.ipv4 = self._state.allocate_ip(port.subnet, port.target_ipv4)
+            except net_ipam.IpamNoIPsAvailable:
+                LOG.error("No IPs available for port %s", port.uuid)
+                continue
+            assigned.append(port)
+        return assigned
+
+    def allocate(self, ports: tp.Iterable[net_models.Port]) -> tp.List[net_models.Port]:
+        """Allocate IPs for the new ports and insert them.
+
+        Return the inserted ports, ports without free IPs or with taken
+        target IPs aren't inserted.
+        """
+        allocated = []
+        pending = list(ports)
+
+        for _ in range(self._attempts):
+            pending = self._assign(pending)
+            if not pending:
+                break
+
+            try:
+                inserted = self._insert(pending)
+            except Exception:
+                for port in pending:
+                    self._state.deallocate_ip(port.subnet, port.ipv4)
+                raise
+
+            lost = []
+            for port in pending:
+                if port.uuid in inserted:
+                    port._saved = True
+                    self._state.add_port(port)
+                    allocated.append(port)
+                elif port.target_ipv4 is None:
+                    lost.append(port)
+                else:
+                    LOG.error(
+                        "Target IP %s of port %s is taken",
+                        port.target_ipv4,
+                        port.uuid,
+                    )
+            pending = lost
+        else:
+            for port in pending:
+                LOG.error("Unable to allocate IP for port %s", port.uuid)
+
+        return allocated
@@ -19,6 +19,7 @@ import typing as tp
 import netaddr
 
 from exordos_core.compute.dm import models
+from exordos_core.network.dhcp import omapi
 
 
 class StaticRoute(tp.NamedTuple):
@@ -63,6 +64,20 @@ option rfc3442-classless-static-routes code 121 = array of integer 8;
 """
 
 
+_omapi_template = """
+omapi-port {port};
+"""
+
+
+_omapi_key_template = """
+key {key_name} {{
+	algorithm hmac-md5;
+	secret "{secret}";
+}};
+omapi-key {key_name};
+"""
+
+
 _netboot_template = """
 
 	# Netboot
@@ -123,11 +138,31 @@ def rfc3442_static_routes(routes: tp.List[StaticRoute]) -> str:
     return f"{route_line}\n\t{rfc3442_route_line}\n"
 
 
-def dhcp_config(subnets: tp.Dict[models.Subnet, tp.List[models.Port]]) -> str:
+def host_name(port: models.Port) -> str:
+    return f"P_{str(port.uuid)}"
+
+
+def dhcp_config(
+    subnets: tp.Dict[models.Subnet, tp.List[models.Port]],
+    with_hosts: bool = True,
+    omapi_spec: tp.Optional[omapi.OmapiSpec] = None,
+) -> str:
+    """Render the server configuration.
+
+    Without hosts only the subnet level configuration is rendered, the
+    hosts may be changed without a restart via OMAPI.
+    """
     # FIXME(akremenetsky): It's considered the subnets aren't intersecting
 
     config = _common_settings
 
+    if omapi_spec is not None:
+        config += _omapi_template.format(port=omapi_spec.port)
+        if omapi_spec.key_name:
+            config += _omapi_key_template.format(
+                key_name=omapi_spec.key_name, secret=omapi_spec.key_secret
+            )
+
     # Build every subnet
     for subnet, ports in subnets.items():
         if discovery_range := subnet.ip_discovery_range_pair:
@@ -140,14 +175,14 @@ def dhcp_config(subnets: tp.Dict[models.Subnet, tp.List[models.Port]]) -> str:
             pool = ""
 
         hosts = ""
-        for port in ports:
+        for port in ports if with_hosts else ():
             if port.mac is None or port.ipv4 is None:
                 raise ValueError("Port is not configured")
 
             hosts += _host_template.format(
                 mac_address=port.mac,
                 ip_address=port.ipv4,
-                hostname=f"P_{str(port.uuid)}",
+                hostname=host_name(port),
             )
 
         if subnet.next_server and ";" not in subnet.next_server:
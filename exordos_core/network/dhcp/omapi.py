@@ -0,0 +1,143 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Host reservations of a running ISC DHCP server via OMAPI.
+
+isc-dhcp-server can't reload its configuration, it has to be restarted
+and the restart drops in-flight exchanges. Host reservations may be
+changed at runtime through OMAPI instead. The client drives `omshell`
+shipped with the server, so all changes of a batch go through a single
+process and connection.
+"""
+
+import itertools
+import logging
+import re
+import subprocess
+import typing as tp
+
+from exordos_core.network import exceptions
+
+LOG = logging.getLogger(__name__)
+
+OMSHELL = "omshell"
+DEF_OMAPI_PORT = 7911
+# Hardware type of Ethernet
+HW_TYPE_ETHERNET = 1
+# Commands which only configure omshell and don't print anything
+SETUP_COMMANDS = frozenset(("server", "port", "key"))
+# omshell prints the current object after every other successful command
+# and an error message instead of it otherwise, the exit code is always
+# zero. Printed objects are the status line and their attribute lines.
+OBJECT_STATUS = "obj: "
+ATTRIBUTE_RE = re.compile(r"^[\w-]+ = ")
+PROMPT = "> "
+
+
+class OmapiError(exceptions.CGNetException):
+    __template__ = "OMAPI command {command!r} failed: {status}"
+    command: str
+    status: str
+
+
+class OmapiSpec(tp.NamedTuple):
+    server: str = "127.0.0.1"
+    port: int = DEF_OMAPI_PORT
+    # HMAC-MD5 key, the server accepts unauthenticated requests without it
+    key_name: tp.Optional[str] = None
+    key_secret: tp.Optional[str] = None
+
+    @classmethod
+    def from_spec(cls, spec: tp.Dict[str, tp.Any]) -> "OmapiSpec":
+        return cls(**spec)
+
+
+class Host(tp.NamedTuple):
+    name: str
+    mac: str
+    ip: str
+
+
+class OmapiClient:
+    def __init__(self, spec: OmapiSpec, timeout: float = 30.0) -> None:
+        self._spec = spec
+        self._timeout = timeout
+
+    def _script(
+        self, remove: tp.Iterable[Host], add: tp.Iterable[Host]
+    ) -> tp.List[str]:
+        lines = [f"server {self._spec.server}", f"port {self._spec.port}"]
+        if self._spec.key_name:
+            lines.append(f"key {self._spec.key_name} {self._spec.key_secret}")
+        lines.append("connect")
+
+        for host in remove:
+            lines += ["new host", f'set name = "{host.name}"', "open", "remove"]
+
+        for host in add:
+            lines += [
+                "new host",
+                f'set name = "{host.name}"',
+                f"set hardware-address = {host.mac}",
+                f"set hardware-type = {HW_TYPE_ETHERNET}",
+                f"set ip-address = {host.ip}",
+                "create",
+            ]
+
+        return lines
+
+    @staticmethod
+    def _statuses(output: str) -> tp.List[str]:
+        """Status lines of the commands in the omshell output."""
+        statuses = []
+        for line in output.splitlines():
+            while line.startswith(PROMPT):
+                line = line[len(PROMPT) :]
+            line = line.strip()
+            if line and not ATTRIBUTE_RE.match(line):
+                statuses.append(line)
+        return statuses
+
+    def _check(self, script: tp.List[str], stdout: str, stderr: str) -> None:
+        commands = [c for c in script if c.split()[0] not in SETUP_COMMANDS]
+        statuses = self._statuses(stdout)
+        for command, status in itertools.zip_longest(commands, statuses):
+            # Some errors are printed to stderr instead of the status
+            if status is None:
+                raise OmapiError(command=command, status=stderr.strip() or "none")
+            # Output after the last command is reported on behalf of omshell
+            if command is None or not status.startswith(OBJECT_STATUS):
+                raise OmapiError(command=command or OMSHELL, status=status)
+
+    def update_hosts(
+        self, remove: tp.Collection[Host], add: tp.Collection[Host]
+    ) -> None:
+        """Remove and add the host reservations in one session."""
+        if not remove and not add:
+            return
+
+        script = self._script(remove, add)
+        result = subprocess.run(
+            [OMSHELL],
+            input="\n".join(script) + "\n",
+            capture_output=True,
+            text=True,
+            timeout=self._timeout,
+            check=True,
+        )
+        self._check(script, result.stdout, result.stderr)
+
+        LOG.debug("OMAPI removed %d and added %d hosts", len(remove), len(add))
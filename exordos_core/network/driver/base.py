@@ -69,6 +69,13 @@ class AbstractNetworkDriver(abc.ABC):
         for port in ports:
             self.delete_port(port)
 
+    def flush(self) -> None:
+        """Apply the changes made since the previous flush.
+
+        Drivers may defer the changes to apply them at once, the network
+        service flushes the driver after every network actualization.
+        """
+
 
 class DummyNetworkDriver(AbstractNetworkDriver):
     SPEC = {"driver": "dummy"}
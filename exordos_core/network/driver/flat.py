@@ -16,6 +16,7 @@
 
 import collections
 import dataclasses
+import hashlib
 import json
 import logging
 import os
@@ -27,6 +28,7 @@ from exordos_core.compute import constants as nc
 from exordos_core.compute.dm import models
 from exordos_core.network import exceptions
 from exordos_core.network.dhcp import isc
+from exordos_core.network.dhcp import omapi
 from exordos_core.network.driver import base
 
 DHCP_CTX_FILE = "gc_ctx_dhcpd.json"
@@ -61,23 +63,32 @@ class DhcpPortAlreadyExists(exceptions.CGNetException):
 
 @dataclasses.dataclass
 class DHCPContext:
+    """Subnets and ports served by the DHCP server.
+
+    Subnets and ports of every subnet are kept in dicts by UUID, the
+    insertion order is preserved so the rendered configuration is stable.
+    The file format is the same, subnets and ports are stored as lists.
+    """
+
     cfg_hash: str
-    subnets: tp.List[models.Subnet]
-    port_map: tp.DefaultDict[sys_uuid.UUID, tp.List[models.Port]]
+    subnets: tp.Dict[sys_uuid.UUID, models.Subnet]
+    port_map: tp.DefaultDict[sys_uuid.UUID, tp.Dict[sys_uuid.UUID, models.Port]]
 
     @property
     def subnet_map(self) -> tp.Dict[models.Subnet, tp.List[models.Port]]:
-        return {s: self.port_map[s.uuid] for s in self.subnets}
+        return {
+            s: list(self.port_map[uuid].values()) for uuid, s in self.subnets.items()
+        }
 
     def save_ctx(self, ctx_path: str) -> None:
         with open(ctx_path, "w") as fctx:
             port_map = {}
             for uuid, ports in self.port_map.items():
-                port_map[str(uuid)] = [p.dump_to_simple_view() for p in ports]
+                port_map[str(uuid)] = [p.dump_to_simple_view() for p in ports.values()]
 
             data = {
                 "cfg_hash": self.cfg_hash,
-                "subnets": [s.dump_to_simple_view() for s in self.subnets],
+                "subnets": [s.dump_to_simple_view() for s in self.subnets.values()],
                 "port_map": port_map,
             }
             json.dump(data, fctx, indent=2)
@@ -98,15 +109,18 @@ class DHCPContext:
         with open(ctx_path) as fctx:
             data = json.load(fctx)
 
-        cfg_hash = data["cfg_hash"]
-        subnets = [models.Subnet.restore_from_simple_view(**s) for s in data["subnets"]]
-        port_map = collections.defaultdict(list)
+        ctx = cls.get_empty_ctx()
+        ctx.cfg_hash = data["cfg_hash"]
+        for s in data["subnets"]:
+            subnet = models.Subnet.restore_from_simple_view(**s)
+            ctx.subnets[subnet.uuid] = subnet
         for uuid, ports in data["port_map"].items():
-            port_map[sys_uuid.UUID(uuid)] = [
-                models.Port.restore_from_simple_view(**p) for p in ports
-            ]
+            port_map = ctx.port_map[sys_uuid.UUID(uuid)]
+            for p in ports:
+                port = models.Port.restore_from_simple_view(**p)
+                port_map[port.uuid] = port
 
-        return cls(subnets=subnets, port_map=port_map, cfg_hash=cfg_hash)
+        return ctx
 
     @classmethod
     def fill_empty_ctx(cls, ctx_path: str, force: bool = False) -> "DHCPContext":
@@ -119,37 +133,49 @@ class DHCPContext:
 
     @classmethod
     def get_empty_ctx(cls) -> "DHCPContext":
-        port_map = collections.defaultdict(list)
-        return cls(subnets=[], port_map=port_map, cfg_hash="")
+        port_map = collections.defaultdict(dict)
+        return cls(subnets={}, port_map=port_map, cfg_hash="")
 
     def add_subnet(self, subnet: models.Subnet) -> None:
-        if subnet in self.subnets:
+        if subnet.uuid in self.subnets:
             raise DhcpSubnetAlreadyExists(subnet=subnet.uuid)
 
-        self.subnets.append(subnet)
-        self.port_map[subnet.uuid] = []
+        self.subnets[subnet.uuid] = subnet
+        self.port_map[subnet.uuid] = {}
 
-    def delete_subnet(self, subnet: models.Subnet) -> None:
-        if subnet not in self.subnets:
-            return
+    def delete_subnet(self, subnet: models.Subnet) -> bool:
+        """Delete the subnet, return False if there is no such subnet."""
+        if self.subnets.pop(subnet.uuid, None) is None:
+            return False
 
-        self.subnets.remove(subnet)
-        del self.port_map[subnet.uuid]
+        self.port_map.pop(subnet.uuid, None)
+        return True
 
     def add_port(self, port: models.Port) -> None:
-        if any(p.uuid == port.uuid for p in self.port_map[port.subnet]):
+        ports = self.port_map[port.subnet]
+        if port.uuid in ports:
             raise DhcpPortAlreadyExists(port=port.uuid)
 
-        self.port_map[port.subnet].append(port)
-
-    def delete_port(self, port: models.Port) -> None:
-        if not any(p.uuid == port.uuid for p in self.port_map[port.subnet]):
-            return
+        ports[port.uuid] = port
 
-        self.port_map[port.subnet].remove(port)
+    def delete_port(self, port: models.Port) -> bool:
+        """Delete the port, return False if there is no such port."""
+        return self.port_map[port.subnet].pop(port.uuid, None) is not None
 
 
 class FlatBridgeNetworkDriver(base.AbstractNetworkDriver):
+    """Flat network served by isc-dhcp-server.
+
+    Changes are accumulated in the DHCP context and applied at once on
+    `flush`. The server is restarted only if the configuration has
+    changed. If OMAPI is enabled in the spec (`"omapi": {"port": 7911,
+    ...}`), host reservations aren't written to the configuration and are
+    pushed via OMAPI, otherwise the server is restarted for them as well.
+
+    The loaded context is cached until the context or the configuration
+    file is changed on disk, see `_files_stamp`.
+    """
+
     DRIVER_NAME = "flat_bridge"
 
     def __init__(self, network: models.Network) -> None:
@@ -166,28 +192,108 @@ class FlatBridgeNetworkDriver(base.AbstractNetworkDriver):
             os.path.dirname(self._dhcp_cfg_path), DHCP_CTX_FILE
         )
 
+        self._omapi_spec = None
+        self._omapi = None
+        if spec.get("omapi") is not None:
+            try:
+                self._omapi_spec = omapi.OmapiSpec.from_spec(spec["omapi"])
+            except TypeError:
+                raise InvalidFlatDriverSpec(spec=spec)
+            self._omapi = omapi.OmapiClient(self._omapi_spec)
+
         if not os.path.exists(self._dhcp_cfg_path):
             raise DhcpCfgNotFound(cfg=self._dhcp_cfg_path)
 
         if not os.path.exists(self._dhcp_ctx_path):
             DHCPContext.fill_empty_ctx(self._dhcp_ctx_path)
 
+        # The context with changes not applied yet and the configuration
+        # that was applied before them
+        self._pending: tp.Optional[DHCPContext] = None
+        self._applied_cfg = ""
+        self._applied_hosts: tp.Dict[str, omapi.Host] = {}
+
+        # The last loaded context and the state of the files it's loaded from
+        self._ctx: tp.Optional[DHCPContext] = None
+        self._ctx_stamp: tp.Optional[tp.Tuple[tp.Tuple[int, int], ...]] = None
+        # The context the applied configuration above is rendered for
+        self._applied_ctx: tp.Optional[DHCPContext] = None
+
+    def _files_stamp(self) -> tp.Optional[tp.Tuple[tp.Tuple[int, int], ...]]:
+        """Modification time and size of the context and config files."""
+        stamp = []
+        for path in (self._dhcp_ctx_path, self._dhcp_cfg_path):
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                return None
+            stamp.append((st.st_mtime_ns, st.st_size))
+        return tuple(stamp)
+
     def _load_ctx(self) -> DHCPContext:
+        if self._pending is not None:
+            return self._pending
+
+        stamp = self._files_stamp()
+        if self._ctx is not None and stamp is not None and stamp == self._ctx_stamp:
+            return self._ctx
+
         # If the configuration isn't valid. Consider it as empty in this
         # case in order to rebuild the networks.
         try:
             ctx = DHCPContext.load_ctx(self._dhcp_ctx_path)
         except json.decoder.JSONDecodeError:
-            return DHCPContext.get_empty_ctx()
-
-        if self._cfg_hash() != ctx.cfg_hash:
-            return DHCPContext.get_empty_ctx()
+            ctx = DHCPContext.get_empty_ctx()
+        else:
+            if self._cfg_hash() != ctx.cfg_hash:
+                ctx = DHCPContext.get_empty_ctx()
 
+        self._ctx, self._ctx_stamp = ctx, stamp
         return ctx
 
+    def _edit_ctx(self) -> DHCPContext:
+        """Context to change, the changes are applied on flush."""
+        if self._pending is None:
+            ctx = self._load_ctx()
+            # The applied configuration is kept since the last flush if the
+            # context is cached. It's rendered before the changes since the
+            # cached objects may be changed in place.
+            if ctx is not self._applied_ctx:
+                self._applied_cfg = self._render(ctx)
+                self._applied_hosts = self._hosts(ctx)
+                self._applied_ctx = ctx
+            self._pending = ctx
+
+        return self._pending
+
+    def _render(
+        self, ctx: DHCPContext, with_hosts: tp.Optional[bool] = None
+    ) -> str:
+        # The hosts are kept only in OMAPI if it's enabled
+        if with_hosts is None:
+            with_hosts = self._omapi is None
+        return isc.dhcp_config(
+            ctx.subnet_map, with_hosts=with_hosts, omapi_spec=self._omapi_spec
+        )
+
+    @staticmethod
+    def _hosts(ctx: DHCPContext) -> tp.Dict[str, omapi.Host]:
+        hosts = {}
+        for ports in ctx.port_map.values():
+            for port in ports.values():
+                if port.mac is None or port.ipv4 is None:
+                    continue
+                name = isc.host_name(port)
+                hosts[name] = omapi.Host(name, port.mac, str(port.ipv4))
+        return hosts
+
+    @staticmethod
+    def _digest(content: bytes) -> str:
+        return hashlib.sha256(content).hexdigest()
+
     def _cfg_hash(self) -> str:
-        with open(self._dhcp_cfg_path) as fcfg:
-            return str(hash(fcfg.read()))
+        with open(self._dhcp_cfg_path, "rb") as fcfg:
+            return self._digest(fcfg.read())
 
     def _save_cfg(self, content: str) -> None:
         with open(self._dhcp_cfg_path, "w") as fcfg:
@@ -198,34 +304,75 @@ class FlatBridgeNetworkDriver(base.AbstractNetworkDriver):
         # just to restart the service
         subprocess.check_call(["systemctl", "restart", isc.DHCP_ISC_SVC_NAME])
 
-    def _apply_cfg(self, ctx: DHCPContext) -> None:
-        dhcp_config = isc.dhcp_config(ctx.subnet_map)
-        self._save_cfg(dhcp_config)
-        self._reload_dhcp_service()
-        ctx.cfg_hash = self._cfg_hash()
+    def _update_hosts(
+        self, client: omapi.OmapiClient, hosts: tp.Dict[str, omapi.Host]
+    ) -> bool:
+        remove = [h for n, h in self._applied_hosts.items() if hosts.get(n) != h]
+        add = [h for n, h in hosts.items() if self._applied_hosts.get(n) != h]
+
+        try:
+            client.update_hosts(remove, add)
+        except Exception:
+            LOG.exception("Unable to update DHCP hosts via OMAPI")
+            return False
+        return True
+
+    def flush(self) -> None:
+        """Apply all changes made since the last flush."""
+        if self._pending is None:
+            return
+
+        ctx, self._pending = self._pending, None
+        # The pending context may be the cached one, drop the cache
+        # until the changes are saved
+        self._ctx = self._ctx_stamp = self._applied_ctx = None
+
+        config = self._render(ctx)
+        hosts = self._hosts(ctx)
+        self._save_cfg(config)
+
+        if config == self._applied_cfg:
+            LOG.debug("DHCP configuration %s is unchanged", self._dhcp_cfg_path)
+        else:
+            self._reload_dhcp_service()
+
+        # The server keeps the hosts created via OMAPI in its leases file,
+        # so they survive the restart above
+        if (
+            self._omapi is not None
+            and hosts != self._applied_hosts
+            and not self._update_hosts(self._omapi, hosts)
+        ):
+            # The hosts are served from the configuration until the next
+            # flush, the OMAPI changes are retried then
+            LOG.warning("Writing DHCP hosts to %s, restarting", self._dhcp_cfg_path)
+            config = self._render(ctx, with_hosts=True)
+            self._save_cfg(config)
+            self._reload_dhcp_service()
+            hosts = self._applied_hosts
+
+        ctx.cfg_hash = self._digest(config.encode())
         ctx.save_ctx(self._dhcp_ctx_path)
 
+        self._ctx, self._ctx_stamp = ctx, self._files_stamp()
+        self._applied_ctx = ctx
+        self._applied_cfg = config
+        self._applied_hosts = hosts
+
     def list_subnets(self) -> tp.Iterable[models.Subnet]:
         """Return subnet list from data plane."""
         ctx = self._load_ctx()
-        return ctx.subnets
+        return list(ctx.subnets.values())
 
     def list_ports(self, subnet: models.Subnet) -> tp.Iterable[models.Port]:
         """Return port list from data plane."""
         ctx = self._load_ctx()
-        return ctx.port_map[subnet.uuid]
+        return list(ctx.port_map[subnet.uuid].values())
 
     def create_subnet(self, subnet: models.Subnet) -> models.Subnet:
         """Create a new subnet."""
-        ctx = self._load_ctx()
-
-        for s in ctx.subnets:
-            if s.uuid == subnet.uuid:
-                raise DhcpSubnetAlreadyExists(subnet=subnet.uuid)
-
-        # Add a new subnet, rebuild configuration, reload the service
+        ctx = self._edit_ctx()
         ctx.add_subnet(subnet)
-        self._apply_cfg(ctx)
         LOG.info(
             "Enabled subnet %s into DHCP configuration %s",
             subnet.uuid,
@@ -236,20 +383,9 @@ class FlatBridgeNetworkDriver(base.AbstractNetworkDriver):
 
     def create_port(self, port: models.Port) -> models.Port:
         """Create a new port."""
-        ctx = self._load_ctx()
-
-        for p in ctx.port_map[port.subnet]:
-            if p.uuid == port.uuid:
-                raise DhcpPortAlreadyExists(port=port.uuid)
-
-        # Add a new port, rebuild configuration, reload the service
+        ctx = self._edit_ctx()
+        ctx.add_port(port)
         port.status = nc.PortStatus.ACTIVE.value
-        try:
-            ctx.add_port(port)
-            self._apply_cfg(ctx)
-        except Exception:
-            port.status = nc.PortStatus.NEW.value
-            raise
 
         LOG.info(
             "Enabled port %s into DHCP configuration %s",
@@ -261,26 +397,14 @@ class FlatBridgeNetworkDriver(base.AbstractNetworkDriver):
 
     def create_ports(self, ports: tp.List[models.Port]) -> tp.List[models.Port]:
         """Create a list of ports."""
-        ctx = self._load_ctx()
+        ctx = self._edit_ctx()
         new_ports = []
 
         for port in ports:
-            for p in ctx.port_map[port.subnet]:
-                if p.uuid == port.uuid:
-                    raise DhcpPortAlreadyExists(port=port.uuid)
-
-            port.status = nc.PortStatus.ACTIVE.value
             ctx.add_port(port)
+            port.status = nc.PortStatus.ACTIVE.value
             new_ports.append(port)
 
-        # Add a new port, rebuild configuration, reload the service
-        try:
-            self._apply_cfg(ctx)
-        except Exception:
-            for port in ports:
-                port.status = nc.PortStatus.NEW.value
-            raise
-
         LOG.info(
             "Enabled ports %s into DHCP configuration %s",
             [p.uuid for p in ports],
@@ -291,20 +415,14 @@ class FlatBridgeNetworkDriver(base.AbstractNetworkDriver):
 
     def delete_subnet(self, subnet: models.Subnet) -> None:
         """Delete the subnet from data plane."""
-        ctx = self._load_ctx()
+        ctx = self._edit_ctx()
 
-        for s in ctx.subnets:
-            if s.uuid != subnet.uuid:
-                continue
-
-            ctx.delete_subnet(s)
-            self._apply_cfg(ctx)
+        if ctx.delete_subnet(subnet):
             LOG.info(
                 "Disabled subnet %s from DHCP configuration %s",
                 subnet.uuid,
                 self._dhcp_cfg_path,
             )
-
             return
 
         LOG.warning(
@@ -315,20 +433,14 @@ class FlatBridgeNetworkDriver(base.AbstractNetworkDriver):
 
     def delete_port(self, port: models.Port) -> None:
         """Delete the port from data plane."""
-        ctx = self._load_ctx()
-
-        for p in ctx.port_map[port.subnet]:
-            if p.uuid != port.uuid:
-                continue
+        ctx = self._edit_ctx()
 
-            ctx.delete_port(p)
-            self._apply_cfg(ctx)
+        if ctx.delete_port(port):
             LOG.info(
                 "Disabled port %s from DHCP configuration %s",
                 port.uuid,
                 self._dhcp_cfg_path,
             )
-
             return
 
         LOG.warning(
@@ -338,16 +450,10 @@ class FlatBridgeNetworkDriver(base.AbstractNetworkDriver):
         )
 
     def delete_ports(self, ports: tp.List[models.Port]) -> None:
-        ctx = self._load_ctx()
+        ctx = self._edit_ctx()
 
         for port in ports:
-            for p in ctx.port_map[port.subnet]:
-                if p.uuid != port.uuid:
-                    continue
-
-                ctx.delete_port(p)
-
-        self._apply_cfg(ctx)
+            ctx.delete_port(port)
 
         LOG.info(
             "Disabled ports %s from DHCP configuration %s",
@@ -357,18 +463,13 @@ class FlatBridgeNetworkDriver(base.AbstractNetworkDriver):
 
     def update_port(self, port: models.Port) -> models.Port:
         """Update the port in data plane."""
-        ctx = self._load_ctx()
+        ctx = self._edit_ctx()
 
         # it's equivalent to replace
         ctx.delete_port(port)
 
         port.status = nc.PortStatus.ACTIVE.value
-        try:
-            ctx.add_port(port)
-            self._apply_cfg(ctx)
-        except Exception:
-            port.status = nc.PortStatus.NEW.value
-            raise
+        ctx.add_port(port)
 
         LOG.info(
             "Updated port %s in DHCP configuration %s",
@@ -380,13 +481,12 @@ class FlatBridgeNetworkDriver(base.AbstractNetworkDriver):
 
     def update_subnet(self, subnet: models.Subnet) -> models.Subnet:
         """Update the subnet in data plane."""
-        ctx = self._load_ctx()
+        ctx = self._edit_ctx()
 
         # it's equivalent to replace
         # The ports will be added on a next iteration
         ctx.delete_subnet(subnet)
         ctx.add_subnet(subnet)
-        self._apply_cfg(ctx)
 
         LOG.info(
             "Updated subnet %s in DHCP configuration %s",
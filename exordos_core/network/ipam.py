@@ -14,6 +14,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import abc
+import array
 import logging
 import typing as tp
 import uuid as sys_uuid
@@ -25,6 +27,9 @@ from exordos_core.network.dm import models as net_models
 
 LOG = logging.getLogger(__name__)
 
+# Free IPs of a subnet, the type depends on the IPAM implementation
+_Pool = tp.TypeVar("_Pool")
+
 
 class IpamNoIPsAvailable(net_exceptions.CGNetException):
     __template__ = "No more IPs available for subnet {subnet}"
@@ -47,7 +52,9 @@ class IpamIpRangeOverlap(net_exceptions.CGNetException):
     ip_range_b: netaddr.IPRange
 
 
-class Ipam:
+class AbstractIpam(abc.ABC, tp.Generic[_Pool]):
+    """IPAM of subnets, free IPs of every subnet are kept in a pool."""
+
     def __init__(
         self,
         subnet_map: tp.Dict[net_models.Subnet, tp.List[net_models.Port]],
@@ -66,21 +73,25 @@ class Ipam:
         ports that are already allocated from this subnet.
         :type subnet_map: Dict[net_models.Subnet, List[net_models.Port]]
         """
-        self._pool_map = {}
+        self._pool_map: tp.Dict[net_models.Subnet, _Pool] = {}
 
-        # TODO(akremenetsky): No need to calculate the pool for each subnet here,
-        # we may do it in a lazy way when it will be required
+        # Pools may be added lazily later, see `NetworkState`
         for subnet, ports in subnet_map.items():
             self.add_subnet(subnet, ports)
 
+    def __contains__(self, subnet: net_models.Subnet) -> bool:
+        return subnet in self._pool_map
+
     def add_subnet(
         self, subnet: net_models.Subnet, ports: tp.Iterable[net_models.Port]
     ) -> None:
         self._pool_map[subnet] = self.calculate_pool(subnet, ports)
 
-    def calculate_pool(
-        self, subnet: net_models.Subnet, ports: tp.Iterable[net_models.Port]
-    ) -> tp.List[tp.Tuple[int, int]]:
+    def remove_subnet(self, subnet: net_models.Subnet) -> None:
+        self._pool_map.pop(subnet, None)
+
+    @staticmethod
+    def _pool_range(subnet: net_models.Subnet) -> tp.Tuple[int, int]:
         ip_start, ip_end = subnet.cidr[0], subnet.cidr[-1]
         if subnet.ip_range_pair:
             ip_start, ip_end = subnet.ip_range_pair
@@ -94,15 +105,82 @@ class Ipam:
                 ip_range_b=subnet.ip_discovery_range,
             )
 
-        pool = [(int(ip_start), int(ip_end))]
+        return int(ip_start), int(ip_end)
+
+    @staticmethod
+    def _occupied_ips(
+        subnet: net_models.Subnet, ports: tp.Iterable[net_models.Port]
+    ) -> tp.Iterator[int]:
         for port in ports:
             if port.ipv4 is not None:
                 # Exclude IPs from the discovery range
                 if subnet.ip_discovery_range and port.ipv4 in subnet.ip_discovery_range:
                     continue
 
-                ip = int(netaddr.IPAddress(port.ipv4))
-                self.occupy_ip(ip, pool)
+                yield int(netaddr.IPAddress(port.ipv4))
+
+    def reserve_ip(
+        self,
+        subnet: net_models.Subnet,
+        address: netaddr.IPAddress,
+    ) -> None:
+        """Occupy the IP allocated outside of this IPAM."""
+        if subnet not in self._pool_map:
+            raise IpamUndefinedSubnet(subnet=subnet.uuid)
+
+        # IPs from the discovery range aren't in the pool
+        if subnet.ip_discovery_range and address in subnet.ip_discovery_range:
+            return
+
+        self.occupy_ip(int(address), self._pool_map[subnet])
+
+    def release_ip(
+        self,
+        subnet: net_models.Subnet,
+        address: netaddr.IPAddress,
+    ) -> None:
+        """Free the IP released outside of this IPAM."""
+        if subnet.ip_discovery_range and address in subnet.ip_discovery_range:
+            return
+
+        self.deallocate_ip(subnet, address)
+
+    @abc.abstractmethod
+    def calculate_pool(
+        self, subnet: net_models.Subnet, ports: tp.Iterable[net_models.Port]
+    ) -> _Pool:
+        """Free IPs of the subnet with the ports."""
+
+    @abc.abstractmethod
+    def occupy_ip(self, address: int, address_pool: _Pool) -> None:
+        """Take the address out of the pool."""
+
+    @abc.abstractmethod
+    def allocate_ip(
+        self,
+        subnet: net_models.Subnet,
+        target_ip: tp.Optional[netaddr.IPAddress] = None,
+    ) -> netaddr.IPAddress:
+        """Take the target IP or the first free one."""
+
+    @abc.abstractmethod
+    def deallocate_ip(
+        self,
+        subnet: net_models.Subnet,
+        address: netaddr.IPAddress,
+    ) -> None:
+        """Return the IP to the pool."""
+
+
+class Ipam(AbstractIpam[tp.List[tp.Tuple[int, int]]]):
+    """IPAM keeping free IPs of every subnet as a list of ranges."""
+
+    def calculate_pool(
+        self, subnet: net_models.Subnet, ports: tp.Iterable[net_models.Port]
+    ) -> tp.List[tp.Tuple[int, int]]:
+        pool = [self._pool_range(subnet)]
+        for ip in self._occupied_ips(subnet, ports):
+            self.occupy_ip(ip, pool)
 
         return pool
 
@@ -143,12 +221,12 @@ class Ipam:
         target_ip: tp.Optional[netaddr.IPAddress] = None,
     ) -> netaddr.IPAddress:
         if subnet not in self._pool_map:
-            raise IpamUndefinedSubnet(subnet=str(subnet.uuid))
+            raise IpamUndefinedSubnet(subnet=subnet.uuid)
 
         address_pool = self._pool_map[subnet]
 
         if len(address_pool) == 0:
-            raise IpamNoIPsAvailable(subnet=str(subnet.uuid))
+            raise IpamNoIPsAvailable(subnet=subnet.uuid)
 
         # Try to occupy the target IP
         if target_ip is not None:
@@ -170,7 +248,7 @@ class Ipam:
         address: netaddr.IPAddress,
     ) -> None:
         if subnet not in self._pool_map:
-            raise IpamUndefinedSubnet(subnet=str(subnet.uuid))
+            raise IpamUndefinedSubnet(subnet=subnet.uuid)
 
         address_pool = self._pool_map[subnet]
 
@@ -198,3 +276,177 @@ class Ipam:
                 return
 
         address_pool.append((address, address))
+
+
+class AddressBitmap:
+    """Free addresses of a range as a bitmap with a summary tree.
+
+    Every address is a bit of a 64-bit word, a set bit means the address
+    is free. A complete binary tree over the words keeps the number of
+    free addresses of every subtree, so the lowest free address is found
+    by descending the tree and an address is occupied or released by
+    updating a single path. Both are O(log n) regardless of how
+    fragmented the range is. The bitmap is built from the occupied
+    addresses at once in O(n / 64 + occupied).
+    """
+
+    WORD = 64
+    FULL = (1 << WORD) - 1
+
+    def __init__(self, start: int, end: int, occupied: tp.Iterable[int] = ()) -> None:
+        self.start = start
+        self.end = end
+        size = end - start + 1
+        words = (size + self.WORD - 1) // self.WORD
+
+        self._words = array.array("Q", [self.FULL]) * words
+        tail = size % self.WORD
+        if tail:
+            self._words[-1] = (1 << tail) - 1
+
+        for address in occupied:
+            if start <= address <= end:
+                offset = address - start
+                self._words[offset // self.WORD] &= ~(1 << offset % self.WORD)
+
+        # Leaves of the tree are the words, the tree is built bottom-up
+        self._leaves = 1
+        while self._leaves < words:
+            self._leaves *= 2
+        self._tree = array.array("q", [0]) * (2 * self._leaves)
+        for i, word in enumerate(self._words):
+            self._tree[self._leaves + i] = word.bit_count()
+        for i in range(self._leaves - 1, 0, -1):
+            self._tree[i] = self._tree[2 * i] + self._tree[2 * i + 1]
+
+    def __len__(self) -> int:
+        """Number of free addresses."""
+        return self._tree[1]
+
+    def __contains__(self, address: int) -> bool:
+        """Whether the address is free."""
+        if not self.start <= address <= self.end:
+            return False
+        offset = address - self.start
+        return bool(self._words[offset // self.WORD] >> offset % self.WORD & 1)
+
+    def _update(self, word: int, delta: int) -> None:
+        i = self._leaves + word
+        while i:
+            self._tree[i] += delta
+            i //= 2
+
+    def occupy(self, address: int) -> bool:
+        """Mark the address as occupied, False if it isn't free."""
+        if address not in self:
+            return False
+        offset = address - self.start
+        self._words[offset // self.WORD] &= ~(1 << offset % self.WORD)
+        self._update(offset // self.WORD, -1)
+        return True
+
+    def release(self, address: int) -> bool:
+        """Mark the address as free, False if it's out of range or free."""
+        if not self.start <= address <= self.end or address in self:
+            return False
+        offset = address - self.start
+        self._words[offset // self.WORD] |= 1 << offset % self.WORD
+        self._update(offset // self.WORD, 1)
+        return True
+
+    def first(self) -> int:
+        """The lowest free address."""
+        if not len(self):
+            raise IndexError("No free addresses")
+
+        i = 1
+        while i < self._leaves:
+            i = 2 * i if self._tree[2 * i] else 2 * i + 1
+        word = i - self._leaves
+        bits = self._words[word]
+        return self.start + word * self.WORD + (bits & -bits).bit_length() - 1
+
+    def ranges(self) -> tp.List[tp.Tuple[int, int]]:
+        """Free addresses as a list of ranges, O(n)."""
+        ranges = []
+        range_start = None
+        for offset in range(self.end - self.start + 1):
+            free = self._words[offset // self.WORD] >> offset % self.WORD & 1
+            if free and range_start is None:
+                range_start = offset
+            elif not free and range_start is not None:
+                ranges.append((self.start + range_start, self.start + offset - 1))
+                range_start = None
+        if range_start is not None:
+            ranges.append((self.start + range_start, self.end))
+        return ranges
+
+
+class BitmapIpam(AbstractIpam[AddressBitmap]):
+    """IPAM keeping free IPs of every subnet in an `AddressBitmap`.
+
+    Unlike the list of ranges allocating and releasing IPs doesn't depend
+    on the fragmentation of the subnet, and the pool is built from the
+    occupied IPs without any scanning. IPs out of the subnet range can't
+    be released into the pool, they are only logged.
+    """
+
+    def calculate_pool(
+        self, subnet: net_models.Subnet, ports: tp.Iterable[net_models.Port]
+    ) -> AddressBitmap:
+        start, end = self._pool_range(subnet)
+        occupied = []
+        for ip in self._occupied_ips(subnet, ports):
+            if not start <= ip <= end:
+                LOG.warning("IP %s is not in the pool", ip)
+                continue
+            occupied.append(ip)
+
+        return AddressBitmap(start, end, occupied)
+
+    def occupy_ip(self, address: int, address_pool: AddressBitmap) -> None:
+        # See the `Ipam.occupy_ip` why it isn't an error
+        if not address_pool.occupy(address):
+            LOG.warning("IP %s is not in the pool", address)
+
+    def allocate_ip(
+        self,
+        subnet: net_models.Subnet,
+        target_ip: tp.Optional[netaddr.IPAddress] = None,
+    ) -> netaddr.IPAddress:
+        if subnet not in self._pool_map:
+            raise IpamUndefinedSubnet(subnet=subnet.uuid)
+
+        address_pool = self._pool_map[subnet]
+
+        if len(address_pool) == 0:
+            raise IpamNoIPsAvailable(subnet=subnet.uuid)
+
+        # Try to occupy the target IP
+        if target_ip is not None:
+            self.occupy_ip(int(target_ip), address_pool)
+            return target_ip
+
+        address = address_pool.first()
+        address_pool.occupy(address)
+        return netaddr.IPAddress(address)
+
+    def deallocate_ip(
+        self,
+        subnet: net_models.Subnet,
+        address: netaddr.IPAddress,
+    ) -> None:
+        if subnet not in self._pool_map:
+            raise IpamUndefinedSubnet(subnet=subnet.uuid)
+
+        address = int(address)
+        if not self._pool_map[subnet].release(address):
+            LOG.warning("IP %s is not allocated", address)
+
+
+# IPAM implementations by the names used in the configuration
+IPAM_BACKENDS: tp.Dict[str, tp.Type[AbstractIpam]] = {
+    "ranges": Ipam,
+    "bitmap": BitmapIpam,
+}
+DEF_IPAM_BACKEND = "ranges"
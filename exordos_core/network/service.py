@@ -22,9 +22,13 @@ from gcl_looper.services import basic
 import netaddr
 from restalchemy.common import contexts
 from restalchemy.dm import filters as dm_filters
+from restalchemy.storage import exceptions as ra_exceptions
+from restalchemy.storage.sql import utils as sql_utils
 
 from exordos_core.compute.dm import models
+from exordos_core.network import allocation as net_allocation
 from exordos_core.network import ipam as net_ipam
+from exordos_core.network import state as net_state
 from exordos_core.network.dm import models as net_models
 from exordos_core.network.driver import base as net_base
 
@@ -33,6 +37,19 @@ TARGET_IP_KEY = "target_ipv4"
 
 
 class NetworkService(basic.BasicService):
+    def __init__(
+        self,
+        iter_min_period: int = 1,
+        iter_pause: float = 0.1,
+        ipam_class: tp.Type[net_ipam.AbstractIpam] = net_ipam.Ipam,
+        resync_period: float = net_state.RESYNC_PERIOD,
+        batch_allocation: bool = False,
+    ):
+        super().__init__(iter_min_period, iter_pause)
+        self._state = net_state.NetworkState(ipam_class, resync_period)
+        self._allocator = net_allocation.PortAllocator(self._state)
+        self._batch_allocation = batch_allocation
+
     def _get_new_vm_nodes(self) -> tp.List[models.NodeWithoutPorts]:
         return models.NodeWithoutPorts.get_vm_nodes()
 
@@ -67,30 +84,11 @@ class NetworkService(basic.BasicService):
     def _get_subnet_map(
         self,
     ) -> tp.Dict[net_models.Subnet, tp.List[net_models.Port]]:
-        # TODO(akremenetsky): Take all subnets so far.
-        # This snippet will be reworked.
-        subnets = net_models.Subnet.objects.get_all()
-        ports = net_models.Port.objects.get_all(
-            filters={
-                "subnet": dm_filters.In([str(subnet.uuid) for subnet in subnets]),
-            }
-        )
-
-        port_subnet_map = collections.defaultdict(list)
-        for port in ports:
-            port_subnet_map[port.subnet.uuid].append(port)
-
         # A subnet can be created without any ports. In this case
-        # we create an empty list for this subnet so that the
-        # actualization logic will work correctly.
-        subnet_map = {}
-        for subnet in subnets:
-            if subnet.uuid in port_subnet_map:
-                subnet_map[subnet] = port_subnet_map[subnet.uuid]
-            else:
-                subnet_map[subnet] = []
-
-        return subnet_map
+        # the subnet has an empty list so that the actualization logic
+        # will work correctly.
+        self._state.refresh()
+        return self._state.subnet_map()
 
     def _build_network_map(
         self, subnet_map: tp.Dict[net_models.Subnet, tp.List[net_models.Port]]
@@ -145,6 +143,16 @@ class NetworkService(basic.BasicService):
             except Exception:
                 LOG.exception("Error actualizing subnet %s", actual_subnet.uuid)
 
+        # Apply all changes of the network at once
+        driver.flush()
+
+    @staticmethod
+    def _fresh_node(port: net_models.Port) -> models.Node:
+        # Ports are kept between iterations, so their nodes may be outdated
+        return models.Node.objects.get_one(
+            filters={"uuid": dm_filters.EQ(port.node.uuid)}
+        )
+
     def _actualize_subnet(
         self,
         driver: net_base.AbstractNetworkDriver,
@@ -189,8 +197,9 @@ class NetworkService(basic.BasicService):
 
             try:
                 # Update `default_network` for the node
-                if "port" not in target_port.node.default_network:
-                    target_port.node.update_default_network(p)
+                node = self._fresh_node(target_port)
+                if "port" not in node.default_network:
+                    node.update_default_network(p)
                 target_port.update()
             except Exception:
                 LOG.exception("Error creating port %s", target_port.uuid)
@@ -233,10 +242,9 @@ class NetworkService(basic.BasicService):
 
                 try:
                     # Update `default_network` for the node as well
-                    if target_port.node.default_network.get("port") == str(
-                        target_port.uuid
-                    ):
-                        target_port.node.update_default_network(actual_port)
+                    node = self._fresh_node(target_port)
+                    if node.default_network.get("port") == str(target_port.uuid):
+                        node.update_default_network(actual_port)
                     target_port.update()
                 except Exception:
                     LOG.exception(
@@ -251,12 +259,12 @@ class NetworkService(basic.BasicService):
         # TODO(akremenetsky): Remove the dirty hack to exclude boot network
         return subnet.next_server is None
 
-    def _allocate_port(
+    def _new_port(
         self,
         node: models.NodeWithoutPorts,
-        ipam: net_ipam.Ipam,
         subnet_map: tp.Dict[net_models.Subnet, tp.List[net_models.Port]],
     ) -> net_models.Port:
+        """New port of the VM node without IP."""
         # Figure out the correct subnet
         for subnet, ports in subnet_map.items():
             if self._is_subnet_match(node, subnet):
@@ -268,13 +276,11 @@ class NetworkService(basic.BasicService):
         if node.default_network.get(TARGET_IP_KEY):
             target_ip = netaddr.IPAddress(node.default_network[TARGET_IP_KEY])
 
-        ip = ipam.allocate_ip(subnet, target_ip)
         mask = subnet.cidr.netmask
         target_mask = mask if target_ip else None
         port = models.Port(
             target_ipv4=target_ip,
             target_mask=target_mask,
-            ipv4=ip,
             mask=mask,
             node=node.uuid,
             mac=models.Port.generate_mac(),
@@ -282,55 +288,113 @@ class NetworkService(basic.BasicService):
             subnet=subnet.uuid,
             source=subnet.name,
         )
-        net_port = net_models.Port.restore_from_simple_view(
-            **port.dump_to_simple_view()
-        )
+        return net_models.Port.restore_from_simple_view(**port.dump_to_simple_view())
+
+    def _allocate_port(
+        self,
+        node: models.NodeWithoutPorts,
+        subnet_map: tp.Dict[net_models.Subnet, tp.List[net_models.Port]],
+    ) -> net_models.Port:
+        port = self._new_port(node, subnet_map)
+        port.ipv4 = self._state.allocate_ip(port.subnet, port.target_ipv4)
+        return port
 
-        subnet_map[subnet].append(net_port)
+    def _insert_port(
+        self,
+        port: net_models.Port,
+        subnet_map: tp.Dict[net_models.Subnet, tp.List[net_models.Port]],
+    ) -> None:
+        """Insert the port with the allocated IP."""
+        try:
+            with sql_utils.savepoint("insert_port"):
+                port.insert()
+        except ra_exceptions.ConflictRecords:
+            # The IP has been taken by a concurrent worker, so it stays
+            # occupied in the IPAM. The port is allocated on the next
+            # iteration.
+            LOG.warning("The IP %s of port %s is taken", port.ipv4, port.uuid)
+            return
+        except Exception:
+            self._state.deallocate_ip(port.subnet, port.ipv4)
+            raise
 
-        return net_port
+        self._state.add_port(port)
+        subnet_map[port.subnet].append(port)
 
-    def _iteration(self) -> None:
-        ipam = None
+    def _allocate_ports(
+        self,
+        new_vm_nodes: tp.Iterable[models.NodeWithoutPorts],
+        new_hw_ports: tp.Iterable[net_models.Port],
+        subnet_map: tp.Dict[net_models.Subnet, tp.List[net_models.Port]],
+    ) -> None:
+        """Allocate IPs and insert the new ports one by one."""
+        # There are new nodes. Allocate ports to them.
+        for node in new_vm_nodes:
+            # Try to allocate a port for the new node
+            try:
+                port = self._allocate_port(node, subnet_map)
+                self._insert_port(port, subnet_map)
+            except ValueError:
+                LOG.error("No suitable subnet found for node %s", node.uuid)
+            except Exception:
+                LOG.exception("Error allocating port for node %s", node.uuid)
 
-        with contexts.Context().session_manager():
-            new_vm_nodes = self._get_new_vm_nodes()
-            subnet_map = self._get_subnet_map()
-            new_hw_ports = self._get_new_hw_ports(subnet_map.keys())
-            network_map = self._build_network_map(subnet_map)
+        # There are new HW ports. Allocate IPs to them.
+        for port in new_hw_ports:
+            try:
+                port.ipv4 = self._state.allocate_ip(port.subnet)
+                self._insert_port(port, subnet_map)
+            except Exception:
+                LOG.exception("Error allocating IP for machine %s", port.machine)
 
-            # There are new nodes. Allocate ports to them.
-            for node in new_vm_nodes:
-                # Initialize ipam if needed
-                if ipam is None:
-                    ipam = net_ipam.Ipam(subnet_map)
+    def _allocate_ports_batch(
+        self,
+        new_vm_nodes: tp.Iterable[models.NodeWithoutPorts],
+        new_hw_ports: tp.Iterable[net_models.Port],
+        subnet_map: tp.Dict[net_models.Subnet, tp.List[net_models.Port]],
+    ) -> None:
+        """Allocate IPs for all new ports and insert them at once."""
+        ports = []
+        for node in new_vm_nodes:
+            try:
+                ports.append(self._new_port(node, subnet_map))
+            except ValueError:
+                LOG.error("No suitable subnet found for node %s", node.uuid)
+        ports.extend(new_hw_ports)
 
-                # Try to allocate a port for the new node
-                try:
-                    port = self._allocate_port(node, ipam, subnet_map)
-                    port.insert()
-                except ValueError:
-                    LOG.error("No suitable subnet found for node %s", node.uuid)
-                    continue
-                except Exception:
-                    ipam.deallocate_ip(port.subnet, port.ipv4)
-                    LOG.exception("Error allocating port for node %s", node.uuid)
-
-            # There are new HW ports. Allocate IPs to them.
-            for port in new_hw_ports:
-                # Initialize ipam if needed
-                if ipam is None:
-                    ipam = net_ipam.Ipam(subnet_map)
-                try:
-                    port.ipv4 = ipam.allocate_ip(port.subnet)
-                    port.insert()
-                    subnet_map[port.subnet].append(port)
-                except Exception:
-                    LOG.exception("Error allocating IP for machine %s", port.machine)
+        if not ports:
+            return
 
-            # Actualize ports and subnets on the data plane
-            for network, net_subnet_map in network_map.items():
-                try:
-                    self._actualize_network(network, net_subnet_map)
-                except Exception:
-                    LOG.exception("Error actualizing network %s", network.uuid)
+        try:
+            allocated = self._allocator.allocate(ports)
+        except Exception:
+            LOG.exception("Error allocating ports %s", [p.uuid for p in ports])
+            return
+
+        for port in allocated:
+            subnet_map[port.subnet].append(port)
+
+    def _iteration(self) -> None:
+        try:
+            with contexts.Context().session_manager():
+                new_vm_nodes = self._get_new_vm_nodes()
+                subnet_map = self._get_subnet_map()
+                new_hw_ports = self._get_new_hw_ports(subnet_map.keys())
+                network_map = self._build_network_map(subnet_map)
+
+                # There are new nodes and HW ports. Allocate ports to them.
+                if self._batch_allocation:
+                    self._allocate_ports_batch(new_vm_nodes, new_hw_ports, subnet_map)
+                else:
+                    self._allocate_ports(new_vm_nodes, new_hw_ports, subnet_map)
+
+                # Actualize ports and subnets on the data plane
+                for network, net_subnet_map in network_map.items():
+                    try:
+                        self._actualize_network(network, net_subnet_map)
+                    except Exception:
+                        LOG.exception("Error actualizing network %s", network.uuid)
+        except Exception:
+            # The transaction is rolled back, the cached state may be wrong
+            self._state.reset()
+            raise
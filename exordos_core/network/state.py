@@ -0,0 +1,243 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Subnets, ports and IPAM pools of the network service.
+
+Loading all ports and rebuilding the IPAM pools of all subnets on every
+iteration costs O(all ports) even if nothing has changed. The state is
+kept between iterations instead. Subnets are few and are loaded every
+time, a changed subnet drops its ports and pool. Ports are fetched
+incrementally by the `updated_at` watermark, deleted ports are detected
+periodically by comparing the number of ports per subnet. A deleted port
+only keeps its IP reserved until the check, so the check doesn't have to
+run on every iteration. IPAM pools are built lazily on the first
+allocation in the subnet and then kept actual by the port changes. A
+periodic full resync is a safety net for changes the watermark may miss.
+"""
+
+import datetime
+import logging
+import time
+import typing as tp
+import uuid as sys_uuid
+
+import netaddr
+from restalchemy.dm import filters as dm_filters
+from restalchemy.storage.sql import engines
+
+from exordos_core.network import ipam as net_ipam
+from exordos_core.network.dm import models as net_models
+
+LOG = logging.getLogger(__name__)
+
+# Full resync period in seconds, non-positive resyncs on every refresh
+RESYNC_PERIOD = 300.0
+# The timestamps are set before the transactions are committed, so the
+# ports are fetched with some overlap to not miss the late commits
+WATERMARK_OVERLAP = datetime.timedelta(seconds=30)
+# Period in seconds of the check for deleted ports, non-positive checks
+# on every refresh
+DELETION_CHECK_PERIOD = 30.0
+
+
+class NetworkState:
+    def __init__(
+        self,
+        ipam_class: tp.Type[net_ipam.AbstractIpam] = net_ipam.Ipam,
+        resync_period: float = RESYNC_PERIOD,
+        deletion_check_period: float = DELETION_CHECK_PERIOD,
+    ) -> None:
+        self._ipam = ipam_class({})
+        self._resync_period = resync_period
+        self._deletion_check_period = deletion_check_period
+        self._last_resync: tp.Optional[float] = None
+        self._last_deletion_check: tp.Optional[float] = None
+        self._watermark: tp.Optional[datetime.datetime] = None
+
+        self._subnets: tp.Dict[sys_uuid.UUID, net_models.Subnet] = {}
+        self._ports: tp.Dict[
+            sys_uuid.UUID, tp.Dict[sys_uuid.UUID, net_models.Port]
+        ] = {}
+
+    def reset(self) -> None:
+        """Drop the state, it's loaded from scratch on the next refresh."""
+        for subnet in self._subnets.values():
+            self._ipam.remove_subnet(subnet)
+        self._subnets.clear()
+        self._ports.clear()
+        self._watermark = None
+        self._last_resync = None
+        self._last_deletion_check = None
+
+    def _advance(self, ports: tp.Iterable[net_models.Port]) -> None:
+        for port in ports:
+            if self._watermark is None or port.updated_at > self._watermark:
+                self._watermark = port.updated_at
+
+    def _load_ports(
+        self, subnets: tp.Collection[sys_uuid.UUID], **filters: tp.Any
+    ) -> tp.List[net_models.Port]:
+        if not subnets:
+            return []
+
+        ports = net_models.Port.objects.get_all(
+            filters={"subnet": dm_filters.In([str(s) for s in subnets]), **filters}
+        )
+        self._advance(ports)
+        return ports
+
+    @staticmethod
+    def _port_counts(
+        subnets: tp.Collection[sys_uuid.UUID],
+    ) -> tp.Dict[sys_uuid.UUID, int]:
+        if not subnets:
+            return {}
+
+        engine = engines.engine_factory.get_engine()
+        with engine.session_manager() as session:
+            rows = session.execute(
+                f"""
+                SELECT subnet, count(*) AS count
+                FROM {net_models.Port.__tablename__}
+                WHERE subnet = ANY(%s)
+                GROUP BY subnet;
+                """,
+                (list(subnets),),
+            ).fetchall()
+        return {sys_uuid.UUID(str(r["subnet"])): r["count"] for r in rows}
+
+    def _apply(
+        self,
+        subnet: net_models.Subnet,
+        old: tp.Optional[net_models.Port],
+        new: tp.Optional[net_models.Port],
+    ) -> None:
+        """Account the port change in the IPAM pool of the subnet."""
+        old_ip = old.ipv4 if old is not None else None
+        new_ip = new.ipv4 if new is not None else None
+        if old_ip == new_ip or subnet not in self._ipam:
+            return
+
+        if old_ip is not None:
+            self._ipam.release_ip(subnet, old_ip)
+        if new_ip is not None:
+            self._ipam.reserve_ip(subnet, new_ip)
+
+    def _replace_ports(
+        self, subnet: sys_uuid.UUID, ports: tp.Iterable[net_models.Port]
+    ) -> None:
+        cached = self._ports.get(subnet, {})
+        fetched = {p.uuid: p for p in ports}
+        for uuid in cached.keys() | fetched.keys():
+            self._apply(self._subnets[subnet], cached.get(uuid), fetched.get(uuid))
+        self._ports[subnet] = fetched
+
+    def refresh(self) -> None:
+        """Fetch the changes since the previous refresh."""
+        now = time.monotonic()
+        resync = (
+            self._last_resync is None or now - self._last_resync >= self._resync_period
+        )
+
+        subnets = {s.uuid: s for s in net_models.Subnet.objects.get_all()}
+
+        # New, changed and deleted subnets are loaded from scratch
+        invalid = {
+            uuid
+            for uuid, subnet in self._subnets.items()
+            if resync
+            or uuid not in subnets
+            or subnet.updated_at != subnets[uuid].updated_at
+        }
+        invalid |= subnets.keys() - self._subnets.keys()
+        for uuid in invalid:
+            self._ports.pop(uuid, None)
+            if uuid in self._subnets:
+                self._ipam.remove_subnet(self._subnets[uuid])
+
+        watermark = self._watermark
+        if resync:
+            self._watermark = None
+        self._subnets = subnets
+
+        loaded = invalid & subnets.keys()
+        ports_map: tp.Dict[sys_uuid.UUID, tp.List[net_models.Port]] = {
+            uuid: [] for uuid in loaded
+        }
+        for port in self._load_ports(loaded):
+            ports_map[port.subnet.uuid].append(port)
+        for uuid, ports in ports_map.items():
+            self._ports[uuid] = {p.uuid: p for p in ports}
+
+        # Changed ports of the other subnets
+        cached = subnets.keys() - loaded
+        if cached and watermark is not None:
+            for port in self._load_ports(
+                cached,
+                updated_at=dm_filters.GE(watermark - WATERMARK_OVERLAP),
+            ):
+                subnet_ports = self._ports[port.subnet.uuid]
+                self._apply(
+                    subnets[port.subnet.uuid], subnet_ports.get(port.uuid), port
+                )
+                subnet_ports[port.uuid] = port
+
+        # Deleted ports or ports missed by the watermark
+        check = (
+            self._last_deletion_check is None
+            or now - self._last_deletion_check >= self._deletion_check_period
+        )
+        if check:
+            counts = self._port_counts(cached)
+            for uuid in cached:
+                if counts.get(uuid, 0) != len(self._ports[uuid]):
+                    self._replace_ports(uuid, self._load_ports((uuid,)))
+            self._last_deletion_check = now
+
+        if resync:
+            self._last_resync = now
+
+    def subnet_map(
+        self,
+    ) -> tp.Dict[net_models.Subnet, tp.List[net_models.Port]]:
+        return {s: list(self._ports[u].values()) for u, s in self._subnets.items()}
+
+    def add_port(self, port: net_models.Port) -> None:
+        """Account the port inserted by the service itself."""
+        self._ports[port.subnet.uuid][port.uuid] = port
+
+    def _subnet_ipam(self, subnet: net_models.Subnet) -> net_ipam.AbstractIpam:
+        if subnet not in self._ipam:
+            self._ipam.add_subnet(subnet, self._ports[subnet.uuid].values())
+        return self._ipam
+
+    def allocate_ip(
+        self,
+        subnet: net_models.Subnet,
+        target_ip: tp.Optional[netaddr.IPAddress] = None,
+    ) -> netaddr.IPAddress:
+        if subnet.uuid not in self._subnets:
+            raise net_ipam.IpamUndefinedSubnet(subnet=subnet.uuid)
+
+        return self._subnet_ipam(subnet).allocate_ip(subnet, target_ip)
+
+    def deallocate_ip(
+        self,
+        subnet: net_models.Subnet,
+        address: netaddr.IPAddress,
+    ) -> None:
+        if subnet in self._ipam:
+            self._ipam.deallocate_ip(subnet, address)
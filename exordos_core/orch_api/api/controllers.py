@@ -13,10 +13,53 @@
 #    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 #    License for the specific language governing permissions and limitations
 #    under the License.
+import logging
+import typing as tp
+
+from gcl_sdk.agents.universal.dm import models as ua_models
+from gcl_sdk.agents.universal.orch_api import controllers as orch_controllers
+from restalchemy.api import actions
 from restalchemy.api import controllers
+from restalchemy.storage.sql import engines
+
+from exordos_core.gservice import heartbeat
+
+LOG = logging.getLogger(__name__)
 
 
 class ApiEndpointController(controllers.RoutesListController):
     """Controller for /v1/ endpoint"""
 
     __TARGET_PATH__ = "/v1/"
+
+
+class UniversalAgentsController(orch_controllers.UniversalAgentsController):
+    """Controller for /v1/agents/ endpoint"""
+
+    @staticmethod
+    def _touch(agent: ua_models.UniversalAgent) -> None:
+        session = engines.engine_factory.get_engine().get_session()
+        try:
+            heartbeat.touch(session, (agent.uuid,))
+            session.commit()
+        except Exception:
+            session.rollback()
+            LOG.exception("Unable to update heartbeat of agent %s", agent.uuid)
+        finally:
+            session.close()
+
+    @actions.get
+    def get_payload(
+        self,
+        resource: ua_models.UniversalAgent,
+        hash: str = "",
+        version: str = "0",
+    ) -> tp.Dict[str, tp.Any]:
+        # Polling the payload is the heartbeat of the agents run elsewhere.
+        # The record is touched once per heartbeat period in a session of
+        # its own, so a failure doesn't abort the transaction of the poll.
+        if heartbeat.is_due(resource):
+            self._touch(resource)
+
+        payload = resource.get_payload(hash=hash, version=int(version))
+        return payload.dump_to_simple_view()
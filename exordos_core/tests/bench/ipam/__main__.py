@@ -0,0 +1,84 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Run the IPAM benchmarks.
+
+python -m exordos_core.tests.bench.ipam --prefixes 24 20 16
+"""
+
+import argparse
+
+from exordos_core.network import ipam as net_ipam
+from exordos_core.tests.bench.ipam import harness
+
+HEADER = (
+    f"{'backend':<8}{'prefix':>7}{'ports':>8}{'build, s':>10}{'ops':>8}{'ops/s':>12}"
+)
+
+
+def _format(report: harness.Report) -> str:
+    return (
+        f"{report.backend:<8}{report.prefix:>7}{report.ports:>8}"
+        f"{report.build_seconds:>10.3f}{report.operations:>8}"
+        f"{report.ops_per_sec:>12.0f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--prefixes",
+        type=int,
+        nargs="+",
+        default=[24, 20, 18],
+        help="Prefix lengths of the subnets, 16 takes minutes for 'ranges'",
+    )
+    parser.add_argument(
+        "--fill",
+        type=float,
+        default=0.5,
+        help="Share of the subnet occupied by random ports",
+    )
+    parser.add_argument(
+        "--operations",
+        type=int,
+        default=10000,
+        help="Number of allocations and releases after the build",
+    )
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        choices=tuple(net_ipam.IPAM_BACKENDS),
+        default=list(net_ipam.IPAM_BACKENDS),
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(HEADER)
+    for prefix in args.prefixes:
+        subnet, ports = harness.generate(prefix, args.fill, seed=args.seed)
+        reports = [
+            harness.run(backend, subnet, ports, args.operations, seed=args.seed)
+            for backend in args.backends
+        ]
+        for report in reports:
+            print(_format(report))
+        if len({r.allocated for r in reports}) > 1:
+            print("WARNING: the backends allocated different IPs")
+
+
+if __name__ == "__main__":
+    main()
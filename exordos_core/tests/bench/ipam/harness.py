@@ -0,0 +1,106 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Drive the IPAM backends on fragmented subnets.
+
+A share of the subnet is occupied by random ports, so the free space is
+split into many small ranges. Every run builds the pools as
+`NetworkService` does and then allocates and releases IPs in turns.
+"""
+
+import random
+import time
+import typing as tp
+import uuid as sys_uuid
+
+import netaddr
+
+from exordos_core.common import constants as c
+from exordos_core.compute.dm import models
+from exordos_core.network import ipam as net_ipam
+
+
+class SimPort(tp.NamedTuple):
+    ipv4: netaddr.IPAddress
+
+
+class Report(tp.NamedTuple):
+    backend: str
+    prefix: int
+    ports: int
+    build_seconds: float
+    operations: int
+    seconds: float
+    # Allocated IPs, the same for all backends on the same input
+    allocated: tp.Tuple[int, ...]
+
+    @property
+    def ops_per_sec(self) -> float:
+        return self.operations / self.seconds if self.seconds else 0.0
+
+
+def generate(
+    prefix: int, fill: float, seed: int = 0
+) -> tp.Tuple[models.Subnet, tp.List[SimPort]]:
+    """Subnet with the given share of random IPs occupied by ports."""
+    subnet = models.Subnet(
+        network=sys_uuid.uuid4(),
+        cidr=netaddr.IPNetwork(f"10.0.0.0/{prefix}"),
+        project_id=c.SERVICE_PROJECT_ID,
+    )
+    first, last = subnet.cidr.first, subnet.cidr.last
+    rnd = random.Random(seed)
+    occupied = rnd.sample(range(first, last + 1), int((last - first + 1) * fill))
+    return subnet, [SimPort(netaddr.IPAddress(ip)) for ip in occupied]
+
+
+def run(
+    backend: str,
+    subnet: models.Subnet,
+    ports: tp.List[SimPort],
+    operations: int,
+    seed: int = 0,
+) -> Report:
+    ipam_class = net_ipam.IPAM_BACKENDS[backend]
+
+    start = time.perf_counter()
+    ipam = ipam_class({subnet: ports})
+    build_seconds = time.perf_counter() - start
+
+    rnd = random.Random(seed)
+    taken = [p.ipv4 for p in ports]
+    allocated = []
+
+    start = time.perf_counter()
+    for _ in range(operations // 2):
+        ip = ipam.allocate_ip(subnet)
+        allocated.append(int(ip))
+        taken.append(ip)
+        # Release a random occupied IP to keep the subnet fragmented
+        i = rnd.randrange(len(taken))
+        taken[i], taken[-1] = taken[-1], taken[i]
+        ipam.deallocate_ip(subnet, taken.pop())
+    seconds = time.perf_counter() - start
+
+    return Report(
+        backend=backend,
+        prefix=subnet.cidr.prefixlen,
+        ports=len(ports),
+        build_seconds=build_seconds,
+        operations=operations // 2 * 2,
+        seconds=seconds,
+        allocated=tuple(allocated),
+    )
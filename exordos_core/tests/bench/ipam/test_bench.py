@@ -0,0 +1,28 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from exordos_core.tests.bench.ipam import harness
+
+
+class TestIpamBench:
+    def test_backends_allocate_the_same(self):
+        subnet, ports = harness.generate(prefix=22, fill=0.5)
+
+        ranges = harness.run("ranges", subnet, ports, operations=1000)
+        bitmap = harness.run("bitmap", subnet, ports, operations=1000)
+
+        assert ranges.operations == bitmap.operations == 1000
+        assert ranges.allocated == bitmap.allocated
@@ -0,0 +1,102 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Run the scheduler benchmarks.
+
+DATABASE_URI=postgresql://... python -m exordos_core.tests.bench.scheduler \
+    --scales 100 1000 10000
+
+The database is cleaned up after every run, don't use a production one.
+"""
+
+import argparse
+
+from exordos_core.tests.bench.scheduler import harness
+from exordos_core.tests.bench.scheduler import synthetic
+
+HEADER = (
+    f"{'mode':<8}{'nodes':>8}{'placed':>8}{'iters':>7}{'place/s':>12}"
+    f"{'queries':>10}{'packing':>9}{'frag':>7}{'viol':>6}"
+)
+
+
+def _format(report: harness.Report) -> str:
+    return (
+        f"{report.mode:<8}{report.nodes:>8}{report.placed:>8}{report.iterations:>7}"
+        f"{report.placements_per_sec:>12.0f}{report.queries:>10}"
+        f"{report.packing:>9.3f}{report.fragmentation:>7.3f}"
+        f"{report.violations:>6}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--scales",
+        type=int,
+        nargs="+",
+        default=[100, 1000, 10000],
+        help="Numbers of nodes to schedule",
+    )
+    parser.add_argument(
+        "--nodes-per-pool",
+        type=int,
+        default=10,
+        help="Nodes per pool, the number of pools depends on the scale",
+    )
+    parser.add_argument(
+        "--zones",
+        type=int,
+        default=0,
+        help="Number of placement zones for the pools",
+    )
+    parser.add_argument(
+        "--policy-ratio",
+        type=float,
+        default=0.3,
+        help="Share of nodes in soft anti-affinity policies",
+    )
+    parser.add_argument(
+        "--modes",
+        nargs="+",
+        choices=("serial", "batch", "hw"),
+        default=["serial", "batch", "hw"],
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(HEADER)
+    for scale in args.scales:
+        for mode in args.modes:
+            # Every run gets a fresh inventory since the runs change it
+            inventory = synthetic.generate(
+                nodes=scale if mode != "hw" else 0,
+                pools=max(scale // args.nodes_per_pool, 1),
+                machines=2 * scale if mode == "hw" else 0,
+                hw_nodes=scale if mode == "hw" else 0,
+                zones=args.zones,
+                policy_ratio=args.policy_ratio,
+                seed=args.seed,
+            )
+            if mode == "hw":
+                report = harness.run_machines(inventory)
+            else:
+                report = harness.run_pools(inventory, batch=mode == "batch")
+            print(_format(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,398 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Drive the real scheduler service against a database.
+
+The synthetic inventory is saved to an empty database, then the
+iterations of `SchedulerService` are run until they stop placing nodes.
+Only the iterations are timed and the queries are counted on the
+database sessions, so the numbers come from the same code paths as in
+production. The database is set up as for the functional tests, see
+`DATABASE_URI`. An in-memory stand-in can't answer the raw SQL of the
+scheduler (capacity, reservations and policy occupancy queries), so the
+runs are skipped if the database isn't available.
+"""
+
+import contextlib
+import time
+import typing as tp
+import uuid as sys_uuid
+
+from gcl_sdk.agents.universal.dm import models as ua_models
+import psycopg
+from gcl_sdk.infra.dm import models as sdk_infra_models
+from restalchemy.dm import filters as dm_filters
+from restalchemy.storage.sql import engines
+from restalchemy.storage.sql import sessions
+
+from exordos_core.common import constants as c
+from exordos_core.compute import constants as nc
+from exordos_core.compute.dm import models
+from exordos_core.compute.scheduler import pipeline
+from exordos_core.compute.scheduler import service
+from exordos_core.tests.bench.scheduler import synthetic
+from exordos_core.tests.functional import consts
+from exordos_core.tests.functional import utils as test_utils
+
+FIRST_MIGRATION = "0000-root-d34de1.py"
+CONNECT_TIMEOUT = 2
+IMAGE = "ubuntu_24.04"
+# Upper bound of iterations, every iteration handles a page of nodes
+MAX_ITERATIONS = 1000
+
+
+class Report(tp.NamedTuple):
+    mode: str
+    nodes: int
+    placed: int
+    iterations: int
+    seconds: float
+    queries: int
+    # Share of capacity used in the pools or machines that got nodes
+    packing: float
+    # Share of free cores in pools unable to fit the biggest flavor
+    fragmentation: float
+    # Soft anti-affinity policies with several members in a pool
+    violations: int
+
+    @property
+    def placements_per_sec(self) -> float:
+        return self.placed / self.seconds if self.seconds else 0.0
+
+
+class QueryCounter:
+    """Count the statements executed by the database sessions."""
+
+    def __init__(self) -> None:
+        self.queries = 0
+
+    def _counted(self, func: tp.Callable[..., tp.Any]) -> tp.Callable[..., tp.Any]:
+        def wrapper(session: tp.Any, *args: tp.Any, **kwargs: tp.Any) -> tp.Any:
+            self.queries += 1
+            return func(session, *args, **kwargs)
+
+        return wrapper
+
+    @contextlib.contextmanager
+    def counting(self) -> tp.Iterator["QueryCounter"]:
+        origin = sessions.PgSQLSession.execute, sessions.PgSQLSession.execute_many
+        sessions.PgSQLSession.execute = self._counted(origin[0])
+        sessions.PgSQLSession.execute_many = self._counted(origin[1])
+        try:
+            yield self
+        finally:
+            sessions.PgSQLSession.execute, sessions.PgSQLSession.execute_many = origin
+
+
+class _Database(test_utils.RestServiceTestCase):
+    """Database with all migrations applied, without the REST service."""
+
+    __FIRST_MIGRATION__ = FIRST_MIGRATION
+
+    @classmethod
+    def init_engine(cls) -> None:
+        engines.engine_factory.configure_factory(db_url=consts.get_database_uri())
+        cls.__ENGINE__ = engines.engine_factory.get_engine()
+
+    @classmethod
+    def setup_class(cls) -> None:
+        cls.init_engine()
+
+    @classmethod
+    def teardown_class(cls) -> None:
+        # Hack for psycopg to finish fast, otherwise we'll need to wait for GC
+        cls.engine.__del__()
+        cls.destroy_engine()
+
+
+def database_available() -> bool:
+    """Whether the database of the benchmark accepts connections."""
+    try:
+        with psycopg.connect(
+            consts.get_database_uri(), connect_timeout=CONNECT_TIMEOUT
+        ):
+            return True
+    except psycopg.Error:
+        return False
+
+
+@contextlib.contextmanager
+def database() -> tp.Iterator[None]:
+    """Empty database for a run, it's cleaned up after the run."""
+    _Database.setup_class()
+    db = _Database()
+    db.setup_method()
+    try:
+        yield
+    finally:
+        db.teardown_method()
+        _Database.teardown_class()
+
+
+def _agents() -> tp.List[ua_models.UniversalAgent]:
+    node = sys_uuid.uuid4()
+    return [
+        ua_models.UniversalAgent(
+            uuid=sys_uuid.uuid4(),
+            capabilities={"capabilities": [service.MACHINE_POOL_CAP]},
+            facts={"facts": []},
+            name="machine_agent",
+            node=node,
+            status="ACTIVE",
+        ),
+        ua_models.UniversalAgent(
+            uuid=sys_uuid.uuid4(),
+            capabilities={
+                "capabilities": [
+                    "builder_pool",
+                    "builder_pool_machine",
+                    "builder_pool_volume",
+                ]
+            },
+            facts={"facts": []},
+            name="compute_pool_builder_bench",
+            node=node,
+            status="ACTIVE",
+        ),
+    ]
+
+
+def populate(inventory: synthetic.Inventory) -> None:
+    """Save the inventory to the database.
+
+    The pools are assigned to the builder and the agent in advance, so
+    the iterations measure the placement of nodes only.
+    """
+    agent, builder = _agents()
+    domain = models.PlacementDomain(name="bench")
+    zones = [
+        models.PlacementZone(uuid=z, name=str(z), domain=domain)
+        for z in inventory.zones
+    ]
+    pools = [
+        models.MachinePool(
+            uuid=p.uuid,
+            name=str(p.uuid),
+            zone=p.zone,
+            agent=agent.uuid,
+            builder=builder.uuid,
+            status=nc.MachinePoolStatus.ACTIVE.value,
+            driver_spec={"driver": "libvirt"},
+            all_cores=p.cores,
+            avail_cores=p.cores,
+            all_ram=p.ram,
+            avail_ram=p.ram,
+            storage_pools=[
+                models.ThinStoragePool(
+                    pool_type="dummy",
+                    capacity_usable=1000000,
+                    capacity_provisioned=0,
+                    oversubscription_ratio=1.0,
+                    available_actual=1000000,
+                )
+            ],
+        )
+        for p in inventory.pools
+    ]
+    machines = [
+        models.Machine(
+            uuid=m.uuid,
+            name=str(m.uuid),
+            cores=m.cores,
+            ram=m.ram,
+            project_id=c.SERVICE_PROJECT_ID,
+            machine_type=nc.NodeType.HW.value,
+            status=nc.MachineStatus.IDLE.value,
+        )
+        for m in inventory.machines
+    ]
+    policies = [
+        models.PlacementPolicy(
+            uuid=uuid, name=str(uuid), kind=kind, project_id=c.SERVICE_PROJECT_ID
+        )
+        for uuid, kind in inventory.policies.items()
+    ]
+
+    nodes = []
+    volumes = []
+    allocations = []
+    for sim_node in (*inventory.nodes, *inventory.hw_nodes):
+        node = models.Node(
+            uuid=sim_node.uuid,
+            name=str(sim_node.uuid),
+            cores=sim_node.cores,
+            ram=sim_node.ram,
+            node_type=sim_node.node_type,
+            project_id=c.SERVICE_PROJECT_ID,
+            disk_spec=sdk_infra_models.RootDiskSpec(
+                image=IMAGE, size=sim_node.volume_size
+            ),
+        )
+        nodes.append(node)
+        volumes.extend(
+            models.Volume.restore_from_simple_view(**v.dump_to_simple_view())
+            for v in node.volumes()
+        )
+        allocations.extend(
+            models.FlatPlacementPolicyAllocation(node=node.uuid, policy=policy)
+            for policy in inventory.allocations.get(node.uuid, ())
+        )
+
+    engine = engines.engine_factory.get_engine()
+    with engine.session_manager() as session:
+        agent.insert(session=session)
+        builder.insert(session=session)
+        if zones:
+            domain.insert(session=session)
+        for batch in (
+            zones,
+            pools,
+            machines,
+            policies,
+            nodes,
+            volumes,
+            allocations,
+        ):
+            if batch:
+                session.batch_insert(batch)
+
+
+def _run(scheduler: service.SchedulerService) -> tp.Tuple[int, float, int]:
+    """Run iterations until nodes stop being scheduled."""
+    counter = QueryCounter()
+    seconds = 0.0
+    iterations = 0
+    unscheduled = len(models.UnscheduledNode.objects.get_all())
+
+    while unscheduled and iterations < MAX_ITERATIONS:
+        with counter.counting():
+            started = time.perf_counter()
+            scheduler._iteration()
+            seconds += time.perf_counter() - started
+        iterations += 1
+
+        left = len(models.UnscheduledNode.objects.get_all())
+        if left == unscheduled:
+            break
+        unscheduled = left
+
+    return iterations, seconds, counter.queries
+
+
+def _scheduler(batch: bool) -> service.SchedulerService:
+    scheduler_pipeline = pipeline.SchedulerPipeline.load()
+    return service.SchedulerService(
+        pool_filters=scheduler_pipeline.pool_filters,
+        pool_weighters=scheduler_pipeline.pool_weighters,
+        machine_filters=scheduler_pipeline.machine_filters,
+        machine_weighters=scheduler_pipeline.machine_weighters,
+        batch_placement=batch,
+    )
+
+
+def _placements() -> tp.Dict[sys_uuid.UUID, models.Machine]:
+    """Machines of the scheduled nodes by the node uuid."""
+    machines = models.Machine.objects.get_all(
+        filters={"node": dm_filters.IsNot(None)}
+    )
+    return {m.node: m for m in machines}
+
+
+def _pool_metrics(
+    inventory: synthetic.Inventory,
+    placements: tp.Dict[sys_uuid.UUID, models.Machine],
+) -> tp.Tuple[float, float, int]:
+    used_cores: tp.Dict[sys_uuid.UUID, int] = {}
+    used_ram: tp.Dict[sys_uuid.UUID, int] = {}
+    for node in inventory.nodes:
+        if node.uuid in placements:
+            pool = placements[node.uuid].pool
+            used_cores[pool] = used_cores.get(pool, 0) + node.cores
+            used_ram[pool] = used_ram.get(pool, 0) + node.ram
+
+    used_pools = [p for p in inventory.pools if p.uuid in used_cores]
+    all_cores = sum(p.cores for p in used_pools)
+    packing = (
+        sum(used_cores[p.uuid] for p in used_pools) / all_cores if all_cores else 0.0
+    )
+
+    cores, ram = max(synthetic.NODE_FLAVORS)
+    free = stranded = 0
+    for pool in inventory.pools:
+        avail_cores = max(pool.cores - used_cores.get(pool.uuid, 0), 0)
+        avail_ram = pool.ram - used_ram.get(pool.uuid, 0)
+        free += avail_cores
+        if avail_cores < cores or avail_ram < ram:
+            stranded += avail_cores
+    fragmentation = stranded / free if free else 0.0
+
+    policy_nodes: tp.Dict[sys_uuid.UUID, tp.List[sys_uuid.UUID]] = {}
+    for node, policies in inventory.allocations.items():
+        for policy in policies:
+            policy_nodes.setdefault(policy, []).append(node)
+
+    violations = 0
+    for nodes in policy_nodes.values():
+        members = [placements[n].pool for n in nodes if n in placements]
+        if len(members) != len(set(members)):
+            violations += 1
+
+    return packing, fragmentation, violations
+
+
+def run_pools(inventory: synthetic.Inventory, batch: bool = True) -> Report:
+    """Place the VM nodes of the inventory into its pools."""
+    with database():
+        populate(inventory)
+        iterations, seconds, queries = _run(_scheduler(batch))
+        placements = _placements()
+
+    packing, fragmentation, violations = _pool_metrics(inventory, placements)
+    return Report(
+        mode="batch" if batch else "serial",
+        nodes=len(inventory.nodes),
+        placed=len(placements),
+        iterations=iterations,
+        seconds=seconds,
+        queries=queries,
+        packing=packing,
+        fragmentation=fragmentation,
+        violations=violations,
+    )
+
+
+def run_machines(inventory: synthetic.Inventory) -> Report:
+    """Schedule the HW nodes of the inventory to its idle machines."""
+    with database():
+        populate(inventory)
+        iterations, seconds, queries = _run(_scheduler(batch=False))
+        placements = _placements()
+
+    scheduled = [n for n in inventory.hw_nodes if n.uuid in placements]
+    machine_cores = sum(placements[n.uuid].cores for n in scheduled)
+    packing = sum(n.cores for n in scheduled) / machine_cores if machine_cores else 0.0
+
+    return Report(
+        mode="hw",
+        nodes=len(inventory.hw_nodes),
+        placed=len(scheduled),
+        iterations=iterations,
+        seconds=seconds,
+        queries=queries,
+        packing=packing,
+        fragmentation=0.0,
+        violations=0,
+    )
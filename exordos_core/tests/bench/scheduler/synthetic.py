@@ -0,0 +1,131 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Synthetic inventory for the scheduler benchmarks.
+
+The inventory is a plain description of pools, machines, nodes and
+placement policies, the harness saves it to the database. All random
+values including the uuids are taken from the seeded generator, so the
+same seed gives the same inventory.
+"""
+
+import random
+import typing as tp
+import uuid as sys_uuid
+
+from exordos_core.compute import constants as nc
+
+# Flavors of nodes as (cores, ram in Mb)
+NODE_FLAVORS = ((1, 1024), (2, 2048), (2, 4096), (4, 8192), (8, 16384), (16, 32768))
+# Sizes of pools and HW machines as (cores, ram in Mb)
+HOST_FLAVORS = ((32, 131072), (64, 262144), (96, 393216), (128, 524288))
+# Sizes of root volumes in Gb
+VOLUME_SIZES = (10, 20, 40, 80)
+
+
+class SimPool(tp.NamedTuple):
+    uuid: sys_uuid.UUID
+    cores: int
+    ram: int
+    zone: tp.Optional[sys_uuid.UUID] = None
+
+
+class SimMachine(tp.NamedTuple):
+    uuid: sys_uuid.UUID
+    cores: int
+    ram: int
+
+
+class SimNode(tp.NamedTuple):
+    uuid: sys_uuid.UUID
+    cores: int
+    ram: int
+    node_type: str
+    # Size of the root volume, HW nodes have no volumes
+    volume_size: int
+
+
+class Inventory(tp.NamedTuple):
+    pools: tp.List[SimPool]
+    machines: tp.List[SimMachine]
+    nodes: tp.List[SimNode]
+    hw_nodes: tp.List[SimNode]
+    zones: tp.List[sys_uuid.UUID]
+    # Policy uuid -> policy kind and node uuid -> policy uuids
+    policies: tp.Dict[sys_uuid.UUID, str]
+    allocations: tp.Dict[sys_uuid.UUID, tp.Set[sys_uuid.UUID]]
+
+
+def _uuid(rnd: random.Random) -> sys_uuid.UUID:
+    return sys_uuid.UUID(int=rnd.getrandbits(128), version=4)
+
+
+def _node(node_type: str, rnd: random.Random) -> SimNode:
+    # HW nodes request whole hosts
+    flavors = HOST_FLAVORS if node_type == nc.NodeType.HW else NODE_FLAVORS
+    cores, ram = rnd.choice(flavors)
+    return SimNode(_uuid(rnd), cores, ram, node_type, rnd.choice(VOLUME_SIZES))
+
+
+def generate(
+    nodes: int,
+    pools: int,
+    machines: int = 0,
+    hw_nodes: int = 0,
+    zones: int = 0,
+    policy_size: int = 3,
+    policy_ratio: float = 0.3,
+    seed: int = 0,
+) -> Inventory:
+    """Generate a random but reproducible inventory.
+
+    `policy_ratio` of the VM nodes are grouped into soft anti-affinity
+    policies of `policy_size` members.
+    """
+    rnd = random.Random(seed)
+    zone_ids = [_uuid(rnd) for _ in range(zones)]
+
+    sim_pools = []
+    for _ in range(pools):
+        cores, ram = rnd.choice(HOST_FLAVORS)
+        zone = rnd.choice(zone_ids) if zone_ids else None
+        sim_pools.append(SimPool(_uuid(rnd), cores, ram, zone))
+
+    sim_machines = [
+        SimMachine(_uuid(rnd), *rnd.choice(HOST_FLAVORS)) for _ in range(machines)
+    ]
+
+    vm_nodes = [_node(nc.NodeType.VM.value, rnd) for _ in range(nodes)]
+    sim_hw_nodes = [_node(nc.NodeType.HW.value, rnd) for _ in range(hw_nodes)]
+
+    policies = {}
+    allocations = {}
+    members = vm_nodes[: int(len(vm_nodes) * policy_ratio)]
+    for i in range(0, len(members), policy_size):
+        policy = _uuid(rnd)
+        policies[policy] = nc.PlacementPolicyKind.SOFT_ANTI_AFFINITY.value
+        for member in members[i : i + policy_size]:
+            allocations[member.uuid] = {policy}
+
+    return Inventory(
+        pools=sim_pools,
+        machines=sim_machines,
+        nodes=vm_nodes,
+        hw_nodes=sim_hw_nodes,
+        zones=zone_ids,
+        policies=policies,
+        allocations=allocations,
+    )
@@ -0,0 +1,54 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import pytest
+
+from exordos_core.tests.bench.scheduler import harness
+from exordos_core.tests.bench.scheduler import synthetic
+
+requires_database = pytest.mark.skipif(
+    not harness.database_available(),
+    reason="The scheduler benchmark needs the database, see DATABASE_URI",
+)
+
+
+class TestSchedulerBench:
+    @requires_database
+    def test_batch_and_serial_place_the_same(self):
+        serial = harness.run_pools(synthetic.generate(nodes=200, pools=20), False)
+        batch = harness.run_pools(synthetic.generate(nodes=200, pools=20), True)
+
+        assert serial.placed == batch.placed == 200
+        assert batch.queries < serial.queries
+        assert batch.queries == harness.run_pools(
+            synthetic.generate(nodes=200, pools=20), True
+        ).queries
+        assert batch.violations == 0
+
+    def test_seeded(self):
+        assert synthetic.generate(nodes=10, pools=2, zones=2) == synthetic.generate(
+            nodes=10, pools=2, zones=2
+        )
+
+    @requires_database
+    def test_hw_best_fit(self):
+        inventory = synthetic.generate(nodes=0, pools=0, machines=400, hw_nodes=200)
+
+        report = harness.run_machines(inventory)
+
+        assert report.placed == 200
+        # Every HW node fits a machine of its own size
+        assert report.packing == 1.0
@@ -26,7 +26,10 @@ from restalchemy.dm import filters as dm_filters
 from exordos_core.common import constants as c
 from exordos_core.compute import constants as nc
 from exordos_core.compute.dm import models
+from exordos_core.network import allocation
 from exordos_core.network import service
+from exordos_core.network import state
+from exordos_core.network.dm import models as net_models
 from exordos_core.network.driver import base as driver_base
 
 
@@ -173,7 +176,9 @@ class TestNetworkService:
         assert FakeDriver.create_subnet_called
 
     @pytest.mark.usefixtures("user_api_client", "auth_user_admin")
-    def test_new_node_add_port(self):
+    @pytest.mark.parametrize("batch_allocation", [False, True])
+    def test_new_node_add_port(self, batch_allocation: bool):
+        self._service = service.NetworkService(batch_allocation=batch_allocation)
         node = self._add_node()
         _, subnet = self._add_network()
         port_uuid = None
@@ -292,6 +297,59 @@ class TestNetworkService:
         assert not FakeDriver.create_port_called
         assert FakeDriver.delete_port_called
 
+    @pytest.mark.usefixtures("user_api_client", "auth_user_admin")
+    def test_port_counts(self):
+        _, subnet = self._add_network()
+        _, other = self._add_network()
+        ports = [
+            self._add_port(subnet, ipv4=netaddr.IPAddress(f"10.0.0.{i}"))
+            for i in range(3)
+        ]
+        assert state.NetworkState._port_counts([subnet.uuid, other.uuid]) == {
+            subnet.uuid: 3
+        }
+
+        ports[0].delete()
+        ports[1].subnet = other.uuid
+        ports[1].update()
+        ports[2].status = nc.PortStatus.ACTIVE.value
+        ports[2].update()
+
+        assert state.NetworkState._port_counts([subnet.uuid, other.uuid]) == {
+            subnet.uuid: 1,
+            other.uuid: 1,
+        }
+        assert state.NetworkState._port_counts([other.uuid]) == {other.uuid: 1}
+
+    @pytest.mark.usefixtures("user_api_client", "auth_user_admin")
+    def test_batch_allocation_lost_race(self):
+        _, subnet = self._add_network()
+        network_state = state.NetworkState()
+        network_state.refresh()
+
+        # A concurrent worker takes the first IP after the state is loaded
+        taken = self._add_port(subnet)
+
+        def new_port(
+            target_ipv4: tp.Optional[netaddr.IPAddress] = None,
+        ) -> net_models.Port:
+            port = subnet.port(target_ipv4=target_ipv4, mac=models.Port.generate_mac())
+            return net_models.Port.restore_from_simple_view(
+                **port.dump_to_simple_view()
+            )
+
+        ports = [new_port(), new_port(), new_port(taken.ipv4)]
+        allocated = allocation.PortAllocator(network_state).allocate(ports)
+
+        assert {p.uuid for p in allocated} == {p.uuid for p in ports[:2]}
+        rows = models.Port.objects.get_all(filters={"subnet": subnet.uuid})
+        assert sorted(str(p.ipv4) for p in rows) == [
+            "10.0.0.0",
+            "10.0.0.1",
+            "10.0.0.2",
+        ]
+        assert {p.uuid for p in rows} == {taken.uuid} | {p.uuid for p in allocated}
+
     @pytest.mark.usefixtures("user_api_client", "auth_user_admin")
     def test_new_node_add_port_target_ip(self):
         extra = {"default_network": {"target_ipv4": "10.0.0.10"}}
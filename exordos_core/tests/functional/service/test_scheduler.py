@@ -19,14 +19,22 @@ import typing as tp
 import uuid as sys_uuid
 
 from gcl_iam.tests.functional import clients as iam_clients
+from gcl_sdk.agents.universal.dm import models as ua_models
+from restalchemy.common import contexts
+from restalchemy.dm import filters as dm_filters
 
+from exordos_core.compute import constants as nc
 from exordos_core.compute.dm import models
+from exordos_core.compute.scheduler import prewarm
 from exordos_core.compute.scheduler import service
 from exordos_core.compute.scheduler.driver.filters import available
 from exordos_core.compute.scheduler.driver.weighter import relative
+from exordos_core.gservice import heartbeat
 
 
 class TestSchedulerService:
+    BATCH_PLACEMENT = False
+
     def setup_method(self) -> None:
         # Run service
         pool_filters = [
@@ -46,6 +54,7 @@ class TestSchedulerService:
             pool_weighters=pool_weighters,
             machine_filters=machine_filters,
             machine_weighters=machine_weighters,
+            batch_placement=self.BATCH_PLACEMENT,
         )
 
     def teardown_method(self) -> None:
@@ -404,3 +413,151 @@ class TestSchedulerService:
         assert machine.ram == 2048
         assert machine.status == "SCHEDULED"
         assert nodes[0].status == "SCHEDULED"
+
+    def test_schedule_nodes_placement_rows(
+        self,
+        default_pool: tp.Dict[str, tp.Any],
+        default_machine_agent: tp.Dict[str, tp.Any],
+        default_pool_builder: tp.Dict[str, tp.Any],
+        node_factory: tp.Callable,
+    ):
+        pool_uuid = sys_uuid.UUID(default_pool["uuid"])
+
+        # A free volume of the image is reused by one of the nodes
+        free_volume = models.MachineVolume(
+            name="free-volume",
+            size=10,
+            image="ubuntu_24.04",
+            pool=pool_uuid,
+            project_id=sys_uuid.UUID(int=0),
+        )
+        free_volume.insert()
+
+        nodes = []
+        for _ in range(3):
+            node = models.Node.restore_from_simple_view(**node_factory())
+            node.insert()
+            nodes.append(node)
+
+        self._service._iteration()
+        self._service._iteration()
+
+        machines = {m.node: m for m in models.Machine.objects.get_all()}
+        reserved = {
+            r.machine: r for r in models.MachinePoolReservations.objects.get_all()
+        }
+        volumes = {
+            v.node_volume: v for v in models.MachineVolume.objects.get_all()
+        }
+        node_volumes = models.Volume.objects.get_all()
+
+        assert set(machines) == {n.uuid for n in nodes}
+        for node in nodes:
+            machine = machines[node.uuid]
+            assert machine.pool == pool_uuid
+            assert machine.status == nc.MachineStatus.SCHEDULED.value
+            assert reserved[machine.uuid].pool == pool_uuid
+            assert reserved[machine.uuid].cores == node.cores
+            assert reserved[machine.uuid].ram == node.ram
+        assert models.UnscheduledNode.objects.get_all() == []
+
+        assert len(volumes) == len(node_volumes) == len(nodes)
+        for node_volume in node_volumes:
+            volume = volumes[node_volume.uuid]
+            assert volume.pool == pool_uuid
+            assert volume.machine == machines[node_volume.node].uuid
+            assert volume.project_id == node_volume.project_id
+
+        # The free volume is reused instead of creating a new one
+        assert free_volume.uuid in {v.uuid for v in volumes.values()}
+
+    def test_prewarm_refill(
+        self,
+        default_pool: tp.Dict[str, tp.Any],
+        default_machine_agent: tp.Dict[str, tp.Any],
+        default_pool_builder: tp.Dict[str, tp.Any],
+        node_factory: tp.Callable,
+    ):
+        pool_uuid = sys_uuid.UUID(default_pool["uuid"])
+        self._service._prewarmer = prewarm.VolumePrewarmer(
+            [prewarm.PrewarmSpec("ubuntu_24.04", 10, 1)]
+        )
+        node = models.Node.restore_from_simple_view(**node_factory())
+        node.insert()
+        other = models.Node.restore_from_simple_view(
+            **node_factory(image="debian_12")
+        )
+        other.insert()
+
+        self._service._iteration()
+        self._service._iteration()
+
+        machines = models.Machine.objects.get_all()
+        free = models.MachineVolume.objects.get_all(
+            filters={"node_volume": dm_filters.Is(None)}
+        )
+
+        assert {m.node for m in machines} == {node.uuid, other.uuid}
+        assert [(v.pool, v.image, v.size) for v in free] == [
+            (pool_uuid, "ubuntu_24.04", 10)
+        ]
+        # Only the pre-warmed image is accounted
+        stats = self._service._prewarmer.stats
+        assert set(stats.hits.keys() | stats.misses.keys()) == {"ubuntu_24.04"}
+
+    def test_schedule_new_pool_without_rebalance(
+        self,
+        monkeypatch,
+        default_pool: tp.Dict[str, tp.Any],
+        default_machine_agent: tp.Dict[str, tp.Any],
+        default_pool_builder: tp.Dict[str, tp.Any],
+        pool_factory: tp.Callable,
+    ):
+        self._service._iteration()
+
+        # The builders and agents are the same, the loads aren't needed
+        def loads() -> tp.NoReturn:
+            raise AssertionError("Unexpected rebalance")
+
+        monkeypatch.setattr(self._service, "_get_pool_loads", loads)
+        pool = models.MachinePool.restore_from_simple_view(**pool_factory())
+        pool.insert()
+
+        self._service._iteration()
+
+        pool = models.MachinePool.objects.get_one(filters={"uuid": pool.uuid})
+        assert str(pool.builder) == default_pool_builder["uuid"]
+        assert str(pool.agent) == default_machine_agent["uuid"]
+
+    def test_heartbeat_touch(self, default_pool_builder: tp.Dict[str, tp.Any]):
+        builder = sys_uuid.UUID(default_pool_builder["uuid"])
+
+        def agent() -> ua_models.UniversalAgent:
+            return ua_models.UniversalAgent.objects.get_one(filters={"uuid": builder})
+
+        def updated_at() -> tp.Any:
+            return agent().updated_at
+
+        with contexts.Context().session_manager() as session:
+            session.execute(
+                "UPDATE ua_agents SET updated_at = now() - interval '1 hour' "
+                "WHERE uuid = %s;",
+                (str(builder),),
+            )
+        stale = updated_at()
+        assert heartbeat.is_due(agent())
+
+        with contexts.Context().session_manager() as session:
+            heartbeat.touch(session, (builder,))
+        touched = updated_at()
+        assert touched > stale
+        assert not heartbeat.is_due(agent())
+
+        # Touched recently, nothing to do
+        with contexts.Context().session_manager() as session:
+            heartbeat.touch(session, (builder,))
+        assert updated_at() == touched
+
+
+class TestBatchSchedulerService(TestSchedulerService):
+    BATCH_PLACEMENT = True
@@ -0,0 +1,56 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import typing as tp
+import uuid as sys_uuid
+
+from gcl_iam.tests.functional import clients as iam_clients
+
+from exordos_core.compute.builders import node as node_builder
+from exordos_core.compute.dm import models
+
+
+class TestShardedBuilder:
+    def _add_nodes(self, node_factory: tp.Callable, count: int) -> None:
+        for i in range(count):
+            view = node_factory(uuid=sys_uuid.UUID(int=i + 1))
+            models.Node.restore_from_simple_view(**view).insert()
+
+    def test_new_instances_of_shard(
+        self,
+        user_api_client: iam_clients.GenesisCoreTestRESTClient,
+        node_factory: tp.Callable,
+    ):
+        self._add_nodes(node_factory, 6)
+        builder = node_builder.NodeBuilderService()
+        builder.set_shards([1], 3)
+
+        instances = builder._get_new_instances()
+
+        assert {i.uuid.int for i in instances} == {1, 4}
+        assert not builder._get_updated_instances()
+
+    def test_new_instances_of_single_shard(
+        self,
+        user_api_client: iam_clients.GenesisCoreTestRESTClient,
+        node_factory: tp.Callable,
+    ):
+        self._add_nodes(node_factory, 3)
+        builder = node_builder.NodeBuilderService()
+
+        instances = builder._get_new_instances()
+
+        assert {i.uuid.int for i in instances} == {1, 2, 3}
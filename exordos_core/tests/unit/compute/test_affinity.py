@@ -0,0 +1,220 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import uuid as sys_uuid
+
+import pytest
+
+from exordos_core.compute import constants as nc
+from exordos_core.compute.dm import models
+from exordos_core.compute.scheduler.driver import base
+from exordos_core.compute.scheduler.driver import occupancy as occ
+from exordos_core.compute.scheduler.driver.filters import affinity
+from exordos_core.compute.scheduler.driver.weighter import spread
+
+
+class FakeNode:
+    def __init__(self):
+        self.uuid = sys_uuid.uuid4()
+
+
+def _bundle():
+    return base.NodeBundle(node=FakeNode(), volumes=[])
+
+
+def _pool(zone=None):
+    return base.MachinePoolBundle(pool=models.MachinePool(zone=zone), volumes=[])
+
+
+@pytest.fixture
+def loads():
+    return []
+
+
+@pytest.fixture
+def occupancy(monkeypatch, loads):
+    occupancy = occ.PolicyOccupancy()
+
+    def load(cls, nodes, pools=()):
+        loads.append(list(nodes))
+        return occupancy
+
+    monkeypatch.setattr(occ.PolicyOccupancy, "load", classmethod(load))
+    return occupancy
+
+
+def _prefetch(stage, nodes, pools):
+    scheduling_pass = base.SchedulingPass(nodes, pools)
+    stage.prefetch(scheduling_pass)
+    return scheduling_pass
+
+
+def _assign(occupancy, nodes, pools, kind, zone=None, domain=None):
+    policy = sys_uuid.uuid4()
+    occupancy._policies[policy] = occ.PolicySpec(kind=kind, zone=zone, domain=domain)
+    occupancy._pool_zones.update({p.pool.uuid: p.pool.zone for p in pools})
+    for node in nodes:
+        occupancy._node_policies.setdefault(node.node.uuid, set()).add(policy)
+    return policy
+
+
+class TestDummySoftAntiAffinityFilter:
+    @pytest.fixture
+    def pools(self):
+        return [_pool(), _pool()]
+
+    @pytest.fixture
+    def nodes(self, occupancy, pools):
+        nodes = [_bundle(), _bundle()]
+        _assign(occupancy, nodes, pools, nc.PlacementPolicyKind.SOFT_ANTI_AFFINITY)
+        return nodes
+
+    @pytest.fixture
+    def aa_filter(self):
+        return affinity.DummySoftAntiAffinityFilter()
+
+    def test_nodes_see_each_other_in_pass(self, aa_filter, nodes, pools):
+        scheduling_pass = _prefetch(aa_filter, nodes, pools)
+
+        assert aa_filter.filter(nodes[0], pools) == pools
+        scheduling_pass.placed(nodes[0], pools[0])
+
+        assert aa_filter.filter(nodes[1], pools) == (pools[1],)
+
+    def test_all_pools_occupied(self, aa_filter, nodes, pools):
+        scheduling_pass = _prefetch(aa_filter, nodes, pools)
+        scheduling_pass.placed(nodes[0], pools[0])
+
+        assert aa_filter.filter(nodes[1], pools[:1]) == pools[:1]
+
+    def test_no_policies(self, aa_filter, nodes, pools):
+        node = _bundle()
+        _prefetch(aa_filter, [node], pools)
+
+        assert aa_filter.filter(node, pools) == pools
+
+
+class TestHardAntiAffinityFilter:
+    def test_no_fallback(self, occupancy):
+        pools = [_pool(), _pool()]
+        nodes = [_bundle(), _bundle(), _bundle()]
+        _assign(occupancy, nodes, pools, nc.PlacementPolicyKind.HARD_ANTI_AFFINITY)
+        aa_filter = affinity.HardAntiAffinityFilter()
+        scheduling_pass = _prefetch(aa_filter, nodes, pools)
+
+        scheduling_pass.placed(nodes[0], pools[0])
+        assert aa_filter.filter(nodes[1], pools) == (pools[1],)
+
+        scheduling_pass.placed(nodes[1], pools[1])
+        assert aa_filter.filter(nodes[2], pools) == ()
+
+
+class TestAffinityFilter:
+    def test_follow_first_member(self, occupancy):
+        pools = [_pool(), _pool()]
+        nodes = [_bundle(), _bundle()]
+        _assign(occupancy, nodes, pools, nc.PlacementPolicyKind.AFFINITY)
+        a_filter = affinity.AffinityFilter()
+        scheduling_pass = _prefetch(a_filter, nodes, pools)
+
+        assert a_filter.filter(nodes[0], pools) == pools
+        scheduling_pass.placed(nodes[0], pools[1])
+
+        assert a_filter.filter(nodes[1], pools) == (pools[1],)
+
+
+class TestPlacementScopeFilter:
+    def test_zone(self, occupancy):
+        zone = sys_uuid.uuid4()
+        pools = [_pool(zone), _pool(sys_uuid.uuid4()), _pool()]
+        node = _bundle()
+        _assign(occupancy, [node], pools, nc.PlacementPolicyKind.ZONE_SPREAD, zone=zone)
+        s_filter = affinity.PlacementScopeFilter()
+        _prefetch(s_filter, [node], pools)
+
+        assert s_filter.filter(node, pools) == (pools[0],)
+
+    def test_domain(self, occupancy):
+        domain = sys_uuid.uuid4()
+        zones = [sys_uuid.uuid4(), sys_uuid.uuid4()]
+        occupancy._zone_domains = {zones[0]: domain, zones[1]: sys_uuid.uuid4()}
+        pools = [_pool(zones[0]), _pool(zones[1]), _pool()]
+        node = _bundle()
+        _assign(
+            occupancy,
+            [node],
+            pools,
+            nc.PlacementPolicyKind.ZONE_SPREAD,
+            domain=domain,
+        )
+        s_filter = affinity.PlacementScopeFilter()
+        _prefetch(s_filter, [node], pools)
+
+        assert s_filter.filter(node, pools) == (pools[0],)
+
+
+class TestZoneSpreadWeighter:
+    def test_spread(self, occupancy):
+        zones = [sys_uuid.uuid4(), sys_uuid.uuid4()]
+        pools = [_pool(zones[0]), _pool(zones[0]), _pool(zones[1])]
+        nodes = [_bundle(), _bundle()]
+        _assign(occupancy, nodes, pools, nc.PlacementPolicyKind.ZONE_SPREAD)
+        weighter = spread.ZoneSpreadWeighter()
+        scheduling_pass = _prefetch(weighter, nodes, pools)
+
+        assert list(weighter.weight_for(nodes[0], pools)) == [1.0, 1.0, 1.0]
+        scheduling_pass.placed(nodes[0], pools[0])
+
+        weights = list(weighter.weight_for(nodes[1], pools))
+        assert weights[0] == weights[1] < weights[2]
+
+    def test_no_policies(self, occupancy):
+        pools = [_pool(), _pool()]
+        weighter = spread.ZoneSpreadWeighter()
+        _prefetch(weighter, [], pools)
+
+        assert list(weighter.weight_for(_bundle(), pools)) == [1.0, 1.0]
+
+
+class TestSchedulingPass:
+    def test_occupancy_shared_by_stages(self, occupancy, loads):
+        pools = [_pool(), _pool()]
+        nodes = [_bundle(), _bundle()]
+        _assign(occupancy, nodes, pools, nc.PlacementPolicyKind.HARD_ANTI_AFFINITY)
+        stages = [
+            affinity.HardAntiAffinityFilter(),
+            affinity.DummySoftAntiAffinityFilter(),
+            spread.ZoneSpreadWeighter(),
+        ]
+        scheduling_pass = base.SchedulingPass(nodes, pools)
+        for stage in stages:
+            stage.prefetch(scheduling_pass)
+
+        scheduling_pass.placed(nodes[0], pools[0])
+        assert stages[0].filter(nodes[1], pools) == (pools[1],)
+        assert stages[1].filter(nodes[1], pools) == pools
+
+        assert loads == [[n.node.uuid for n in nodes]]
+
+    def test_no_load_without_policy_stages(self, occupancy, loads):
+        scheduling_pass = base.SchedulingPass([_bundle()], [_pool()])
+        scheduling_pass.placed(scheduling_pass.nodes[0], scheduling_pass.pools[0])
+
+        assert loads == []
+
+    def test_out_of_pass(self, occupancy):
+        with pytest.raises(ValueError):
+            affinity.HardAntiAffinityFilter().filter(_bundle(), [_pool()])
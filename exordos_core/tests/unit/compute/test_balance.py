@@ -0,0 +1,122 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+import uuid as sys_uuid
+
+from gcl_sdk.agents.universal.dm import models as ua_models
+import pytest
+
+from exordos_core.compute.scheduler import balance
+
+
+def _agent(status="ACTIVE", age=0, uuid=None):
+    agent = ua_models.UniversalAgent(
+        uuid=uuid or sys_uuid.uuid4(),
+        name="agent",
+        node=sys_uuid.uuid4(),
+        status=status,
+    )
+    updated_at = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(
+        seconds=age
+    )
+    agent.properties["updated_at"].set_value_force(updated_at)
+    return agent
+
+
+class TestIsAlive:
+    def test_alive(self):
+        assert balance.is_alive(_agent())
+
+    def test_not_active(self):
+        assert not balance.is_alive(_agent(status="DISABLED"))
+
+    def test_stale(self):
+        agent = _agent(age=balance.AGENT_STALE_TIMEOUT + 1)
+
+        assert not balance.is_alive(agent)
+        assert balance.is_alive(agent, stale_timeout=None)
+
+
+class TestLiveness:
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        clock = [1000.0]
+        monkeypatch.setattr(balance.time, "monotonic", lambda: clock[0])
+        return clock
+
+    def test_hysteresis(self, clock):
+        liveness = balance.Liveness(revive_delay=60)
+        agent = _agent()
+        stale = _agent(age=balance.AGENT_STALE_TIMEOUT + 1, uuid=agent.uuid)
+
+        assert liveness.alive([agent]) == [agent]
+        assert liveness.alive([stale]) == []
+
+        # Fresh again but not long enough
+        assert liveness.alive([agent]) == []
+        clock[0] += 30
+        assert liveness.alive([agent]) == []
+        clock[0] += 30
+        assert liveness.alive([agent]) == [agent]
+
+    def test_revive_interrupted(self, clock):
+        liveness = balance.Liveness(revive_delay=60)
+        agent = _agent()
+        stale = _agent(age=balance.AGENT_STALE_TIMEOUT + 1, uuid=agent.uuid)
+
+        liveness.alive([stale])
+        liveness.alive([agent])
+        clock[0] += 50
+        liveness.alive([stale])
+        clock[0] += 20
+
+        assert liveness.alive([agent]) == []
+
+
+class TestLoadBalancer:
+    @pytest.fixture
+    def owners(self):
+        return sorted(sys_uuid.uuid4() for _ in range(3))
+
+    def test_assign_least_loaded(self, owners):
+        balancer = balance.LoadBalancer(owners)
+        balancer.add(owners[0], sys_uuid.uuid4(), 10)
+        balancer.add(owners[1], sys_uuid.uuid4(), 5)
+
+        assert balancer.assign(sys_uuid.uuid4(), 3) == owners[2]
+        assert balancer.assign(sys_uuid.uuid4(), 3) == owners[2]
+        assert balancer.assign(sys_uuid.uuid4(), 3) == owners[1]
+
+    def test_moves(self, owners):
+        balancer = balance.LoadBalancer(owners)
+        for _ in range(6):
+            balancer.add(owners[0], sys_uuid.uuid4(), 4)
+
+        moves = balancer.moves(limit=10)
+
+        assert len(moves) == 4
+        assert [balancer.load(o) for o in owners] == [8, 8, 8]
+        # The balanced state is stable
+        assert balancer.moves(limit=10) == []
+
+    def test_moves_limit(self, owners):
+        balancer = balance.LoadBalancer(owners)
+        for _ in range(6):
+            balancer.add(owners[0], sys_uuid.uuid4(), 4)
+
+        assert len(balancer.moves(limit=1)) == 1
+        assert balancer.load(owners[0]) == 20
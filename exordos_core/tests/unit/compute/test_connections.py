@@ -0,0 +1,86 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+
+import pytest
+
+libvirt = pytest.importorskip("libvirt")
+
+from exordos_core.compute.pool.drivers import connections  # noqa: E402
+
+URI = "test:///default"
+
+
+class TestConnectionPool:
+    def test_thread_bound(self):
+        pool = connections.ConnectionPool(URI, size=2)
+        conns = []
+
+        def run():
+            conns.append(pool.get())
+
+        threads = [threading.Thread(target=run) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert pool.get() is pool.get()
+        assert len({id(c) for c in conns}) == 2
+        pool.close()
+
+    def test_reopen_broken(self):
+        pool = connections.ConnectionPool(URI, size=1)
+        conn = pool.get()
+
+        conn.close()
+
+        assert pool.get() is not conn
+        pool.close()
+
+    def test_open_outside_lock(self, monkeypatch):
+        pool = connections.ConnectionPool(URI, size=2)
+        opened = pool.get(1)
+        release = threading.Event()
+        origin = pool._open
+
+        def slow_open():
+            release.wait()
+            return origin()
+
+        monkeypatch.setattr(pool, "_open", slow_open)
+        thread = threading.Thread(target=pool.get, args=(0,))
+        thread.start()
+
+        # The other slot isn't blocked by the slow open
+        assert pool.get(1) is opened
+        release.set()
+        thread.join()
+        assert pool.get(0) is not None
+        pool.close()
+
+    def test_shared_per_uri(self):
+        first = connections.acquire(URI)
+        second = connections.acquire(URI)
+        conn = first.get()
+
+        assert first is second
+        connections.release(first)
+        assert first.get() is conn
+
+        connections.release(second)
+        assert connections.acquire(URI) is not first
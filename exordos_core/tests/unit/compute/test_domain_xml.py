@@ -0,0 +1,140 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import uuid as sys_uuid
+from xml.etree import ElementTree as ET
+
+import pytest
+
+from exordos_core.compute.pool.drivers import domain_xml
+
+NS = f"{{{domain_xml.GENESIS_NS}}}"
+
+
+def _layout(**kwargs):
+    params = dict(boot="hd", disks=("file", "block"), interfaces=1)
+    params.update(kwargs)
+    return domain_xml.DomainLayout(**params)
+
+
+def _render(layout, **kwargs):
+    params = dict(
+        uuid=sys_uuid.UUID(int=1),
+        name="vm-1",
+        cores=2,
+        ram=2048,
+        disks=["/pool/root.qcow2", "/dev/zvol/pool/data"],
+        interfaces=[("00:16:3e:00:00:01", "default")],
+        image="http://repo/image.raw.gz?a=1&b=2",
+    )
+    params.update(kwargs)
+    return domain_xml.render_domain(layout, **params)
+
+
+class TestRenderDomain:
+    def test_render(self):
+        root = ET.fromstring(_render(_layout(iface_rom_file="/rom.bin")))
+
+        assert root.find("uuid").text == str(sys_uuid.UUID(int=1))
+        assert root.find("name").text == "vm-1"
+        assert root.find("vcpu").text == "2"
+        assert root.find("memory").text == "2048"
+        assert root.find("currentMemory").get("unit") == "MiB"
+        assert root.find("os/boot").get("dev") == "hd"
+        assert root.find(f".//{NS}vcpu").text == "2"
+        assert root.find(f".//{NS}mem").text == "2048"
+        assert root.find(f".//{NS}image").get("uri") == (
+            "http://repo/image.raw.gz?a=1&b=2"
+        )
+
+        iface = root.find("devices/interface")
+        assert iface.find("mac").get("address") == "00:16:3e:00:00:01"
+        assert iface.find("source").get("network") == "default"
+        assert iface.find("rom").get("file") == "/rom.bin"
+
+        disks = root.findall("devices/disk")
+        assert [d.get("type") for d in disks] == ["file", "block"]
+        assert disks[0].find("source").get("file") == "/pool/root.qcow2"
+        assert disks[1].find("source").get("dev") == "/dev/zvol/pool/data"
+        assert [d.find("target").get("dev") for d in disks] == ["vda", "vdb"]
+        assert [d.find("driver").get("type") for d in disks] == ["qcow2", "raw"]
+
+    def test_escape(self):
+        root = ET.fromstring(_render(_layout(), name='<vm & "1">'))
+
+        assert root.find("name").text == '<vm & "1">'
+
+    def test_no_image(self):
+        root = ET.fromstring(_render(_layout(with_image=False), image=None))
+
+        assert root.find(f".//{NS}image") is None
+
+    def test_layout_mismatch(self):
+        with pytest.raises(ValueError):
+            _render(_layout(), disks=["/pool/root.qcow2"])
+
+    def test_template_cache(self):
+        domain_xml.compile_template.cache_clear()
+
+        _render(_layout())
+        _render(_layout(), uuid=sys_uuid.UUID(int=2), name="vm-2")
+        _render(_layout(boot="network"))
+
+        info = domain_xml.compile_template.cache_info()
+        assert (info.hits, info.misses) == (1, 2)
+
+
+class TestDomainElement:
+    def test_edit(self):
+        element = domain_xml.DomainElement(_render(_layout()))
+
+        element.set_name("vm-2")
+        element.set_vcpu(4)
+        element.set_memory(4096)
+
+        root = ET.fromstring(element.xml)
+        assert root.find("name").text == "vm-2"
+        assert root.find("vcpu").text == "4"
+        assert root.find("memory").text == "4096"
+        assert root.find("currentMemory").text == "4096"
+        assert root.find(f".//{NS}vcpu").text == "4"
+        assert root.find(f".//{NS}mem").text == "4096"
+        assert len(root.findall("devices/disk")) == 2
+
+    def test_metadata_namespace_in_place(self):
+        xml = domain_xml.DomainElement(_render(_layout())).xml
+
+        assert xml.startswith('<domain type="kvm">')
+        assert f'<genesis:genesis xmlns:genesis="{domain_xml.GENESIS_NS}">' in xml
+
+    def test_metadata_like_content(self):
+        element = domain_xml.DomainElement(_render(_layout()))
+        element.set_name("<metadata-0 />")
+
+        root = ET.fromstring(element.xml)
+
+        assert root.find("name").text == "<metadata-0 />"
+        assert root.find(f"metadata/{NS}genesis/{NS}vcpu") is not None
+
+    def test_foreign_metadata_namespace(self):
+        root = ET.fromstring(_render(_layout()))
+        ET.SubElement(root.find("metadata"), "{urn:other}meta", {"{urn:other}a": "1"})
+        xml = domain_xml.DomainElement(ET.tostring(root, encoding="unicode")).xml
+
+        assert '<ns0:meta xmlns:ns0="urn:other" ns0:a="1"' in xml
+        assert ET.fromstring(xml).find("metadata/{urn:other}meta").get(
+            "{urn:other}a"
+        ) == "1"
@@ -0,0 +1,314 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import hashlib
+import subprocess
+import types
+import uuid as sys_uuid
+
+import netaddr
+import pytest
+
+from exordos_core.common import constants as c
+from exordos_core.compute.dm import models
+from exordos_core.network.dhcp import omapi
+from exordos_core.network.driver import flat
+
+
+def _subnet():
+    return models.Subnet(
+        network=sys_uuid.uuid4(),
+        cidr=netaddr.IPNetwork("10.0.0.0/24"),
+        project_id=c.SERVICE_PROJECT_ID,
+    )
+
+
+def _port(subnet, ip, uuid=None):
+    return models.Port(
+        uuid=uuid or sys_uuid.uuid4(),
+        subnet=subnet.uuid,
+        ipv4=netaddr.IPAddress(ip),
+        mask=subnet.cidr.netmask,
+        mac=models.Port.generate_mac(),
+        project_id=c.SERVICE_PROJECT_ID,
+    )
+
+
+class TestFlatBridgeNetworkDriver:
+    @pytest.fixture
+    def calls(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(
+            flat.FlatBridgeNetworkDriver,
+            "_reload_dhcp_service",
+            lambda self: calls.append("restart"),
+        )
+        monkeypatch.setattr(
+            omapi.OmapiClient,
+            "update_hosts",
+            lambda self, remove, add: calls.append(("omapi", len(remove), len(add))),
+        )
+        return calls
+
+    def _driver(self, tmp_path, **spec):
+        cfg = tmp_path / "dhcpd.conf"
+        cfg.write_text("")
+        network = types.SimpleNamespace(
+            driver_spec={"driver": "flat_bridge", "dhcp_cfg": str(cfg), **spec}
+        )
+        return flat.FlatBridgeNetworkDriver(network)
+
+    def test_coalesce_changes(self, tmp_path, calls):
+        driver = self._driver(tmp_path)
+        subnet = _subnet()
+
+        driver.create_subnet(subnet)
+        driver.create_ports([_port(subnet, "10.0.0.10")])
+        driver.create_port(_port(subnet, "10.0.0.11"))
+        driver.flush()
+        driver.flush()
+
+        assert calls == ["restart"]
+        assert len(driver.list_ports(subnet)) == 2
+
+    def test_hosts_via_omapi(self, tmp_path, calls):
+        driver = self._driver(tmp_path, omapi={"port": 7911})
+        subnet = _subnet()
+        port = _port(subnet, "10.0.0.10")
+        driver.create_subnet(subnet)
+        driver.create_ports([port])
+        driver.flush()
+
+        driver.update_port(_port(subnet, "10.0.0.12", uuid=port.uuid))
+        driver.create_port(_port(subnet, "10.0.0.11"))
+        driver.flush()
+
+        assert calls == ["restart", ("omapi", 0, 1), ("omapi", 1, 2)]
+        config = (tmp_path / "dhcpd.conf").read_text()
+        assert "omapi-port 7911;" in config
+        assert "host " not in config
+
+    def test_unchanged_config(self, tmp_path, calls):
+        driver = self._driver(tmp_path, omapi={})
+        subnet = _subnet()
+        port = _port(subnet, "10.0.0.10")
+        driver.create_subnet(subnet)
+        driver.create_ports([port])
+        driver.flush()
+
+        driver.update_port(port)
+        driver.flush()
+
+        assert calls == ["restart", ("omapi", 0, 1)]
+
+    def test_subnet_change_restarts(self, tmp_path, calls):
+        driver = self._driver(tmp_path, omapi={})
+        subnet = _subnet()
+        driver.create_subnet(subnet)
+        driver.flush()
+
+        subnet.dns_servers = ["8.8.8.8"]
+        driver.update_subnet(subnet)
+        driver.flush()
+
+        assert calls == ["restart", "restart"]
+
+    def test_omapi_fallback(self, tmp_path, monkeypatch, calls):
+        def fail(self, remove, add):
+            raise omapi.OmapiError(command="connect", status="not connected.")
+
+        update_hosts = omapi.OmapiClient.update_hosts
+        monkeypatch.setattr(omapi.OmapiClient, "update_hosts", fail)
+        driver = self._driver(tmp_path, omapi={})
+        subnet = _subnet()
+        driver.create_subnet(subnet)
+        driver.flush()
+
+        driver.create_port(_port(subnet, "10.0.0.10"))
+        driver.flush()
+
+        assert calls == ["restart", "restart"]
+        assert "host " in (tmp_path / "dhcpd.conf").read_text()
+
+        # The hosts are moved back to OMAPI on the next flush
+        monkeypatch.setattr(omapi.OmapiClient, "update_hosts", update_hosts)
+        driver.create_port(_port(subnet, "10.0.0.11"))
+        driver.flush()
+
+        assert calls == ["restart", "restart", "restart", ("omapi", 0, 2)]
+        assert "host " not in (tmp_path / "dhcpd.conf").read_text()
+
+    @pytest.fixture
+    def loads(self, monkeypatch):
+        loads = []
+        load_ctx = flat.DHCPContext.load_ctx.__func__
+
+        def counted(cls, *args, **kwargs):
+            loads.append(args)
+            return load_ctx(cls, *args, **kwargs)
+
+        monkeypatch.setattr(flat.DHCPContext, "load_ctx", classmethod(counted))
+        return loads
+
+    def test_cached_ctx(self, tmp_path, calls, loads):
+        driver = self._driver(tmp_path)
+        subnet = _subnet()
+        driver.create_subnet(subnet)
+        driver.create_port(_port(subnet, "10.0.0.10"))
+        driver.flush()
+
+        for _ in range(3):
+            driver.list_subnets()
+            driver.list_ports(subnet)
+
+        assert len(loads) == 1
+        assert len(driver.list_ports(subnet)) == 1
+
+    def test_reload_changed_ctx(self, tmp_path, calls, loads):
+        driver = self._driver(tmp_path)
+        subnet = _subnet()
+        driver.create_subnet(subnet)
+        driver.flush()
+
+        # Another driver of the same network applies changes
+        other = self._driver(tmp_path)
+        other.create_port(_port(subnet, "10.0.0.10"))
+        other.flush()
+
+        assert len(driver.list_ports(subnet)) == 1
+
+    def test_changed_cfg_rebuilds(self, tmp_path, calls):
+        driver = self._driver(tmp_path)
+        subnet = _subnet()
+        driver.create_subnet(subnet)
+        driver.flush()
+
+        with open(tmp_path / "dhcpd.conf", "a") as fcfg:
+            fcfg.write("# edited manually\n")
+
+        assert driver.list_subnets() == []
+
+    def test_stable_cfg_hash(self, tmp_path, calls):
+        driver = self._driver(tmp_path)
+        driver.create_subnet(_subnet())
+        driver.flush()
+
+        ctx = flat.DHCPContext.load_ctx(str(tmp_path / flat.DHCP_CTX_FILE))
+        content = (tmp_path / "dhcpd.conf").read_bytes()
+        assert ctx.cfg_hash == hashlib.sha256(content).hexdigest()
+
+    def test_duplicate_port(self, tmp_path, calls):
+        driver = self._driver(tmp_path)
+        subnet = _subnet()
+        port = _port(subnet, "10.0.0.10")
+        driver.create_subnet(subnet)
+        driver.create_port(port)
+
+        with pytest.raises(flat.DhcpPortAlreadyExists):
+            driver.create_port(_port(subnet, "10.0.0.11", uuid=port.uuid))
+
+        driver.delete_ports([port])
+        driver.delete_port(port)
+        driver.flush()
+        assert driver.list_ports(subnet) == []
+
+
+class TestOmapiClient:
+    @pytest.fixture
+    def scripts(self, monkeypatch):
+        scripts = []
+
+        def run(args, input, **kwargs):
+            scripts.append(input)
+            commands = input.splitlines()[3:]
+            stdout = "obj: host\n" * len(commands)
+            return subprocess.CompletedProcess(args, 0, stdout, "")
+
+        monkeypatch.setattr(omapi.subprocess, "run", run)
+        return scripts
+
+    def test_update_hosts(self, scripts):
+        client = omapi.OmapiClient(omapi.OmapiSpec(key_name="k", key_secret="s"))
+        host = omapi.Host("P_1", "52:54:00:00:00:01", "10.0.0.1")
+
+        client.update_hosts([host], [host])
+
+        lines = scripts[0].splitlines()
+        assert lines[:4] == [
+            "server 127.0.0.1",
+            "port 7911",
+            "key k s",
+            "connect",
+        ]
+        assert lines.count("new host") == 2
+        assert lines[-1] == "create"
+
+    def _run(self, monkeypatch, stdout, stderr=""):
+        monkeypatch.setattr(
+            omapi.subprocess,
+            "run",
+            lambda args, **kwargs: subprocess.CompletedProcess(
+                args, 0, stdout, stderr
+            ),
+        )
+
+    def test_statuses(self, monkeypatch):
+        self._run(
+            monkeypatch,
+            "> obj: <null>\n"
+            "> obj: host\n"
+            "> obj: host\n"
+            'name = "can\'t-invalid"\n'
+            "> obj: host\n"
+            'name = "can\'t-invalid"\n'
+            "> obj: <null>\n",
+        )
+        host = omapi.Host("can't-invalid", "52:54:00:00:00:01", "10.0.0.1")
+
+        omapi.OmapiClient(omapi.OmapiSpec()).update_hosts([host], [])
+
+    def test_error(self, monkeypatch):
+        self._run(
+            monkeypatch,
+            "obj: <null>\n"
+            "obj: host\n"
+            "obj: host\n"
+            'name = "P_1"\n'
+            "can't open object: not found\n"
+            "can't destroy object: not found\n",
+        )
+        host = omapi.Host("P_1", "52:54:00:00:00:01", "10.0.0.1")
+
+        with pytest.raises(omapi.OmapiError) as e:
+            omapi.OmapiClient(omapi.OmapiSpec()).update_hosts([host], [])
+
+        assert e.value.command == "open"
+        assert e.value.status == "can't open object: not found"
+
+    def test_error_in_stderr(self, monkeypatch):
+        self._run(monkeypatch, "", "dhcpctl_connect: connection refused\n")
+        host = omapi.Host("P_1", "52:54:00:00:00:01", "10.0.0.1")
+
+        with pytest.raises(omapi.OmapiError) as e:
+            omapi.OmapiClient(omapi.OmapiSpec()).update_hosts([host], [])
+
+        assert e.value.command == "connect"
+        assert e.value.status == "dhcpctl_connect: connection refused"
+
+    def test_nothing_to_update(self, scripts):
+        omapi.OmapiClient(omapi.OmapiSpec()).update_hosts([], [])
+
+        assert scripts == []
@@ -0,0 +1,88 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import gzip
+import io
+
+import pytest
+
+from exordos_core.compute.pool.drivers import image_cache
+
+GB = 1 << 30
+
+
+def _image(name, size, last_used, in_use=False):
+    return image_cache.CachedImage(name, size * GB, last_used, in_use)
+
+
+class TestLruEvictions:
+    def test_enough_space(self):
+        images = [_image("a", 10, 1.0)]
+
+        assert image_cache.lru_evictions(images, 100 * GB, 10 * GB, 50 * GB) == []
+
+    def test_least_recently_used_first(self):
+        images = [_image("a", 10, 3.0), _image("b", 10, 1.0), _image("c", 10, 2.0)]
+
+        evictions = image_cache.lru_evictions(images, 55 * GB, 20 * GB, 50 * GB)
+
+        assert evictions == ["b", "c"]
+
+    def test_skip_in_use(self):
+        images = [_image("a", 10, 1.0, in_use=True), _image("b", 10, 2.0)]
+
+        evictions = image_cache.lru_evictions(images, 55 * GB, 10 * GB, 50 * GB)
+
+        assert evictions == ["b"]
+
+    def test_not_enough_space(self):
+        images = [_image("a", 10, 1.0, in_use=True), _image("b", 1, 2.0)]
+
+        assert image_cache.lru_evictions(images, 50 * GB, 10 * GB, 50 * GB) is None
+
+
+class TestImages:
+    def test_base_volume_name(self):
+        name = image_cache.base_volume_name("http://repo/image.raw.gz")
+
+        assert image_cache.is_base_volume(name)
+        assert name == image_cache.base_volume_name("http://repo/image.raw.gz")
+        assert name != image_cache.base_volume_name("http://repo/other.raw.gz")
+
+    def test_image_format(self):
+        assert image_cache.image_format("http://repo/image.raw.gz") == "raw"
+        assert image_cache.image_format("http://repo/image.qcow2") == "qcow2"
+        assert image_cache.image_format("http://repo/image.qcow2.gz?v=1") == "qcow2"
+
+    def test_virtual_size(self):
+        header = image_cache.QCOW2_MAGIC + bytes(20) + (10 << 30).to_bytes(8, "big")
+
+        assert image_cache.virtual_size(io.BytesIO(header), 512, "qcow2") == 10 << 30
+        assert image_cache.virtual_size(io.BytesIO(header), 512, "raw") == 512
+
+    def test_virtual_size_not_qcow2(self):
+        with pytest.raises(ValueError):
+            image_cache.virtual_size(io.BytesIO(bytes(512)), 512, "qcow2")
+
+    def test_download_gzip(self, tmp_path):
+        data = b"image" * 100000
+        (tmp_path / "image.raw.gz").write_bytes(gzip.compress(data))
+        target = io.BytesIO()
+
+        size = image_cache.download_image((tmp_path / "image.raw.gz").as_uri(), target)
+
+        assert size == len(data)
+        assert target.getvalue() == data
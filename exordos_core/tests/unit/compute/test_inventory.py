@@ -0,0 +1,134 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import time
+
+import pytest
+
+libvirt = pytest.importorskip("libvirt")
+
+from exordos_core.compute.pool.drivers import inventory  # noqa: E402
+
+URI = "test:///default"
+STORAGE_POOL = "default-pool"
+DOMAIN_XML = """
+<domain type="test">
+  <name>{name}</name>
+  <memory>1024</memory>
+  <os><type>hvm</type></os>
+</domain>
+"""
+VOLUME_XML = """
+<volume>
+  <name>{name}</name>
+  <capacity>1048576</capacity>
+</volume>
+"""
+
+
+def _wait(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "Event hasn't been delivered"
+        time.sleep(0.01)
+
+
+def _names(inv):
+    return {d.name() for d, _ in inv.domains()}
+
+
+@pytest.fixture
+def conn():
+    inventory.ensure_event_loop()
+    conn = libvirt.open(URI)
+    yield conn
+    conn.close()
+
+
+class TestLibvirtInventory:
+    def test_load(self, conn):
+        inv = inventory.LibvirtInventory(STORAGE_POOL)
+
+        inv.refresh(conn)
+
+        assert "test" in _names(inv)
+        assert inv.parsed_domains == len(conn.listAllDomains())
+        assert inv.storage_pool.name() == STORAGE_POOL
+        assert inv.storage_pool_type == "dir"
+        inv.close()
+
+    def test_parse_changed_domains_only(self, conn):
+        inv = inventory.LibvirtInventory(STORAGE_POOL)
+        inv.refresh(conn)
+        parsed = inv.parsed_domains
+
+        domain = conn.defineXML(DOMAIN_XML.format(name="inventory-new"))
+        try:
+            _wait(lambda: inv._dirty_domains)
+            inv.refresh(conn)
+
+            assert "inventory-new" in _names(inv)
+            assert inv.parsed_domains == parsed + 1
+        finally:
+            domain.undefine()
+
+        _wait(lambda: inv._dirty_domains)
+        inv.refresh(conn)
+
+        assert "inventory-new" not in _names(inv)
+        inv.close()
+
+    def test_no_changes(self, conn):
+        inv = inventory.LibvirtInventory(STORAGE_POOL)
+        inv.refresh(conn)
+        parsed = inv.parsed_domains
+
+        inv.refresh(conn)
+
+        assert inv.parsed_domains == parsed
+        inv.close()
+
+    def test_resync(self, conn):
+        inv = inventory.LibvirtInventory(STORAGE_POOL, resync_period=0)
+        inv.refresh(conn)
+        parsed = inv.parsed_domains
+
+        inv.refresh(conn)
+
+        assert inv.parsed_domains == 2 * parsed
+        inv.close()
+
+    def test_invalidate_volumes(self, conn):
+        inv = inventory.LibvirtInventory(STORAGE_POOL)
+        inv.refresh(conn)
+        pool = conn.storagePoolLookupByName(STORAGE_POOL)
+
+        volume = pool.createXML(VOLUME_XML.format(name="inventory-vol"))
+        try:
+            inv.invalidate_volumes()
+            inv.refresh(conn)
+
+            (cached,) = [v for v in inv.volumes() if v.name() == "inventory-vol"]
+            assert inv.volume_info(cached)[1] == 1048576
+            assert inv.volume_path(cached) == volume.path()
+        finally:
+            volume.delete()
+
+        inv.invalidate_volumes("inventory-vol")
+        inv.refresh(conn)
+
+        assert "inventory-vol" not in {v.name() for v in inv.volumes()}
+        inv.close()
@@ -14,6 +14,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import random
+from unittest import mock
+
 import netaddr
 import pytest
 
@@ -110,3 +113,94 @@ class TestIPAM:
 
         empty_ipam.deallocate_ip(subnet, netaddr.IPAddress("0.0.1.1"))
         assert empty_ipam._pool_map[subnet] == [(0, 255), (257, 257)]
+
+
+class TestAddressBitmap:
+    def test_full(self):
+        bitmap = ipam.AddressBitmap(0, 255)
+
+        assert len(bitmap) == 256
+        assert bitmap.first() == 0
+        assert bitmap.ranges() == [(0, 255)]
+
+    def test_bulk_construction(self):
+        bitmap = ipam.AddressBitmap(10, 200, occupied=[10, 11, 64, 199, 300])
+
+        assert len(bitmap) == 187
+        assert bitmap.first() == 12
+        assert bitmap.ranges() == [(12, 63), (65, 198), (200, 200)]
+
+    def test_occupy_release(self):
+        bitmap = ipam.AddressBitmap(0, 1000)
+
+        assert bitmap.occupy(0)
+        assert not bitmap.occupy(0)
+        assert not bitmap.occupy(1001)
+        assert bitmap.first() == 1
+        assert bitmap.release(0)
+        assert not bitmap.release(0)
+        assert not bitmap.release(1001)
+        assert len(bitmap) == 1001
+
+    def test_exhausted(self):
+        bitmap = ipam.AddressBitmap(5, 5)
+
+        assert bitmap.occupy(5)
+        assert len(bitmap) == 0
+        with pytest.raises(IndexError):
+            bitmap.first()
+
+    def test_same_as_ranges(self, empty_ipam: ipam.Ipam):
+        rnd = random.Random(0)
+        occupied = rnd.sample(range(4096), 2000)
+        ranges = [(0, 4095)]
+        for address in occupied:
+            empty_ipam.occupy_ip(address, ranges)
+
+        bitmap = ipam.AddressBitmap(0, 4095, occupied)
+
+        assert bitmap.ranges() == ranges
+        assert bitmap.first() == ranges[0][0]
+
+
+class TestBitmapIpam:
+    @pytest.fixture
+    def bitmap_ipam(self, empty_ipam: ipam.Ipam) -> ipam.BitmapIpam:
+        return ipam.BitmapIpam({s: [] for s in empty_ipam._pool_map})
+
+    def test_allocate_ip(self, bitmap_ipam: ipam.BitmapIpam):
+        subnet = list(bitmap_ipam._pool_map.keys())[0]
+
+        assert bitmap_ipam.allocate_ip(subnet) == netaddr.IPAddress("0.0.0.0")
+        assert bitmap_ipam.allocate_ip(subnet) == netaddr.IPAddress("0.0.0.1")
+
+    def test_allocate_ip_target(self, bitmap_ipam: ipam.BitmapIpam):
+        subnet = list(bitmap_ipam._pool_map.keys())[0]
+
+        assert bitmap_ipam.allocate_ip(
+            subnet, netaddr.IPAddress("0.0.0.10")
+        ) == netaddr.IPAddress("0.0.0.10")
+        assert bitmap_ipam._pool_map[subnet].ranges() == [(0, 9), (11, 255)]
+
+    def test_allocate_ip_no_available_ips(self, bitmap_ipam: ipam.BitmapIpam):
+        subnet = list(bitmap_ipam._pool_map.keys())[0]
+        for _ in range(256):
+            bitmap_ipam.allocate_ip(subnet)
+
+        with pytest.raises(ipam.IpamNoIPsAvailable):
+            bitmap_ipam.allocate_ip(subnet)
+
+    def test_deallocate(self, bitmap_ipam: ipam.BitmapIpam):
+        subnet = list(bitmap_ipam._pool_map.keys())[0]
+        bitmap_ipam.allocate_ip(subnet, netaddr.IPAddress("0.0.0.128"))
+
+        bitmap_ipam.deallocate_ip(subnet, netaddr.IPAddress("0.0.0.128"))
+        # Already free and out of range IPs are ignored
+        bitmap_ipam.deallocate_ip(subnet, netaddr.IPAddress("0.0.0.128"))
+        bitmap_ipam.deallocate_ip(subnet, netaddr.IPAddress("0.0.1.1"))
+
+        assert bitmap_ipam._pool_map[subnet].ranges() == [(0, 255)]
+
+    def test_undefined_subnet(self, bitmap_ipam: ipam.BitmapIpam):
+        with pytest.raises(ipam.IpamUndefinedSubnet):
+            bitmap_ipam.allocate_ip(mock.MagicMock())
@@ -0,0 +1,160 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+import typing as tp
+import uuid as sys_uuid
+
+import netaddr
+import pytest
+
+from exordos_core.common import constants as c
+from exordos_core.compute.dm import models
+from exordos_core.network import ipam
+from exordos_core.network import state
+from exordos_core.network.dm import models as net_models
+
+NOW = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+class FakePort(tp.NamedTuple):
+    uuid: sys_uuid.UUID
+    subnet: models.Subnet
+    ipv4: netaddr.IPAddress
+    updated_at: datetime.datetime
+
+
+class FakeObjects:
+    def __init__(self, objects):
+        self.objects = objects
+        self.calls = []
+
+    def get_all(self, filters=None):
+        filters = filters or {}
+        self.calls.append(filters)
+        objects = self.objects
+        if "subnet" in filters:
+            subnets = set(filters["subnet"].value)
+            objects = [o for o in objects if str(o.subnet.uuid) in subnets]
+        if "updated_at" in filters:
+            since = filters["updated_at"].value
+            objects = [o for o in objects if o.updated_at >= since]
+        return list(objects)
+
+
+class TestNetworkState:
+    @pytest.fixture
+    def subnet(self):
+        return models.Subnet(
+            network=sys_uuid.uuid4(),
+            cidr=netaddr.IPNetwork("10.0.0.0/29"),
+            project_id=c.SERVICE_PROJECT_ID,
+            updated_at=NOW,
+        )
+
+    @pytest.fixture
+    def db(self, monkeypatch, subnet):
+        subnets = FakeObjects([subnet])
+        ports = FakeObjects(
+            [
+                FakePort(sys_uuid.uuid4(), subnet, netaddr.IPAddress(ip), NOW)
+                for ip in ("10.0.0.0", "10.0.0.2")
+            ]
+        )
+        monkeypatch.setattr(net_models.Subnet, "objects", subnets)
+        monkeypatch.setattr(net_models.Port, "objects", ports)
+        monkeypatch.setattr(
+            state.NetworkState,
+            "_port_counts",
+            staticmethod(lambda subnets: {subnet.uuid: len(ports.objects)}),
+        )
+        return subnets, ports
+
+    def test_lazy_pool(self, db, subnet):
+        network_state = state.NetworkState(ipam.BitmapIpam)
+
+        network_state.refresh()
+
+        assert subnet not in network_state._ipam
+        assert len(network_state.subnet_map()[subnet]) == 2
+        assert network_state.allocate_ip(subnet) == netaddr.IPAddress("10.0.0.1")
+        assert network_state.allocate_ip(subnet) == netaddr.IPAddress("10.0.0.3")
+
+    def test_incremental_ports(self, db, subnet):
+        _, ports = db
+        network_state = state.NetworkState(ipam.BitmapIpam)
+        network_state.refresh()
+        network_state.allocate_ip(subnet)
+
+        ports.objects.append(
+            FakePort(
+                sys_uuid.uuid4(),
+                subnet,
+                netaddr.IPAddress("10.0.0.3"),
+                NOW + datetime.timedelta(minutes=5),
+            )
+        )
+        ports.calls.clear()
+        network_state.refresh()
+
+        assert len(ports.calls) == 1
+        assert "updated_at" in ports.calls[0]
+        assert len(network_state.subnet_map()[subnet]) == 3
+        assert network_state.allocate_ip(subnet) == netaddr.IPAddress("10.0.0.4")
+
+    def test_deleted_ports(self, db, subnet):
+        _, ports = db
+        network_state = state.NetworkState(ipam.BitmapIpam, deletion_check_period=0)
+        network_state.refresh()
+        network_state.allocate_ip(subnet)
+
+        del ports.objects[0]
+        network_state.refresh()
+
+        assert len(network_state.subnet_map()[subnet]) == 1
+        assert network_state.allocate_ip(subnet) == netaddr.IPAddress("10.0.0.0")
+
+    def test_deleted_ports_before_check(self, db, subnet):
+        _, ports = db
+        network_state = state.NetworkState(ipam.BitmapIpam)
+        network_state.refresh()
+        network_state.allocate_ip(subnet)
+
+        del ports.objects[0]
+        network_state.refresh()
+
+        assert len(network_state.subnet_map()[subnet]) == 2
+        assert network_state.allocate_ip(subnet) == netaddr.IPAddress("10.0.0.3")
+
+    def test_changed_subnet(self, db, subnet):
+        subnets, _ = db
+        network_state = state.NetworkState(ipam.BitmapIpam)
+        network_state.refresh()
+        network_state.allocate_ip(subnet)
+
+        changed = models.Subnet(
+            uuid=subnet.uuid,
+            network=subnet.network,
+            cidr=subnet.cidr,
+            project_id=c.SERVICE_PROJECT_ID,
+            ip_range=netaddr.IPRange("10.0.0.4", "10.0.0.6"),
+            updated_at=NOW + datetime.timedelta(minutes=5),
+        )
+        subnets.objects = [changed]
+        network_state.refresh()
+
+        assert changed not in network_state._ipam
+        assert network_state.allocate_ip(changed) == netaddr.IPAddress("10.0.0.4")
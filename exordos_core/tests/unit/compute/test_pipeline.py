@@ -0,0 +1,169 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import typing as tp
+
+import pytest
+
+from exordos_core.common import utils
+from exordos_core.compute import constants as nc
+from exordos_core.compute.dm import models
+from exordos_core.compute.scheduler import pipeline
+from exordos_core.compute.scheduler.driver import base
+from exordos_core.compute.scheduler.driver.filters import available
+from exordos_core.compute.scheduler.driver.weighter import relative
+
+ENTRY_POINTS = {
+    nc.EP_SCHEDULER_POOL_FILTERS: {
+        "CoresRamAvailableFilter": available.CoresRamAvailableFilter,
+    },
+    nc.EP_SCHEDULER_POOL_WEIGHTERS: {
+        "RelativeCoreRamWeighter": relative.RelativeCoreRamWeighter,
+        "StackingWeighter": relative.StackingWeighter,
+    },
+    nc.EP_SCHEDULER_MACHINE_FILTERS: {
+        "HWCoresRamAvailableFilter": available.HWCoresRamAvailableFilter,
+    },
+    nc.EP_SCHEDULER_MACHINE_WEIGHTERS: {
+        "SimpleMachineWeighter": relative.SimpleMachineWeighter,
+    },
+}
+
+
+class FakeNode(tp.NamedTuple):
+    cores: int
+    ram: int
+
+
+def _pool(avail_cores):
+    return base.MachinePoolBundle(
+        pool=models.MachinePool(
+            all_cores=100,
+            avail_cores=avail_cores,
+            all_ram=100000,
+            avail_ram=avail_cores * 1000,
+        ),
+        volumes=[],
+    )
+
+
+class TestSchedulerPipeline:
+    @pytest.fixture(autouse=True)
+    def entry_points(self, monkeypatch):
+        monkeypatch.setattr(
+            utils,
+            "load_from_entry_point",
+            lambda group, name: ENTRY_POINTS[group][name],
+        )
+
+    @pytest.fixture
+    def scheduler_pipeline(self):
+        return pipeline.SchedulerPipeline.load(
+            pool_filters=["CoresRamAvailableFilter"],
+            pool_weighters=["RelativeCoreRamWeighter", "StackingWeighter"],
+            machine_filters=["HWCoresRamAvailableFilter"],
+            machine_weighters=["SimpleMachineWeighter"],
+            multipliers={"StackingWeighter": 3.0},
+        )
+
+    def test_load(self, scheduler_pipeline):
+        assert [s.name for s in scheduler_pipeline.pool_weighters] == [
+            "RelativeCoreRamWeighter",
+            "StackingWeighter",
+        ]
+        assert [s.multiplier for s in scheduler_pipeline.pool_weighters] == [1.0, 3.0]
+
+    def test_multiplier(self, scheduler_pipeline):
+        pools = [_pool(50), _pool(80)]
+
+        weights = scheduler_pipeline.pool_weighters[1].weight(pools)
+
+        assert weights == [1.5, pytest.approx(0.6)]
+
+    def test_stats(self, scheduler_pipeline):
+        node = base.NodeBundle(node=FakeNode(cores=10, ram=10000), volumes=[])
+        stage = scheduler_pipeline.pool_filters[0]
+        pools = [_pool(50), _pool(5)]
+
+        assert stage.filter(node, pools) == (pools[0],)
+        stage.filter(node, pools)
+
+        stats = scheduler_pipeline.stats()
+        assert stats[("pool_filter", "CoresRamAvailableFilter")].calls == 2
+        assert stats[("pool_weighter", "StackingWeighter")].calls == 0
+
+
+class TestDefaultSchedulerPipeline:
+    def test_load(self):
+        scheduler_pipeline = pipeline.SchedulerPipeline.load()
+
+        assert [s.name for s in scheduler_pipeline.pool_filters] == list(
+            pipeline.DEFAULT_POOL_FILTERS
+        )
+        assert [s.name for s in scheduler_pipeline.pool_weighters] == list(
+            pipeline.DEFAULT_POOL_WEIGHTERS
+        )
+        assert [s.name for s in scheduler_pipeline.machine_filters] == list(
+            pipeline.DEFAULT_MACHINE_FILTERS
+        )
+        assert [s.name for s in scheduler_pipeline.machine_weighters] == list(
+            pipeline.DEFAULT_MACHINE_WEIGHTERS
+        )
+
+    def test_load_unknown(self):
+        with pytest.raises(RuntimeError):
+            pipeline.SchedulerPipeline.load(pool_filters=["UnknownFilter"])
+
+
+class RecordingPoolFilter(base.MachinePoolAbstractFilter):
+    def __init__(self):
+        self.calls = []
+
+    def prefetch(self, scheduling_pass):
+        self.calls.append(("prefetch", scheduling_pass))
+
+    def placed(self, node, pool):
+        self.calls.append(("placed", node, pool))
+
+    def filter(self, node, pools):
+        return pools
+
+
+class TestStageHooks:
+    def test_pool_stage(self):
+        driver = RecordingPoolFilter()
+        stage = pipeline.FilterStage("RecordingPoolFilter", driver)
+        node = base.NodeBundle(node=FakeNode(cores=1, ram=1), volumes=[])
+        pool = _pool(10)
+        scheduling_pass = base.SchedulingPass([node], [pool])
+
+        stage.prefetch(scheduling_pass)
+        stage.placed(node, pool)
+
+        assert driver.calls == [
+            ("prefetch", scheduling_pass),
+            ("placed", node, pool),
+        ]
+        assert stage.stats.calls == 2
+
+    def test_machine_stage(self):
+        stage = pipeline.FilterStage(
+            "HWCoresRamAvailableFilter", available.HWCoresRamAvailableFilter()
+        )
+
+        stage.prefetch(base.SchedulingPass([], []))
+
+        assert stage.stats.calls == 0
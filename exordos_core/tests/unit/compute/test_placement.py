@@ -0,0 +1,154 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import typing as tp
+import uuid as sys_uuid
+
+import pytest
+
+from exordos_core.compute.dm import models
+from exordos_core.compute.scheduler import placement
+from exordos_core.compute.scheduler.driver import base
+from exordos_core.compute.scheduler.driver.weighter import relative
+
+
+def _pool(cores, ram):
+    return base.MachinePoolBundle(
+        pool=models.MachinePool(
+            all_cores=100,
+            avail_cores=cores,
+            all_ram=100000,
+            avail_ram=ram,
+        ),
+        volumes=[],
+    )
+
+
+class FakeNode(tp.NamedTuple):
+    uuid: sys_uuid.UUID
+    cores: int
+    ram: int
+
+
+def _node(cores, ram):
+    return FakeNode(uuid=sys_uuid.uuid4(), cores=cores, ram=ram)
+
+
+class TestPoolCapacityIndex:
+    @pytest.fixture
+    def pools(self):
+        return [_pool(10, 10000), _pool(50, 1000), _pool(80, 80000)]
+
+    def test_candidates(self, pools):
+        index = placement.PoolCapacityIndex(pools)
+
+        candidates = index.candidates(_node(20, 2048))
+
+        assert candidates == [pools[2]]
+
+    def test_candidates_all(self, pools):
+        index = placement.PoolCapacityIndex(pools)
+
+        candidates = index.candidates(_node(1, 512))
+
+        assert {p.pool.uuid for p in candidates} == {p.pool.uuid for p in pools}
+
+    def test_consume(self, pools):
+        index = placement.PoolCapacityIndex(pools)
+        node = _node(40, 40000)
+
+        index.consume(node, pools[2])
+
+        assert pools[2].pool.avail_cores == 40
+        assert pools[2].pool.avail_ram == 40000
+        assert index.candidates(node) == [pools[2]]
+        index.consume(node, pools[2])
+        assert index.candidates(node) == []
+
+
+class TestIdleMachineIndex:
+    @pytest.fixture
+    def index(self, monkeypatch):
+        fetched = []
+
+        def fetch_page(self, bucket):
+            # Two pages per bucket, one machine per page
+            page = [
+                base.MachineBundle(
+                    machine=FakeNode(sys_uuid.uuid4(), bucket.cores, bucket.ram),
+                    volumes=[],
+                )
+            ]
+            bucket.machines.extend(page)
+            fetched.append((bucket.cores, bucket.ram))
+            bucket.exhausted = fetched.count((bucket.cores, bucket.ram)) == 2
+            return page
+
+        monkeypatch.setattr(placement.IdleMachineIndex, "_fetch_page", fetch_page)
+        index = placement.IdleMachineIndex(page_size=1)
+        index._buckets = sorted(
+            (
+                placement._MachineBucket(64, 262144, 2),
+                placement._MachineBucket(8, 16384, 2),
+                placement._MachineBucket(16, 8192, 2),
+            ),
+            key=lambda b: (b.size, b.cores),
+        )
+        index.fetched = fetched
+        return index
+
+    def test_best_fit_first(self, index):
+        candidates = index.candidates(_node(4, 8192))
+
+        first = next(candidates)
+
+        assert (first[0].machine.cores, first[0].machine.ram) == (8, 16384)
+        assert index.fetched == [(8, 16384)]
+
+    def test_skip_small_buckets(self, index):
+        machines = [m for page in index.candidates(_node(12, 4096)) for m in page]
+
+        assert [(m.machine.cores, m.machine.ram) for m in machines] == [
+            (16, 8192),
+            (16, 8192),
+            (64, 262144),
+            (64, 262144),
+        ]
+        assert (8, 16384) not in index.fetched
+
+    def test_take(self, index):
+        machine = next(index.candidates(_node(4, 8192)))[0]
+
+        index.take(machine)
+        machine = next(index.candidates(_node(4, 8192)))[0]
+        index.take(machine)
+
+        first = next(index.candidates(_node(4, 8192)))[0]
+        assert (first.machine.cores, first.machine.ram) == (16, 8192)
+
+
+class TestWeights:
+    def test_accumulate_weights(self):
+        pools = [_pool(50, 50000), _pool(80, 80000)]
+        weighters = [relative.RelativeCoreRamWeighter()] * 2
+
+        weights = placement.accumulate_weights(weighters, pools)
+
+        assert weights == pytest.approx([2 * 0.28571, 2 * 0.71428], rel=1e-3)
+        assert placement.best_index(weights) == 1
+
+    def test_best_index_first_on_ties(self):
+        assert placement.best_index([0.5, 1.0, 1.0]) == 1
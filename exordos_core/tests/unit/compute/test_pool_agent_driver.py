@@ -0,0 +1,85 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+import uuid as sys_uuid
+
+import pytest
+
+from exordos_core.compute.agents.universal.drivers import pool as pool_driver
+
+
+class FakeDriver:
+    def __init__(self, pool=None):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class TestMetaPoolDrivers:
+    @pytest.fixture
+    def driver_map(self, monkeypatch):
+        driver_map = {}
+        monkeypatch.setattr(pool_driver.MetaPool, "__driver_map__", driver_map)
+        return driver_map
+
+    def _pool(self, name):
+        return pool_driver.MetaPool(
+            uuid=sys_uuid.uuid4(), driver_spec={"driver": "dummy", "name": name}
+        )
+
+    def test_evict_drivers(self, driver_map):
+        alive, gone = self._pool("alive"), self._pool("gone")
+        alive_driver, gone_driver = FakeDriver(), FakeDriver()
+        driver_map[str(alive.driver_spec)] = alive_driver
+        driver_map[str(gone.driver_spec)] = gone_driver
+
+        pool_driver.MetaPool.evict_drivers([alive])
+
+        assert driver_map == {str(alive.driver_spec): alive_driver}
+        assert gone_driver.closed
+        assert not alive_driver.closed
+
+    def test_load_driver_once(self, driver_map, monkeypatch):
+        pool = self._pool("pool")
+        loaded = []
+        barrier = threading.Barrier(4)
+
+        def driver_class(pool):
+            loaded.append(pool)
+            return FakeDriver(pool)
+
+        monkeypatch.setattr(
+            pool_driver.utils,
+            "load_from_entry_point",
+            lambda group, name: driver_class,
+        )
+        drivers = []
+
+        def run():
+            barrier.wait()
+            drivers.append(pool.load_driver())
+
+        threads = [threading.Thread(target=run) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(loaded) == 1
+        assert len({id(d) for d in drivers}) == 1
+        assert driver_map == {str(pool.driver_spec): drivers[0]}
@@ -0,0 +1,103 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import typing as tp
+import uuid as sys_uuid
+
+import pytest
+
+from exordos_core.compute.builders import pool as pool_builder
+from exordos_core.compute.dm import models
+
+
+class FakeNode(tp.NamedTuple):
+    uuid: sys_uuid.UUID
+
+
+class FakeMachine(tp.NamedTuple):
+    uuid: sys_uuid.UUID
+    node: FakeNode
+
+
+class FakePort(tp.NamedTuple):
+    uuid: sys_uuid.UUID
+    node: sys_uuid.UUID
+
+
+class FakeVolume(tp.NamedTuple):
+    uuid: sys_uuid.UUID
+    machine: sys_uuid.UUID
+    index: int
+
+
+class FakeObjects:
+    def __init__(self, objects, field):
+        self._objects = objects
+        self._field = field
+        self.calls = 0
+
+    def get_all(self, filters):
+        self.calls += 1
+        values = set(filters[self._field].value)
+        return [o for o in self._objects if getattr(o, self._field) in values]
+
+
+class TestPoolBuilderService:
+    @pytest.fixture
+    def machines(self):
+        return [
+            FakeMachine(uuid=sys_uuid.uuid4(), node=FakeNode(sys_uuid.uuid4()))
+            for _ in range(3)
+        ]
+
+    @pytest.fixture
+    def objects(self, monkeypatch, machines):
+        ports = [FakePort(sys_uuid.uuid4(), m.node.uuid) for m in machines[:2]]
+        volumes = [
+            FakeVolume(sys_uuid.uuid4(), m.uuid, i)
+            for m in machines[:2]
+            for i in (1, 0)
+        ]
+        port_objects = FakeObjects(ports, "node")
+        volume_objects = FakeObjects(volumes, "machine")
+        monkeypatch.setattr(models.Port, "objects", port_objects)
+        monkeypatch.setattr(models.MachineVolume, "objects", volume_objects)
+        return port_objects, volume_objects
+
+    @pytest.fixture
+    def builder(self):
+        return pool_builder.PoolBuilderService(sys_uuid.uuid4(), orch_client=None)
+
+    def test_prefetch_machine_deps(self, builder, machines, objects):
+        builder._iteration_context = {}
+
+        builder._prefetch_machine_deps(machines)
+        deps = [builder._fetch_machine_deps(m) for m in machines]
+
+        assert [o.calls for o in objects] == [1, 1]
+        for machine, (ports, volumes) in zip(machines[:2], deps):
+            assert [p.node for p in ports] == [machine.node.uuid]
+            assert [v.index for v in volumes] == [0, 1]
+            assert {v.machine for v in volumes} == {machine.uuid}
+        assert deps[2] == ([], [])
+
+    def test_agent_by_pool(self, builder):
+        pool = models.MachinePool(agent=sys_uuid.uuid4())
+        builder._iteration_context = {"pool_agents": {pool.uuid: pool.agent}}
+
+        assert builder._agent_by_pool(pool.uuid) == pool.agent
+        with pytest.raises(ValueError):
+            builder._agent_by_pool(sys_uuid.uuid4())
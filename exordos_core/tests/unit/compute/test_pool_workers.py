@@ -0,0 +1,156 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+import uuid as sys_uuid
+
+import pytest
+
+from exordos_core.compute.agents.universal.drivers import workers
+
+
+class TestPoolWorkers:
+    @pytest.fixture
+    def pool_workers(self):
+        pool_workers = workers.PoolWorkers(2, timeout=0.2)
+        yield pool_workers
+        pool_workers.shutdown()
+
+    def test_complete_on_collect(self, pool_workers):
+        pool, uuid = sys_uuid.uuid4(), sys_uuid.uuid4()
+        completed = []
+
+        pool_workers.submit(
+            pool, "pool_volume", uuid, lambda: None, lambda: completed.append(uuid)
+        )
+
+        assert uuid in pool_workers
+        pool_workers.collect("pool_volume")
+        assert completed == [uuid]
+        assert uuid not in pool_workers
+
+    def test_collect_kind(self, pool_workers):
+        pool = sys_uuid.uuid4()
+        volume, machine = sys_uuid.uuid4(), sys_uuid.uuid4()
+        completed = []
+
+        pool_workers.submit(
+            pool, "pool_volume", volume, lambda: None, lambda: completed.append(volume)
+        )
+        pool_workers.submit(
+            pool,
+            "pool_machine",
+            machine,
+            lambda: None,
+            lambda: completed.append(machine),
+        )
+        pool_workers.collect("pool_volume")
+
+        assert completed == [volume]
+        assert machine in pool_workers
+
+    def test_failure_is_isolated(self, pool_workers):
+        pool = sys_uuid.uuid4()
+        failed, succeeded = sys_uuid.uuid4(), sys_uuid.uuid4()
+        completed = []
+
+        def fail():
+            raise RuntimeError("boom")
+
+        pool_workers.submit(
+            pool, "pool_machine", failed, fail, lambda: completed.append(failed)
+        )
+        pool_workers.submit(
+            pool,
+            "pool_machine",
+            succeeded,
+            lambda: None,
+            lambda: completed.append(succeeded),
+        )
+        pool_workers.collect()
+
+        assert completed == [succeeded]
+        assert failed not in pool_workers
+
+    def test_timeout(self, pool_workers):
+        pool, uuid = sys_uuid.uuid4(), sys_uuid.uuid4()
+        release = threading.Event()
+        completed = []
+
+        pool_workers.submit(
+            pool, "pool_machine", uuid, release.wait, lambda: completed.append(uuid)
+        )
+        pool_workers.collect()
+
+        assert uuid in pool_workers
+        assert completed == []
+        with pytest.raises(ValueError):
+            pool_workers.submit(pool, "pool_machine", uuid, release.wait, None)
+
+        release.set()
+        pool_workers._operations[uuid].future.result()
+        pool_workers.collect()
+        assert completed == [uuid]
+
+    def test_collect_no_wait(self, pool_workers):
+        pool, uuid = sys_uuid.uuid4(), sys_uuid.uuid4()
+        release = threading.Event()
+        completed = []
+
+        pool_workers.submit(
+            pool, "pool_volume", uuid, release.wait, lambda: completed.append(uuid)
+        )
+        pool_workers.collect("pool_volume", wait=False)
+        assert uuid in pool_workers
+
+        release.set()
+        pool_workers._operations[uuid].future.result()
+        pool_workers.collect("pool_volume", wait=False)
+        assert completed == [uuid]
+
+    def test_blocked(self, pool_workers):
+        pool, volume, machine = sys_uuid.uuid4(), sys_uuid.uuid4(), sys_uuid.uuid4()
+        release = threading.Event()
+
+        pool_workers.submit(
+            pool,
+            "pool_volume",
+            volume,
+            release.wait,
+            lambda: None,
+            dependents=(machine,),
+        )
+        assert pool_workers.blocked(machine)
+        assert not pool_workers.blocked(volume)
+
+        release.set()
+        pool_workers._operations[volume].future.result()
+        pool_workers.collect(wait=False)
+        assert not pool_workers.blocked(machine)
+
+    def test_evict(self, pool_workers):
+        pool, gone = sys_uuid.uuid4(), sys_uuid.uuid4()
+        for p in (pool, gone):
+            pool_workers.submit(
+                p, "pool_volume", sys_uuid.uuid4(), lambda: None, lambda: None
+            )
+
+        pool_workers.evict([pool])
+        assert len(pool_workers._executors) == 2
+
+        pool_workers.collect()
+        pool_workers.evict([pool])
+        assert tuple(pool_workers._executors) == (pool,)
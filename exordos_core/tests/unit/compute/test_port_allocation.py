@@ -0,0 +1,135 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import uuid as sys_uuid
+
+import netaddr
+import pytest
+
+from exordos_core.common import constants as c
+from exordos_core.compute.dm import models
+from exordos_core.network import allocation
+from exordos_core.network import ipam
+from exordos_core.network import state
+
+
+class FakePort:
+    def __init__(self, subnet, target_ipv4=None):
+        self.uuid = sys_uuid.uuid4()
+        self.subnet = subnet
+        self.target_ipv4 = target_ipv4
+        self.ipv4 = None
+        self._saved = False
+
+
+class FakeUniqueIndex:
+    """IPs inserted by all workers, emulates the unique index."""
+
+    def __init__(self):
+        self.taken = set()
+        self.statements = []
+
+    def insert(self, ports):
+        self.statements.append(len(ports))
+        inserted = set()
+        for port in ports:
+            if port.ipv4 not in self.taken:
+                self.taken.add(port.ipv4)
+                inserted.add(port.uuid)
+        return inserted
+
+
+class TestPortAllocator:
+    @pytest.fixture
+    def subnet(self):
+        return models.Subnet(
+            network=sys_uuid.uuid4(),
+            cidr=netaddr.IPNetwork("10.0.0.0/29"),
+            project_id=c.SERVICE_PROJECT_ID,
+        )
+
+    @pytest.fixture
+    def network_state(self, subnet):
+        network_state = state.NetworkState(ipam.BitmapIpam)
+        network_state._subnets = {subnet.uuid: subnet}
+        network_state._ports = {subnet.uuid: {}}
+        return network_state
+
+    @pytest.fixture
+    def index(self, monkeypatch):
+        index = FakeUniqueIndex()
+        monkeypatch.setattr(
+            allocation.PortAllocator, "_insert", staticmethod(index.insert)
+        )
+        return index
+
+    def test_batch(self, network_state, subnet, index):
+        ports = [FakePort(subnet) for _ in range(3)]
+
+        allocated = allocation.PortAllocator(network_state).allocate(ports)
+
+        assert allocated == ports
+        assert [p.ipv4 for p in ports] == [
+            netaddr.IPAddress(f"10.0.0.{i}") for i in range(3)
+        ]
+        assert index.statements == [3]
+        assert all(p._saved for p in ports)
+        assert len(network_state.subnet_map()[subnet]) == 3
+
+    def test_lost_race(self, network_state, subnet, index):
+        index.taken.update(
+            {netaddr.IPAddress("10.0.0.0"), netaddr.IPAddress("10.0.0.2")}
+        )
+        ports = [FakePort(subnet) for _ in range(2)]
+
+        allocated = allocation.PortAllocator(network_state).allocate(ports)
+
+        assert {p.uuid for p in allocated} == {p.uuid for p in ports}
+        assert {p.ipv4 for p in ports} == {
+            netaddr.IPAddress("10.0.0.1"),
+            netaddr.IPAddress("10.0.0.3"),
+        }
+        # The first port lost two races
+        assert index.statements == [2, 1, 1]
+
+    def test_taken_target(self, network_state, subnet, index):
+        target = netaddr.IPAddress("10.0.0.5")
+        index.taken.add(target)
+        ports = [FakePort(subnet, target), FakePort(subnet)]
+
+        allocated = allocation.PortAllocator(network_state).allocate(ports)
+
+        assert allocated == ports[1:]
+        assert index.statements == [2]
+
+    def test_no_ips(self, network_state, subnet, index):
+        ports = [FakePort(subnet) for _ in range(10)]
+
+        allocated = allocation.PortAllocator(network_state).allocate(ports)
+
+        assert allocated == ports[:8]
+
+    def test_insert_error(self, monkeypatch, network_state, subnet):
+        def insert(ports):
+            raise RuntimeError("Lost connection")
+
+        monkeypatch.setattr(allocation.PortAllocator, "_insert", staticmethod(insert))
+
+        with pytest.raises(RuntimeError):
+            allocation.PortAllocator(network_state).allocate([FakePort(subnet)])
+
+        # The IP is returned to the pool
+        assert network_state.allocate_ip(subnet) == netaddr.IPAddress("10.0.0.0")
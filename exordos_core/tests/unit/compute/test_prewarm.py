@@ -0,0 +1,98 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import pytest
+
+from exordos_core.compute.dm import models
+from exordos_core.compute.scheduler import prewarm
+from exordos_core.compute.scheduler import storage
+from exordos_core.compute.scheduler.driver import base
+
+IMAGE = "http://repo/ubuntu.raw.gz"
+
+
+def _pool(usable=100):
+    return base.MachinePoolBundle(
+        pool=models.MachinePool(
+            storage_pools=[
+                models.ThinStoragePool(pool_type="dir", capacity_usable=usable)
+            ],
+        ),
+        volumes=[],
+    )
+
+
+class TestPrewarmSpec:
+    def test_parse(self):
+        spec = prewarm.PrewarmSpec.parse(f"10:3:{IMAGE}")
+
+        assert spec == prewarm.PrewarmSpec(image=IMAGE, size=10, volumes=3)
+
+
+class TestVolumePrewarmer:
+    @pytest.fixture(autouse=True)
+    def saved(self, monkeypatch):
+        saved = []
+        monkeypatch.setattr(
+            models.MachineVolume, "save", lambda self: saved.append(self)
+        )
+        return saved
+
+    @pytest.fixture
+    def indexes(self):
+        indexes = {}
+        return lambda pool: indexes.setdefault(
+            pool.pool.uuid, storage.ReusableVolumeIndex()
+        )
+
+    def test_refill(self, saved, indexes):
+        pools = [_pool(), _pool()]
+        prewarmer = prewarm.VolumePrewarmer([prewarm.PrewarmSpec(IMAGE, 10, 2)])
+
+        created = prewarmer.refill(pools, indexes)
+
+        assert created == saved
+        assert len(created) == 4
+        assert {v.pool for v in created} == {p.pool.uuid for p in pools}
+        assert all(indexes(p).count(IMAGE, 10) == 2 for p in pools)
+        assert pools[0].pool.storage_pools[0].capacity_provisioned == 20
+        assert prewarmer.refill(pools, indexes) == []
+
+    def test_refill_limit_and_space(self, indexes):
+        pools = [_pool(usable=15), _pool()]
+        prewarmer = prewarm.VolumePrewarmer(
+            [prewarm.PrewarmSpec(IMAGE, 10, 3)], per_pass=3
+        )
+
+        created = prewarmer.refill(pools, indexes)
+
+        # One volume fits the first pool, the rest go to the second one
+        assert [v.pool for v in created] == [pools[0].pool.uuid] + [
+            pools[1].pool.uuid
+        ] * 2
+
+    def test_stats(self):
+        prewarmer = prewarm.VolumePrewarmer([prewarm.PrewarmSpec(IMAGE, 10, 2)])
+        for hit in (True, True, True, False):
+            prewarmer.observe(IMAGE, hit)
+        prewarmer.observe("http://repo/other.raw.gz", False)
+
+        assert prewarmer.stats.hit_ratio(IMAGE) == 0.75
+        assert (
+            f'exordos_prewarm_hit_ratio{{image="{IMAGE}"}} 0.75'
+            in prewarmer.stats.render("exordos")
+        )
+        assert prewarmer.stats.misses == {IMAGE: 1}
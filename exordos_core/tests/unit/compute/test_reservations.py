@@ -0,0 +1,96 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import uuid as sys_uuid
+
+import pytest
+
+from exordos_core.compute.dm import models
+from exordos_core.compute.scheduler import placement
+from exordos_core.compute.scheduler import reservations
+
+POOL = sys_uuid.uuid4()
+OTHER_POOL = sys_uuid.uuid4()
+
+
+def _reservation(pool, cores, ram):
+    machine = sys_uuid.uuid4()
+    return models.MachinePoolReservations(
+        uuid=machine, pool=pool, machine=machine, cores=cores, ram=ram
+    )
+
+
+class TestReservationLedger:
+    @pytest.fixture
+    def deleted(self, monkeypatch):
+        deleted = []
+        monkeypatch.setattr(
+            reservations, "delete_reservations", lambda m: deleted.extend(m)
+        )
+        return deleted
+
+    @pytest.fixture
+    def rows(self):
+        return [
+            _reservation(POOL, 2, 2048),
+            _reservation(POOL, 4, 4096),
+            _reservation(OTHER_POOL, 8, 8192),
+        ]
+
+    def test_reserved(self, rows):
+        ledger = reservations.ReservationLedger(rows)
+
+        assert ledger.reserved(POOL) == (6, 6144)
+        assert ledger.reserved(POOL, exclude=rows[0].machine) == (4, 4096)
+        assert ledger.reserved(sys_uuid.uuid4()) == (0, 0)
+
+    def test_release(self, rows, deleted):
+        ledger = reservations.ReservationLedger(rows)
+
+        assert ledger.release(rows[1].machine)
+        assert not ledger.release(rows[1].machine)
+
+        assert rows[1].machine not in ledger
+        assert ledger.reserved(POOL) == (2, 2048)
+        assert deleted == [rows[1].machine]
+
+
+def test_apply_reserved():
+    pools = [
+        models.MachinePool(uuid=POOL, avail_cores=10, avail_ram=10240),
+        models.MachinePool(uuid=OTHER_POOL, avail_cores=10, avail_ram=10240),
+    ]
+
+    reservations.apply_reserved(pools, {POOL: reservations.Reserved(6, 6144)})
+
+    assert (pools[0].avail_cores, pools[0].avail_ram) == (4, 4096)
+    assert (pools[1].avail_cores, pools[1].avail_ram) == (10, 10240)
+
+
+def test_writer_reserves_machines():
+    machine = models.Machine(
+        cores=2,
+        ram=2048,
+        pool=POOL,
+        project_id=sys_uuid.uuid4(),
+    )
+    writer = placement.PlacementWriter()
+
+    writer.add(machine, ())
+
+    (reservation,) = writer._reservations
+    assert reservation.uuid == reservation.machine == machine.uuid
+    assert (reservation.pool, reservation.cores, reservation.ram) == (POOL, 2, 2048)
@@ -0,0 +1,85 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import uuid as sys_uuid
+
+import pytest
+
+from exordos_core.compute.dm import models
+from exordos_core.compute.scheduler import storage
+
+
+def _storage_pool(usable, provisioned, ratio=1.0):
+    return models.ThinStoragePool(
+        pool_type="dir",
+        capacity_usable=usable,
+        capacity_provisioned=provisioned,
+        oversubscription_ratio=ratio,
+    )
+
+
+def _volume(image, size):
+    return models.MachineVolume(image=image, size=size, project_id=sys_uuid.uuid4())
+
+
+class TestSelectStoragePool:
+    def test_most_free(self):
+        pools = [_storage_pool(100, 80), _storage_pool(100, 20)]
+
+        assert storage.select_storage_pool(pools, 10) is pools[1]
+
+    def test_less_oversubscribed_on_ties(self):
+        pools = [_storage_pool(100, 100, 2.0), _storage_pool(200, 100)]
+
+        assert storage.select_storage_pool(pools, 10) is pools[1]
+
+    def test_no_space(self):
+        pools = [_storage_pool(100, 95), _storage_pool(100, 99)]
+
+        assert storage.select_storage_pool(pools, 10) is None
+        assert storage.select_storage_pool([], 10) is None
+
+
+class TestReusableVolumeIndex:
+    @pytest.fixture
+    def volumes(self):
+        return [
+            _volume("ubuntu", 10),
+            _volume("ubuntu", 20),
+            _volume("ubuntu", 20),
+            _volume("debian", 15),
+            _volume(None, 10),
+        ]
+
+    def test_find_best_fit(self, volumes):
+        index = storage.ReusableVolumeIndex(volumes)
+
+        assert len(index) == 4
+        assert index.find("ubuntu", 25).size == 20
+        assert index.find("ubuntu", 15).size == 10
+        assert index.find("ubuntu", 5) is None
+        assert index.find("centos", 50) is None
+
+    def test_remove(self, volumes):
+        index = storage.ReusableVolumeIndex(volumes)
+
+        for _ in range(2):
+            index.remove(index.find("ubuntu", 20))
+
+        assert index.find("ubuntu", 20) is volumes[0]
+        index.remove(volumes[0])
+        assert index.find("ubuntu", 20) is None
+        assert len(index) == 1
@@ -100,3 +100,9 @@ class TestSchedulerWeighter:
 
         # Weight for overused pool might be treated as the worst case
         assert weights[0] == 0.0
+
+    def test_stacking_weight(self, pools):
+        """Test the stacking weighter prefers the most used pools."""
+        weights = list(relative.StackingWeighter().weight(pools[:2]))
+
+        assert weights == [0.5, pytest.approx(0.2)]
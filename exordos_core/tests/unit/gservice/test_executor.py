@@ -0,0 +1,113 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+import time
+
+from gcl_looper.services import basic
+import pytest
+
+from exordos_core.gservice import executor
+
+
+class FakeService(basic.BasicService):
+    def __init__(self, name, journal, duration=0.0):
+        super().__init__()
+        self.name = name
+        self._journal = journal
+        self._duration = duration
+        self.threads = []
+
+    def _iteration(self):
+        self.threads.append(threading.get_ident())
+        time.sleep(self._duration)
+        self._journal.append(self.name)
+
+
+class TestParallelServiceExecutor:
+    @pytest.fixture
+    def journal(self):
+        return []
+
+    def test_run_all_services(self, journal):
+        services = [FakeService(str(i), journal) for i in range(5)]
+        pool = executor.ParallelServiceExecutor(workers=3)
+
+        pool.run(services)
+        pool.shutdown()
+
+        assert sorted(journal) == [s.name for s in services]
+        assert all(s.threads for s in services)
+
+    def test_dependencies_order(self, journal):
+        scheduler = FakeService("scheduler", journal, duration=0.05)
+        builder = FakeService("builder", journal)
+        agent = FakeService("agent", journal)
+        pool = executor.ParallelServiceExecutor(
+            workers=3,
+            dependencies={
+                id(builder): (scheduler,),
+                id(agent): (builder,),
+            },
+        )
+
+        pool.run([agent, builder, scheduler])
+        pool.shutdown()
+
+        assert journal == ["scheduler", "builder", "agent"]
+
+    def test_dependency_out_of_pass(self, journal):
+        scheduler = FakeService("scheduler", journal)
+        builder = FakeService("builder", journal)
+        pool = executor.ParallelServiceExecutor(
+            workers=2,
+            dependencies={id(builder): (scheduler,)},
+        )
+
+        pool.run([builder])
+        pool.shutdown()
+
+        assert journal == ["builder"]
+
+    def test_deadline(self, journal):
+        slow = FakeService("slow", journal, duration=0.3)
+        fast = FakeService("fast", journal)
+        pool = executor.ParallelServiceExecutor(workers=2, deadline=0.05)
+
+        started_at = time.monotonic()
+        pool.run([slow, fast])
+        assert time.monotonic() - started_at < 0.3
+        assert journal == ["fast"]
+
+        # The slow service is still running so it's skipped
+        pool.run([slow, fast])
+        assert len(slow.threads) == 1
+
+        time.sleep(0.3)
+        pool.run([fast])
+        pool.shutdown()
+        assert journal == ["fast", "fast", "slow", "fast"]
+
+
+class TestSerialServiceExecutor:
+    def test_run(self):
+        journal = []
+        services = [FakeService(str(i), journal) for i in range(3)]
+
+        executor.SerialServiceExecutor().run(services)
+
+        assert journal == ["0", "1", "2"]
+        assert {t for s in services for t in s.threads} == {threading.get_ident()}
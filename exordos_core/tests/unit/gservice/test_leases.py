@@ -0,0 +1,130 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import uuid as sys_uuid
+
+import pytest
+
+from exordos_core.common import sharding
+from exordos_core.gservice import leases
+
+
+class FakeCursor:
+    def __init__(self, row):
+        self._row = row
+
+    def fetchone(self):
+        return self._row
+
+
+class FakeConnection:
+    """Emulates session advisory locks shared by all connections."""
+
+    def __init__(self, locks):
+        self._locks = locks
+        self.closed = False
+
+    def execute(self, statement, params=()):
+        if "pg_try_advisory_lock" in statement:
+            owner = self._locks.setdefault(params, self)
+            return FakeCursor((owner is self,))
+        if "pg_advisory_unlock" in statement:
+            if self._locks.get(params) is self:
+                del self._locks[params]
+            return FakeCursor((True,))
+        if "pg_locks" in statement:
+            members = [k for k in self._locks if k[0] == params[0]]
+            return FakeCursor((len(members),))
+        raise ValueError(statement)
+
+    def close(self):
+        # The server releases the session locks
+        for key, owner in tuple(self._locks.items()):
+            if owner is self:
+                del self._locks[key]
+        self.closed = True
+
+
+KEYS = ["a", "b", "c", "d:0", "d:1"]
+
+
+class TestLeaseManager:
+    @pytest.fixture
+    def locks(self, monkeypatch):
+        locks = {}
+        monkeypatch.setattr(
+            leases.psycopg, "connect", lambda *args, **kwargs: FakeConnection(locks)
+        )
+        return locks
+
+    def test_single_member_owns_all(self, locks):
+        manager = leases.LeaseManager("postgresql://", refresh_period=0)
+
+        assert manager.refresh(KEYS) == set(KEYS)
+
+    def test_rebalance(self, locks):
+        first = leases.LeaseManager("postgresql://", refresh_period=0)
+        second = leases.LeaseManager("postgresql://", refresh_period=0)
+
+        first.refresh(KEYS)
+        second.refresh(KEYS)
+        first.refresh(KEYS)
+        second.refresh(KEYS)
+
+        assert first.owned | second.owned == set(KEYS)
+        assert not first.owned & second.owned
+        assert len(first.owned) == 3
+        assert len(second.owned) == 2
+
+    def test_keep_leases(self, locks):
+        first = leases.LeaseManager("postgresql://", refresh_period=0)
+        second = leases.LeaseManager("postgresql://", refresh_period=0)
+
+        first.refresh(KEYS)
+        second.refresh(KEYS)
+        first.refresh(KEYS, keep=KEYS)
+
+        assert first.owned == set(KEYS)
+
+    def test_takeover(self, locks):
+        first = leases.LeaseManager("postgresql://", refresh_period=0)
+        second = leases.LeaseManager("postgresql://", refresh_period=0)
+        first.refresh(KEYS)
+        second.refresh(KEYS)
+        first.refresh(KEYS)
+
+        first.close()
+
+        assert second.refresh(KEYS) == set(KEYS)
+
+
+class TestShardedServiceMixin:
+    class Service(sharding.ShardedServiceMixin):
+        pass
+
+    def test_all_shards_by_default(self):
+        service = self.Service()
+
+        assert service.is_primary_shard
+        assert service.in_shard(sys_uuid.uuid4())
+
+    def test_in_shard(self):
+        service = self.Service()
+        service.set_shards([1], 2)
+
+        assert not service.is_primary_shard
+        assert service.in_shard(sys_uuid.UUID(int=3))
+        assert not service.in_shard(sys_uuid.UUID(int=4))
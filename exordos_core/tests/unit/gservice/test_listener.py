@@ -0,0 +1,92 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import itertools
+
+from gcl_looper.services import basic
+
+from exordos_core.gservice import executor
+from exordos_core.gservice import listener
+
+
+class FakeConnectionInfo:
+    def __init__(self, backend_pid):
+        self.backend_pid = backend_pid
+
+
+class FakeConnection:
+    def __init__(self, backend_pid):
+        self.info = FakeConnectionInfo(backend_pid)
+
+    def cursor(self, row_factory=None):
+        return None
+
+
+class FakeEngine:
+    db_name = "fake"
+
+    def __init__(self):
+        self._pids = itertools.count(100)
+
+    def get_connection(self):
+        return FakeConnection(next(self._pids))
+
+    def get_session(self):
+        raise AssertionError("The sessions aren't hooked")
+
+
+class WritingService(basic.BasicService):
+    def __init__(self, engine):
+        super().__init__()
+        self._engine = engine
+
+    def _iteration(self):
+        self._engine.get_session()
+
+
+class TestOriginTracker:
+    def test_sessions_of_services_are_tracked(self):
+        engine = FakeEngine()
+        origins = listener.OriginTracker()
+        origins.install(engine)
+        first = WritingService(engine)
+        second = WritingService(engine)
+
+        executor.SerialServiceExecutor(origins=origins).run([first, second])
+
+        assert origins.owner(100) == id(first)
+        assert origins.owner(101) == id(second)
+
+    def test_sessions_out_of_services_are_not_tracked(self):
+        engine = FakeEngine()
+        origins = listener.OriginTracker()
+        origins.install(engine)
+
+        engine.get_session()
+
+        assert origins.owner(100) is None
+
+    def test_backend_reused_by_another_service(self):
+        engine = FakeEngine()
+        origins = listener.OriginTracker()
+        origins.install(engine)
+        first = WritingService(engine)
+        second = WritingService(engine)
+        engine._pids = itertools.repeat(100)
+
+        executor.SerialServiceExecutor(origins=origins).run([first, second])
+
+        assert origins.owner(100) == id(second)
@@ -0,0 +1,137 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from gcl_looper.services import basic
+import pytest
+
+from exordos_core.compute.scheduler import pipeline
+from exordos_core.gservice import executor
+from exordos_core.gservice import metrics
+
+
+class FakeCursor:
+    def execute(self, statement, values=None):
+        pass
+
+
+class FakeConnection:
+    def cursor(self, row_factory=None):
+        return FakeCursor()
+
+
+class FakeEngine:
+    db_name = "fake"
+
+    def get_connection(self):
+        return FakeConnection()
+
+
+class FakeService(basic.BasicService):
+    def __init__(self, engine=None, statements=0, fail=False):
+        super().__init__(iter_min_period=10)
+        self._engine = engine
+        self._statements = statements
+        self._fail = fail
+
+    def _iteration(self):
+        if self._engine is not None:
+            session = self._engine.get_session()
+            for i in range(self._statements):
+                session.execute(f"SELECT {i}")
+        if self._fail:
+            raise RuntimeError("Iteration failed")
+
+
+class TestServiceMetrics:
+    @pytest.fixture
+    def service_metrics(self, tmp_path):
+        return metrics.ServiceMetrics(path=str(tmp_path / "gservice.prom"))
+
+    def test_measure(self, service_metrics):
+        service = FakeService()
+        service_metrics.register(service, "fake")
+
+        executor.SerialServiceExecutor(service_metrics).run([service, service])
+
+        stats = service_metrics.stats(service)
+        assert stats.iterations == 2
+        assert sum(stats.bucket_counts) == 2
+        assert stats.failures == 0
+        assert stats.overruns == 0
+        assert stats.last_success is not None
+
+    def test_measure_failure(self, service_metrics):
+        service = FakeService(fail=True)
+        service_metrics.register(service, "fake")
+
+        executor.SerialServiceExecutor(service_metrics).run([service])
+
+        stats = service_metrics.stats(service)
+        assert stats.iterations == 1
+        assert stats.failures == 1
+        assert stats.last_success is None
+
+    def test_sql_statements(self, service_metrics):
+        engine = FakeEngine()
+        metrics.install_sql_counter(engine)
+        service = FakeService(engine=engine, statements=3)
+        service_metrics.register(service, "fake")
+
+        executor.SerialServiceExecutor(service_metrics).run([service, service])
+
+        stats = service_metrics.stats(service)
+        assert stats.last_sql_statements == 3
+        assert stats.sql_statements == 6
+
+    def test_export(self, service_metrics, tmp_path):
+        service = FakeService()
+        service_metrics.register(service, "fake")
+        service_metrics.observe_lag(service, 1.5)
+
+        executor.SerialServiceExecutor(service_metrics).run([service])
+        service_metrics.export()
+
+        content = (tmp_path / "gservice.prom").read_text()
+        assert (
+            'exordos_gservice_iteration_duration_seconds_bucket{service="fake",'
+            'le="+Inf"} 1'
+        ) in content
+        assert (
+            'exordos_gservice_iteration_duration_seconds_count{service="fake"} 1'
+            in (content)
+        )
+        assert 'exordos_gservice_last_iteration_lag_seconds{service="fake"} 1.5' in (
+            content
+        )
+        assert 'exordos_gservice_iteration_overruns_total{service="fake"} 0' in content
+
+    def test_export_stages(self, service_metrics, tmp_path):
+        service_metrics.register_stages(
+            "scheduler",
+            lambda: {("pool_filter", "Fake"): pipeline.StageStats(3, 0.25)},
+        )
+
+        service_metrics.export()
+
+        content = (tmp_path / "gservice.prom").read_text()
+        assert (
+            'exordos_gservice_stage_calls_total{service="scheduler",'
+            'kind="pool_filter",stage="Fake"} 3'
+        ) in content
+        assert (
+            'exordos_gservice_stage_duration_seconds_total{service="scheduler",'
+            'kind="pool_filter",stage="Fake"} 0.25'
+        ) in content
@@ -0,0 +1,100 @@
+#    Copyright 2026 Genesis Corporation.
+#
+#    All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from exordos_core.gservice import listener
+from exordos_core.gservice import metrics
+from exordos_core.gservice import sessions
+
+
+class FakeCursor:
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, statement, values=None):
+        self.statements.append(statement)
+
+    def executemany(self, statement, values):
+        self.statements.append(statement)
+
+
+class FakeConnectionInfo:
+    backend_pid = 100
+
+
+class FakeConnection:
+    info = FakeConnectionInfo()
+
+    def __init__(self):
+        self.cursors = []
+
+    def cursor(self, row_factory=None):
+        cursor = FakeCursor()
+        self.cursors.append(cursor)
+        return cursor
+
+
+class FakeEngine:
+    db_name = "fake"
+
+    def __init__(self):
+        self.connection = FakeConnection()
+
+    def get_connection(self):
+        return self.connection
+
+
+class TestInstall:
+    def test_install_once(self):
+        engine = FakeEngine()
+
+        hooks = sessions.install(engine)
+        get_session = engine.get_session
+
+        assert sessions.install(engine) is hooks
+        assert engine.get_session is get_session
+        assert isinstance(engine.get_session(), sessions.HookedPgSQLSession)
+
+    def test_hooks(self):
+        engine = FakeEngine()
+        hooks = sessions.install(engine)
+        opened = []
+        executed = []
+        hooks.on_opened(opened.append)
+        hooks.on_executed(lambda: executed.append(True))
+
+        session = engine.get_session()
+        session.execute("SELECT 1")
+        session.execute_many("SELECT %s", [(1,), (2,)])
+
+        assert opened == [session]
+        assert session.backend_pid == 100
+        assert len(executed) == 2
+        assert engine.connection.cursors[0].statements == [
+            "SELECT 1",
+            "SELECT %s",
+        ]
+
+    def test_features_installed_twice(self):
+        engine = FakeEngine()
+        origins = listener.OriginTracker()
+        for _ in range(2):
+            metrics.install_sql_counter(engine)
+            origins.install(engine)
+
+        before = metrics._sql_statements()
+        engine.get_session().execute("SELECT 1")
+
+        assert metrics._sql_statements() - before == 1
@@ -0,0 +1,107 @@
+# Copyright 2026 Genesis Corporation
+#
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from restalchemy.storage.sql import migrations
+
+# Tables which wake up the interested gservice services on changes
+NOTIFY_TABLES = (
+    "nodes",
+    "compute_ports",
+    "machines",
+    "config_configs",
+    "em_resources",
+    "ua_target_resources",
+)
+# A transition table may be attached to a single event only, so every
+# event has its own trigger
+NOTIFY_EVENTS = (
+    ("INSERT", "NEW"),
+    ("UPDATE", "NEW"),
+    ("DELETE", "OLD"),
+)
+
+
+class MigrationStep(migrations.AbstractMigrationStep):
+    def __init__(self):
+        self._depends = ["0060-openapi-spec_e-m-link-02ef0a.py"]
+
+    @property
+    def migration_id(self):
+        return "8e6329b8-ee23-4f75-adb6-8fdc843befc3"
+
+    @property
+    def is_manual(self):
+        return False
+
+    def upgrade(self, session):
+        # Statement level triggers and the table name as a payload keep
+        # the notifications cheap: PostgreSQL folds identical
+        # notifications within a transaction into a single one. The
+        # transition tables skip statements which haven't touched any
+        # rows, for instance, UPDATEs with a non-matching WHERE.
+        expressions = [
+            """
+                CREATE OR REPLACE FUNCTION exordos_notify_change()
+                RETURNS trigger AS $$
+                BEGIN
+                    IF EXISTS (SELECT 1 FROM changed_rows) THEN
+                        PERFORM pg_notify('exordos_changes', TG_TABLE_NAME);
+                    END IF;
+                    RETURN NULL;
+                END;
+                $$ LANGUAGE plpgsql;
+            """,
+        ]
+        for table in NOTIFY_TABLES:
+            for event, transition in NOTIFY_EVENTS:
+                trigger = f"{table}_notify_{event.lower()}"
+                expressions.extend(
+                    (
+                        f"""
+                            DROP TRIGGER IF EXISTS {trigger} ON {table};
+                        """,
+                        f"""
+                            CREATE TRIGGER {trigger}
+                                AFTER {event} ON {table}
+                                REFERENCING {transition} TABLE AS changed_rows
+                                FOR EACH STATEMENT
+                                EXECUTE FUNCTION exordos_notify_change();
+                        """,
+                    )
+                )
+
+        for expression in expressions:
+            session.execute(expression)
+
+    def downgrade(self, session):
+        expressions = [
+            f"""
+                DROP TRIGGER IF EXISTS {table}_notify_{event.lower()} ON {table};
+            """
+            for table in NOTIFY_TABLES
+            for event, _ in NOTIFY_EVENTS
+        ]
+        expressions.append(
+            """
+                DROP FUNCTION IF EXISTS exordos_notify_change();
+            """
+        )
+
+        for expression in expressions:
+            session.execute(expression)
+
+
+migration_step = MigrationStep()
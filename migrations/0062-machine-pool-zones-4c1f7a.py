@@ -0,0 +1,63 @@
+# Copyright 2026 Genesis Corporation
+#
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from restalchemy.storage.sql import migrations
+
+
+class MigrationStep(migrations.AbstractMigrationStep):
+    def __init__(self):
+        self._depends = ["0061-change-notify-triggers-8e6329.py"]
+
+    @property
+    def migration_id(self):
+        return "4c1f7a52-93d0-4b8e-a6f1-2d9e7b0c3a58"
+
+    @property
+    def is_manual(self):
+        return False
+
+    def upgrade(self, session):
+        expressions = [
+            """
+            ALTER TABLE machine_pools
+                ADD IF NOT EXISTS zone UUID
+                references compute_placement_zones(uuid) ON DELETE SET NULL;
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS machine_pools_zone_idx
+                ON machine_pools (zone);
+            """,
+        ]
+
+        for expression in expressions:
+            session.execute(expression)
+
+    def downgrade(self, session):
+        expressions = [
+            """
+            DROP INDEX IF EXISTS machine_pools_zone_idx;
+            """,
+            """
+            ALTER TABLE machine_pools
+                DROP COLUMN IF EXISTS zone;
+            """,
+        ]
+
+        for expression in expressions:
+            session.execute(expression)
+
+
+migration_step = MigrationStep()
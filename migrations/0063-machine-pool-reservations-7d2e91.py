@@ -0,0 +1,61 @@
+# Copyright 2026 Genesis Corporation
+#
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from restalchemy.storage.sql import migrations
+
+
+class MigrationStep(migrations.AbstractMigrationStep):
+    def __init__(self):
+        self._depends = ["0062-machine-pool-zones-4c1f7a.py"]
+
+    @property
+    def migration_id(self):
+        return "7d2e91b4-0c5a-4f3e-9b86-e1a4c2d5f713"
+
+    @property
+    def is_manual(self):
+        return False
+
+    def upgrade(self, session):
+        expressions = [
+            """
+            CREATE INDEX IF NOT EXISTS n_machine_pool_reservations_pool_idx
+                ON n_machine_pool_reservations (pool);
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS n_machine_pool_reservations_machine_idx
+                ON n_machine_pool_reservations (machine);
+            """,
+        ]
+
+        for expression in expressions:
+            session.execute(expression)
+
+    def downgrade(self, session):
+        expressions = [
+            """
+            DROP INDEX IF EXISTS n_machine_pool_reservations_machine_idx;
+            """,
+            """
+            DROP INDEX IF EXISTS n_machine_pool_reservations_pool_idx;
+            """,
+        ]
+
+        for expression in expressions:
+            session.execute(expression)
+
+
+migration_step = MigrationStep()
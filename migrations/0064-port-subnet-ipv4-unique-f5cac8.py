@@ -0,0 +1,88 @@
+# Copyright 2026 Genesis Corporation
+#
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import logging
+
+from restalchemy.storage.sql import migrations
+
+LOG = logging.getLogger(__name__)
+
+
+class MigrationStep(migrations.AbstractMigrationStep):
+    def __init__(self):
+        self._depends = ["0063-machine-pool-reservations-7d2e91.py"]
+
+    @property
+    def migration_id(self):
+        return "f5cac843-e0e5-445b-baa6-ac6c5ea78c95"
+
+    @property
+    def is_manual(self):
+        return False
+
+    def _check_duplicates(self, session):
+        # Ports sharing an IP are already broken, but which of them is
+        # used by the machines is known only to the operator
+        duplicates = session.execute(
+            """
+            SELECT subnet, ipv4, array_agg(uuid::text ORDER BY created_at) AS ports
+            FROM compute_ports
+            WHERE ipv4 IS NOT NULL
+            GROUP BY subnet, ipv4
+            HAVING count(*) > 1;
+            """
+        ).fetchall()
+        for row in duplicates:
+            LOG.error(
+                "IP %s of subnet %s is assigned to several ports: %s",
+                row["ipv4"],
+                row["subnet"],
+                ", ".join(row["ports"]),
+            )
+
+        if duplicates:
+            raise ValueError(
+                f"{len(duplicates)} IPs are assigned to several ports, delete "
+                "the extra ports and apply the migration again"
+            )
+
+    def upgrade(self, session):
+        self._check_duplicates(session)
+
+        expressions = [
+            # An IP is claimed atomically by inserting the port
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS compute_ports_subnet_ipv4_idx
+                ON compute_ports (subnet, ipv4)
+                WHERE ipv4 IS NOT NULL;
+            """,
+        ]
+
+        for expression in expressions:
+            session.execute(expression)
+
+    def downgrade(self, session):
+        expressions = [
+            """
+            DROP INDEX IF EXISTS compute_ports_subnet_ipv4_idx;
+            """,
+        ]
+
+        for expression in expressions:
+            session.execute(expression)
+
+
+migration_step = MigrationStep()